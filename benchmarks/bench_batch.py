@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""Measure the throughput of K2hr3BatchExecutor with 1, 8 and 64 workers.
+
+The fake K2HR3 server answers each request after --latency seconds.
+
+$ python benchmarks/bench_batch.py --requests 512 --latency 0.005
+"""
+
+import argparse
+import os
+import sys
+import time
+
+here = os.path.dirname(__file__)
+src_dir = os.path.join(here, '..', 'src')
+if os.path.exists(src_dir):
+    sys.path.append(src_dir)
+
+from k2hr3client.api import K2hr3HTTPMethod  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.batch import K2hr3BatchExecutor  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.http import K2hr3ConnectionPool, K2hr3Http  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.role import K2hr3Role  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from tests.fakeserver import K2hr3FakeServer  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+
+
+def bench(baseurl, workers, count):
+    """Return the requests per second with the workers."""
+    pool = K2hr3ConnectionPool(maxsize=workers)
+    httpreq = K2hr3Http(baseurl, pool=pool)
+    requests = [(K2hr3HTTPMethod.GET, K2hr3Role("token").get(f"role{i}"))
+                for i in range(count)]
+    with K2hr3BatchExecutor(httpreq, max_workers=workers) as executor:
+        start = time.perf_counter()
+        results = executor.run(requests)
+        elapsed = time.perf_counter() - start
+    pool.clear()
+    if not all(result.ok for result in results):
+        raise RuntimeError('some requests failed')
+    return count / elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='batch executor benchmark')
+    parser.add_argument('--requests', dest='requests', type=int, default=512,
+                        help='number of requests per run')
+    parser.add_argument('--latency', dest='latency', type=float,
+                        default=0.005, help='server latency in seconds')
+    args = parser.parse_args()
+
+    with K2hr3FakeServer(delay=args.latency) as server:
+        for workers in (1, 8, 64):
+            rps = bench(server.baseurl, workers, args.requests)
+            print(f'workers={workers:3d}: {rps:10.1f} req/s')
+    sys.exit(0)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""Measure the request bodies of all API classes.
+
+Each body is built by json.loads and json.dumps of the template as before
+and by the compiled K2hr3BodyBuilder, and both must be byte-identical.
+
+$ python benchmarks/bench_builder.py --count 100000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+here = os.path.dirname(__file__)
+src_dir = os.path.join(here, '..', 'src')
+if os.path.exists(src_dir):
+    sys.path.append(src_dir)
+
+from k2hr3client import acr, policy, resource, role, service, tenant, token  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+
+# pylint: disable=protected-access
+_HOST = {'port': 8080, 'cuk': 'cuk', 'extra': 'extra', 'tag': 'tag',
+         'inboundip': '127.0.0.1', 'outboundip': '127.0.0.2'}
+_CASES = [
+    ('K2hr3Acr.add_member', acr._ACR_API_ADD_MEMBER_BODY,
+     acr._ACR_API_ADD_MEMBER, {'tenant': ('tenant',)},
+     {'tenant': 'mytenant'}),
+    ('K2hr3Policy.create', policy._POLICY_API_CREATE_POLICY_BODY,
+     policy._POLICY_API_CREATE_POLICY,
+     {name: ('policy', name) for name in
+      ('name', 'effect', 'action', 'resource', 'alias')},
+     {'name': 'test_policy', 'effect': 'allow',
+      'action': ['yrn:yahoo::::action:read'],
+      'resource': ['yrn:yahoo:::demo:resource:test_resource'],
+      'alias': []}),
+    ('K2hr3Resource.create_conf_resource',
+     resource._RESOURCE_API_CREATE_RESOURCE_BODY,
+     resource._RESOURCE_API_CREATE_RESOURCE,
+     {name: ('resource', name) for name in
+      ('name', 'type', 'data', 'keys', 'alias')},
+     {'name': 'test_resource', 'type': 'string', 'data': 'x' * 1024,
+      'keys': {'cluster-name': 'testcluster'}, 'alias': []}),
+    ('K2hr3Role.create', role._ROLE_API_CREATE_ROLE_BODY,
+     role._ROLE_API_CREATE_ROLE,
+     {name: ('role', name) for name in ('name', 'policies', 'alias')},
+     {'name': 'test_role', 'policies': ['yrn:yahoo:::demo:policy:p'],
+      'alias': []}),
+    ('K2hr3Role.add_member', role._ROLE_API_ADD_MEMBER_BODY,
+     role._ROLE_API_ADD_MEMBER,
+     {name: ('host', name) for name in ('host',) + tuple(_HOST)},
+     dict(_HOST, host='localhost')),
+    ('K2hr3Role.add_member_with_roletoken',
+     role._ROLE_API_ADD_MEMBER_USING_ROLETOKEN_BODY,
+     role._ROLE_API_ADD_MEMBER_USING_ROLETOKEN,
+     {name: ('host', name) for name in _HOST}, _HOST),
+    ('K2hr3Service.create', service._SERVICE_API_CREATE_SERVICE_BODY,
+     service._SERVICE_API_CREATE_SERVICE,
+     {'name': ('name',), 'verify': ('verify',)},
+     {'name': 'test_service', 'verify': 'http://verify.example.com'}),
+    ('K2hr3Service.add_member', service._SERVICE_API_ADD_MEMBER_BODY,
+     service._SERVICE_API_ADD_MEMBER,
+     {'tenant': ('tenant',), 'clear_tenant': ('clear_tenant',)},
+     {'tenant': 'mytenant', 'clear_tenant': False}),
+    ('K2hr3Tenant.create', tenant._TENANT_API_CREATE_TENANT_BODY,
+     tenant._TENANT_API_CREATE_TENANT,
+     {name: ('tenant', name) for name in
+      ('name', 'desc', 'display', 'users')},
+     {'name': 'mytenant', 'desc': 'test tenant', 'display': 'My Tenant',
+      'users': ['demo']}),
+    ('K2hr3Token.create', token._TOKEN_API_CREATE_TOKEN_TYPE1_BODY,
+     token._TOKEN_API_CREATE_TOKEN_TYPE1,
+     {'tenant_name': ('auth', 'tenantName'), 'user': ('auth', 'user'),
+      'password': ('auth', 'password')},
+     {'tenant_name': 'demo', 'user': 'demo', 'password': 'password'}),
+]
+# pylint: enable=protected-access
+
+
+def legacy(template, fields, values):
+    """Return the body built by json.loads and json.dumps."""
+    python_data = json.loads(template)
+    for name, path in fields.items():
+        node = python_data
+        for key in path[:-1]:
+            node = node[key]
+        node[path[-1]] = values[name]
+    return json.dumps(python_data)
+
+
+def bench(func, count):
+    """Return the microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) * 1000000 / count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='body builder benchmark')
+    parser.add_argument('--count', dest='count', type=int, default=100000,
+                        help='number of bodies per case')
+    args = parser.parse_args()
+
+    for label, builder, template, fields, values in _CASES:
+        if builder.build(**values) != legacy(template, fields, values):
+            raise RuntimeError(f'{label} builds a different body')
+        old = bench(lambda: legacy(template, fields, values),  # pylint: disable=cell-var-from-loop # noqa
+                    args.count)
+        new = bench(lambda: builder.build(**values),  # pylint: disable=cell-var-from-loop # noqa
+                    args.count)
+        print(f'{label:36s} json: {old:6.2f} us  builder: {new:6.2f} us  '
+              f'({old / new:4.1f}x)')
+    sys.exit(0)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""Measure building the requests of the registered endpoints without I/O.
+
+Each case creates an API instance, calls the request method and builds
+the urllib request by prepare_request, which looks up the endpoint of
+the (class, method, operation).
+
+$ python benchmarks/bench_endpoint.py --count 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+here = os.path.dirname(__file__)
+src_dir = os.path.join(here, '..', 'src')
+if os.path.exists(src_dir):
+    sys.path.append(src_dir)
+
+from k2hr3client.acr import K2hr3Acr  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.api import K2hr3HTTPMethod  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.http import prepare_request  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.policy import K2hr3Policy  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.resource import K2hr3Resource  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.role import K2hr3Role, K2hr3RoleHost  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.service import K2hr3Service  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.tenant import K2hr3Tenant  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+
+_BASEURL = 'http://127.0.0.1:18080'
+_HOST = K2hr3RoleHost('localhost', '8080', 'cuk', 'extra', 'tag',
+                      '127.0.0.1', '127.0.0.2')
+_RESOURCE = 'yrn:yahoo:::demo:resource:test_resource'
+_CASES = [
+    ('K2hr3Acr.add_member', K2hr3HTTPMethod.POST,
+     lambda: K2hr3Acr('token', 'service').add_member('demo')),
+    ('K2hr3Policy.create', K2hr3HTTPMethod.POST,
+     lambda: K2hr3Policy('token').create(
+         'test_policy', 'allow', ['yrn:yahoo::::action:read'], [_RESOURCE],
+         None, [])),
+    ('K2hr3Policy.validate', K2hr3HTTPMethod.HEAD,
+     lambda: K2hr3Policy('token').validate(
+         'test_policy', 'demo', _RESOURCE, 'yrn:yahoo::::action:read',
+         'service')),
+    ('K2hr3Resource.get', K2hr3HTTPMethod.GET,
+     lambda: K2hr3Resource('token', resource_path='test_resource').get(
+         True, 'service')),
+    ('K2hr3Role.create', K2hr3HTTPMethod.POST,
+     lambda: K2hr3Role('token').create(
+         'test_role', ['yrn:yahoo:::demo:policy:test_policy'], [])),
+    ('K2hr3Role.add_member', K2hr3HTTPMethod.PUT,
+     lambda: K2hr3Role('token').add_member('test_role', _HOST, True,
+                                            'true')),
+    ('K2hr3Role.get', K2hr3HTTPMethod.GET,
+     lambda: K2hr3Role('token').get('test_role')),
+    ('K2hr3Role.delete_member', K2hr3HTTPMethod.DELETE,
+     lambda: K2hr3Role('token').delete_member('test_role', 'localhost',
+                                               '8080', 'cuk')),
+    ('K2hr3Service.add_member', K2hr3HTTPMethod.POST,
+     lambda: K2hr3Service('token', 'service').add_member('demo', False)),
+    ('K2hr3Tenant.create', K2hr3HTTPMethod.POST,
+     lambda: K2hr3Tenant('token').create('demo', ['demo'], 'desc',
+                                         'display')),
+    ('K2hr3Tenant.get_tenant_list', K2hr3HTTPMethod.GET,
+     lambda: K2hr3Tenant('token').get_tenant_list(True)),
+]
+
+
+def bench(method, build, count):
+    """Return the microseconds per request."""
+    start = time.perf_counter()
+    for _ in range(count):
+        prepare_request(_BASEURL, method, build())
+    return (time.perf_counter() - start) * 1000000 / count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='endpoint benchmark')
+    parser.add_argument('--count', dest='count', type=int, default=20000,
+                        help='number of requests per case')
+    args = parser.parse_args()
+
+    for label, method, build in _CASES:
+        if prepare_request(_BASEURL, method, build()).url == \
+                f'{_BASEURL}/None':
+            raise RuntimeError(f'{label} has no endpoint')
+        usec = bench(method, build, args.count)
+        print(f'{label:30s} {method.name:6s} {usec:7.2f} us/request')
+    sys.exit(0)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
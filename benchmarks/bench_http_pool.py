@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""Compare requests per second of urlopen and K2hr3ConnectionPool.
+
+$ python benchmarks/bench_http_pool.py --requests 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+import urllib.request
+
+here = os.path.dirname(__file__)
+src_dir = os.path.join(here, '..', 'src')
+if os.path.exists(src_dir):
+    sys.path.append(src_dir)
+
+from k2hr3client.http import K2hr3ConnectionPool, K2hr3Http  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.version import K2hr3Version  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from tests.fakeserver import K2hr3FakeServer  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+
+
+def bench_urlopen(url, count):
+    """Send requests by urlopen, one connection per request."""
+    start = time.perf_counter()
+    for _ in range(count):
+        with urllib.request.urlopen(url, timeout=30) as res:
+            res.read()
+    return count / (time.perf_counter() - start)
+
+
+def bench_pool(baseurl, count):
+    """Send requests by K2hr3Http over a connection pool."""
+    httpreq = K2hr3Http(baseurl, pool=K2hr3ConnectionPool())
+    start = time.perf_counter()
+    for _ in range(count):
+        myversion = K2hr3Version("v1")
+        myversion.get()
+        httpreq.GET(myversion)
+    elapsed = time.perf_counter() - start
+    httpreq.pool.clear()
+    return count / elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='connection pool benchmark')
+    parser.add_argument('--requests', dest='requests', type=int, default=2000,
+                        help='number of requests per run')
+    args = parser.parse_args()
+
+    with K2hr3FakeServer() as server:
+        bench_urlopen(f'{server.baseurl}/v1', 10)  # warm up
+        urlopen_rps = bench_urlopen(f'{server.baseurl}/v1', args.requests)
+        before = server.connections
+        pool_rps = bench_pool(server.baseurl, args.requests)
+        pool_conns = server.connections - before
+    print(f'urlopen: {urlopen_rps:10.1f} req/s '
+          f'({args.requests} connections)')
+    print(f'pool:    {pool_rps:10.1f} req/s ({pool_conns} connections)')
+    print(f'speedup: {pool_rps / urlopen_rps:10.2f}x')
+    sys.exit(0)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""Measure K2hr3PolicyEngine against the HEAD requests of the policy API.
+
+The fake K2HR3 server answers each request after --latency seconds.
+
+$ python benchmarks/bench_policyengine.py --checks 1000 --latency 0.001
+"""
+
+import argparse
+import os
+import sys
+import time
+
+here = os.path.dirname(__file__)
+src_dir = os.path.join(here, '..', 'src')
+if os.path.exists(src_dir):
+    sys.path.append(src_dir)
+
+from k2hr3client.api import K2hr3HTTPMethod  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.http import K2hr3Http  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.policy import K2hr3Policy  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from k2hr3client.policyengine import K2hr3PolicyEngine  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+from tests.fakeserver import K2hr3FakeServer  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+
+_POLICY = 'yrn:yahoo:::demo:policy:test_policy'
+_ACTION = 'yrn:yahoo::::action:read'
+
+
+def app(req):
+    """Return a policy allowing the resources of 256 names."""
+    if req.method == 'HEAD':
+        return 204, {}, None
+    return 200, {}, {'result': True, 'message': None, 'policy': {
+        'name': _POLICY, 'effect': 'allow', 'action': [_ACTION],
+        'resource': [f'yrn:yahoo:::demo:resource:r{i}/*'
+                     for i in range(256)],
+        'condition': None, 'reference': 0, 'alias': []}}
+
+
+def bench_head(httpreq, count):
+    """Return the checks per second by the HEAD requests."""
+    start = time.perf_counter()
+    for i in range(count):
+        request = K2hr3Policy("token").validate(
+            _POLICY, 'demo', f'r{i % 256}/x', _ACTION).request(
+                K2hr3HTTPMethod.HEAD)
+        httpreq.send(request)
+    return count / (time.perf_counter() - start)
+
+
+def bench_engine(httpreq, count):
+    """Return the checks per second by K2hr3PolicyEngine."""
+    with K2hr3PolicyEngine(httpreq, "token") as engine:
+        engine.validate(_POLICY, 'demo', 'r0/x', _ACTION)
+        start = time.perf_counter()
+        for i in range(count):
+            engine.validate(_POLICY, 'demo', f'r{i % 256}/x', _ACTION)
+        return count / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='policy engine benchmark')
+    parser.add_argument('--checks', dest='checks', type=int, default=1000,
+                        help='number of checks per run')
+    parser.add_argument('--latency', dest='latency', type=float,
+                        default=0.001, help='server latency in seconds')
+    args = parser.parse_args()
+
+    with K2hr3FakeServer(app, delay=args.latency) as server:
+        myhttp = K2hr3Http(server.baseurl)
+        print(f'head:   {bench_head(myhttp, args.checks):12.1f} checks/s')
+        print(f'engine: {bench_engine(myhttp, args.checks):12.1f} checks/s')
+    sys.exit(0)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""Measure the per-request cost of building a SSLContext.
+
+$ python benchmarks/bench_ssl_context.py --requests 200
+"""
+
+import argparse
+import os
+import ssl
+import sys
+import time
+import tracemalloc
+
+here = os.path.dirname(__file__)
+src_dir = os.path.join(here, '..', 'src')
+if os.path.exists(src_dir):
+    sys.path.append(src_dir)
+
+from k2hr3client.http import get_ssl_context  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+
+
+def create_every_time():
+    """Build a context as K2hr3Http did before for each https request."""
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+def measure(func, count):
+    """Return the cpu seconds and the peak memory bytes per call."""
+    tracemalloc.start()
+    start = time.process_time()
+    for _ in range(count):
+        func()
+    elapsed = time.process_time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / count, peak
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='SSLContext benchmark')
+    parser.add_argument('--requests', dest='requests', type=int, default=200,
+                        help='number of simulated https requests')
+    args = parser.parse_args()
+
+    get_ssl_context(True)  # warm up the registry
+    fresh_cpu, fresh_peak = measure(create_every_time, args.requests)
+    cached_cpu, cached_peak = measure(lambda: get_ssl_context(True),
+                                      args.requests)
+    print(f'create_default_context: {fresh_cpu * 1e6:10.1f} us/request '
+          f'(python heap peak {fresh_peak / 1024:.1f} KiB)')
+    print(f'get_ssl_context:        {cached_cpu * 1e6:10.1f} us/request '
+          f'(python heap peak {cached_peak / 1024:.1f} KiB)')
+    print(f'cpu saved:              {(fresh_cpu - cached_cpu) * 1e6:10.1f} '
+          f'us/request')
+    sys.exit(0)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
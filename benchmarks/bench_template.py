@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""Measure the rendering of resource templates of 8KB and 1MB.
+
+Each template is rendered by reading it line by line with two re.sub
+calls per line as before, by render_template without the cache and by
+render_template with the cache, and all must be identical.
+
+$ python benchmarks/bench_template.py --count 100
+"""
+
+import argparse
+import os
+from pathlib import Path
+import re
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(__file__)
+src_dir = os.path.join(here, '..', 'src')
+if os.path.exists(src_dir):
+    sys.path.append(src_dir)
+
+from k2hr3client import resource  # type: ignore # pylint: disable=import-error, wrong-import-position # noqa
+
+_LINE = 'CLUSTER_NAME = __TROVE_K2HDKC_CLUSTER_NAME__ ' \
+        'TENANT = __TROVE_K2HDKC_TENANT_NAME__ # padding\n'
+
+
+def legacy(path, projectname, clustername, max_length):
+    """Return the data rendered line by line."""
+    data = ''
+    line_len = 0
+    with path.open() as f:
+        for line in iter(f.readline, ''):
+            line = re.sub('__TROVE_K2HDKC_CLUSTER_NAME__', clustername, line)
+            line = re.sub('__TROVE_K2HDKC_TENANT_NAME__', projectname, line)
+            line_len += len(line)
+            if line_len > max_length:
+                raise RuntimeError('data too big')
+            data = ''.join([data, line])
+    return data
+
+
+def uncached(path, projectname, clustername, max_length):
+    """Return the data rendered without the cache."""
+    resource._render_template.cache_clear()  # pylint: disable=protected-access # noqa
+    return resource.render_template(path, projectname, clustername,
+                                    max_length)
+
+
+def cached(path, projectname, clustername, max_length):
+    """Return the data rendered with the cache."""
+    return resource.render_template(path, projectname, clustername,
+                                    max_length)
+
+
+def bench(func, count):
+    """Return the microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) * 1000000 / count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='template benchmark')
+    parser.add_argument('--count', dest='count', type=int, default=100,
+                        help='number of renderings per case')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for label, size in (('8KB', 8 * 1024), ('1MB', 1024 * 1024)):
+            path = Path(tmpdir) / f'template_{label}.txt'
+            path.write_text(_LINE * (size // len(_LINE)))
+            params = (path, 'mytenant', 'mycluster', 2 * size)
+            expected = legacy(*params)
+            if uncached(*params) != expected or \
+                    cached(*params) != expected:
+                raise RuntimeError(f'{label} renders a different data')
+            old = bench(lambda: legacy(*params),  # pylint: disable=cell-var-from-loop # noqa
+                        args.count)
+            new = bench(lambda: uncached(*params),  # pylint: disable=cell-var-from-loop # noqa
+                        args.count)
+            hit = bench(lambda: cached(*params),  # pylint: disable=cell-var-from-loop # noqa
+                        args.count)
+            print(f'{label}  lines: {old:10.1f} us  one pass: {new:8.1f} us '
+                  f'({old / new:5.1f}x)  cached: {hit:6.1f} us')
+    sys.exit(0)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -45,10 +45,11 @@
 """
 
 
-import json
 from typing import Optional
 
-from k2hr3client.api import K2hr3Api, K2hr3HTTPMethod
+from k2hr3client.api import K2hr3Api, K2hr3Endpoint, K2hr3HTTPMethod, \
+    register_endpoints
+from k2hr3client.builder import K2hr3BodyBuilder
 from k2hr3client.exception import K2hr3Exception
 
 _ACR_API_ADD_MEMBER = """
@@ -56,6 +57,8 @@ _ACR_API_ADD_MEMBER = """
     "tenant":    "<tenant name>"
 }
 """
+_ACR_API_ADD_MEMBER_BODY = K2hr3BodyBuilder(
+    _ACR_API_ADD_MEMBER, tenant=('tenant',))
 
 
 class K2hr3Acr(K2hr3Api):  # pylint: disable=too-many-instance-attributes
@@ -178,45 +181,20 @@ class K2hr3Acr(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         if getattr(self, '_service', None) is None:
             self._service = val
 
-    #
-    # abstract methos that must be implemented in subclasses
-    #
-    def _api_path(self, method: K2hr3HTTPMethod) -> Optional[str]:
-        """Get the request url path."""
-        if method == K2hr3HTTPMethod.POST:
-            # Creating the request body
-            if self.api_id == 1:
-                python_data = json.loads(_ACR_API_ADD_MEMBER)
-                python_data['tenant'] = self.tenant
-                self.body = json.dumps(python_data)
-                return f'{self.version}/{self.basepath}/{self.service}'
-        if method == K2hr3HTTPMethod.PUT:
-            if self.api_id == 1:
-                self.urlparams = json.dumps({
-                    'tenant': self.tenant
-                })
-                return f'{self.version}/{self.basepath}/{self.service}'
-        if method == K2hr3HTTPMethod.GET:
-            if self.api_id == 2:
-                return f'{self.version}/{self.basepath}/{self.service}'
-            if self.api_id == 3:
-                self.urlparams = json.dumps({
-                    'cip': self.cip,
-                    'cport': self.cport,
-                    'crole': self.crole,
-                    'ccuk': self.ccuk,
-                    'sport': self.sport,
-                    'srole': self.srole,
-                    'scuk': self.scuk,
-                })
-                return f'{self.version}/{self.basepath}/{self.service}'
-        if method == K2hr3HTTPMethod.DELETE:
-            if self.api_id == 4:
-                self.urlparams = json.dumps({
-                    'tenant': self.tenant
-                })
-                return f'{self.version}/{self.basepath}/{self.service}'
-        return None
+
+_ACR_PATH = '{version}/{basepath}/{service}'
+register_endpoints(K2hr3Acr, (
+    K2hr3Endpoint(1, K2hr3HTTPMethod.POST, _ACR_PATH,
+                  body=lambda r3api: _ACR_API_ADD_MEMBER_BODY.build(
+                      tenant=r3api.tenant)),
+    K2hr3Endpoint(1, K2hr3HTTPMethod.PUT, _ACR_PATH, query=('tenant',)),
+    K2hr3Endpoint(2, K2hr3HTTPMethod.GET, _ACR_PATH),
+    K2hr3Endpoint(3, K2hr3HTTPMethod.GET, _ACR_PATH,
+                  query=('cip', 'cport', 'crole', 'ccuk', 'sport', 'srole',
+                         'scuk')),
+    K2hr3Endpoint(4, K2hr3HTTPMethod.DELETE, _ACR_PATH, query=('tenant',)),
+))
+
 #
 # Local variables:
 # tab-width: 4
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of a cache of the available ACR resources.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.acrcache import K2hr3AcrCache
+
+    myhttp = K2hr3Http("http://127.0.0.1:18080")
+    acrcache = K2hr3AcrCache(myhttp, mytoken.token, "myservice", ttl=60.0)
+    # sends a request only if the answer of the roles is not cached.
+    resp = acrcache.get(cip="192.168.0.1", crole=CLIENT_ROLE_YRN,
+                        srole=SERVICE_ROLE_YRN)
+    resp.json()["response"]  // [{"name": ...
+    acrcache.stats().hit_ratio  // 0.99...
+"""
+
+import logging
+import time
+from typing import Any, Callable, Optional, Tuple
+
+from k2hr3client.acr import K2hr3Acr
+from k2hr3client.api import K2hr3ApiResponse, K2hr3HTTPMethod
+from k2hr3client.cache import K2hr3CacheStats, K2hr3LRUCache, \
+    K2hr3Singleflight
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+
+LOG = logging.getLogger(__name__)
+
+# (cip, cport, crole, ccuk, sport, srole, scuk)
+_AcrKey = Tuple[Optional[str], ...]
+
+
+def _text(val: Any) -> Optional[str]:
+    """Return a stripped str, or None if it is empty."""
+    if val is None:
+        return None
+    val = str(val).strip()
+    return val or None
+
+
+def _port(val: Any) -> Optional[str]:
+    """Return a port as a decimal str, or None if it is empty."""
+    val = _text(val)
+    if val is not None and val.isdigit():
+        return str(int(val))
+    return val
+
+
+def _role(val: Any) -> Optional[str]:
+    """Return a role yrn without the trailing slashes."""
+    val = _text(val)
+    return None if val is None else val.rstrip('/') or None
+
+
+def acr_key(cip: Any = None,  # pylint: disable=too-many-arguments
+            *, cport: Any = None, crole: Any = None, ccuk: Any = None,
+            sport: Any = None, srole: Any = None,
+            scuk: Any = None) -> _AcrKey:
+    """Return the normalized arguments of get_available_resources.
+
+    The blank values are None, the ports are decimal strs and the roles
+    have no trailing slashes, so the equivalent arguments share a key.
+    """
+    return (_text(cip), _port(cport), _role(crole), _text(ccuk),
+            _port(sport), _role(srole), _text(scuk))
+
+
+class K2hr3AcrCache():
+    """K2hr3AcrCache memoizes K2hr3Acr.get_available_resources.
+
+    The responses are keyed by the normalized arguments and live ``ttl``
+    seconds, and the least recently used one is evicted if more than
+    ``maxsize`` responses are cached. Concurrent callers of a key not
+    cached share one request. An error response is returned but not
+    cached. stats() returns the hits and the misses.
+    """
+
+    __slots__ = ('_http', '_r3token', '_service', '_entries', '_flight')
+
+    def __init__(self, http: K2hr3Http,  # pylint: disable=too-many-arguments
+                 r3token: str, service: str, *, ttl: float = 60.0,
+                 maxsize: int = 4096,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """Init the members.
+
+        :param http: client to get the resources
+        :param r3token: token of the ACR API
+        :param service: service name
+        :param ttl: seconds a response is reused
+        :param maxsize: max number of the responses
+        :raises K2hr3Exception: if service is not str, ttl is negative or
+                                maxsize is not int > 0
+        """
+        if isinstance(service, str) is False:
+            raise K2hr3Exception(
+                f'service should be str, not {type(service)}')
+        self._http = http
+        self._r3token = r3token
+        self._service = service
+        self._entries = K2hr3LRUCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._flight = K2hr3Singleflight()
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3AcrCache _service={self._service}, ' \
+               f'_ttl={self._entries.ttl}, ' \
+               f'_maxsize={self._entries.maxsize}, ' \
+               f'entries={len(self._entries)}>'
+
+    def __len__(self) -> int:
+        """Return the number of the cached responses."""
+        return len(self._entries)
+
+    @property
+    def service(self) -> str:
+        """Return the service name."""
+        return self._service
+
+    def stats(self) -> K2hr3CacheStats:
+        """Return the hits and the misses of the responses."""
+        return self._entries.stats()
+
+    def get(self, cip: Any = None,  # pylint: disable=too-many-arguments
+            *, cport: Any = None, crole: Any = None, ccuk: Any = None,
+            sport: Any = None, srole: Any = None,
+            scuk: Any = None) -> K2hr3ApiResponse:
+        """Return the response of get_available_resources.
+
+        :raises K2hr3Exception: if the request could not be sent
+        """
+        key = acr_key(cip, cport=cport, crole=crole, ccuk=ccuk, sport=sport,
+                      srole=srole, scuk=scuk)
+        resp = self._entries.get(key)
+        if resp is not None:
+            return resp
+        return self._flight.do(key, self._get, key)
+
+    def invalidate(self, crole: Optional[str] = None,
+                   srole: Optional[str] = None) -> None:
+        """Drop the responses of the roles, or all responses."""
+        if crole is None and srole is None:
+            self._entries.clear()
+            return
+        crole, srole = _role(crole), _role(srole)
+        for key in self._entries.keys():
+            if crole in (None, key[2]) and srole in (None, key[5]):
+                self._entries.pop(key)
+
+    def _get(self, key: _AcrKey) -> K2hr3ApiResponse:
+        """Get the resources and cache the response."""
+        request = K2hr3Acr(self._r3token, self._service) \
+            .get_available_resources(*key).request(K2hr3HTTPMethod.GET)
+        resp = self._http.send(request, errors=True)
+        if resp is None:
+            raise K2hr3Exception(
+                f'could not get the resources of {self._service}')
+        if resp.code >= 300 or resp.result is False:
+            LOG.warning('not caching the resources of %s, code %s',
+                        self._service, resp.code)
+            return resp
+        self._entries.set(key, resp)
+        return resp
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -38,14 +38,28 @@ k2hr3client - Python library for K2HR3 API.
 
 import abc
 from enum import Enum
+import json
 import logging
 from http.client import HTTPMessage
-from typing import Optional
+from operator import attrgetter
+import re
+import string
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, \
+    Optional, Tuple, Union
+import urllib.parse
 
 from k2hr3client.exception import K2hr3Exception
+from k2hr3client.jsonutil import loads
 
 LOG = logging.getLogger(__name__)
 
+# K2HR3 WebAPI responses start with the result and the message.
+_RESULT_MESSAGE_RE = re.compile(
+    r'\s*\{\s*"result"\s*:\s*(?P<result>true|false)\s*'
+    r'(?:,\s*"message"\s*:\s*(?P<message>null|"(?:[^"\\]|\\.)*")\s*[,}])?')
+_NOT_DECODED = object()
+_FORMATTER = string.Formatter()
+
 
 # NOTE(hiwakaba): we do not use 3.11's http.HTTPMethod module
 # Because we need to support 3.10.
@@ -67,10 +81,11 @@ class K2hr3HTTPMethod(Enum):  # type: ignore[no-redef]
 class K2hr3ApiResponse():  # pylint: disable=too-many-instance-attributes
     """K2hr3ApiResponse stores the response of K2HR3 WebAPI.
 
-    The members are set by setter methods only one time.
+    The members are set by setter methods only one time. The body is
+    decoded by json() at most once.
     """
 
-    __slots__ = ('_code', '_url', '_hdrs', '_body')
+    __slots__ = ('_code', '_url', '_hdrs', '_body', '_json')
 
     def __init__(self, code=None, url=None, hdrs=None, body=None) -> None:
         """Init the members."""
@@ -78,6 +93,7 @@ class K2hr3ApiResponse():  # pylint: disable=too-many-instance-attributes
         self.url = url
         self.hdrs = hdrs
         self.body = body
+        self._json = _NOT_DECODED  # type: Any
 
     def __repr__(self) -> str:
         """Represent the members."""
@@ -103,6 +119,51 @@ class K2hr3ApiResponse():  # pylint: disable=too-many-instance-attributes
         if getattr(self, '_body', None) is None:
             self._body = val
 
+    def json(self) -> Any:
+        """Return the decoded body.
+
+        The body is decoded once by the decoder of jsonutil.set_decoder
+        and the result is cached.
+
+        :raises ValueError: if the body is not json
+        """
+        if self._json is _NOT_DECODED:
+            self._json = loads(self._body) if self._body else None
+        return self._json
+
+    def _result_message(self) -> Optional[re.Match]:
+        if self._json is not _NOT_DECODED or not self._body:
+            return None
+        return _RESULT_MESSAGE_RE.match(self._body)
+
+    @property
+    def result(self) -> Optional[bool]:
+        """Return the result member of the body.
+
+        The head of the body is read without decoding the whole body.
+        """
+        matches = self._result_message()
+        if matches is not None:
+            return matches.group('result') == 'true'
+        python_data = self.json()
+        if isinstance(python_data, dict):
+            return python_data.get('result')
+        return None
+
+    @property
+    def message(self) -> Optional[str]:
+        """Return the message member of the body.
+
+        The head of the body is read without decoding the whole body.
+        """
+        matches = self._result_message()
+        if matches is not None and matches.group('message') is not None:
+            return json.loads(matches.group('message'))
+        python_data = self.json()
+        if isinstance(python_data, dict):
+            return python_data.get('message')
+        return None
+
     @property
     def hdrs(self) -> HTTPMessage:
         """Return the header."""
@@ -150,6 +211,179 @@ class K2hr3ApiResponse():  # pylint: disable=too-many-instance-attributes
             self._url = val
 
 
+class K2hr3Endpoint():
+    """K2hr3Endpoint declares an operation of a K2HR3 API class.
+
+    An operation is identified by the api_id its request method of the API
+    class sets. The path template is formatted with the attributes of the
+    API instance like ``'{version}/{basepath}/{role_name}'``, and the query
+    maps the url parameter names to the attribute names. Both are compiled
+    once, so building a request only reads the attributes.
+    """
+
+    __slots__ = ('_operation', '_method', '_path', '_parts', '_query',
+                 '_body')
+
+    def __init__(self, operation: int, method: K2hr3HTTPMethod,  # pylint: disable=too-many-arguments # noqa
+                 path: Union[str, Callable[[Any], str]],
+                 query: Optional[Iterable[Union[str, Tuple[str, Any]]]] = None,  # noqa
+                 body: Optional[Callable[[Any], str]] = None) -> None:
+        """Init the members.
+
+        :param operation: api_id of the operation
+        :param path: path template or a callable that returns the path
+        :param query: url parameter names of the same attributes or pairs
+                      of an url parameter and an attribute name that may
+                      be dotted like 'host.port' or a callable that returns
+                      the value. No url parameters are set if None.
+        :param body: callable that returns the request body
+        """
+        self._operation = operation
+        self._method = method
+        self._path = path
+        self._parts: List[Tuple[str, Optional[Callable]]] = []
+        if isinstance(path, str):
+            for literal, field, _, _ in _FORMATTER.parse(path):
+                self._parts.append(
+                    (literal, attrgetter(field) if field else None))
+        self._query: Optional[List[Tuple[str, Callable]]] = None
+        if query is not None:
+            self._query = []
+            for item in query:
+                name, attr = (item, item) if isinstance(item, str) else item
+                self._query.append(
+                    (name, attr if callable(attr) else attrgetter(attr)))
+        self._body = body
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3Endpoint operation={self._operation}, ' \
+               f'method={self._method.name}, path={self._path!r}>'
+
+    @property
+    def operation(self) -> int:
+        """Return the api_id of the operation."""
+        return self._operation
+
+    @property
+    def method(self) -> K2hr3HTTPMethod:
+        """Return the request method."""
+        return self._method
+
+    def path(self, r3api: Any) -> str:
+        """Return the request url path of the API instance."""
+        if not self._parts:
+            return self._path(r3api)  # type: ignore
+        return ''.join([literal + str(getter(r3api)) if getter else literal
+                        for literal, getter in self._parts])
+
+    def query(self, r3api: Any) -> Optional[dict]:
+        """Return the url parameters of the API instance."""
+        if self._query is None:
+            return None
+        return {name: getter(r3api) for name, getter in self._query}
+
+    def body(self, r3api: Any) -> Optional[str]:
+        """Return the request body of the API instance."""
+        return self._body(r3api) if self._body is not None else None
+
+    def apply(self, r3api: 'K2hr3Api') -> str:
+        """Set the url parameters and the body and return the path."""
+        if self._body is not None:
+            r3api.body = self._body(r3api)
+        if self._query is not None:
+            r3api.urlparams = json.dumps(self.query(r3api))
+        return self.path(r3api)
+
+
+_EndpointKey = Tuple[type, K2hr3HTTPMethod, int]
+_ENDPOINTS: Dict[_EndpointKey, K2hr3Endpoint] = {}
+
+
+def encode_urlparams(urlparams: Optional[Union[str, dict]]) -> str:
+    """Encode the urlparams of a K2hr3Api that may be a json string."""
+    if not urlparams:
+        return ''
+    if isinstance(urlparams, dict):
+        return urllib.parse.urlencode(urlparams)
+    return urllib.parse.urlencode(json.loads(urlparams))
+
+
+class K2hr3Request(NamedTuple):
+    """Represent an immutable request of a K2HR3 API.
+
+    A request is hashable and can be shared between threads and sent
+    many times. The query is the encoded url parameters, and the body is
+    the data to send.
+    """
+
+    method: K2hr3HTTPMethod
+    path: str
+    query: Optional[str]
+    headers: Tuple[Tuple[str, str], ...]
+    body: Optional[bytes]
+
+    @classmethod
+    def build(cls, method: K2hr3HTTPMethod,  # pylint: disable=too-many-arguments # noqa
+              path: Optional[str], urlparams: Optional[Union[str, dict]],
+              headers: Optional[dict], body: Optional[str]
+              ) -> 'K2hr3Request':
+        """Encode the url parameters and the body of a request method.
+
+        POST sends the body of application/json or the url parameters as
+        the form data. PUT always has a query string.
+        """
+        query = None  # type: Optional[str]
+        data = None  # type: Optional[bytes]
+        if method == K2hr3HTTPMethod.POST:
+            content_type = headers.get('Content-Type') if headers else None
+            if content_type == 'application/json':
+                data = body.encode('ascii') if body else None
+            else:
+                form = encode_urlparams(urlparams)
+                data = form.encode('ascii') if form else None
+        elif method == K2hr3HTTPMethod.PUT:
+            query = encode_urlparams(urlparams)
+        elif urlparams:
+            query = encode_urlparams(urlparams)
+        return cls(method, str(path), query,
+                   tuple(headers.items()) if headers else (), data)
+
+    def url(self, baseurl: str) -> str:
+        """Return the full url of the request."""
+        if self.query or self.method == K2hr3HTTPMethod.PUT:
+            return f'{baseurl}/{self.path}?{self.query}'
+        return f'{baseurl}/{self.path}'
+
+
+def register_endpoints(cls: type, endpoints: Iterable[K2hr3Endpoint]
+                       ) -> None:
+    """Register the endpoints of an API class.
+
+    :raises K2hr3Exception: if an operation is registered twice
+    """
+    for endpoint in endpoints:
+        key = (cls, endpoint.method, endpoint.operation)
+        if key in _ENDPOINTS:
+            raise K2hr3Exception(
+                f'{cls.__name__} has the endpoint of {endpoint.method.name} '
+                f'{endpoint.operation} already')
+        _ENDPOINTS[key] = endpoint
+
+
+def get_endpoint(cls: type, method: K2hr3HTTPMethod, operation: int
+                 ) -> Optional[K2hr3Endpoint]:
+    """Return the endpoint of the operation of an API class or None."""
+    endpoint = _ENDPOINTS.get((cls, method, operation))
+    if endpoint is None:
+        # subclasses share the endpoints of the base classes.
+        for base in cls.__mro__[1:]:
+            endpoint = _ENDPOINTS.get((base, method, operation))
+            if endpoint is not None:
+                break
+    return endpoint
+
+
 class K2hr3Api(abc.ABC):  # pylint: disable=too-many-instance-attributes
     """Base class of all K2HR3 WebAPIs."""
 
@@ -262,11 +496,35 @@ class K2hr3Api(abc.ABC):  # pylint: disable=too-many-instance-attributes
         self._version = val
 
     #
-    # abstract methods that must be implemented in subclasses
+    # methods that sub classes may override
     #
-    @abc.abstractmethod
     def _api_path(self, method: K2hr3HTTPMethod) -> Optional[str]:
-        """Sub classes should implement this method."""
+        """Get the request url path of the registered endpoint.
+
+        Sub classes register their endpoints by register_endpoints or
+        override this method.
+        """
+        endpoint = get_endpoint(type(self), method, self.api_id)
+        if endpoint is None:
+            return None
+        return endpoint.apply(self)
+
+    def request(self, method: K2hr3HTTPMethod) -> K2hr3Request:
+        """Return the immutable request of the operation.
+
+        The request of a registered endpoint is built from the current
+        attributes without updating the urlparams and the body, so the
+        instance can build other requests later. The response of the
+        request is returned by K2hr3Http.send, not set to this instance.
+        """
+        endpoint = get_endpoint(type(self), method, self.api_id)
+        if endpoint is None:
+            path = self._api_path(method)
+            return K2hr3Request.build(method, path, self.urlparams,
+                                      self.headers, self.body)
+        return K2hr3Request.build(method, endpoint.path(self),
+                                  endpoint.query(self), self.headers,
+                                  endpoint.body(self))
 
     #
     # methods that are invoked from other classes
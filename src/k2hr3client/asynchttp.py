@@ -0,0 +1,525 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""
+k2hr3client - Python library for K2HR3 API.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package
+    import asyncio
+    from k2hr3client.asynchttp import AsyncK2hr3Http
+    from k2hr3client.token import K2hr3Token
+
+    async def main():
+        async with AsyncK2hr3Http('http://127.0.0.1:18080') as client:
+            mytoken = K2hr3Token("demo", "gAAAAA...")
+            await client.post(mytoken.create())
+            print(mytoken.token)
+
+    asyncio.run(main())
+"""
+
+import asyncio
+from collections import deque
+import email.parser
+import http.client
+import logging
+import ssl
+import time
+from typing import Any, Deque, Dict, Optional, Tuple
+import urllib.parse
+from urllib.error import URLError
+
+from k2hr3client.api import K2hr3Api, K2hr3ApiResponse, K2hr3HTTPMethod, \
+    K2hr3Request
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import check_baseurl, get_ssl_context, prepare_request
+from k2hr3client.resolver import K2hr3Resolver, get_resolver
+from k2hr3client.retry import K2hr3RetryPolicy
+
+LOG = logging.getLogger(__name__)
+
+_PoolKey = Tuple[str, str, int, Optional[ssl.SSLContext]]
+_Stream = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+# reader, writer and the time when the connection got idle
+_IdleStream = Tuple[asyncio.StreamReader, asyncio.StreamWriter, float]
+
+_MAX_HEADERS = 100
+
+
+class AsyncK2hr3ConnectionPool():
+    """AsyncK2hr3ConnectionPool keeps idle asyncio stream connections.
+
+    Idle connections are kept per (scheme, host, port, SSLContext) up to
+    ``maxsize`` and are evicted after ``idle_timeout`` seconds. New
+    connections are made to the addresses cached by ``resolver``. The
+    connections belong to the event loop they were made in, so the idle
+    ones are dropped when the pool is used in another event loop.
+    """
+
+    __slots__ = ('_maxsize', '_idle_timeout', '_idle', '_resolver', '_loop')
+
+    def __init__(self, maxsize: int = 10, idle_timeout: float = 60.0,
+                 resolver: Optional[K2hr3Resolver] = None) -> None:
+        """Init the members."""
+        if isinstance(maxsize, int) is False or maxsize < 0:
+            raise K2hr3Exception(f'maxsize should be int >= 0, not {maxsize}')
+        self._maxsize = maxsize
+        self._idle_timeout = idle_timeout
+        self._resolver = resolver or get_resolver()
+        self._idle: Dict[_PoolKey, Deque[_IdleStream]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<AsyncK2hr3ConnectionPool _maxsize={self._maxsize}, ' \
+               f'_idle_timeout={self._idle_timeout}, ' \
+               f'idle={self.idle_count()}>'
+
+    def idle_count(self) -> int:
+        """Return the number of idle connections."""
+        return sum(len(conns) for conns in self._idle.values())
+
+    def _bind(self) -> None:
+        """Drop the idle connections of another event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # the streams can not be used nor closed in another loop, so
+            # they are left to the garbage collector.
+            if self._idle:
+                LOG.debug('dropping %s idle connections of another loop',
+                          self.idle_count())
+            self._idle = {}
+            self._loop = loop
+
+    @staticmethod
+    def _is_alive(reader: asyncio.StreamReader,
+                  writer: asyncio.StreamWriter) -> bool:
+        """Check the health of an idle connection."""
+        return not (writer.is_closing() or reader.at_eof())
+
+    async def acquire(self, key: _PoolKey, timeout: float
+                      ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]: # noqa
+        """Return an idle connection if any, or a new one."""
+        self._bind()
+        now = time.monotonic()
+        conns = self._idle.get(key)
+        while conns:
+            reader, writer, last_used = conns.pop()
+            if now - last_used <= self._idle_timeout and \
+                    self._is_alive(reader, writer):
+                return reader, writer, True
+            LOG.debug('evicting an idle connection to %s', key)
+            writer.close()
+        reader, writer = await asyncio.wait_for(self._connect(key), timeout)
+        return reader, writer, False
+
+    async def _connect(self, key: _PoolKey) -> _Stream:
+        """Connect to the first address of the host that accepts."""
+        scheme, host, port, context = key
+        addrinfos = self._resolver.cached(host, port)
+        if addrinfos is None:
+            # getaddrinfo blocks, so it runs out of the event loop.
+            addrinfos = await asyncio.get_running_loop().run_in_executor(
+                None, self._resolver.resolve, host, port)
+        error = None  # type: Optional[OSError]
+        for addrinfo in addrinfos:
+            sockaddr = addrinfo[4]
+            try:
+                if scheme == 'https':
+                    return await asyncio.open_connection(
+                        sockaddr[0], sockaddr[1], ssl=context,
+                        server_hostname=host)
+                return await asyncio.open_connection(sockaddr[0],
+                                                     sockaddr[1])
+            except OSError as err:
+                LOG.debug('could not connect to %s of %s, %s',
+                          sockaddr, host, err)
+                self._resolver.mark_failed(host, port, sockaddr)
+                error = err
+        raise error or OSError(f'no address of {host}')
+
+    def release(self, key: _PoolKey, reader: asyncio.StreamReader,
+                writer: asyncio.StreamWriter) -> None:
+        """Return a connection to the pool."""
+        self._bind()
+        now = time.monotonic()
+        conns = self._idle.setdefault(key, deque())
+        while conns and now - conns[0][2] > self._idle_timeout:
+            conns.popleft()[1].close()
+        if len(conns) < self._maxsize:
+            conns.append((reader, writer, now))
+        else:
+            writer.close()
+
+    async def clear(self) -> None:
+        """Close all idle connections."""
+        idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for _, writer, _ in conns:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
+
+
+async def _read_exactly(reader: asyncio.StreamReader, size: int) -> bytes:
+    """Read the bytes of the size.
+
+    :raises http.client.IncompleteRead: if the connection is closed
+    """
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError as error:
+        raise http.client.IncompleteRead(
+            error.partial, size - len(error.partial)) from error
+
+
+def _parse_size(val: Any, base: int = 10) -> int:
+    """Return a chunk size or a Content-Length.
+
+    :raises http.client.HTTPException: if the size is invalid
+    """
+    try:
+        size = int(val, base)
+    except ValueError as error:
+        raise http.client.HTTPException(f'invalid size {val!r}') from error
+    if size < 0:
+        raise http.client.HTTPException(f'invalid size {val!r}')
+    return size
+
+
+async def _read_response(reader: asyncio.StreamReader,  # pylint: disable=too-many-locals # noqa
+                         method: str
+                         ) -> Tuple[int, http.client.HTTPMessage, bytes, bool]: # noqa
+    """Read a HTTP/1.1 response.
+
+    :returns: the status code, headers, body and whether to close
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise http.client.RemoteDisconnected(
+            'Remote end closed connection without response')
+    try:
+        version, status, _ = status_line.decode('iso-8859-1').split(' ', 2)
+        code = int(status)
+    except ValueError as error:
+        raise http.client.BadStatusLine(repr(status_line)) from error
+
+    lines = []
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        lines.append(line)
+        if len(lines) > _MAX_HEADERS:
+            raise http.client.HTTPException(
+                f'got more than {_MAX_HEADERS} headers')
+    hstring = b''.join(lines).decode('iso-8859-1')
+    headers = email.parser.Parser(
+        _class=http.client.HTTPMessage).parsestr(hstring)
+
+    conn_tokens = (headers.get('Connection') or '').lower()
+    will_close = 'close' in conn_tokens or \
+        (version == 'HTTP/1.0' and 'keep-alive' not in conn_tokens)
+
+    if method == 'HEAD' or code in (204, 304) or 100 <= code < 200:
+        return code, headers, b'', will_close  # type: ignore
+    if 'chunked' in (headers.get('Transfer-Encoding') or '').lower():
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = _parse_size(size_line.split(b';', 1)[0].strip(), 16)
+            if size == 0:
+                # skips the trailers.
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await _read_exactly(reader, size))
+            await _read_exactly(reader, 2)
+        return code, headers, b''.join(chunks), will_close  # type: ignore
+    length = headers.get('Content-Length')
+    if length is not None:
+        body = await _read_exactly(reader, _parse_size(length))
+        return code, headers, body, will_close  # type: ignore
+    # reads until EOF, so the connection can not be reused.
+    return code, headers, await reader.read(), True  # type: ignore
+
+
+class AsyncK2hr3Http():  # pylint: disable=too-many-instance-attributes
+    """AsyncK2hr3Http sends http/https requests to the K2hr3 WebAPI.
+
+    The same K2hr3Api objects as K2hr3Http are accepted and many requests
+    run concurrently on one event loop up to ``max_concurrency``. A
+    client can be used in another event loop later, like the next
+    ``asyncio.run()``.
+    """
+
+    __slots__ = ('_baseurl', '_timeout_seconds', '_allow_self_signed_cert',
+                 '_cafile', '_certfile', '_keyfile', '_pool',
+                 '_max_concurrency', '_semaphore', '_loop', '_retry_policy')
+
+    def __init__(self, baseurl: str, *,  # pylint: disable=too-many-arguments
+                 max_concurrency: int = 100,
+                 pool: Optional[AsyncK2hr3ConnectionPool] = None,
+                 cafile: Optional[str] = None,
+                 certfile: Optional[str] = None,
+                 keyfile: Optional[str] = None,
+                 retry_policy: Optional[K2hr3RetryPolicy] = None) -> None:
+        """Init the members.
+
+        :param max_concurrency: max number of requests in flight
+        :param pool: connection pool. A new pool is created if None.
+        :param retry_policy: retry policy. The default policy is used if None.
+        """
+        check_baseurl(baseurl)
+        if isinstance(max_concurrency, int) is False or max_concurrency < 1:
+            raise K2hr3Exception(
+                f'max_concurrency should be int > 0, not {max_concurrency}')
+        self._baseurl = baseurl
+        self._timeout_seconds = 30  # type: float
+        self._allow_self_signed_cert = True  # type: bool
+        self._cafile = cafile
+        self._certfile = certfile
+        self._keyfile = keyfile
+        self._pool = pool if pool is not None else AsyncK2hr3ConnectionPool()
+        self._max_concurrency = max_concurrency
+        self._retry_policy = retry_policy or K2hr3RetryPolicy()
+        # NOTE: the semaphore is created in each running loop.
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        attrs = []
+        values = ""
+        for attr in ['_baseurl', '_timeout_seconds', '_max_concurrency',
+                     '_allow_self_signed_cert']:
+            val = getattr(self, attr, None)
+            if val:
+                attrs.append((attr, repr(val)))
+                values = ', '.join(['%s=%s' % i for i in attrs]) # pylint: disable=consider-using-f-string # noqa
+        return '<AsyncK2hr3Http ' + values + '>'
+
+    async def __aenter__(self) -> 'AsyncK2hr3Http':
+        """Return the client."""
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        """Close the idle connections."""
+        await self.close()
+
+    @property
+    def baseurl(self) -> str:
+        """Return the url."""
+        return self._baseurl
+
+    @property
+    def pool(self) -> AsyncK2hr3ConnectionPool:
+        """Return the connection pool."""
+        return self._pool
+
+    @property
+    def max_concurrency(self) -> int:
+        """Return the max number of requests in flight."""
+        return self._max_concurrency
+
+    @property
+    def retry_policy(self) -> K2hr3RetryPolicy:
+        """Return the retry policy."""
+        return self._retry_policy
+
+    @property
+    def ssl_context(self) -> ssl.SSLContext:
+        """Return the SSLContext shared by the same verification settings."""
+        return get_ssl_context(self._allow_self_signed_cert, self._cafile,
+                               self._certfile, self._keyfile)
+
+    async def close(self) -> None:
+        """Close the idle connections."""
+        await self._pool.clear()
+
+    async def _exchange(self, key: _PoolKey,  # pylint: disable=too-many-locals # noqa
+                        method: str, target: str,
+                        data: Optional[bytes], headers: dict
+                        ) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        """Send a request over a pooled connection and read the response."""
+        _, host, port, _ = key
+        default_port = 443 if key[0] == 'https' else 80
+        hdrs = {'Host': host if port == default_port else f'{host}:{port}'}
+        hdrs.update(headers)
+        if data is not None or method in ('POST', 'PUT'):
+            hdrs['Content-Length'] = str(len(data or b''))
+        head = ''.join([f'{method} {target} HTTP/1.1\r\n'] +
+                       [f'{name}: {val}\r\n' for name, val in hdrs.items()] +
+                       ['\r\n']).encode('iso-8859-1')
+        while True:
+            try:
+                reader, writer, reused = await self._pool.acquire(
+                    key, self._timeout_seconds)
+            except (OSError, asyncio.TimeoutError) as error:
+                # the request surely did not reach the server.
+                raise URLError(error) from error
+            try:
+                writer.write(head + (data or b''))
+                await writer.drain()
+                code, msg, body, will_close = await _read_response(
+                    reader, method)
+            except (http.client.RemoteDisconnected, ConnectionResetError,
+                    BrokenPipeError):
+                writer.close()
+                if reused:
+                    # the server closed the idle connection. try a fresh one.
+                    LOG.debug('stale connection to %s, reconnecting', key)
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            if will_close:
+                writer.close()
+            else:
+                self._pool.release(key, reader, writer)
+            return code, msg, body
+
+    async def _send(self, method_name: str,  # pylint: disable=too-many-locals # noqa
+                    full_url: str,
+                    data: Optional[bytes], headers: dict
+                    ) -> Optional[Tuple[int, Any, bytes]]:
+        """Send a request with retries and return the response or None."""
+        parsed = urllib.parse.urlsplit(full_url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            LOG.error('http or https, not %s', parsed.scheme)
+            return None
+        context = self.ssl_context if parsed.scheme == 'https' else None
+        key = (parsed.scheme, parsed.hostname,
+               parsed.port or (443 if parsed.scheme == 'https' else 80),
+               context)
+        target = parsed.path or '/'
+        if parsed.query:
+            target = '?'.join([target, parsed.query])
+
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            # a semaphore is bound to the loop it waited in first.
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._loop = loop
+        retry = self._retry_policy.start()
+        while True:
+            status = None  # type: Optional[int]
+            retry_after = None  # type: Optional[str]
+            sent = True
+            timeout = self._timeout_seconds
+            time_left = retry.time_left()
+            try:
+                if time_left is not None:
+                    if time_left <= 0:
+                        raise asyncio.TimeoutError()
+                    timeout = min(timeout, time_left)
+                async with self._semaphore:
+                    code, headers_in, body = await asyncio.wait_for(
+                        self._exchange(key, method_name, target, data,
+                                       headers),
+                        timeout)
+                if code < 400:
+                    return code, headers_in, body
+                LOG.error('Could not complete the request. code %s '
+                          'headers %s', code, headers_in)
+                status = code
+                retry_after = headers_in.get('Retry-After')
+            except asyncio.TimeoutError:
+                LOG.error('timed out. url %s', full_url)
+            except URLError as error:
+                LOG.error('Could not send the request. reason %s',
+                          error.reason)
+                sent = False
+            except http.client.HTTPException as error:
+                LOG.error('Could not read the response. %s', repr(error))
+                return None
+            except OSError as error:
+                LOG.error('error(OSError, socket) %s', error)
+            delay = retry.next_delay(method_name, status, sent, retry_after)
+            if delay is None:
+                return None
+            LOG.warning('sleeping for %s. remaining retries=%s',
+                        delay, retry.remaining)
+            await asyncio.sleep(delay)
+
+    async def request(self, method: K2hr3HTTPMethod, r3api: K2hr3Api) -> bool:
+        """Send a request of the r3api and set the response to it."""
+        prepared = prepare_request(self._baseurl, method, r3api)
+        req = prepared.request
+        response = await self._send(req.get_method(), req.full_url,
+                                    req.data,  # type: ignore
+                                    dict(req.header_items()))
+        if response is None:
+            return False
+        code, headers, body = response
+        r3api.set_response(code=code, url=req.full_url, headers=headers,
+                           body=body.decode('utf-8'))
+        return True
+
+    async def send(self, request: K2hr3Request
+                   ) -> Optional[K2hr3ApiResponse]:
+        """Send an immutable request and return the response.
+
+        :returns: the response or None if the request failed
+        """
+        full_url = request.url(self._baseurl)
+        headers = {'User-Agent': 'K2hr3Http'}
+        headers.update(request.headers)
+        response = await self._send(request.method.name, full_url,
+                                    request.body, headers)
+        if response is None:
+            return None
+        code, hdrs, body = response
+        return K2hr3ApiResponse(code, full_url, hdrs, body.decode('utf-8'))
+
+    async def post(self, r3api: K2hr3Api) -> bool:
+        """Send requests by using POST Method."""
+        return await self.request(K2hr3HTTPMethod.POST, r3api)
+
+    async def put(self, r3api: K2hr3Api) -> bool:
+        """Send requests by using PUT Method."""
+        return await self.request(K2hr3HTTPMethod.PUT, r3api)
+
+    async def get(self, r3api: K2hr3Api) -> bool:
+        """Send requests by using GET Method."""
+        return await self.request(K2hr3HTTPMethod.GET, r3api)
+
+    async def head(self, r3api: K2hr3Api) -> bool:
+        """Send requests by using HEAD Method."""
+        return await self.request(K2hr3HTTPMethod.HEAD, r3api)
+
+    async def delete(self, r3api: K2hr3Api) -> bool:
+        """Send requests by using DELETE Method."""
+        return await self.request(K2hr3HTTPMethod.DELETE, r3api)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of bulk requests.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.api import K2hr3HTTPMethod
+    from k2hr3client.batch import K2hr3BatchExecutor
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.role import K2hr3Role
+
+    myhttp = K2hr3Http("http://127.0.0.1:18080")
+    requests = [
+        (K2hr3HTTPMethod.GET, K2hr3Role(mytoken.token).get(name))
+        for name in ["role1", "role2", "role3"]
+    ]
+    with K2hr3BatchExecutor(myhttp, max_workers=8) as executor:
+        for result in executor.run(requests):
+            result.ok  // True
+            result.r3api.resp.body // {"result":true...
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import concurrent.futures
+import logging
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import urllib.parse
+
+from k2hr3client.api import K2hr3Api, K2hr3ApiResponse, K2hr3HTTPMethod
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+
+LOG = logging.getLogger(__name__)
+
+_Method = Union[K2hr3HTTPMethod, str]
+
+
+class K2hr3BatchResult():
+    """Represent the result of a request sent by K2hr3BatchExecutor."""
+
+    __slots__ = ('_index', '_method', '_r3api', '_ok', '_error', '_response')
+
+    def __init__(self, index: int,  # pylint: disable=too-many-arguments
+                 method: K2hr3HTTPMethod, r3api: K2hr3Api, ok: bool, *,
+                 error: Optional[BaseException] = None,
+                 response: Optional[K2hr3ApiResponse] = None) -> None:
+        """Init the members."""
+        self._index = index
+        self._method = method
+        self._r3api = r3api
+        self._ok = ok
+        self._error = error
+        self._response = response
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3BatchResult _index={self._index}, ' \
+               f'_method={self._method.name}, _ok={self._ok}>'
+
+    @property
+    def index(self) -> int:
+        """Return the position in the input."""
+        return self._index
+
+    @property
+    def method(self) -> K2hr3HTTPMethod:
+        """Return the http method."""
+        return self._method
+
+    @property
+    def r3api(self) -> K2hr3Api:
+        """Return the api object that holds the response."""
+        return self._r3api
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """Return True if the request succeeded."""
+        return self._ok
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """Return the exception raised by the request if any."""
+        return self._error
+
+    @property
+    def response(self) -> Optional[K2hr3ApiResponse]:
+        """Return the response, including an error status, if any."""
+        return self._response
+
+
+def outcome(result: K2hr3BatchResult) -> Tuple[bool, Optional[int],
+                                               Optional[str]]:
+    """Return whether a request succeeded, the status code and the error.
+
+    A response whose result is false is a failure.
+    """
+    resp = result.response
+    if resp is None:
+        return False, None, str(result.error or 'request failed')
+    if not result.ok:
+        try:
+            message = resp.message
+        except ValueError:
+            message = None  # not json like an error page of a proxy
+        return False, resp.code, message or 'request failed'
+    if resp.result is False:
+        return False, resp.code, resp.message or 'result is false'
+    return True, resp.code, None
+
+
+class K2hr3BatchExecutor():
+    """K2hr3BatchExecutor sends many requests concurrently on a thread pool.
+
+    The number of requests in flight to each host is bounded by
+    ``max_per_host``, which defaults to ``max_workers``.
+    """
+
+    __slots__ = ('_http', '_max_workers', '_max_per_host', '_executor',
+                 '_host_limits', '_lock')
+
+    def __init__(self, http: K2hr3Http, max_workers: int = 8,
+                 max_per_host: Optional[int] = None) -> None:
+        """Init the members.
+
+        :param http: default client to send the requests
+        :param max_workers: number of threads
+        :param max_per_host: max number of requests in flight to a host
+        """
+        if isinstance(max_workers, int) is False or max_workers < 1:
+            raise K2hr3Exception(
+                f'max_workers should be int > 0, not {max_workers}')
+        if max_per_host is not None and \
+                (isinstance(max_per_host, int) is False or max_per_host < 1):
+            raise K2hr3Exception(
+                f'max_per_host should be int > 0, not {max_per_host}')
+        self._http = http
+        self._max_workers = max_workers
+        self._max_per_host = max_per_host or max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='k2hr3batch')
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3BatchExecutor _max_workers={self._max_workers}, ' \
+               f'_max_per_host={self._max_per_host}>'
+
+    def __enter__(self) -> 'K2hr3BatchExecutor':
+        """Return the executor."""
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Shutdown the thread pool."""
+        self.shutdown()
+
+    @property
+    def max_workers(self) -> int:
+        """Return the number of threads."""
+        return self._max_workers
+
+    @property
+    def max_per_host(self) -> int:
+        """Return the max number of requests in flight to a host."""
+        return self._max_per_host
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shutdown the thread pool."""
+        self._executor.shutdown(wait=wait)
+
+    def _host_limit(self, http: K2hr3Http) -> threading.BoundedSemaphore:
+        host = urllib.parse.urlsplit(str(http.baseurl)).netloc
+        with self._lock:
+            limit = self._host_limits.get(host)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self._max_per_host)
+                self._host_limits[host] = limit
+            return limit
+
+    @staticmethod
+    def _method(method: _Method) -> K2hr3HTTPMethod:
+        if isinstance(method, K2hr3HTTPMethod):
+            return method
+        try:
+            return K2hr3HTTPMethod[str(method).upper()]
+        except KeyError as error:
+            raise K2hr3Exception(f'unknown method, {method}') from error
+
+    def _call(self, index: int, method: K2hr3HTTPMethod, r3api: K2hr3Api,
+              http: K2hr3Http) -> K2hr3BatchResult:
+        with self._host_limit(http):
+            try:
+                # keeps the response of an error status for outcome().
+                resp = http.send(r3api.request(method), errors=True)
+            except Exception as error:  # pylint: disable=broad-except
+                LOG.error('request %s failed. %s', index, error)
+                return K2hr3BatchResult(index, method, r3api, False,
+                                        error=error)
+        if resp is None:
+            return K2hr3BatchResult(index, method, r3api, False)
+        r3api.set_response(code=resp.code, url=resp.url, headers=resp.hdrs,
+                           body=resp.body)
+        return K2hr3BatchResult(index, method, r3api, resp.code < 400,
+                                response=r3api.resp)
+
+    def submit(self, method: _Method, r3api: K2hr3Api,
+               http: Optional[K2hr3Http] = None,
+               index: int = 0) -> 'Future[K2hr3BatchResult]':
+        """Send a request in the thread pool.
+
+        :param http: client to send the request. The default if None.
+        """
+        return self._executor.submit(self._call, index, self._method(method),
+                                     r3api, http or self._http)
+
+    def _submit_all(self, requests: Iterable[Tuple[_Method, K2hr3Api]]
+                    ) -> List['Future[K2hr3BatchResult]']:
+        return [self.submit(method, r3api, index=index)
+                for index, (method, r3api) in enumerate(requests)]
+
+    def run(self, requests: Iterable[Tuple[_Method, K2hr3Api]]
+            ) -> List[K2hr3BatchResult]:
+        """Send the requests and return the results in input order."""
+        return [future.result() for future in self._submit_all(requests)]
+
+    def as_completed(self, requests: Iterable[Tuple[_Method, K2hr3Api]]
+                     ) -> Iterator[K2hr3BatchResult]:
+        """Send the requests and yield the results as each completes."""
+        futures = self._submit_all(requests)
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of request body builders.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.builder import K2hr3BodyBuilder
+
+    _TEMPLATE = '{"role": {"name": "<role name>", "alias": []}}'
+    # compiles the template once.
+    _BUILDER = K2hr3BodyBuilder(_TEMPLATE, name=('role', 'name'),
+                                alias=('role', 'alias'))
+    _BUILDER.build(name="myrole", alias=[])
+    // '{"role": {"name": "myrole", "alias": []}}'
+"""
+
+import json
+from json.encoder import encode_basestring_ascii
+import logging
+from typing import Any, Dict, List, Tuple
+
+from k2hr3client.exception import K2hr3Exception
+
+LOG = logging.getLogger(__name__)
+
+_Path = Tuple[str, ...]
+_MISSING = object()
+_CONSTANTS = {True: 'true', False: 'false', None: 'null'}
+
+
+def _dumps(value: Any) -> str:
+    """Return json.dumps(value) with the fast paths of the scalars."""
+    kind = type(value)
+    if kind is str:
+        return encode_basestring_ascii(value)
+    if kind is bool or value is None:
+        return _CONSTANTS[value]
+    if kind is int:
+        return int.__repr__(value)
+    if kind is list and all(isinstance(item, str) for item in value):
+        return '[' + ', '.join(map(encode_basestring_ascii, value)) + ']'
+    return json.dumps(value)
+
+
+class K2hr3BodyBuilder():
+    """K2hr3BodyBuilder builds request bodies from a json template.
+
+    The template is parsed once and compiled into the constant json
+    fragments and the slots of the fields, so a build only encodes the
+    field values. The body is byte-identical to ``json.dumps`` of the
+    template whose fields are replaced with the values. A field that is
+    not in the template is added at the end of its parent object in the
+    order of the fields.
+    """
+
+    __slots__ = ('_fields', '_parts', '_slots', '_defaults')
+
+    def __init__(self, template: str, **fields: _Path) -> None:
+        """Init the members.
+
+        :param template: json text of the body
+        :param fields: paths of the fields in the template by name
+        :raises K2hr3Exception: if a field path is not in the template
+        """
+        self._fields = fields
+        self._parts = []  # type: List[Any]
+        self._slots = []  # type: List[Tuple[int, str]]
+        self._defaults = {}  # type: Dict[str, str]
+        by_path = {tuple(path): name for name, path in fields.items()}
+        self._compile(json.loads(template), (), by_path)
+        if len(self._slots) != len(fields):
+            missing = set(fields) - {name for _, name in self._slots}
+            raise K2hr3Exception(f'fields not in the template, {missing}')
+        self._merge()
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3BodyBuilder _fields={list(self._fields)}>'
+
+    @property
+    def fields(self) -> List[str]:
+        """Return the names of the fields."""
+        return list(self._fields)
+
+    def _compile(self, node: Any, path: _Path,
+                 by_path: Dict[_Path, str]) -> None:
+        """Append the fragments of the node."""
+        name = by_path.get(path) if path else None
+        if name is not None:
+            if node is not _MISSING:
+                self._defaults[name] = json.dumps(node)
+            self._slots.append((len(self._parts), name))
+            self._parts.append(None)
+            return
+        if not isinstance(node, dict):
+            self._parts.append(json.dumps(node))
+            return
+        keys = list(node)
+        for field_path in by_path:
+            if len(field_path) == len(path) + 1 and \
+                    field_path[:-1] == path and field_path[-1] not in node:
+                keys.append(field_path[-1])
+        self._parts.append('{')
+        for index, key in enumerate(keys):
+            if index:
+                self._parts.append(', ')
+            self._parts.append(json.dumps(key) + ': ')
+            self._compile(node.get(key, _MISSING), path + (key,), by_path)
+        self._parts.append('}')
+
+    def _merge(self) -> None:
+        """Join the adjacent constant fragments."""
+        parts = []  # type: List[Any]
+        slots = []
+        for index, part in enumerate(self._parts):
+            if part is None:
+                name = [name for pos, name in self._slots if pos == index][0]
+                slots.append((len(parts), name))
+                parts.append(None)
+            elif parts and parts[-1] is not None:
+                parts[-1] += part
+            else:
+                parts.append(part)
+        self._parts = parts
+        self._slots = slots
+
+    def build(self, **values: Any) -> str:
+        """Return the body of the values.
+
+        A field in the template keeps the template value if it is omitted.
+
+        :raises K2hr3Exception: if a field not in the template is omitted
+        """
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            if name in values:
+                parts[index] = _dumps(values[name])
+            elif name in self._defaults:
+                parts[index] = self._defaults[name]
+            else:
+                raise K2hr3Exception(f'{name} is required')
+        return ''.join(parts)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of caching utilities.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.cache import K2hr3LRUCache, K2hr3Singleflight
+
+    flight = K2hr3Singleflight()
+    # concurrent callers of the same key share one call.
+    token = flight.do(("demo", "fingerprint"), create_token)
+
+    # keeps 1024 entries at most for 60 seconds.
+    cache = K2hr3LRUCache(maxsize=1024, ttl=60.0)
+    cache.set("key", "value")
+    cache.get("key")  // "value"
+    cache.stats().hit_ratio  // 1.0
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, \
+    Tuple, TypeVar
+
+from k2hr3client.exception import K2hr3Exception
+
+LOG = logging.getLogger(__name__)
+
+_T = TypeVar('_T')
+
+
+class K2hr3Singleflight():
+    """K2hr3Singleflight runs one call per key at a time.
+
+    Callers of a key that is in flight wait for the call and share its
+    result or exception instead of starting another one.
+    """
+
+    __slots__ = ('_lock', '_calls')
+
+    def __init__(self) -> None:
+        """Init the members."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3Singleflight in_flight={len(self._calls)}>'
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Return True if a call of the key is running."""
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: Hashable, func: Callable[..., _T], *args: Any,
+           **kwargs: Any) -> _T:
+        """Call the func unless a call of the key is running.
+
+        :returns: the result of the call of the key
+        :raises Exception: the exception raised by the call of the key
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()  # type: ignore
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as error:
+            future.set_exception(error)  # type: ignore
+            raise
+        else:
+            future.set_result(result)  # type: ignore
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class K2hr3CacheStats(NamedTuple):
+    """Represent the counters of a K2hr3LRUCache."""
+
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """Return the ratio of the hits to the lookups."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class K2hr3LRUCache():
+    """K2hr3LRUCache keeps at most ``maxsize`` entries for ``ttl`` seconds.
+
+    The least recently used entry is evicted to set a new key in a full
+    cache. An expired entry is kept until it is evicted or replaced, so a
+    caller can still read it by entry() while it is refreshed. The hits
+    and the misses are counted by get() only.
+    """
+
+    __slots__ = ('_maxsize', '_ttl', '_clock', '_lock', '_entries', '_hits',
+                 '_misses')
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """Init the members.
+
+        :param maxsize: max number of the entries
+        :param ttl: seconds an entry lives by default
+        :param clock: function to return the current seconds
+        :raises K2hr3Exception: if maxsize is not int > 0 or ttl is negative
+        """
+        if isinstance(maxsize, int) is False or maxsize < 1:
+            raise K2hr3Exception(f'maxsize should be int > 0, not {maxsize}')
+        if ttl < 0:
+            raise K2hr3Exception(f'ttl should be positive, not {ttl}')
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, Tuple[Any, float]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3LRUCache _maxsize={self._maxsize}, ' \
+               f'_ttl={self._ttl}, entries={len(self._entries)}>'
+
+    def __len__(self) -> int:
+        """Return the number of the entries including the expired ones."""
+        return len(self._entries)
+
+    @property
+    def maxsize(self) -> int:
+        """Return the max number of the entries."""
+        return self._maxsize
+
+    @property
+    def ttl(self) -> float:
+        """Return the seconds an entry lives by default."""
+        return self._ttl
+
+    def entry(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """Return the value and the expiry of the key even if it expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value of the key if it has not expired."""
+        entry = self.entry(key)
+        hit = entry is not None and entry[1] > self._clock()
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+        return entry[0] if hit else default  # type: ignore
+
+    def set(self, key: Hashable, value: Any,
+            ttl: Optional[float] = None) -> None:
+        """Set the value of the key.
+
+        :param ttl: seconds the entry lives. The default if None.
+        """
+        expires_at = self._clock() + (self._ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove the key and return the value even if it expired."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def keys(self) -> list:
+        """Return the keys from the least recently used one."""
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        """Remove all of the entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> K2hr3CacheStats:
+        """Return the counters."""
+        with self._lock:
+            return K2hr3CacheStats(self._hits, self._misses,
+                                   len(self._entries), self._maxsize)
+
+    def reset_stats(self) -> None:
+        """Reset the hits and the misses."""
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
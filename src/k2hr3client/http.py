@@ -34,23 +34,40 @@ k2hr3client - Python library for K2HR3 API.
     # GET the K2hr Extdata API.
     httpreq.GET(example.acquires_template())
     print(example.resp)
+
+    # Send an immutable request many times.
+    from k2hr3client.api import K2hr3HTTPMethod
+    from k2hr3client.role import K2hr3Role
+    request = K2hr3Role("token").get("myrole").request(K2hr3HTTPMethod.GET)
+    response = httpreq.send(request)
+    print(response.code)
 """
 
+from collections import deque
+import contextlib
 from enum import Enum
-import json
+import errno
+import functools
+import http.client
 import logging
 import re
+import select
 import socket
 import ssl
+import threading
 import time
-from typing import Optional
+from typing import Any, Deque, Dict, Iterator, NamedTuple, Optional, Tuple, \
+    Union
 import urllib
 import urllib.parse
 import urllib.request
-from urllib.error import ContentTooShortError, HTTPError, URLError
+from urllib.error import HTTPError, URLError
 
-from k2hr3client.api import K2hr3HTTPMethod, K2hr3Api
+from k2hr3client.api import K2hr3Api, K2hr3ApiResponse, K2hr3HTTPMethod, \
+    K2hr3Request
 from k2hr3client.exception import K2hr3Exception
+from k2hr3client.resolver import K2hr3Resolver, get_resolver
+from k2hr3client.retry import K2hr3RetryPolicy
 
 LOG = logging.getLogger(__name__)
 
@@ -61,6 +78,428 @@ class _AgentError(Enum):
     FATAL = 3
 
 
+_PoolKey = Tuple[str, str, int, Optional[ssl.SSLContext]]
+_SSLContextKey = Tuple[bool, Optional[str], Optional[str], Optional[str]]
+# an idle connection and the time it was last used
+_IdleConnection = Tuple[http.client.HTTPConnection, float]
+
+_SSL_CONTEXTS: Dict[_SSLContextKey, ssl.SSLContext] = {}
+_SSL_CONTEXTS_LOCK = threading.Lock()
+
+
+def get_ssl_context(allow_self_signed_cert: bool = True,
+                    cafile: Optional[str] = None,
+                    certfile: Optional[str] = None,
+                    keyfile: Optional[str] = None) -> ssl.SSLContext:
+    """Return a SSLContext shared in the process.
+
+    ssl.create_default_context loads the CA bundle every time it is called.
+    The contexts are built once per verification settings and reused.
+    """
+    key = (allow_self_signed_cert, cafile, certfile, keyfile)
+    with _SSL_CONTEXTS_LOCK:
+        ctx = _SSL_CONTEXTS.get(key)
+        if ctx is None:
+            # https://docs.python.jp/3/library/ssl.html#ssl.create_default_context
+            ctx = ssl.create_default_context(cafile=cafile)
+            if allow_self_signed_cert:
+                # https://github.com/python/cpython/blob/master/Lib/ssl.py#L567
+                ctx.check_hostname = False
+                ctx.verify_mode = ssl.CERT_NONE
+            if certfile:
+                ctx.load_cert_chain(certfile, keyfile)
+            _SSL_CONTEXTS[key] = ctx
+        return ctx
+
+
+def _connect(conn: http.client.HTTPConnection,
+             resolver: K2hr3Resolver) -> None:
+    """Connect to an address of the host cached by the resolver."""
+    conn.sock = resolver.create_connection(
+        conn.host, conn.port, conn.timeout,
+        conn.source_address)  # type: ignore[attr-defined]
+    try:
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except OSError as error:
+        if error.errno != errno.ENOPROTOOPT:
+            raise
+    if conn._tunnel_host:  # type: ignore[attr-defined] # pylint: disable=protected-access # noqa
+        conn._tunnel()  # type: ignore[attr-defined] # pylint: disable=protected-access # noqa
+
+
+class _K2hr3HTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection that connects to the resolved addresses."""
+
+    def __init__(self, *args, resolver: K2hr3Resolver, **kwargs) -> None:
+        """Init the members."""
+        super().__init__(*args, **kwargs)
+        self.resolver = resolver
+
+    def connect(self) -> None:
+        """Connect to an address of the host."""
+        _connect(self, self.resolver)
+
+
+class _K2hr3HTTPSConnection(http.client.HTTPSConnection):
+    """HTTPSConnection that resumes a TLS session."""
+
+    def __init__(self, *args, resolver: K2hr3Resolver,
+                 session: Optional[ssl.SSLSession] = None,
+                 **kwargs) -> None:
+        """Init the members."""
+        super().__init__(*args, **kwargs)
+        self.resolver = resolver
+        self.session = session
+
+    def connect(self) -> None:
+        """Connect to the host with the cached TLS session if any."""
+        _connect(self, self.resolver)
+        server_hostname = self._tunnel_host or self.host  # type: ignore[attr-defined] # noqa
+        self.sock = self._context.wrap_socket(  # type: ignore[attr-defined]
+            self.sock, server_hostname=server_hostname, session=self.session)
+
+
+class K2hr3ConnectionPool():
+    """K2hr3ConnectionPool keeps idle keep-alive connections for reuse.
+
+    Idle connections are kept per (scheme, host, port, SSLContext) up to
+    ``maxsize``. A connection idle longer than ``idle_timeout`` seconds is
+    evicted and a connection that the server has closed is detected before
+    reuse. TLS sessions are cached to resume the handshake of new
+    connections. New connections are made to the addresses cached by
+    ``resolver``, which defaults to the resolver shared in the process.
+    """
+
+    __slots__ = ('_maxsize', '_idle_timeout', '_lock', '_idle', '_sessions',
+                 '_resolver')
+
+    def __init__(self, maxsize: int = 10, idle_timeout: float = 60.0,
+                 resolver: Optional[K2hr3Resolver] = None) -> None:
+        """Init the members."""
+        if isinstance(maxsize, int) is False or maxsize < 0:
+            raise K2hr3Exception(f'maxsize should be int >= 0, not {maxsize}')
+        self._maxsize = maxsize
+        self._idle_timeout = idle_timeout
+        self._resolver = resolver or get_resolver()
+        self._lock = threading.Lock()
+        self._idle: Dict[_PoolKey, Deque[_IdleConnection]] = {}
+        self._sessions: Dict[_PoolKey, ssl.SSLSession] = {}
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3ConnectionPool _maxsize={self._maxsize}, ' \
+               f'_idle_timeout={self._idle_timeout}, ' \
+               f'idle={self.idle_count()}>'
+
+    @property
+    def maxsize(self) -> int:
+        """Return the max number of idle connections per host."""
+        return self._maxsize
+
+    @property
+    def idle_timeout(self) -> float:
+        """Return the seconds an idle connection is kept."""
+        return self._idle_timeout
+
+    @property
+    def resolver(self) -> K2hr3Resolver:
+        """Return the resolver of the host names."""
+        return self._resolver
+
+    def idle_count(self, key: Optional[_PoolKey] = None) -> int:
+        """Return the number of idle connections."""
+        with self._lock:
+            if key is not None:
+                return len(self._idle.get(key, ()))
+            return sum(len(conns) for conns in self._idle.values())
+
+    @staticmethod
+    def _is_alive(conn: http.client.HTTPConnection) -> bool:
+        """Check the health of an idle connection.
+
+        An idle keep-alive socket must have nothing to read. If it is
+        readable, the server has closed it or sent garbage.
+        """
+        sock = conn.sock
+        if sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    def _new_connection(self, key: _PoolKey, timeout: float
+                        ) -> http.client.HTTPConnection:
+        scheme, host, port, context = key
+        if scheme == 'https':
+            with self._lock:
+                session = self._sessions.get(key)
+            return _K2hr3HTTPSConnection(host, port, timeout=timeout,
+                                         context=context, session=session,
+                                         resolver=self._resolver)
+        return _K2hr3HTTPConnection(host, port, timeout=timeout,
+                                    resolver=self._resolver)
+
+    def _save_session(self, key: _PoolKey,
+                      conn: http.client.HTTPConnection) -> None:
+        """Keep the TLS session of a connection for resumption."""
+        session = getattr(conn.sock, 'session', None)
+        if session is not None:
+            with self._lock:
+                self._sessions[key] = session
+
+    def _acquire(self, key: _PoolKey, timeout: float
+                 ) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return an idle connection if any, or a new one."""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                conns = self._idle.get(key)
+                if not conns:
+                    break
+                # LIFO keeps the hottest connections alive.
+                conn, last_used = conns.pop()
+            if now - last_used <= self._idle_timeout and self._is_alive(conn):
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+            LOG.debug('evicting an idle connection to %s', key)
+            conn.close()
+        return self._new_connection(key, timeout), False
+
+    def _release(self, key: _PoolKey, conn: http.client.HTTPConnection
+                 ) -> None:
+        """Return a connection to the pool."""
+        self._save_session(key, conn)
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            conns = self._idle.setdefault(key, deque())
+            while conns and now - conns[0][1] > self._idle_timeout:
+                expired.append(conns.popleft()[0])
+            if len(conns) < self._maxsize:
+                conns.append((conn, now))
+                conn = None  # type: ignore
+        for old in expired:
+            old.close()
+        if conn is not None:
+            conn.close()
+
+    def clear(self) -> None:
+        """Close all idle connections.
+
+        The TLS sessions are kept to resume the next handshake.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+    @staticmethod
+    def _target(url: str, context: Optional[ssl.SSLContext]
+                ) -> Tuple[_PoolKey, str]:
+        """Return the pool key and the request target of the url."""
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise K2hr3Exception(f'url should be http or https, not {url}')
+        default_port = 443 if parsed.scheme == 'https' else 80
+        if parsed.scheme != 'https':
+            context = None
+        elif context is None:
+            context = get_ssl_context()
+        key = (parsed.scheme, parsed.hostname, parsed.port or default_port,
+               context)
+        path = parsed.path or '/'
+        if parsed.query:
+            path = '?'.join([path, parsed.query])
+        return key, path
+
+    def _getresponse(self, key: _PoolKey,  # pylint: disable=too-many-arguments # noqa
+                     method: str, path: str, body: Optional[bytes],
+                     headers: Optional[dict], *, timeout: float, read: bool
+                     ) -> Tuple[http.client.HTTPConnection,
+                                http.client.HTTPResponse, Optional[bytes]]:
+        """Send a request and return the connection and the response.
+
+        :param read: reads the body if True
+        """
+        while True:
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+            except OSError as error:
+                conn.close()
+                if reused:
+                    LOG.debug('stale connection to %s, reconnecting', key)
+                    continue
+                # same as urlopen, the request could not be sent.
+                raise URLError(error) from error
+            try:
+                res = conn.getresponse()
+                data = res.read() if read else None
+            except (http.client.RemoteDisconnected, ConnectionResetError,
+                    BrokenPipeError):
+                conn.close()
+                if reused:
+                    # the server closed the idle connection. try a fresh one.
+                    LOG.debug('stale connection to %s, reconnecting', key)
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            return conn, res, data
+
+    def _finish(self, key: _PoolKey, conn: http.client.HTTPConnection,
+                res: http.client.HTTPResponse) -> None:
+        """Return the connection to the pool if it can be reused."""
+        if res.will_close or not res.isclosed():
+            self._save_session(key, conn)
+            conn.close()
+        else:
+            self._release(key, conn)
+
+    def request(self, method: str, url: str, body: Optional[bytes] = None,
+                *, headers: Optional[dict] = None, timeout: float = 30,
+                context: Optional[ssl.SSLContext] = None
+                ) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        """Send a request over a pooled connection.
+
+        :returns: the status code, the response headers and the body
+        :raises URLError: if the request could not be sent
+        :raises OSError: if the response could not be read
+        :raises http.client.HTTPException: if the response is broken
+        """
+        key, path = self._target(url, context)
+        conn, res, data = self._getresponse(key, method, path, body, headers,
+                                            timeout=timeout, read=True)
+        self._finish(key, conn, res)
+        return res.status, res.msg, data  # type: ignore
+
+    @contextlib.contextmanager
+    def stream(self, method: str, url: str,  # pylint: disable=too-many-arguments # noqa
+               body: Optional[bytes] = None, *,
+               headers: Optional[dict] = None, timeout: float = 30,
+               context: Optional[ssl.SSLContext] = None
+               ) -> Iterator[http.client.HTTPResponse]:
+        """Send a request over a pooled connection and yield the response.
+
+        The body is not read, so the caller reads it in chunks. The
+        connection goes back to the pool if the body was read to the end,
+        and it is closed otherwise.
+
+        :raises URLError: if the request could not be sent
+        :raises OSError: if the response could not be read
+        :raises http.client.HTTPException: if the response is broken
+        """
+        key, path = self._target(url, context)
+        conn, res, _ = self._getresponse(key, method, path, body, headers,
+                                         timeout=timeout, read=False)
+        try:
+            yield res
+        finally:
+            self._finish(key, conn, res)
+
+
+_DEFAULT_POOL = K2hr3ConnectionPool()
+
+
+def get_pool() -> K2hr3ConnectionPool:
+    """Return the connection pool shared in the process."""
+    return _DEFAULT_POOL
+
+
+def check_baseurl(value: Optional[str]) -> None:
+    """Check the baseurl of the K2HR3 API.
+
+    :raise K2hr3Exception: if the val is invalid.
+    """
+    if isinstance(value, str) is False:
+        raise K2hr3Exception("value should be str, not {type(value)}")
+    # scheme
+    try:
+        scheme, url_string = value.split('://', maxsplit=2)  # type: ignore
+    except ValueError as verr:
+        raise K2hr3Exception(
+            f'scheme should contain ://, not {value}') from verr
+    if scheme not in ('http', 'https'):
+        raise K2hr3Exception(
+            f'scheme should be http or http, not {scheme}')
+    matches = re.match(
+        r'(?P<domain>[\w|\.]+)?(?P<port>:\d{2,5})?(?P<path>[\w|/]*)?',
+        url_string)
+    if matches is None:
+        raise K2hr3Exception(
+            f'the argument seems not to be a url string, {value}')
+
+    # domain is resolved lazily by K2hr3Resolver when connecting.
+    domain = matches.group('domain')
+    if domain is None:
+        raise K2hr3Exception(
+            f'url contains no domain, {value}')
+
+    # path(optional)
+    if matches.group('path') is None:
+        raise K2hr3Exception(
+            f'url contains no path, {value}')
+    path = matches.group('path')
+    # port(optional)
+    port = matches.group('port')
+    LOG.debug('url=%s domain=%s port=%s path=%s', value, domain, port,
+              path)
+
+
+class K2hr3PreparedRequest(NamedTuple):
+    """Represent a request built from a K2hr3Api."""
+
+    url: str
+    urlparams: Optional[Union[str, bytes]]
+    headers: dict
+    request: urllib.request.Request
+
+
+def prepare_request(baseurl: str, method: K2hr3HTTPMethod, r3api: K2hr3Api,
+                    headers: Optional[dict] = None) -> K2hr3PreparedRequest:
+    """Build a request of the K2hr3Api without any shared state.
+
+    :param headers: default request headers the r3api headers update
+    """
+    # 1. Constructs request url using K2hr3Api.path property.
+    r3api_path = r3api._api_path(method)  # type: ignore # pylint: disable=protected-access # noqa
+    url = f"{baseurl}/{r3api_path}"
+
+    # 2. Constructs url parameters and body using K2hr3Api properties.
+    request = K2hr3Request.build(method, r3api_path, r3api.urlparams,
+                                 r3api.headers, r3api.body)
+
+    # 3. Constructs headers using K2hr3Api.headers property.
+    hdrs = dict(headers) if headers else {'User-Agent': 'K2hr3Http'}
+    hdrs.update(request.headers)
+
+    # 4. Constructs a request.
+    # NOTE: headers is expected "MutableMapping[str, str]"
+    req = urllib.request.Request(request.url(baseurl), data=request.body,
+                                 headers=hdrs, method=method.name)
+    urlparams = request.body if method == K2hr3HTTPMethod.POST \
+        else request.query  # type: Optional[Union[str, bytes]]
+    return K2hr3PreparedRequest(url, urlparams, hdrs, req)
+
+
+@functools.lru_cache(maxsize=1024)
+def _request_target(baseurl: str, request: K2hr3Request) -> Tuple[str, dict]:
+    """Return the full url and the headers of a request.
+
+    The results of the same requests are shared. Callers must not modify
+    the headers.
+    """
+    headers = {'User-Agent': 'K2hr3Http'}
+    headers.update(request.headers)
+    return request.url(baseurl), headers
+
+
 class K2hr3Http():  # pylint: disable=too-many-instance-attributes
     """K2hr3Http sends a http/https request to the K2hr3 WebAPI.
 
@@ -69,26 +508,40 @@ class K2hr3Http():  # pylint: disable=too-many-instance-attributes
 
     __slots__ = ('_baseurl', '_hdrs', '_timeout_seconds',
                  '_url', '_urlparams',
-                 '_retry_interval_seconds', '_retries',
-                 '_allow_self_signed_cert')
-
-    def __init__(self, baseurl: str) -> None:
-        """Init the members."""
+                 '_retry_policy', '_allow_self_signed_cert', '_pool',
+                 '_cafile', '_certfile', '_keyfile')
+
+    def __init__(self, baseurl: str,  # pylint: disable=too-many-arguments
+                 *, pool: Optional[K2hr3ConnectionPool] = None,
+                 cafile: Optional[str] = None,
+                 certfile: Optional[str] = None,
+                 keyfile: Optional[str] = None,
+                 retry_policy: Optional[K2hr3RetryPolicy] = None) -> None:
+        """Init the members.
+
+        :param pool: connection pool. The process-wide pool is used if None.
+        :param cafile: CA certificates file to verify the server
+        :param certfile: client certificate file
+        :param keyfile: private key file of the client certificate
+        :param retry_policy: retry policy. The default policy is used if None.
+        """
         self._set_baseurl(baseurl)
+        self._pool = pool if pool is not None else _DEFAULT_POOL
         self._timeout_seconds = 30
         self._url = None  # type: Optional[str]
         self._urlparams = None  # type: Optional[str]
-        self._retry_interval_seconds = 60  # type: int
-        self._retries = 3  # type: int
+        self._retry_policy = retry_policy or K2hr3RetryPolicy()
         self._allow_self_signed_cert = True  # type: bool
+        self._cafile = cafile
+        self._certfile = certfile
+        self._keyfile = keyfile
 
     def __repr__(self) -> str:
         """Represent the members."""
         attrs = []
         values = ""
         for attr in ['_baseurl', '_hdrs', '_timeout_seconds',
-                     '_retry_interval_seconds', '_retries',
-                     '_allow_self_signed_cert']:
+                     '_retry_policy', '_allow_self_signed_cert']:
             val = getattr(self, attr, None)
             if val:
                 attrs.append((attr, repr(val)))
@@ -105,48 +558,42 @@ class K2hr3Http():  # pylint: disable=too-many-instance-attributes
 
         :raise K2hr3Exception: if the val is invalid.
         """
-        if isinstance(value, str) is False:
-            raise K2hr3Exception("value should be str, not {type(value)}")
-        # scheme
-        try:
-            scheme, url_string = value.split('://', maxsplit=2)  # type: ignore
-        except ValueError as verr:
-            raise K2hr3Exception(
-                f'scheme should contain ://, not {value}') from verr
-        if scheme not in ('http', 'https'):
-            raise K2hr3Exception(
-                f'scheme should be http or http, not {scheme}')
-        matches = re.match(
-            r'(?P<domain>[\w|\.]+)?(?P<port>:\d{2,5})?(?P<path>[\w|/]*)?',
-            url_string)
-        if matches is None:
-            raise K2hr3Exception(
-                f'the argument seems not to be a url string, {value}')
+        check_baseurl(value)
+        if getattr(self, '_baseurl', None) is None:
+            self._baseurl = value
 
-        # domain must be resolved.
-        domain = matches.group('domain')
-        if domain is None:
-            raise K2hr3Exception(
-                f'url contains no domain, {value}')
-        try:
-            # https://github.com/python/cpython/blob/master/Modules/socketmodule.c#L5729
-            ipaddress = socket.gethostbyname(domain)
-        except OSError as error:  # resolve failed
-            raise K2hr3Exception(
-                f'unresolved domain, {domain} {error}') from error
-        LOG.debug('%s resolved %s', domain, ipaddress)
+    def _checked_baseurl(self) -> str:
+        """Return the baseurl.
+
+        :raise K2hr3Exception: if the baseurl is not set.
+        """
+        if self._baseurl is None:
+            raise K2hr3Exception('baseurl should be set')
+        return self._baseurl
 
-        # path(optional)
-        if matches.group('path') is None:
+    @property
+    def pool(self) -> K2hr3ConnectionPool:
+        """Return the connection pool."""
+        return self._pool
+
+    @property
+    def retry_policy(self) -> K2hr3RetryPolicy:
+        """Return the retry policy."""
+        return self._retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, val: K2hr3RetryPolicy) -> None:
+        """Set the retry policy."""
+        if isinstance(val, K2hr3RetryPolicy) is False:
             raise K2hr3Exception(
-                f'url contains no path, {value}')
-        path = matches.group('path')
-        # port(optional)
-        port = matches.group('port')
-        LOG.debug('url=%s domain=%s port=%s path=%s', value, domain, port,
-                  path)
-        if getattr(self, '_baseurl', None) is None:
-            self._baseurl = value
+                f'value type must be K2hr3RetryPolicy, not {type(val)}')
+        self._retry_policy = val
+
+    @property
+    def ssl_context(self) -> ssl.SSLContext:
+        """Return the SSLContext shared by the same verification settings."""
+        return get_ssl_context(self._allow_self_signed_cert, self._cafile,
+                               self._certfile, self._keyfile)
 
     @property
     def headers(self) -> dict:
@@ -208,200 +655,181 @@ class K2hr3Http():  # pylint: disable=too-many-instance-attributes
         del self.url
         del self.urlparams
 
-    def _HTTP_REQUEST_METHOD(self, r3api: K2hr3Api, req: urllib.request.Request) -> bool:   # pylint: disable=invalid-name # noqa
-        agent_error = _AgentError.NONE
-        try:
-            ctx = None
-            if req.type == 'https':
-                # https://docs.python.jp/3/library/ssl.html#ssl.create_default_context
-                ctx = ssl.create_default_context()
-                if self._allow_self_signed_cert:
-                    # https://github.com/python/cpython/blob/master/Lib/ssl.py#L567
-                    ctx.check_hostname = False
-                    ctx.verify_mode = ssl.CERT_NONE
-            with urllib.request.urlopen(req, timeout=self._timeout_seconds,
-                                        context=ctx) as res:
-                r3api.set_response(code=res.getcode(),
-                                   url=res.geturl(),
-                                   headers=res.info(),
-                                   body=res.read().decode('utf-8'))
-                return True
-        except HTTPError as error:
-            LOG.error(
-                'Could not complete the request. code %s reason %s headers %s',
-                error.code, error.reason, error.headers)
-            agent_error = _AgentError.FATAL
-        except (ContentTooShortError, URLError) as error:
-            # https://github.com/python/cpython/blob/master/Lib/urllib/error.py#L73
-            LOG.error('Could not read the server. reason %s', error.reason)
-            agent_error = _AgentError.FATAL
-        except (socket.timeout, OSError) as error:  # temporary error
-            LOG.error('error(OSError, socket) %s', error)
-            agent_error = _AgentError.TEMP
-        finally:
+    def _exchange(self, method: str,  # pylint: disable=too-many-arguments,too-many-locals # noqa
+                  full_url: str, data: Optional[bytes], headers: dict,
+                  errors: bool = False) -> Optional[Tuple[int, Any, bytes]]:
+        """Send a request with retries and return the response or None.
+
+        :param errors: returns the last response of an error status
+                       instead of None
+        """
+        retry = self._retry_policy.start()
+        while True:
+            agent_error = _AgentError.NONE
+            error_response = None  # type: Optional[Tuple[int, Any, bytes]]
+            status = None  # type: Optional[int]
+            retry_after = None  # type: Optional[str]
+            sent = True
+            try:
+                ctx = None
+                if full_url.startswith('https:'):
+                    ctx = self.ssl_context
+                timeout = self._timeout_seconds  # type: float
+                time_left = retry.time_left()
+                if time_left is not None:
+                    if time_left <= 0:
+                        # a timeout of 0 makes the socket non-blocking.
+                        raise socket.timeout('reached the request deadline')
+                    timeout = min(timeout, time_left)
+                code, hdrs, body = self._pool.request(
+                    method, full_url, body=data, headers=headers,
+                    timeout=timeout, context=ctx)
+                if code >= 400:
+                    error_response = (code, hdrs, body)
+                    raise HTTPError(full_url, code,
+                                    http.client.responses.get(code, ''),
+                                    hdrs, None)
+            except HTTPError as error:
+                LOG.error(
+                    'Could not complete the request. code %s reason %s '
+                    'headers %s', error.code, error.reason, error.headers)
+                agent_error = _AgentError.TEMP
+                status = error.code
+                retry_after = error.headers.get('Retry-After')
+            except URLError as error:
+                # https://github.com/python/cpython/blob/master/Lib/urllib/error.py#L73
+                LOG.error('Could not send the request. reason %s',
+                          error.reason)
+                agent_error = _AgentError.TEMP
+                sent = False
+            except (socket.timeout, OSError) as error:  # temporary error
+                LOG.error('error(OSError, socket) %s', error)
+                agent_error = _AgentError.TEMP
+            except http.client.HTTPException as error:
+                LOG.error('Could not read the response. %s', repr(error))
+                agent_error = _AgentError.FATAL
+
+            if agent_error == _AgentError.NONE:
+                LOG.debug('no problem.')
+                return code, hdrs, body
             if agent_error == _AgentError.TEMP:
-                self._retries -= 1  # decrement the retries value.
-                if self._retries >= 0:
+                delay = retry.next_delay(method, status, sent, retry_after)
+                if delay is not None:
                     LOG.warning('sleeping for %s. remaining retries=%s',
-                                self._retry_interval_seconds,
-                                self._retries)
-                    time.sleep(self._retry_interval_seconds)
-                    self.GET(r3api)
-                else:
-                    LOG.error("reached the max retry count.")
-                    agent_error = _AgentError.FATAL
-
-        if agent_error == _AgentError.NONE:
-            LOG.debug('no problem.')
-            return True
-        LOG.debug('problem. See the error log.')
-        return False
+                                delay, retry.remaining)
+                    time.sleep(delay)
+                    continue
+            LOG.debug('problem. See the error log.')
+            return error_response if errors else None
 
-    def POST(self, r3api: K2hr3Api) -> bool:  # pylint: disable=invalid-name # noqa
-        """Send requests by using POST Method."""
+    def _HTTP_REQUEST_METHOD(self, r3api: K2hr3Api, req: urllib.request.Request) -> bool:   # pylint: disable=invalid-name # noqa
+        response = self._exchange(req.get_method(), req.full_url,
+                                  req.data,  # type: ignore
+                                  dict(req.header_items()))
+        if response is None:
+            return False
+        code, headers, body = response
+        r3api.set_response(code=code, url=req.full_url, headers=headers,
+                           body=body.decode('utf-8'))
+        return True
+
+    def send(self, request: K2hr3Request,
+             errors: bool = False) -> Optional[K2hr3ApiResponse]:
+        """Send an immutable request and return the response.
+
+        Nothing is stored in this instance or in the request, so the same
+        request can be sent many times from many threads.
+
+        :param errors: returns the response of an error status like 403
+                       instead of None
+        :returns: the response or None if the request failed
+        """
+        full_url, headers = _request_target(self._checked_baseurl(),
+                                            request)
+        if not full_url.startswith(('http:', 'https:')):
+            LOG.error('http or https, not %s', full_url)
+            return None
+        response = self._exchange(request.method.name, full_url,
+                                  request.body, headers, errors)
+        if response is None:
+            return None
+        code, hdrs, body = response
+        return K2hr3ApiResponse(code, full_url, hdrs, body.decode('utf-8'))
+
+    @contextlib.contextmanager
+    def stream(self, request: K2hr3Request
+               ) -> Iterator[http.client.HTTPResponse]:
+        """Send an immutable request and yield the unread response.
+
+        The body is read from the socket as the caller reads it, so a huge
+        response is never held in memory. The request is not retried.
+
+        :raises K2hr3Exception: if the request failed or the status is an
+                                error
+        """
+        full_url, headers = _request_target(self._checked_baseurl(),
+                                            request)
+        if not full_url.startswith(('http:', 'https:')):
+            raise K2hr3Exception(f'http or https, not {full_url}')
+        ctx = self.ssl_context if full_url.startswith('https:') else None
+        try:
+            with self._pool.stream(request.method.name, full_url,
+                                   body=request.body, headers=headers,
+                                   timeout=self._timeout_seconds,
+                                   context=ctx) as res:
+                if res.status >= 400:
+                    raise K2hr3Exception(
+                        f'{request.method.name} {full_url} failed, '
+                        f'code {res.status}')
+                yield res
+        except (URLError, OSError, http.client.HTTPException) as error:
+            raise K2hr3Exception(
+                f'could not stream {full_url}, {error}') from error
+
+    def request(self, method: K2hr3HTTPMethod, r3api: K2hr3Api) -> bool:
+        """Send a request of the r3api.
+
+        The request is built per call and nothing is stored in this
+        instance, so one instance can be shared across threads. The url,
+        urlparams and headers properties are not updated.
+        """
+        prepared = prepare_request(self._checked_baseurl(), method, r3api)
+        if prepared.request.type not in ('http', 'https'):
+            LOG.error('http or https, not %s', prepared.request.type)
+            return False
+        return self._HTTP_REQUEST_METHOD(r3api, prepared.request)
+
+    def _send(self, method: K2hr3HTTPMethod, r3api: K2hr3Api) -> bool:
+        """Build a request of the r3api, keep it and send it."""
         self._init_request()
-        # 1. Constructs request url using K2hr3Api.path property.
-        r3api_path = r3api._api_path(K2hr3HTTPMethod.POST)  # type: ignore # pylint: disable=protected-access # noqa
-        self.url = f"{self._baseurl}/{r3api_path}"
-
-        # 2. Constructs url parameters using K2hr3Api.urlparams property.
-        if r3api.headers:
-            content_type = r3api.headers.get('Content-Type')
-        if content_type == "application/json":
-            query = r3api.body
-            if query:
-                query = query.encode('ascii')  # type: ignore
-        else:
-            query = urllib.parse.urlencode(r3api.urlparams)  # type: ignore
-            if query:
-                query = query.encode('ascii')  # type: ignore
-        self.urlparams = query
-
-        # 3. Constructs headers using K2hr3Api.headers property.
-        if self._hdrs:
-            self._hdrs.update(r3api.headers)
-
-        # 4. Sends a request.
-        req = urllib.request.Request(self.url, data=query,  # type: ignore
-                                     headers=self._hdrs,    # type: ignore  # noqa
-                                     method="POST")
-        if req.type not in ('http', 'https'):
-            LOG.error('http or https, not %s', req.type)
+        prepared = prepare_request(self._checked_baseurl(), method, r3api)
+        self.url = prepared.url
+        self.urlparams = prepared.urlparams  # type: ignore
+        self._hdrs = prepared.headers
+        if prepared.request.type not in ('http', 'https'):
+            LOG.error('http or https, not %s', prepared.request.type)
             return False
-        return self._HTTP_REQUEST_METHOD(r3api, req)
+        return self._HTTP_REQUEST_METHOD(r3api, prepared.request)
+
+    def POST(self, r3api: K2hr3Api) -> bool:  # pylint: disable=invalid-name # noqa
+        """Send requests by using POST Method."""
+        return self._send(K2hr3HTTPMethod.POST, r3api)
 
     def PUT(self, r3api: K2hr3Api) -> bool:  # pylint: disable=invalid-name # noqa
         """Send requests by using PUT Method."""
-        self._init_request()
-        # 1. Constructs request url using K2hr3Api.path property.
-        r3api_path = r3api._api_path(K2hr3HTTPMethod.PUT)  # type: ignore # pylint: disable=protected-access # noqa
-        self.url = f"{self._baseurl}/{r3api_path}"
-
-        # 2. Constructs url parameters using K2hr3Api.urlparams property.
-        query = urllib.parse.urlencode(json.loads(r3api.urlparams))  # type: ignore  # noqa
-        self.urlparams = query
-
-        # 3. Constructs headers using K2hr3Api.headers property.
-        if self._hdrs:
-            self._hdrs.update(r3api.headers)
-
-        # 5. Sends a request.
-        req = urllib.request.Request("?".join([self.url, self.urlparams]),
-                                     data=None, headers=self._hdrs,  # type: ignore  # noqa
-                                     method="PUT")
-        if req.type not in ('http', 'https'):
-            LOG.error('http or https, not %s', req.type)
-            return False
-        return self._HTTP_REQUEST_METHOD(r3api, req)
+        return self._send(K2hr3HTTPMethod.PUT, r3api)
 
     def GET(self, r3api: K2hr3Api) -> bool:   # pylint: disable=invalid-name # noqa
         """Send requests by using GET Method."""
-        self._init_request()
-        # 1. Constructs request url using K2hr3Api.path property.
-        r3api_path = r3api._api_path(K2hr3HTTPMethod.GET)  # type: ignore # pylint: disable=protected-access # noqa
-        self.url = f"{self._baseurl}/{r3api_path}"
-
-        # 2. Constructs url parameters using K2hr3Api.params property.
-        if r3api.urlparams:
-            if isinstance(r3api.urlparams, dict):
-                query = urllib.parse.urlencode(r3api.urlparams)
-            else:
-                query = urllib.parse.urlencode(json.loads(r3api.urlparams))
-            self.urlparams = query
-        url = self.url
-        if self.urlparams:
-            url = "?".join([self.url, self.urlparams])
-
-        # 3. Constructs headers using K2hr3Api.headers property.
-        if self._hdrs:
-            self._hdrs.update(r3api.headers)
-
-        # 4. Sends a request.
-        req = urllib.request.Request(url, headers=self._hdrs, method="GET")  # type: ignore  # noqa
-        if req.type not in ('http', 'https'):
-            LOG.error('http or https, not %s', req.type)
-            return False
-        return self._HTTP_REQUEST_METHOD(r3api, req)
+        return self._send(K2hr3HTTPMethod.GET, r3api)
 
     def HEAD(self, r3api: K2hr3Api) -> bool:   # pylint: disable=invalid-name # noqa
-        """Send requests by using GET Method."""
-        self._init_request()
-        # 1. Constructs request url using K2hr3Api.path property.
-        r3api_path = r3api._api_path(K2hr3HTTPMethod.HEAD)  # type: ignore # pylint: disable=protected-access # noqa
-        self.url = f"{self._baseurl}/{r3api_path}"
-
-        # 2. Constructs url parameters using K2hr3Api.params property.
-        if r3api.urlparams:
-            if isinstance(r3api.urlparams, dict):
-                query = urllib.parse.urlencode(r3api.urlparams)
-            else:
-                query = urllib.parse.urlencode(json.loads(r3api.urlparams))
-            self.urlparams = query
-        url = self.url
-        if self.urlparams:
-            url = "?".join([self.url, self.urlparams])
-
-        # 3. Constructs headers using K2hr3Api.headers property.
-        if self._hdrs:
-            self._hdrs.update(r3api.headers)  # type: ignore
-
-        # 4. Sends a request.
-        # NOTE: headers is expected "MutableMapping[str, str]"
-        req = urllib.request.Request(url, headers=self._hdrs, method="HEAD")  # type: ignore # noqa
-        if req.type not in ('http', 'https'):
-            LOG.error('http or https, not %s', req.type)
-            return False
-        return self._HTTP_REQUEST_METHOD(r3api, req)
+        """Send requests by using HEAD Method."""
+        return self._send(K2hr3HTTPMethod.HEAD, r3api)
 
     def DELETE(self, r3api: K2hr3Api) -> bool:   # pylint: disable=invalid-name # noqa
         """Send requests by using DELETE Method."""
-        self._init_request()
-        # 1. Constructs request url using K2hr3Api.path property.
-        r3api_path = r3api._api_path(K2hr3HTTPMethod.DELETE)  # type: ignore # pylint: disable=protected-access # noqa
-        self.url = f"{self._baseurl}/{r3api_path}"
-
-        # 2. Constructs url parameters using K2hr3Api.params property.
-        if r3api.urlparams:
-            if isinstance(r3api.urlparams, dict):
-                query = urllib.parse.urlencode(r3api.urlparams)
-            else:
-                query = urllib.parse.urlencode(json.loads(r3api.urlparams))
-            self.urlparams = query
-        url = self.url
-        if self.urlparams:
-            url = "?".join([self.url, self.urlparams])
-
-        # 3. Constructs headers using K2hr3Api.headers property.
-        if self._hdrs:
-            self._hdrs.update(r3api.headers)  # type: ignore
-
-        # 4. Sends a request.
-        # NOTE: headers is expected "MutableMapping[str, str]"
-        req = urllib.request.Request(url, headers=self._hdrs, method="HEAD")  # type: ignore # noqa
-        if req.type not in ('http', 'https'):
-            LOG.error('http or https, not %s', req.type)
-            return False
-        return self._HTTP_REQUEST_METHOD(r3api, req)
+        return self._send(K2hr3HTTPMethod.DELETE, r3api)
 
 #
 # Local variables:
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of OpenStack Identity tokens.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.identity import K2hr3IdentityTokenProvider
+
+    provider = K2hr3IdentityTokenProvider(
+        "http://172.24.4.1/identity/v3/auth/tokens", "demo", "password")
+    # one password authentication for the scoped tokens of the projects.
+    demo_token = provider.scoped_token("demo")
+    admin_token = provider.scoped_token("admin")
+"""
+
+import http.client
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.error import URLError
+
+from k2hr3client.cache import K2hr3Singleflight
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3ConnectionPool, get_pool, get_ssl_context
+from k2hr3client.token import IDENTITY_V3_PASSWORD_AUTH_BODY, \
+    IDENTITY_V3_TOKEN_AUTH_BODY, parse_expiry
+from k2hr3client.tokencache import K2hr3CachedToken, fingerprint
+
+LOG = logging.getLogger(__name__)
+
+_ProviderKey = Tuple[str, str, str]
+
+_PROVIDERS: Dict[_ProviderKey, 'K2hr3IdentityTokenProvider'] = {}
+_PROVIDERS_LOCK = threading.Lock()
+
+
+class K2hr3IdentityTokenProvider():  # pylint: disable=too-many-instance-attributes # noqa
+    """K2hr3IdentityTokenProvider caches the Keystone tokens of a user.
+
+    The unscoped token of the password authentication is reused to get
+    the scoped tokens of all projects, and each token is kept until
+    ``refresh_margin`` seconds before its ``expires_at``. Concurrent
+    callers of the same token share one request. The requests are sent
+    over the pooled connections with ``timeout``.
+    """
+
+    __slots__ = ('_identity_url', '_user', '_password', '_user_domain',
+                 '_project_domain', '_timeout', '_refresh_margin',
+                 '_lifetime', '_pool', '_allow_self_signed_cert', '_lock',
+                 '_unscoped', '_scoped', '_flight')
+
+    def __init__(self, identity_url: str,  # pylint: disable=too-many-arguments # noqa
+                 user: str, password: str, *, user_domain: str = 'Default',
+                 project_domain: str = 'default', timeout: float = 30.0,
+                 refresh_margin: float = 60.0, lifetime: float = 3600.0,
+                 pool: Optional[K2hr3ConnectionPool] = None) -> None:
+        """Init the members.
+
+        :param identity_url: url of the Identity v3 auth/tokens API
+        :param user_domain: domain name of the user
+        :param project_domain: domain id of the projects
+        :param timeout: seconds to wait for a response
+        :param refresh_margin: seconds before the expiry to drop a token
+        :param lifetime: seconds a token lives if the response has no expiry
+        :param pool: connection pool. The process-wide pool is used if None.
+        """
+        self._identity_url = identity_url
+        self._user = user
+        self._password = password
+        self._user_domain = user_domain
+        self._project_domain = project_domain
+        self._timeout = timeout
+        self._refresh_margin = refresh_margin
+        self._lifetime = lifetime
+        self._pool = pool if pool is not None else get_pool()
+        self._allow_self_signed_cert = True
+        self._lock = threading.Lock()
+        self._unscoped: Optional[K2hr3CachedToken] = None
+        self._scoped: Dict[str, K2hr3CachedToken] = {}
+        self._flight = K2hr3Singleflight()
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        # NOTE: the password is a secret.
+        return f'<K2hr3IdentityTokenProvider ' \
+               f'_identity_url={self._identity_url!r}, ' \
+               f'_user={self._user!r}, _timeout={self._timeout}, ' \
+               f'projects={len(self._scoped)}>'
+
+    @property
+    def identity_url(self) -> str:
+        """Return the url of the Identity API."""
+        return self._identity_url
+
+    @property
+    def timeout(self) -> float:
+        """Return the seconds to wait for a response."""
+        return self._timeout
+
+    def _is_fresh(self, cached: Optional[K2hr3CachedToken]) -> bool:
+        return cached is not None and \
+            cached.expires_in() > self._refresh_margin
+
+    def _post(self, body: str) -> K2hr3CachedToken:
+        """Request a token to the Identity API."""
+        context = None
+        if self._identity_url.startswith('https'):
+            context = get_ssl_context(self._allow_self_signed_cert)
+        headers = {
+            'User-Agent': 'k2hr3client-python',
+            'Content-Type': 'application/json'
+        }
+        try:
+            code, hdrs, resp_body = self._pool.request(
+                'POST', self._identity_url,
+                body=body.encode('ascii'),
+                headers=headers, timeout=self._timeout, context=context)
+        except (URLError, OSError, http.client.HTTPException) as error:
+            raise K2hr3Exception(
+                f'could not request a token to {self._identity_url}, '
+                f'{error}') from error
+        if code >= 400:
+            raise K2hr3Exception(
+                f'could not get a token of {self._user}, code {code}')
+        token_id = hdrs.get('X-Subject-Token')
+        if not token_id:
+            raise K2hr3Exception('no X-Subject-Token in the response')
+        expires_at = None
+        try:
+            expires_at = parse_expiry(
+                json.loads(resp_body).get('token', {}).get('expires_at'))
+        except (ValueError, AttributeError):
+            LOG.warning('could not read expires_at of the token')
+        if expires_at is None:
+            expires_at = time.time() + self._lifetime
+        return K2hr3CachedToken(token_id, expires_at)
+
+    def _authenticate(self) -> K2hr3CachedToken:
+        """Get an unscoped token by the password authentication."""
+        # https://docs.openstack.org/api-ref/identity/v3/index.html#password-authentication-with-unscoped-authorization
+        cached = self._post(IDENTITY_V3_PASSWORD_AUTH_BODY.build(
+            name=self._user, password=self._password,
+            domain=self._user_domain))
+        with self._lock:
+            self._unscoped = cached
+        return cached
+
+    def unscoped_token(self) -> str:
+        """Return the unscoped token of the user.
+
+        :raises K2hr3Exception: if the token could not be got
+        """
+        with self._lock:
+            cached = self._unscoped
+        if not self._is_fresh(cached):
+            cached = self._flight.do(('unscoped',), self._authenticate)
+        return cached.token  # type: ignore
+
+    def _scope(self, project: str) -> K2hr3CachedToken:
+        """Get a scoped token of the project by the unscoped token."""
+        # https://docs.openstack.org/api-ref/identity/v3/index.html?expanded=#token-authentication-with-scoped-authorization
+        cached = self._post(IDENTITY_V3_TOKEN_AUTH_BODY.build(
+            token=self.unscoped_token(), project=project,
+            domain=self._project_domain))
+        with self._lock:
+            self._scoped[project] = cached
+        return cached
+
+    def scoped_token(self, project: str) -> str:
+        """Return the scoped token of the project.
+
+        :raises K2hr3Exception: if the token could not be got
+        """
+        with self._lock:
+            cached = self._scoped.get(project)
+        if not self._is_fresh(cached):
+            cached = self._flight.do(('scoped', project), self._scope,
+                                     project)
+        return cached.token  # type: ignore
+
+    def invalidate(self, project: Optional[str] = None) -> None:
+        """Drop the scoped token of the project, or all tokens."""
+        with self._lock:
+            if project is None:
+                self._unscoped = None
+                self._scoped.clear()
+            else:
+                self._scoped.pop(project, None)
+
+
+def get_identity_provider(identity_url: str, user: str, password: str,
+                          timeout: float = 30.0
+                          ) -> K2hr3IdentityTokenProvider:
+    """Return the provider of the user shared in the process."""
+    key = (identity_url, user, fingerprint(password))
+    with _PROVIDERS_LOCK:
+        provider = _PROVIDERS.get(key)
+        if provider is None:
+            provider = K2hr3IdentityTokenProvider(identity_url, user,
+                                                  password, timeout=timeout)
+            _PROVIDERS[key] = provider
+        return provider
+
+
+def clear_identity_providers(identity_url: Optional[str] = None,
+                             user: Optional[str] = None) -> None:
+    """Drop the shared providers of the user, or all providers.
+
+    The providers keep the passwords of the users, so drop them when the
+    tokens of the users are not needed any more.
+    """
+    with _PROVIDERS_LOCK:
+        for key in list(_PROVIDERS):
+            if identity_url is not None and key[0] != identity_url:
+                continue
+            if user is not None and key[1] != user:
+                continue
+            del _PROVIDERS[key]
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
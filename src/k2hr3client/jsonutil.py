@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of JSON utilities.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.jsonutil import iter_members, set_decoder
+
+    # decodes the responses with orjson if it is installed.
+    set_decoder("auto")
+
+    # reads the "tokens" member of a huge response in 64KB chunks.
+    with open("tokens.json", "rb") as fp:
+        for token, detail in iter_members(fp, "tokens"):
+            print(token, detail["registerpath"])
+"""
+
+import codecs
+import importlib
+import json
+import logging
+import re
+from typing import Any, Callable, IO, Iterable, Iterator, List, Optional, \
+    Tuple, Union
+
+from k2hr3client.exception import K2hr3Exception
+
+LOG = logging.getLogger(__name__)
+
+_Chunks = Union[IO, Iterable[Union[str, bytes]]]
+
+_DECODER = json.JSONDecoder()
+_WHITESPACES = ' \t\n\r'
+_CHUNK_SIZE = 65536
+# the rest of a JSON text which may be completed by the next chunk
+_LITERALS = ('true', 'false', 'null', 'NaN', 'Infinity', '-Infinity')
+_PARTIAL = re.compile(r'\.|[eE][-+]?|u[0-9a-fA-F]{0,4}')
+
+# decoders in the order of preference of "auto"
+_DECODER_MODULES = ('orjson', 'ujson', 'simplejson', 'json')
+_LOADS = json.loads  # type: Callable[[Union[str, bytes]], Any]
+_LOADS_NAME = 'json'
+
+
+def available_decoders() -> List[str]:
+    """Return the names of the installed json decoders."""
+    names = []
+    for name in _DECODER_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def set_decoder(decoder: Union[str, Callable[[Union[str, bytes]], Any]]
+                ) -> None:
+    """Set the json decoder of the responses.
+
+    :param decoder: "json", "orjson", "ujson", "simplejson", "auto" to use
+                    the fastest installed one, or a callable like json.loads
+    :raises K2hr3Exception: if the decoder is not installed
+    """
+    global _LOADS, _LOADS_NAME  # pylint: disable=global-statement
+    if callable(decoder):
+        _LOADS = decoder
+        _LOADS_NAME = getattr(decoder, '__module__', None) or repr(decoder)
+        return
+    if decoder == 'auto':
+        decoder = available_decoders()[0]
+    if decoder not in _DECODER_MODULES:
+        raise K2hr3Exception(f'unknown json decoder, {decoder}')
+    try:
+        module = importlib.import_module(decoder)
+    except ImportError as error:
+        raise K2hr3Exception(
+            f'json decoder is not installed, {decoder}') from error
+    _LOADS = module.loads  # type: ignore
+    _LOADS_NAME = decoder
+
+
+def get_decoder() -> str:
+    """Return the name of the json decoder of the responses."""
+    return _LOADS_NAME
+
+
+def loads(text: Union[str, bytes]) -> Any:
+    """Decode a json text by the decoder set by set_decoder."""
+    return _LOADS(text)
+
+
+class _K2hr3JsonStream():
+    """Hold the unparsed part of a JSON text read in chunks."""
+
+    __slots__ = ('_chunks', '_decoder', '_buf', '_pos', '_eof')
+
+    def __init__(self, chunks: _Chunks, chunk_size: int) -> None:
+        """Init the members."""
+        if hasattr(chunks, 'read'):
+            self._chunks = _until_empty(chunks.read,  # type: ignore
+                                        chunk_size)  # type: Iterator[Union[str, bytes]] # noqa
+        else:
+            self._chunks = iter(chunks)  # type: ignore
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read the next chunk and return False at the end."""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._decoder.decode(b'', final=True)
+        elif isinstance(chunk, bytes):
+            text = self._decoder.decode(chunk)
+        else:
+            text = chunk
+        # drops the parsed part to bound the memory.
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character or '' at the end."""
+        while True:
+            while self._pos < len(self._buf) and \
+                    self._buf[self._pos] in _WHITESPACES:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        """Consume one of the characters."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise K2hr3Exception(
+                f'invalid json, expected {chars!r}, not {char!r}')
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                val, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as error:
+                if _incomplete(error) and self._fill():
+                    continue
+                raise K2hr3Exception(f'invalid json, {error}') from error
+            # a number may continue in the next chunk.
+            if isinstance(val, (int, float)) and not self._eof and \
+                    (end == len(self._buf) or
+                     _PARTIAL.fullmatch(self._buf, end)) and self._fill():
+                continue
+            self._pos = end
+            return val
+
+
+def _incomplete(error: json.JSONDecodeError) -> bool:
+    """Return True if the error is due to the end of the buffer."""
+    if error.msg.startswith('Unterminated string'):
+        return True
+    rest = error.doc[error.pos:]
+    if not rest.strip():
+        return True
+    return _PARTIAL.fullmatch(rest) is not None or \
+        any(literal.startswith(rest) for literal in _LITERALS)
+
+
+def _until_empty(reader, chunk_size: int) -> Iterator[Union[str, bytes]]:
+    """Yield the chunks of a file object until it returns empty."""
+    while True:
+        chunk = reader(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _iter_container(stream: _K2hr3JsonStream
+                    ) -> Iterator[Tuple[Any, Any]]:
+    """Yield the members of an object or the items of an array."""
+    opener = stream.expect('{[')
+    closer = '}' if opener == '{' else ']'
+    if stream.peek() == closer:
+        stream.expect(closer)
+        return
+    while True:
+        if opener == '{':
+            key = stream.value()
+            stream.expect(':')
+            yield key, stream.value()
+        else:
+            yield stream.value(), None
+        if stream.expect(',' + closer) == closer:
+            return
+
+
+def iter_members(chunks: _Chunks, name: Optional[str] = None,
+                 chunk_size: int = _CHUNK_SIZE) -> Iterator[Tuple[Any, Any]]:
+    """Yield the members of an object in a JSON text read in chunks.
+
+    Only a member is decoded at a time, so the memory is bounded by the
+    largest member, not by the text.
+
+    :param chunks: file object or iterable of str or bytes chunks
+    :param name: name of the object in the top-level object. The top-level
+                 object itself if None. An array yields (item, None).
+    :returns: iterator of (key, value)
+    :raises K2hr3Exception: if the text is not valid
+    """
+    stream = _K2hr3JsonStream(chunks, chunk_size)
+    if name is None:
+        yield from _iter_container(stream)
+        return
+    stream.expect('{')
+    if stream.peek() == '}':
+        return
+    while True:
+        key = stream.value()
+        stream.expect(':')
+        if key == name and stream.peek() in '{[':
+            yield from _iter_container(stream)
+        else:
+            stream.value()
+        if stream.expect(',}') == '}':
+            return
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -42,17 +42,26 @@
     myhttp.GET(mylist.get())
     mylist.resp.body // {"result":true...
 
+    # GET the resources under "cluster" of the tenant.
+    mylist = K2hr3List(mytoken.token)
+    myhttp.GET(mylist.get(target="resource", root_path="cluster"))
+    mylist.resp.body // {"result":true,"message":null,"children":[...
+
 """
 
 
 import logging
 from typing import Optional
 
-from k2hr3client.api import K2hr3Api, K2hr3HTTPMethod
+from k2hr3client.api import K2hr3Api, K2hr3Endpoint, K2hr3HTTPMethod, \
+    register_endpoints
 from k2hr3client.exception import K2hr3Exception
 
 LOG = logging.getLogger(__name__)
 
+# objects listed under a service or a tenant
+LIST_TARGETS = ('resource', 'policy', 'role')
+
 
 class K2hr3List(K2hr3Api):  # pylint: disable=too-many-instance-attributes
     """Relationship with K2HR3 LIST API.
@@ -62,8 +71,11 @@ class K2hr3List(K2hr3Api):  # pylint: disable=too-many-instance-attributes
 
     __slots__ = ('_r3token', '_service', )
 
-    def __init__(self, r3token: str, service: str) -> None:
-        """Init the members."""
+    def __init__(self, r3token: str, service: str = '') -> None:
+        """Init the members.
+
+        :param service: service name. The objects of the tenant if empty.
+        """
         super().__init__("list")
         self.r3token = r3token
         self.service = service
@@ -77,6 +89,8 @@ class K2hr3List(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         self.urlparams = None
         # ---
         self.expand = False
+        self.target = None  # type: Optional[str]
+        self.root_path = None  # type: Optional[str]
 
     # ---- GET ----
     # GET
@@ -88,9 +102,17 @@ class K2hr3List(K2hr3Api):  # pylint: disable=too-many-instance-attributes
     # URL Arguments
     # expand=true or false(default)
     #
-    def get(self, expand=False):
-        """List K2HR3's SERVICE, RESOURCE, POLICY and ROLE in YRN form."""
-        self.api_id = 1
+    def get(self, expand=False, target: Optional[str] = None,
+            root_path: Optional[str] = None):
+        """List K2HR3's SERVICE, RESOURCE, POLICY and ROLE in YRN form.
+
+        :param target: "resource", "policy" or "role" to list the objects
+                       under the root path. The service if None.
+        :param root_path: path of the object to list the children
+        :raises K2hr3Exception: if the target is unknown
+        """
+        self._set_target(target, root_path)
+        self.api_id = 1 if target is None else 3
         self.expand = expand
         return self
 
@@ -102,11 +124,27 @@ class K2hr3List(K2hr3Api):  # pylint: disable=too-many-instance-attributes
     # http(s)://API SERVER:PORT/v1/list{/service name}/policy{/root path}?urlarg # noqa
     # http(s)://API SERVER:PORT/v1/list{/service name}/role{/root path}?urlarg
     #
-    def validate(self):
-        """Validate the objects."""
+    def validate(self, target: Optional[str] = None,
+                 root_path: Optional[str] = None):
+        """Validate the objects.
+
+        :raises K2hr3Exception: if the target is unknown
+        """
+        self._set_target(target, root_path)
         self.api_id = 2
         return self
 
+    def _set_target(self, target: Optional[str],
+                    root_path: Optional[str]) -> None:
+        """Set the target and the root path."""
+        if target is not None and target not in LIST_TARGETS:
+            raise K2hr3Exception(
+                f'target should be one of {LIST_TARGETS}, not {target}')
+        if target is None and root_path:
+            raise K2hr3Exception('root_path needs a target')
+        self.target = target
+        self.root_path = root_path.strip('/') if root_path else None
+
     def __repr__(self) -> str:
         """Represent the instance."""
         attrs = []
@@ -144,18 +182,28 @@ class K2hr3List(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         if getattr(self, '_service', None) is None:
             self._service = val
 
-    #
-    # abstract methos that must be implemented in subclasses
-    #
-    def _api_path(self, method: K2hr3HTTPMethod) -> Optional[str]:
-        """Get the request url path."""
-        if method == K2hr3HTTPMethod.GET:
-            if self.api_id == 1:
-                return f'{self.version}/{self.basepath}/{self.service}'
-        if method == K2hr3HTTPMethod.HEAD:
-            if self.api_id == 2:
-                return f'{self.version}/{self.basepath}/{self.service}'
-        return None
+
+def _list_path(r3api: K2hr3List) -> str:
+    """Return the path of the service or of the objects under a root."""
+    parts = [r3api.version, r3api.basepath]
+    if r3api.service:
+        parts.append(r3api.service)
+    if r3api.target:
+        parts.append(r3api.target)
+        if r3api.root_path:
+            parts.append(r3api.root_path)
+    return '/'.join(parts)
+
+
+register_endpoints(K2hr3List, (
+    # GET http(s)://API SERVER:PORT/v1/list/service name
+    K2hr3Endpoint(1, K2hr3HTTPMethod.GET, _list_path),
+    # HEAD http(s)://API SERVER:PORT/v1/list{/service name}/...
+    K2hr3Endpoint(2, K2hr3HTTPMethod.HEAD, _list_path),
+    # GET http(s)://API SERVER:PORT/v1/list{/service name}/resource{/root path}?urlarg # noqa
+    K2hr3Endpoint(3, K2hr3HTTPMethod.GET, _list_path, query=('expand',)),
+))
+
 #
 # Local variables:
 # tab-width: 4
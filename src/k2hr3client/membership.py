@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of role members in bulk.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.membership import K2hr3RoleMembers, \
+        K2hr3RoleMembershipSync
+    from k2hr3client.role import K2hr3RoleHost
+
+    myhttp = K2hr3Http("http://127.0.0.1:18080")
+    hosts = [
+        K2hr3RoleHost(f"host{i}", 8080, None, None, None, None, None)
+        for i in range(500)
+    ]
+    members = K2hr3RoleMembers(myhttp, mytoken.token, chunk_size=100)
+    for result in members.add("test_role", hosts):
+        if not result.ok:
+            print(result.host.host, result.error)
+
+    # adds and deletes only the differences.
+    sync = K2hr3RoleMembershipSync(myhttp, mytoken.token)
+    result = sync.sync("test_role", [("host1", 8080, None)])
+    result.unchanged  // 1
+    len(result.deleted)  // 499
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from k2hr3client.api import K2hr3HTTPMethod
+from k2hr3client.batch import K2hr3BatchExecutor, outcome
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+from k2hr3client.role import K2hr3Role, K2hr3RoleHost, K2hr3RoleHostList
+
+LOG = logging.getLogger(__name__)
+
+_Chunk = List[Tuple[int, K2hr3RoleHost]]
+_Key = Tuple[str, str, str]
+
+# ports of the members that accept any port
+_ANY_PORTS = (None, '', '*', 0, '0')
+
+# express of the K2HR3 API server accepts 100KB bodies by default.
+_MAX_BODY_SIZE = 64 * 1024
+
+
+class K2hr3MemberResult():
+    """Represent the result of a host sent by K2hr3RoleMembers."""
+
+    __slots__ = ('_host', '_ok', '_code', '_error')
+
+    def __init__(self, host: K2hr3RoleHost, ok: bool,  # pylint: disable=invalid-name # noqa
+                 code: Optional[int] = None,
+                 error: Optional[str] = None) -> None:
+        """Init the members."""
+        self._host = host
+        self._ok = ok
+        self._code = code
+        self._error = error
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3MemberResult host={self._host.host!r}, ' \
+               f'_ok={self._ok}, _code={self._code}>'
+
+    @property
+    def host(self) -> K2hr3RoleHost:
+        """Return the host."""
+        return self._host
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """Return True if the host was added."""
+        return self._ok
+
+    @property
+    def code(self) -> Optional[int]:
+        """Return the status code of the response if any."""
+        return self._code
+
+    @property
+    def error(self) -> Optional[str]:
+        """Return the reason of the failure if any."""
+        return self._error
+
+
+class K2hr3RoleMembers():
+    """K2hr3RoleMembers adds many hosts to a role by add_members.
+
+    The hosts are split into chunks of at most ``chunk_size`` hosts and
+    ``max_body_size`` bytes, and the chunks are sent concurrently. If a
+    chunk fails, its hosts are sent one by one to find the failed hosts
+    unless ``isolate`` is False.
+    """
+
+    __slots__ = ('_http', '_r3token', '_chunk_size', '_max_body_size',
+                 '_max_workers', '_isolate')
+
+    def __init__(self, http: K2hr3Http,  # pylint: disable=too-many-arguments # noqa
+                 r3token: str, *, chunk_size: int = 100,
+                 max_body_size: int = _MAX_BODY_SIZE, max_workers: int = 8,
+                 isolate: bool = True) -> None:
+        """Init the members.
+
+        :param http: client to send the requests
+        :param r3token: scoped token of the role
+        :param chunk_size: max number of hosts in a request
+        :param max_body_size: max bytes of the hosts in a request
+        :param max_workers: number of requests in flight
+        :param isolate: sends the hosts of a failed chunk one by one if True
+        """
+        if isinstance(chunk_size, int) is False or chunk_size < 1:
+            raise K2hr3Exception(
+                f'chunk_size should be int > 0, not {chunk_size}')
+        if isinstance(max_body_size, int) is False or max_body_size < 1:
+            raise K2hr3Exception(
+                f'max_body_size should be int > 0, not {max_body_size}')
+        self._http = http
+        self._r3token = r3token
+        self._chunk_size = chunk_size
+        self._max_body_size = max_body_size
+        self._max_workers = max_workers
+        self._isolate = isolate
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        # NOTE: the token is a secret.
+        return f'<K2hr3RoleMembers _chunk_size={self._chunk_size}, ' \
+               f'_max_body_size={self._max_body_size}, ' \
+               f'_max_workers={self._max_workers}>'
+
+    @property
+    def chunk_size(self) -> int:
+        """Return the max number of hosts in a request."""
+        return self._chunk_size
+
+    def chunks(self, hosts: Any) -> List[_Chunk]:
+        """Split the hosts into the chunks of (position, host).
+
+        :param hosts: K2hr3RoleHostList or iterable of K2hr3RoleHost
+        """
+        if isinstance(hosts, K2hr3RoleHostList):
+            hosts = hosts.hostlist
+        chunks = []  # type: List[_Chunk]
+        chunk = []  # type: _Chunk
+        size = 0
+        for index, host in enumerate(hosts):
+            # a separator and the json object of the host
+            host_size = len(json.dumps(vars(host))) + 2
+            if chunk and (len(chunk) >= self._chunk_size or
+                          size + host_size > self._max_body_size):
+                chunks.append(chunk)
+                chunk, size = [], 0
+            chunk.append((index, host))
+            size += host_size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _requests(self, role_name: str, chunks: List[_Chunk],  # pylint: disable=too-many-arguments # noqa
+                  clear_hostname: bool, clear_ips: bool,
+                  method: K2hr3HTTPMethod) -> List[Tuple[K2hr3HTTPMethod,
+                                                         K2hr3Role]]:
+        """Return the add_members requests of the chunks."""
+        return [(method, K2hr3Role(self._r3token).add_members(
+            role_name, [host for _, host in chunk], clear_hostname,
+            clear_ips)) for chunk in chunks]  # type: ignore
+
+    def add(self, role_name: str, hosts: Any,  # pylint: disable=too-many-arguments # noqa
+            clear_hostname: bool = False, clear_ips: bool = False,
+            method: K2hr3HTTPMethod = K2hr3HTTPMethod.POST
+            ) -> List[K2hr3MemberResult]:
+        """Add the hosts to the role.
+
+        :param hosts: K2hr3RoleHostList or iterable of K2hr3RoleHost
+        :param method: K2hr3HTTPMethod.POST or K2hr3HTTPMethod.PUT
+        :returns: the results of the hosts in input order
+        """
+        with K2hr3BatchExecutor(self._http,
+                                max_workers=self._max_workers) as executor:
+            return self._add(executor, role_name, hosts,
+                             clear_hostname=clear_hostname,
+                             clear_ips=clear_ips, method=method)
+
+    def _add(self, executor: K2hr3BatchExecutor,  # pylint: disable=too-many-arguments,too-many-locals # noqa
+             role_name: str, hosts: Any, *, clear_hostname: bool,
+             clear_ips: bool, method: K2hr3HTTPMethod
+             ) -> List[K2hr3MemberResult]:
+        """Add the hosts to the role on the executor."""
+        chunks = self.chunks(hosts)
+        results = {}  # type: Dict[int, K2hr3MemberResult]
+        retries = []  # type: List[_Chunk]
+        requests = self._requests(role_name, chunks, clear_hostname,
+                                  clear_ips, method)
+        for result in executor.as_completed(requests):
+            chunk = chunks[result.index]
+            ok, code, error = outcome(result)
+            if not ok and self._isolate and len(chunk) > 1:
+                LOG.warning('%s hosts failed. sending them one by one. %s',
+                            len(chunk), error)
+                retries.extend([[item] for item in chunk])
+                continue
+            for index, host in chunk:
+                results[index] = K2hr3MemberResult(host, ok, code, error)
+        requests = self._requests(role_name, retries, clear_hostname,
+                                  clear_ips, method)
+        for result in executor.as_completed(requests):
+            ok, code, error = outcome(result)
+            index, host = retries[result.index][0]
+            results[index] = K2hr3MemberResult(host, ok, code, error)
+        return [results[index] for index in sorted(results)]
+
+
+class K2hr3SyncResult():
+    """Represent the result of K2hr3RoleMembershipSync.sync."""
+
+    __slots__ = ('_added', '_deleted', '_unchanged')
+
+    def __init__(self, added: List[K2hr3MemberResult],
+                 deleted: List[K2hr3MemberResult], unchanged: int) -> None:
+        """Init the members."""
+        self._added = added
+        self._deleted = deleted
+        self._unchanged = unchanged
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3SyncResult _added={len(self._added)}, ' \
+               f'_deleted={len(self._deleted)}, ' \
+               f'_unchanged={self._unchanged}>'
+
+    @property
+    def added(self) -> List[K2hr3MemberResult]:
+        """Return the results of the added hosts."""
+        return self._added
+
+    @property
+    def deleted(self) -> List[K2hr3MemberResult]:
+        """Return the results of the deleted hosts."""
+        return self._deleted
+
+    @property
+    def unchanged(self) -> int:
+        """Return the number of the hosts already in the role."""
+        return self._unchanged
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """Return True if all of the hosts were added or deleted."""
+        return all(result.ok for result in self._added + self._deleted)
+
+
+def member_key(host: Any) -> _Key:
+    """Return the (host, port, cuk) key of a member.
+
+    The port of any port is "0" and no cuk is "".
+
+    :param host: K2hr3RoleHost, (host, port, cuk) tuple, dict or a
+                 "host port cuk ..." string of the role details
+    """
+    if isinstance(host, str):
+        fields = host.split()  # type: List[Any]
+    elif isinstance(host, dict):
+        fields = [host.get('host'), host.get('port'), host.get('cuk')]
+    elif isinstance(host, (tuple, list)):
+        fields = list(host)
+    else:
+        fields = [host.host, host.port, host.cuk]
+    fields += [None] * (3 - len(fields))
+    name, port, cuk = fields[:3]
+    if not name:
+        raise K2hr3Exception(f'host should be a hostname or an ip, not {host}')
+    return (str(name), '0' if port in _ANY_PORTS else str(port),
+            '' if cuk is None else str(cuk))
+
+
+def _role_host(host: Any) -> K2hr3RoleHost:
+    """Return the K2hr3RoleHost of a host."""
+    if isinstance(host, K2hr3RoleHost):
+        return host
+    name, port, cuk = member_key(host)
+    return K2hr3RoleHost(name, port, cuk, None, None, None, None)
+
+
+class K2hr3RoleMembershipSync(K2hr3RoleMembers):
+    """K2hr3RoleMembershipSync makes the members of a role the given hosts.
+
+    The members are fetched once by K2hr3Role.get and compared with the
+    hosts by the (host, port, cuk) keys in sets, so only the missing hosts
+    are added and only the other members are deleted. The adds and the
+    deletes are sent concurrently. Nothing is sent if nothing changed.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return super().__repr__().replace('<K2hr3RoleMembers ',
+                                          '<K2hr3RoleMembershipSync ')
+
+    def members(self, role_name: str) -> Dict[_Key, K2hr3RoleHost]:
+        """Return the members of the role by the keys.
+
+        The members of the roles in the role are not included because
+        they can not be deleted from the role.
+
+        :raises K2hr3Exception: if the role could not be fetched
+        """
+        r3api = K2hr3Role(self._r3token).get(role_name, expand=False)
+        resp = self._http.send(r3api.request(K2hr3HTTPMethod.GET))
+        if resp is None or resp.code >= 300 or resp.result is False:
+            raise K2hr3Exception(
+                f'failed to get the role {role_name}, {resp}')
+        role = (resp.json() or {}).get('role') or {}
+        hosts = role.get('hosts') or {}
+        members = {}  # type: Dict[_Key, K2hr3RoleHost]
+        for name in ('hostnames', 'ips'):
+            for host in hosts.get(name) or []:
+                key = member_key(host)
+                members[key] = K2hr3RoleHost(*key, None, None, None, None)
+        return members
+
+    @staticmethod
+    def diff(hosts: Iterable[Any], members: Dict[_Key, K2hr3RoleHost]
+             ) -> Tuple[List[K2hr3RoleHost], List[K2hr3RoleHost]]:
+        """Return the hosts to add and the members to delete.
+
+        :param hosts: desired hosts of the role
+        :param members: current members of the role by the keys
+        """
+        desired = {}  # type: Dict[_Key, K2hr3RoleHost]
+        for host in hosts:
+            desired.setdefault(member_key(host), _role_host(host))
+        adds = [host for key, host in desired.items() if key not in members]
+        deletes = [host for key, host in members.items()
+                   if key not in desired]
+        return adds, deletes
+
+    def plan(self, role_name: str, hosts: Iterable[Any]
+             ) -> Tuple[List[K2hr3RoleHost], List[K2hr3RoleHost]]:
+        """Return the hosts to add and the members to delete of the role."""
+        return self.diff(hosts, self.members(role_name))
+
+    def _delete(self, role_name: str, host: K2hr3RoleHost) -> K2hr3Role:
+        """Return the delete_member request of a member."""
+        name, port, cuk = member_key(host)
+        return K2hr3Role(self._r3token).delete_member(role_name, name, port,
+                                                      cuk)
+
+    def sync(self, role_name: str, hosts: Iterable[Any],  # pylint: disable=too-many-arguments # noqa
+             clear_hostname: bool = False, clear_ips: bool = False,
+             method: K2hr3HTTPMethod = K2hr3HTTPMethod.POST
+             ) -> K2hr3SyncResult:
+        """Make the members of the role the hosts.
+
+        :param hosts: K2hr3RoleHost or (host, port, cuk) of the hosts
+        :param method: K2hr3HTTPMethod.POST or K2hr3HTTPMethod.PUT to add
+        :raises K2hr3Exception: if the role could not be fetched
+        """
+        hosts = list(hosts)
+        members = self.members(role_name)
+        adds, deletes = self.diff(hosts, members)
+        unchanged = len(members) - len(deletes)
+        if not adds and not deletes:
+            return K2hr3SyncResult([], [], unchanged)
+        with K2hr3BatchExecutor(self._http,
+                                max_workers=self._max_workers) as executor:
+            futures = [executor.submit(K2hr3HTTPMethod.DELETE,
+                                       self._delete(role_name, host),
+                                       index=index)
+                       for index, host in enumerate(deletes)]
+            added = self._add(executor, role_name, adds,
+                              clear_hostname=clear_hostname,
+                              clear_ips=clear_ips,
+                              method=method) if adds else []
+            deleted = [K2hr3MemberResult(host, *outcome(future.result()))
+                       for host, future in zip(deletes, futures)]
+        return K2hr3SyncResult(added, deleted, unchanged)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -54,12 +54,13 @@
 
 """
 
-import json
 import logging
 from typing import List, Optional
 
 
-from k2hr3client.api import K2hr3Api, K2hr3HTTPMethod
+from k2hr3client.api import K2hr3Api, K2hr3Endpoint, K2hr3HTTPMethod, \
+    register_endpoints
+from k2hr3client.builder import K2hr3BodyBuilder
 
 LOG = logging.getLogger(__name__)
 
@@ -75,6 +76,10 @@ _POLICY_API_CREATE_POLICY = """
     }
 }
 """
+_POLICY_API_CREATE_POLICY_BODY = K2hr3BodyBuilder(
+    _POLICY_API_CREATE_POLICY, name=('policy', 'name'),
+    effect=('policy', 'effect'), action=('policy', 'action'),
+    resource=('policy', 'resource'), alias=('policy', 'alias'))
 
 
 class K2hr3Policy(K2hr3Api):  # pylint: disable=too-many-instance-attributes
@@ -188,50 +193,22 @@ class K2hr3Policy(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         if getattr(self, '_r3token', None) is None:
             self._r3token = val
 
-    #
-    # abstract methos that must be implemented in subclasses
-    #
-    def _api_path(self, method: K2hr3HTTPMethod) -> Optional[str]:
-        """Get the request url path."""
-        if method == K2hr3HTTPMethod.POST:
-            if self.api_id == 1:
-                python_data = json.loads(_POLICY_API_CREATE_POLICY)
-                python_data['policy']['name'] = self.policy_name
-                python_data['policy']['effect'] = self.effect
-                python_data['policy']['action'] = self.action
-                python_data['policy']['resource'] = self.resource
-                python_data['policy']['alias'] = self.alias
-                self.body = json.dumps(python_data)
-                return f'{self.version}/{self.basepath}'
-        if method == K2hr3HTTPMethod.PUT:
-            if self.api_id == 1:
-                self.urlparams = json.dumps({
-                    'name': self.policy_name,
-                    'effect': self.effect,
-                    'action': self.action,
-                    'resource': self.resource,
-                    'alias': self.alias
-                })
-                return f'{self.version}/{self.basepath}'
-        if method == K2hr3HTTPMethod.GET:
-            if self.api_id == 3:
-                self.urlparams = json.dumps({
-                    'service': self.service
-                })
-                return f'{self.version}/{self.basepath}/{self.policy_name}'
-        if method == K2hr3HTTPMethod.HEAD:
-            if self.api_id == 4:
-                self.urlparams = json.dumps({
-                    'tenant': self.tenant,
-                    'resource': self.resource,
-                    'action': self.action,
-                    'service': self.service
-                })
-                return f'{self.version}/{self.basepath}/{self.policy_name}'
-        if method == K2hr3HTTPMethod.DELETE:
-            if self.api_id == 5:
-                return f'{self.version}/{self.basepath}/{self.policy_name}'
-        return None
+
+_POLICY_PATH = '{version}/{basepath}/{policy_name}'
+register_endpoints(K2hr3Policy, (
+    K2hr3Endpoint(1, K2hr3HTTPMethod.POST, '{version}/{basepath}',
+                  body=lambda r3api: _POLICY_API_CREATE_POLICY_BODY.build(
+                      name=r3api.policy_name, effect=r3api.effect,
+                      action=r3api.action, resource=r3api.resource,
+                      alias=r3api.alias)),
+    K2hr3Endpoint(1, K2hr3HTTPMethod.PUT, '{version}/{basepath}',
+                  query=(('name', 'policy_name'), 'effect', 'action',
+                         'resource', 'alias')),
+    K2hr3Endpoint(3, K2hr3HTTPMethod.GET, _POLICY_PATH, query=('service',)),
+    K2hr3Endpoint(4, K2hr3HTTPMethod.HEAD, _POLICY_PATH,
+                  query=('tenant', 'resource', 'action', 'service')),
+    K2hr3Endpoint(5, K2hr3HTTPMethod.DELETE, _POLICY_PATH),
+))
 
 #
 # Local variables:
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of local policy evaluations.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.policyengine import K2hr3PolicyEngine
+
+    myhttp = K2hr3Http("http://127.0.0.1:18080")
+    engine = K2hr3PolicyEngine(myhttp, mytoken.token, ttl=300.0)
+    # fetches the policy and its aliases once, then answers in memory
+    # like K2hr3Policy.validate.
+    engine.validate("test_policy", "demo", "test_resource",
+                    "yrn:yahoo::::action:read")  // True
+    # drops the policy when it is updated.
+    engine.invalidate("test_policy")
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from k2hr3client.api import K2hr3HTTPMethod
+from k2hr3client.cache import K2hr3LRUCache, K2hr3Singleflight
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+from k2hr3client.policy import K2hr3Policy
+
+LOG = logging.getLogger(__name__)
+
+# fields of a yrn, "yrn:yahoo:<service>::<tenant>:<kind>:<path>"
+_YRN_FIELDS = 7
+# segment of a pattern matching any segment
+_WILDCARD = '*'
+_EFFECTS = ('allow', 'deny')
+# (policy yrn, service)
+_PolicyKey = Tuple[str, str]
+
+
+def full_yrn(name: str, kind: str, tenant: str,
+             service: Optional[str] = None) -> str:
+    """Return the yrn full path of a name of the tenant.
+
+    :param name: name or yrn full path
+    :param kind: "policy", "resource" or "role"
+    """
+    if name.startswith('yrn:'):
+        return name
+    return f'yrn:yahoo:{service or ""}::{tenant}:{kind}:{name.strip("/")}'
+
+
+def yrn_segments(yrn: str) -> List[str]:
+    """Return the segments of a yrn including those of the path."""
+    fields = yrn.split(':', _YRN_FIELDS - 1)
+    if len(fields) < _YRN_FIELDS:
+        return fields
+    return fields[:-1] + fields[-1].strip('/').split('/')
+
+
+class _K2hr3TrieNode():  # pylint: disable=too-few-public-methods
+    """Node of K2hr3YrnTrie."""
+
+    __slots__ = ('children', 'values')
+
+    def __init__(self) -> None:
+        """Init the members."""
+        self.children = {}  # type: Dict[str, _K2hr3TrieNode]
+        self.values = set()  # type: Set[Any]
+
+
+class K2hr3YrnTrie():
+    """K2hr3YrnTrie maps the yrn patterns to values by the segments.
+
+    A pattern matches a yrn of the same segments, and a ``*`` segment of
+    a pattern matches any one segment. A lookup walks the segments once,
+    so it does not depend on the number of the patterns.
+    """
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self) -> None:
+        """Init the members."""
+        self._root = _K2hr3TrieNode()
+        self._size = 0
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3YrnTrie size={self._size}>'
+
+    def __len__(self) -> int:
+        """Return the number of the patterns."""
+        return self._size
+
+    def add(self, pattern: str, value: Any) -> None:
+        """Add a value of a yrn pattern."""
+        node = self._root
+        for segment in yrn_segments(pattern):
+            node = node.children.setdefault(segment, _K2hr3TrieNode())
+        if not node.values:
+            self._size += 1
+        node.values.add(value)
+
+    def match(self, yrn: str) -> Set[Any]:
+        """Return the values of the patterns matching a yrn."""
+        nodes = [self._root]
+        for segment in yrn_segments(yrn):
+            nexts = []
+            for node in nodes:
+                child = node.children.get(segment)
+                if child is not None:
+                    nexts.append(child)
+                child = node.children.get(_WILDCARD)
+                if child is not None and segment != _WILDCARD:
+                    nexts.append(child)
+            if not nexts:
+                return set()
+            nodes = nexts
+        values = set()  # type: Set[Any]
+        for node in nodes:
+            values |= node.values
+        return values
+
+
+class K2hr3PolicyMatcher():
+    """K2hr3PolicyMatcher decides the actions of a policy and its aliases.
+
+    The resource patterns are indexed by the actions, and a request is
+    allowed if an allowing rule matches it and no denying rule does. The
+    conditions of the policies are not evaluated.
+    """
+
+    __slots__ = ('_name', '_policies', '_actions')
+
+    def __init__(self, name: str, policies: List[Dict[str, Any]]) -> None:
+        """Init the members.
+
+        :param name: yrn full path of the policy
+        :param policies: "policy" objects of the policy and its aliases
+        :raises K2hr3Exception: if an effect is invalid
+        """
+        self._name = name
+        self._policies = tuple(policy.get('name') or ''
+                               for policy in policies)
+        self._actions = {}  # type: Dict[str, K2hr3YrnTrie]
+        for policy in policies:
+            effect = policy.get('effect')
+            if effect not in _EFFECTS:
+                raise K2hr3Exception(
+                    f'effect should be allow or deny, not {effect}')
+            for action in policy.get('action') or []:
+                trie = self._actions.setdefault(action, K2hr3YrnTrie())
+                for resource in policy.get('resource') or []:
+                    trie.add(resource, effect)
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3PolicyMatcher _name={self._name}, ' \
+               f'_policies={self._policies}>'
+
+    @property
+    def name(self) -> str:
+        """Return the yrn full path of the policy."""
+        return self._name
+
+    @property
+    def policies(self) -> Tuple[str, ...]:
+        """Return the names of the policy and its aliases."""
+        return self._policies
+
+    def allowed(self, resource: str, action: str) -> bool:
+        """Return True if the action on the resource yrn is allowed."""
+        trie = self._actions.get(action)
+        if trie is None:
+            return False
+        effects = trie.match(resource)
+        return 'allow' in effects and 'deny' not in effects
+
+
+class K2hr3PolicyEngine():  # pylint: disable=too-many-instance-attributes
+    """K2hr3PolicyEngine answers K2hr3Policy.validate without requests.
+
+    A policy is fetched by K2hr3Policy.get with its aliases when it is
+    used first, and compiled into a K2hr3PolicyMatcher. A compiled policy
+    is refreshed in the background when it is used after ``ttl``
+    seconds, and it is used until the refresh completes. invalidate()
+    drops the policies, so call it when a policy is updated.
+    """
+
+    __slots__ = ('_http', '_r3token', '_ttl', '_max_aliases', '_clock',
+                 '_policies', '_flight', '_executor')
+
+    def __init__(self, http: K2hr3Http,  # pylint: disable=too-many-arguments
+                 r3token: str, *, ttl: float = 300.0, maxsize: int = 1024,
+                 max_aliases: int = 64, max_workers: int = 1,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """Init the members.
+
+        :param http: client to get the policies
+        :param r3token: token to get the policies
+        :param ttl: seconds a policy is used before it is refreshed
+        :param maxsize: max number of the policies
+        :param max_aliases: max number of the aliases of a policy
+        :param max_workers: number of threads to refresh the policies
+        :raises K2hr3Exception: if ttl is negative or max_aliases is not
+                                int >= 0
+        """
+        if ttl < 0:
+            raise K2hr3Exception(f'ttl should be positive, not {ttl}')
+        if isinstance(max_aliases, int) is False or max_aliases < 0:
+            raise K2hr3Exception(
+                f'max_aliases should be int >= 0, not {max_aliases}')
+        self._http = http
+        self._r3token = r3token
+        self._ttl = ttl
+        self._max_aliases = max_aliases
+        self._clock = clock
+        self._policies = K2hr3LRUCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._flight = K2hr3Singleflight()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='k2hr3policy')
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3PolicyEngine _ttl={self._ttl}, ' \
+               f'policies={len(self._policies)}>'
+
+    def __enter__(self) -> 'K2hr3PolicyEngine':
+        """Return the engine."""
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Stop the refresh threads."""
+        self.close()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the refresh threads."""
+        self._executor.shutdown(wait=wait)
+
+    def invalidate(self, policy_name: Optional[str] = None,
+                   tenant: str = '', service: Optional[str] = None) -> None:
+        """Drop the policy, or all policies.
+
+        The policies including the policy as an alias are dropped too.
+        """
+        if policy_name is None:
+            self._policies.clear()
+            return
+        name = full_yrn(policy_name, 'policy', tenant, service)
+        for key in self._policies.keys():
+            entry = self._policies.entry(key)
+            if key[0] == name or \
+                    (entry is not None and name in entry[0].policies):
+                self._policies.pop(key)
+
+    def matcher(self, policy_name: str, tenant: str,
+                service: Optional[str] = None) -> K2hr3PolicyMatcher:
+        """Return the compiled policy.
+
+        :raises K2hr3Exception: if the policy could not be fetched
+        """
+        key = (full_yrn(policy_name, 'policy', tenant, service),
+               service or '')
+        entry = self._policies.entry(key)
+        if entry is not None:
+            matcher, expires_at = entry
+            if self._clock() >= expires_at and \
+                    not self._flight.in_flight(key):
+                self._executor.submit(self._refresh_quietly, key)
+            return matcher
+        return self._flight.do(key, self._refresh, key)
+
+    def validate(self, policy_name: str,  # pylint: disable=too-many-arguments
+                 tenant: str, resource: str, action: str,
+                 service: Optional[str] = None) -> bool:
+        """Return True if the policy allows the action on the resource.
+
+        :param policy_name: name or yrn full path of the policy
+        :param resource: name or yrn full path of the resource
+        :param action: yrn full path of the action
+        :raises K2hr3Exception: if the policy could not be fetched
+        """
+        return self.matcher(policy_name, tenant, service).allowed(
+            full_yrn(resource, 'resource', tenant, service), action)
+
+    def _get(self, name: str, service: str) -> Dict[str, Any]:
+        """Return the policy object of a yrn full path."""
+        request = K2hr3Policy(self._r3token).get(name, service).request(
+            K2hr3HTTPMethod.GET)
+        resp = self._http.send(request)
+        if resp is None:
+            raise K2hr3Exception(f'could not get the policy, {name}')
+        policy = resp.json().get('policy')
+        if not isinstance(policy, dict):
+            raise K2hr3Exception(f'no policy in the response of {name}')
+        return policy
+
+    def _refresh(self, key: _PolicyKey) -> K2hr3PolicyMatcher:
+        """Fetch the policy and its aliases, and cache the matcher."""
+        name, service = key
+        policies = []
+        names = [name]
+        seen = {name}
+        while names:
+            policy = self._get(names.pop(), service)
+            policies.append(policy)
+            for alias in policy.get('alias') or []:
+                if alias in seen:
+                    continue
+                # seen holds the policy and its aliases.
+                if len(seen) - 1 >= self._max_aliases:
+                    raise K2hr3Exception(
+                        f'{name} has more than {self._max_aliases} aliases')
+                seen.add(alias)
+                names.append(alias)
+        matcher = K2hr3PolicyMatcher(name, policies)
+        self._policies.set(key, matcher)
+        return matcher
+
+    def _refresh_quietly(self, key: _PolicyKey) -> None:
+        """Refresh a policy in the background."""
+        try:
+            self._flight.do(key, self._refresh, key)
+        except Exception as error:  # pylint: disable=broad-except
+            # the compiled policy is used until it is refreshed.
+            LOG.warning('could not refresh the policy %s, %s', key[0],
+                        error)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
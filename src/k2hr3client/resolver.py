@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of DNS resolution.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.http import K2hr3ConnectionPool, K2hr3Http
+    from k2hr3client.resolver import K2hr3Resolver
+
+    # keeps the addresses of the hosts for 30 seconds.
+    pool = K2hr3ConnectionPool(resolver=K2hr3Resolver(ttl=30))
+    myhttp = K2hr3Http("http://k2hr3.example.com:18080", pool=pool)
+"""
+
+import logging
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from k2hr3client.exception import K2hr3Exception
+
+LOG = logging.getLogger(__name__)
+
+# (family, type, proto, canonname, sockaddr) of socket.getaddrinfo
+_AddrInfo = Tuple[int, int, int, str, Any]
+_HostKey = Tuple[str, int]
+
+
+class _K2hr3ResolverEntry():  # pylint: disable=too-few-public-methods
+    """Represent the resolved addresses of a host."""
+
+    __slots__ = ('expires_at', 'addrinfos', 'error', 'cursor', 'failed')
+
+    def __init__(self, expires_at: float, addrinfos: List[_AddrInfo],
+                 error: Optional[OSError] = None) -> None:
+        """Init the members."""
+        self.expires_at = expires_at
+        self.addrinfos = addrinfos
+        self.error = error
+        self.cursor = 0
+        self.failed: Dict[Any, float] = {}
+
+
+class K2hr3Resolver():
+    """K2hr3Resolver resolves host names lazily and caches the addresses.
+
+    The addresses of a host are kept for ``ttl`` seconds and a failed
+    lookup for ``negative_ttl`` seconds. Each lookup rotates the A/AAAA
+    records of a host to spread new connections over them, and an address
+    that failed to connect is tried last until its host is resolved again.
+    One resolver is shared by the connection pools of the process.
+    """
+
+    __slots__ = ('_ttl', '_negative_ttl', '_lock', '_cache')
+
+    def __init__(self, ttl: float = 60.0, negative_ttl: float = 5.0) -> None:
+        """Init the members.
+
+        :param ttl: seconds the addresses of a host are kept
+        :param negative_ttl: seconds a failed lookup is kept
+        :raises K2hr3Exception: if ttl or negative_ttl is negative
+        """
+        if ttl < 0 or negative_ttl < 0:
+            raise K2hr3Exception('ttl should not be negative')
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._cache: Dict[_HostKey, _K2hr3ResolverEntry] = {}
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3Resolver _ttl={self._ttl}, ' \
+               f'_negative_ttl={self._negative_ttl}, ' \
+               f'hosts={len(self._cache)}>'
+
+    @property
+    def ttl(self) -> float:
+        """Return the seconds the addresses of a host are kept."""
+        return self._ttl
+
+    def invalidate(self, host: Optional[str] = None) -> None:
+        """Drop the cached addresses of the host, or of all hosts."""
+        with self._lock:
+            if host is None:
+                self._cache.clear()
+                return
+            for key in [key for key in self._cache if key[0] == host]:
+                del self._cache[key]
+
+    def _entry(self, host: str, port: int) -> Optional[_K2hr3ResolverEntry]:
+        """Return the cached entry unless it has expired."""
+        with self._lock:
+            entry = self._cache.get((host, port))
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry
+        return None
+
+    def _lookup(self, host: str, port: int) -> _K2hr3ResolverEntry:
+        """Resolve the host and cache the result."""
+        try:
+            addrinfos: List[_AddrInfo] = []
+            addrinfos.extend(socket.getaddrinfo(host, port,
+                                                type=socket.SOCK_STREAM))
+            entry = _K2hr3ResolverEntry(time.monotonic() + self._ttl,
+                                        addrinfos)
+            LOG.debug('%s resolved %s', host,
+                      [addrinfo[4][0] for addrinfo in addrinfos])
+        except OSError as error:  # resolve failed
+            entry = _K2hr3ResolverEntry(
+                time.monotonic() + self._negative_ttl, [], error)
+        with self._lock:
+            self._cache[(host, port)] = entry
+        return entry
+
+    def _ordered(self, entry: _K2hr3ResolverEntry) -> List[_AddrInfo]:
+        """Return the addresses in round-robin order, failed ones last."""
+        now = time.monotonic()
+        with self._lock:
+            addrinfos = entry.addrinfos
+            if not addrinfos:
+                return []
+            start = entry.cursor % len(addrinfos)
+            entry.cursor += 1
+            rotated = addrinfos[start:] + addrinfos[:start]
+            if not entry.failed:
+                return rotated
+            healthy, failed = [], []
+            for addrinfo in rotated:
+                if entry.failed.get(addrinfo[4], 0) > now:
+                    failed.append(addrinfo)
+                else:
+                    healthy.append(addrinfo)
+            return healthy + failed
+
+    def cached(self, host: str, port: int) -> Optional[List[_AddrInfo]]:
+        """Return the addresses without blocking, or None if not cached.
+
+        :raises OSError: if the last lookup of the host failed
+        """
+        entry = self._entry(host, port)
+        if entry is None:
+            return None
+        if entry.error is not None:
+            raise entry.error
+        return self._ordered(entry)
+
+    def resolve(self, host: str, port: int) -> List[_AddrInfo]:
+        """Return the addresses of the host in the order to try.
+
+        The host is resolved only if it is not cached or has expired.
+
+        :raises OSError: if the host could not be resolved
+        """
+        addrinfos = self.cached(host, port)
+        if addrinfos is None:
+            entry = self._lookup(host, port)
+            if entry.error is not None:
+                raise entry.error
+            addrinfos = self._ordered(entry)
+        return addrinfos
+
+    def mark_failed(self, host: str, port: int, sockaddr: Any) -> None:
+        """Try the address last until the host is resolved again."""
+        entry = self._entry(host, port)
+        if entry is not None:
+            with self._lock:
+                entry.failed[sockaddr] = entry.expires_at
+
+    def create_connection(self, host: str, port: int,
+                          timeout: Optional[float] = None,
+                          source_address: Optional[Tuple[str, int]] = None
+                          ) -> socket.socket:
+        """Connect to the first address of the host that accepts.
+
+        :raises OSError: if all addresses failed
+        """
+        error: Optional[OSError] = None
+        for family, socktype, proto, _, sockaddr in self.resolve(host, port):
+            sock = socket.socket(family, socktype, proto)
+            try:
+                if timeout is not None:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sockaddr)
+                return sock
+            except OSError as err:
+                LOG.debug('could not connect to %s of %s, %s',
+                          sockaddr, host, err)
+                sock.close()
+                self.mark_failed(host, port, sockaddr)
+                error = err
+        raise error or OSError(f'no address of {host}')
+
+
+_DEFAULT_RESOLVER = K2hr3Resolver()
+
+
+def get_resolver() -> K2hr3Resolver:
+    """Return the resolver shared in the process."""
+    return _DEFAULT_RESOLVER
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -57,19 +57,27 @@
 
 """
 
-import json
+import functools
 import logging
+import os
 from pathlib import Path
 import re
-from typing import Optional, Any
+from stat import S_ISREG
+from typing import Any, Dict, Optional
 
 
-from k2hr3client.api import K2hr3Api, K2hr3HTTPMethod
+from k2hr3client.api import K2hr3Api, K2hr3Endpoint, K2hr3HTTPMethod, \
+    register_endpoints
+from k2hr3client.builder import K2hr3BodyBuilder
 from k2hr3client.exception import K2hr3Exception
 
 LOG = logging.getLogger(__name__)
 
 _MAX_LINE_LENGTH = 1024 * 8
+_CLUSTER_NAME_VARIABLE = '__TROVE_K2HDKC_CLUSTER_NAME__'
+_TENANT_NAME_VARIABLE = '__TROVE_K2HDKC_TENANT_NAME__'
+_TEMPLATE_PATTERN = re.compile(
+    f'{_CLUSTER_NAME_VARIABLE}|{_TENANT_NAME_VARIABLE}')
 _RESOURCE_API_CREATE_RESOURCE = """
 {
     "resource":    {
@@ -81,6 +89,10 @@ _RESOURCE_API_CREATE_RESOURCE = """
     }
 }
 """
+_RESOURCE_API_CREATE_RESOURCE_BODY = K2hr3BodyBuilder(
+    _RESOURCE_API_CREATE_RESOURCE, name=('resource', 'name'),
+    type=('resource', 'type'), data=('resource', 'data'),
+    keys=('resource', 'keys'), alias=('resource', 'alias'))
 _RESOURCE_API_CREATE_RESOURCE_WITH_ROLE_TOKEN = """
 {
     "resource":    {
@@ -104,6 +116,63 @@ _RESOURCE_API_CREATE_RESOURCE_WITH_NO_TOKEN = """
 """
 
 
+def _rendered_length(text: str, values: Dict[str, str]) -> int:
+    """Return the length of the rendered text without rendering it."""
+    length = len(text)
+    for name, value in values.items():
+        length += text.count(name) * (len(value) - len(name))
+    return length
+
+
+@functools.lru_cache(maxsize=64)
+def _render_template(path: str,  # pylint: disable=too-many-arguments
+                     mtime_ns: int,  # pylint: disable=unused-argument
+                     size: int, *, projectname: str, clustername: str,
+                     max_length: int) -> str:
+    """Return the rendered template of the file of the mtime and size."""
+    values = {_CLUSTER_NAME_VARIABLE: clustername,
+              _TENANT_NAME_VARIABLE: projectname}
+    with open(path, encoding='utf-8') as f:
+        if size <= max_length:
+            text = f.read()
+            length = _rendered_length(text, values)
+        else:
+            # stops reading a big file at max_length. The variables are
+            # not split across the lines.
+            lines = []
+            length = 0
+            for line in f:
+                length += _rendered_length(line, values)
+                if length > max_length:
+                    break
+                lines.append(line)
+            text = ''.join(lines)
+    if length > max_length:
+        raise K2hr3Exception('data too big')
+    return _TEMPLATE_PATTERN.sub(lambda match: values[match.group(0)], text)
+
+
+def render_template(path: Path, projectname: str, clustername: str,
+                    max_length: int = _MAX_LINE_LENGTH) -> str:
+    """Return the resource data of a template file.
+
+    __TROVE_K2HDKC_TENANT_NAME__ and __TROVE_K2HDKC_CLUSTER_NAME__ are
+    replaced in one pass. The data is cached until the file is modified.
+
+    :raises K2hr3Exception: if the path is not a regular file or the data
+                            is longer than max_length
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError as error:
+        raise K2hr3Exception(f'path must exist, not {path}') from error
+    if S_ISREG(stat.st_mode) is False:
+        raise K2hr3Exception(f'path must be a regular file, not {path}')
+    return _render_template(os.path.abspath(path), stat.st_mtime_ns,
+                            stat.st_size, projectname=projectname,
+                            clustername=clustername, max_length=max_length)
+
+
 class K2hr3Resource(K2hr3Api):  # pylint: disable=too-many-instance-attributes
     """Relationship with K2HR3 RESOURCE API.
 
@@ -148,7 +217,7 @@ class K2hr3Resource(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         self.port = None
         self.cuk = None
         self.role = None
-        self._data = None
+        self._data = None  # type: Any
 
     # ---- POST/PUT ----
     # POST http(s)://API SERVER:PORT/v1/resource
@@ -331,33 +400,10 @@ class K2hr3Resource(K2hr3Api):  # pylint: disable=too-many-instance-attributes
 
     def _set_data(self, val: Any, projectname: str, clustername: str) -> None:
         """Set data."""
-        if getattr(self, '_data', None) is None:
-            self._data = val
         if isinstance(val, Path) is False:
             self._data = val
         else:
-            self._data = ""  # type: ignore
-            if val.exists() is False:
-                raise K2hr3Exception(f'path must exist, not {val}')
-            if val.is_file() is False:
-                raise K2hr3Exception(
-                    f'path must be a regular file, not {val}')
-            # NOTE(hiwakaba): val must not be an arbitrary value.
-            # for backward compat, the resource template is used.
-            val = "/opt/stack/k2hdkc_dbaas/utils/python-k2hr3client/examples/example_resource.txt"  # noqa # pylint: disable=line-too-long
-            with val.open() as f:  # pylint: disable=no-member
-                line_len = 0
-                for line in iter(f.readline, ''):
-                    # 3. replace TROVE_K2HDKC_CLUSTER_NAME with clustername
-                    line = re.sub('__TROVE_K2HDKC_CLUSTER_NAME__', clustername,
-                                  line)
-                    # 4. replace TROVE_K2HDKC_TENANT_NAME with projectname
-                    line = re.sub('__TROVE_K2HDKC_TENANT_NAME__', projectname,
-                                  line)
-                    line_len += len(line)
-                    if line_len > _MAX_LINE_LENGTH:
-                        raise K2hr3Exception('data too big')
-                    self._data = "".join([self._data, line])  # type: ignore
+            self._data = render_template(val, projectname, clustername)
 
     @property  # type: ignore
     def r3token(self):
@@ -392,91 +438,44 @@ class K2hr3Resource(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         if getattr(self, '_resource_path', None) is None:
             self._resource_path = val
 
-    #
-    # abstract methos that must be implemented in subclasses
-    #
-    def _api_path(self, method: K2hr3HTTPMethod) -> Optional[str]: # pylint: disable=too-many-branches, too-many-return-statements, line-too-long # noqa
-        """Get the request url path."""
-        if method == K2hr3HTTPMethod.POST:
-            if self.api_id == 1:
-                python_data = json.loads(_RESOURCE_API_CREATE_RESOURCE)
-                python_data['resource']['name'] = self.name
-                python_data['resource']['type'] = self.data_type
-                python_data['resource']['data'] = self.data
-                python_data['resource']['keys'] = self.keys
-                python_data['resource']['alias'] = self.alias
-                self.body = json.dumps(python_data)
-                if self.r3token:
-                    return f'{self.version}/{self.basepath}'
-                return f'{self.version}/{self.basepath}/{self.resource_path}'
-        if method == K2hr3HTTPMethod.PUT:
-            if self.api_id == 1:
-                self.urlparams = json.dumps({
-                    'name': self.name,
-                    'type': self.data_type,
-                    'data': self.data,
-                    'keys': self.keys,
-                    'alias': self.alias
-                })
-                if self.r3token:
-                    return f'{self.version}/{self.basepath}'
-                return f'{self.version}/{self.basepath}/{self.resource_path}'
-        if method == K2hr3HTTPMethod.GET:
-            if self.api_id == 3:
-                self.urlparams = json.dumps({
-                    'expand': self.expand,
-                    'service': self.service
-                })
-                return f'{self.version}/{self.basepath}/{self.resource_path}'
-            if self.api_id == 4:
-                self.urlparams = json.dumps({
-                    'type': self.data_type,
-                    'keys': self.keys,
-                    'service': self.service
-                })
-                return f'{self.version}/{self.basepath}/{self.resource_path}'
-        if method == K2hr3HTTPMethod.HEAD:
-            if self.api_id == 5:
-                self.urlparams = json.dumps({
-                    'type': self.data_type,
-                    'keys': self.keys,
-                    'service': self.service
-                })
-                return f'{self.version}/{self.basepath}/{self.resource_path}'
-            if self.api_id == 6:
-                self.urlparams = json.dumps({
-                    'port': self.port,
-                    'cuk': self.cuk,
-                    'role': self.role,
-                    'type': self.data_type,
-                    'keys': self.keys,
-                    'service': self.service
-                })
-                return f'{self.version}/{self.basepath}/{self.resource_path}'
-        if method == K2hr3HTTPMethod.DELETE:
-            if self.api_id == 7:
-                self.urlparams = json.dumps({
-                    'type': self.data_type,
-                    'keynames': self.keys,
-                    'alias': self.alias
-                })
-                return f'{self.version}/{self.basepath}/{self.resource_path}'
-            if self.api_id == 8:
-                self.urlparams = json.dumps({
-                    'type': self.data_type,
-                    'keynames': self.keys,
-                })
-                return f'{self.version}/{self.basepath}/{self.resource_path}'
-            if self.api_id == 9:
-                self.urlparams = json.dumps({
-                    'port': self.port,
-                    'cuk': self.cuk,
-                    'role': self.role,
-                    'type': self.data_type,
-                    'keynames': self.keys,
-                })
-                return f'{self.version}/{self.basepath}/{self.resource_path}'
-        return None
+
+_RESOURCE_PATH = '{version}/{basepath}/{resource_path}'
+
+
+def _create_resource_path(r3api: K2hr3Resource) -> str:
+    """Return the path to create a resource by a token or not."""
+    if r3api.r3token:
+        return f'{r3api.version}/{r3api.basepath}'
+    return f'{r3api.version}/{r3api.basepath}/{r3api.resource_path}'
+
+
+register_endpoints(K2hr3Resource, (
+    K2hr3Endpoint(1, K2hr3HTTPMethod.POST, _create_resource_path,
+                  body=lambda r3api: _RESOURCE_API_CREATE_RESOURCE_BODY.build(
+                      name=r3api.name, type=r3api.data_type, data=r3api.data,
+                      keys=r3api.keys, alias=r3api.alias)),
+    K2hr3Endpoint(1, K2hr3HTTPMethod.PUT, _create_resource_path,
+                  query=('name', ('type', 'data_type'), 'data', 'keys',
+                         'alias')),
+    K2hr3Endpoint(3, K2hr3HTTPMethod.GET, _RESOURCE_PATH,
+                  query=('expand', 'service')),
+    K2hr3Endpoint(4, K2hr3HTTPMethod.GET, _RESOURCE_PATH,
+                  query=(('type', 'data_type'), 'keys', 'service')),
+    K2hr3Endpoint(5, K2hr3HTTPMethod.HEAD, _RESOURCE_PATH,
+                  query=(('type', 'data_type'), 'keys', 'service')),
+    K2hr3Endpoint(6, K2hr3HTTPMethod.HEAD, _RESOURCE_PATH,
+                  query=('port', 'cuk', 'role', ('type', 'data_type'),
+                         'keys', 'service')),
+    K2hr3Endpoint(7, K2hr3HTTPMethod.DELETE, _RESOURCE_PATH,
+                  query=(('type', 'data_type'), ('keynames', 'keys'),
+                         'alias')),
+    K2hr3Endpoint(8, K2hr3HTTPMethod.DELETE, _RESOURCE_PATH,
+                  query=(('type', 'data_type'), ('keynames', 'keys'))),
+    K2hr3Endpoint(9, K2hr3HTTPMethod.DELETE, _RESOURCE_PATH,
+                  query=('port', 'cuk', 'role', ('type', 'data_type'),
+                         ('keynames', 'keys'))),
+))
+
 #
 # Local variables:
 # tab-width: 4
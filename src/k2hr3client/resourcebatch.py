@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of resources in bulk.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.resourcebatch import K2hr3ResourceBatch, \
+        K2hr3ResourceSpec
+
+    myhttp = K2hr3Http("http://127.0.0.1:18080")
+    specs = [
+        K2hr3ResourceSpec("cluster", "string", "data",
+                          keys={"cluster-name": "mycluster"}),
+        K2hr3ResourceSpec("cluster/server", "object", {"port": 8020}),
+    ]
+    batch = K2hr3ResourceBatch(myhttp, mytoken.token, max_workers=8)
+    # creates the new resources, updates the modified ones and skips
+    # the others.
+    for result in batch.create_or_update(specs):
+        print(result.spec.name, result.action, result.ok)
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from k2hr3client.api import K2hr3HTTPMethod
+from k2hr3client.batch import K2hr3BatchExecutor, outcome
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+from k2hr3client.resource import K2hr3Resource
+
+LOG = logging.getLogger(__name__)
+
+_DATA_TYPES = ('string', 'object')
+
+
+class K2hr3ResourceSpec():
+    """Represent a resource to create.
+
+    The arguments are validated when the spec is created, so a batch
+    fails before any request is sent.
+    """
+
+    __slots__ = ('_name', '_data_type', '_data', '_keys', '_alias')
+
+    def __init__(self, name: str,  # pylint: disable=too-many-arguments
+                 data_type: str = 'string', data: Any = '',
+                 keys: Optional[dict] = None,
+                 alias: Optional[List[str]] = None) -> None:
+        """Init the members.
+
+        :param name: resource name or path
+        :param data_type: "string" or "object"
+        :param data: str, a pathlib.Path of a template, or an object
+        :param keys: keys of the resource
+        :param alias: yrn full paths of the alias resources
+        :raises K2hr3Exception: if the name is empty, the data_type is
+                                unknown, the keys are not a dict or the
+                                alias is not a list of str
+        """
+        if isinstance(name, str) is False or not name.strip('/'):
+            raise K2hr3Exception(f'name should be str, not {name!r}')
+        if data_type not in _DATA_TYPES:
+            raise K2hr3Exception(
+                f'data_type should be one of {_DATA_TYPES}, not {data_type}')
+        if keys is not None and isinstance(keys, dict) is False:
+            raise K2hr3Exception(f'keys should be dict, not {keys!r}')
+        if alias is not None and (isinstance(alias, list) is False or not
+                                  all(isinstance(a, str) for a in alias)):
+            raise K2hr3Exception(f'alias should be list of str, not {alias!r}')
+        self._name = name.strip('/')
+        self._data_type = data_type
+        self._data = data
+        self._keys = keys
+        self._alias = alias
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3ResourceSpec _name={self._name}, ' \
+               f'_data_type={self._data_type}>'
+
+    @property
+    def name(self) -> str:
+        """Return the resource name."""
+        return self._name
+
+    @property
+    def data_type(self) -> str:
+        """Return the data type."""
+        return self._data_type
+
+    @property
+    def data(self) -> Any:
+        """Return the data."""
+        return self._data
+
+    @property
+    def keys(self) -> Optional[dict]:
+        """Return the keys."""
+        return self._keys
+
+    @property
+    def alias(self) -> Optional[List[str]]:
+        """Return the alias."""
+        return self._alias
+
+
+class K2hr3ResourceResult():
+    """Represent the result of a resource of K2hr3ResourceBatch."""
+
+    __slots__ = ('_spec', '_action', '_ok', '_code', '_error')
+
+    def __init__(self, spec: K2hr3ResourceSpec,  # pylint: disable=too-many-arguments # noqa
+                 action: str, ok: bool,  # pylint: disable=invalid-name
+                 code: Optional[int] = None,
+                 error: Optional[str] = None) -> None:
+        """Init the members."""
+        self._spec = spec
+        self._action = action
+        self._ok = ok
+        self._code = code
+        self._error = error
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3ResourceResult _name={self._spec.name}, ' \
+               f'_action={self._action}, _ok={self._ok}, ' \
+               f'_code={self._code}>'
+
+    @property
+    def spec(self) -> K2hr3ResourceSpec:
+        """Return the spec."""
+        return self._spec
+
+    @property
+    def action(self) -> str:
+        """Return "created", "updated" or "skipped"."""
+        return self._action
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """Return True if the resource was created, updated or skipped."""
+        return self._ok
+
+    @property
+    def code(self) -> Optional[int]:
+        """Return the status code of the response if any."""
+        return self._code
+
+    @property
+    def error(self) -> Optional[str]:
+        """Return the reason of the failure if any."""
+        return self._error
+
+
+def _current(resource: Optional[dict]) -> Optional[Tuple[Any, Any, Any]]:
+    """Return the (data, keys, alias) of a resource of the GET response."""
+    if resource is None:
+        return None
+    data = resource.get('string')
+    if data is None:
+        data = resource.get('object')
+    return (data, resource.get('keys') or {},
+            sorted(resource.get('aliases') or resource.get('alias') or []))
+
+
+class K2hr3ResourceBatch():
+    """K2hr3ResourceBatch creates many resources of a tenant concurrently.
+
+    The requests are sent over the pooled connections of the client with
+    at most ``max_workers`` requests in flight, and every spec gets a
+    K2hr3ResourceResult in input order.
+    """
+
+    __slots__ = ('_http', '_r3token', '_max_workers', '_tenant',
+                 '_cluster_name')
+
+    def __init__(self, http: K2hr3Http,  # pylint: disable=too-many-arguments
+                 r3token: str, max_workers: int = 8, tenant: str = '',
+                 cluster_name: str = '') -> None:
+        """Init the members.
+
+        :param http: client to send the requests
+        :param r3token: scoped token of the tenant
+        :param max_workers: number of requests in flight
+        :param tenant: tenant name to render the template data
+        :param cluster_name: cluster name to render the template data
+        """
+        if isinstance(max_workers, int) is False or max_workers < 1:
+            raise K2hr3Exception(
+                f'max_workers should be int > 0, not {max_workers}')
+        self._http = http
+        self._r3token = r3token
+        self._max_workers = max_workers
+        self._tenant = tenant
+        self._cluster_name = cluster_name
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        # NOTE: the token is a secret.
+        return f'<K2hr3ResourceBatch _max_workers={self._max_workers}>'
+
+    @property
+    def max_workers(self) -> int:
+        """Return the number of requests in flight."""
+        return self._max_workers
+
+    @staticmethod
+    def _specs(specs: Iterable[K2hr3ResourceSpec]
+               ) -> List[K2hr3ResourceSpec]:
+        """Return the specs after checking the types and the names."""
+        specs = list(specs)
+        names = set()
+        for spec in specs:
+            if isinstance(spec, K2hr3ResourceSpec) is False:
+                raise K2hr3Exception(
+                    f'spec should be K2hr3ResourceSpec, not {spec!r}')
+            if spec.name in names:
+                raise K2hr3Exception(f'duplicate resource, {spec.name}')
+            names.add(spec.name)
+        return specs
+
+    def _create(self, spec: K2hr3ResourceSpec) -> K2hr3Resource:
+        """Return the create_conf_resource request of a spec."""
+        return K2hr3Resource(self._r3token).create_conf_resource(
+            spec.name, spec.data_type, spec.data, self._tenant,
+            self._cluster_name, spec.keys, spec.alias)
+
+    def fetch(self, names: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """Return the current resources by the names.
+
+        The value is the "resource" of the GET response without expansion,
+        or None if the resource does not exist.
+        """
+        names = list(names)
+        requests = [(K2hr3HTTPMethod.GET,
+                     K2hr3Resource(self._r3token, resource_path=name).get())
+                    for name in names]
+        listing = {}  # type: Dict[str, Optional[dict]]
+        with K2hr3BatchExecutor(self._http,
+                                max_workers=self._max_workers) as executor:
+            for result in executor.run(requests):
+                name = names[result.index]
+                resp = result.r3api.resp if result.ok else None
+                if resp is None or resp.result is False:
+                    listing[name] = None
+                else:
+                    listing[name] = (resp.json() or {}).get('resource')
+        return listing
+
+    def _send(self, specs: List[K2hr3ResourceSpec],
+              requests: List[Tuple[int, str, K2hr3Resource]],
+              results: Dict[int, K2hr3ResourceResult]
+              ) -> List[K2hr3ResourceResult]:
+        """Send the requests and return the results in input order."""
+        with K2hr3BatchExecutor(self._http,
+                                max_workers=self._max_workers) as executor:
+            for result in executor.run([(K2hr3HTTPMethod.POST, r3api)
+                                        for _, _, r3api in requests]):
+                index, action, _ = requests[result.index]
+                ok, code, error = outcome(result)
+                if not ok:
+                    LOG.error('could not create the resource %s, %s',
+                              specs[index].name, error)
+                results[index] = K2hr3ResourceResult(specs[index], action, ok,
+                                                     code, error)
+        return [results[index] for index in range(len(specs))]
+
+    def create(self, specs: Iterable[K2hr3ResourceSpec]
+               ) -> List[K2hr3ResourceResult]:
+        """Create the resources.
+
+        :raises K2hr3Exception: if a spec is invalid or duplicate
+        """
+        specs = self._specs(specs)
+        requests = [(index, 'created', self._create(spec))
+                    for index, spec in enumerate(specs)]
+        return self._send(specs, requests, {})
+
+    def create_or_update(self, specs: Iterable[K2hr3ResourceSpec],
+                         listing: Optional[Dict[str, Optional[dict]]] = None
+                         ) -> List[K2hr3ResourceResult]:
+        """Create the new resources and update the modified ones.
+
+        The resources whose data, keys and alias are equal to the current
+        ones are skipped without any request.
+
+        :param listing: current resources by the names as fetch() returns.
+                        The resources are fetched concurrently if None.
+        :raises K2hr3Exception: if a spec is invalid or duplicate
+        """
+        specs = self._specs(specs)
+        if listing is None:
+            listing = self.fetch(spec.name for spec in specs)
+        requests = []  # type: List[Tuple[int, str, K2hr3Resource]]
+        results = {}  # type: Dict[int, K2hr3ResourceResult]
+        for index, spec in enumerate(specs):
+            r3api = self._create(spec)
+            current = _current(listing.get(spec.name))
+            if current is None:
+                requests.append((index, 'created', r3api))
+            elif current == (r3api.data, spec.keys or {},
+                             sorted(spec.alias or [])):
+                results[index] = K2hr3ResourceResult(spec, 'skipped', True)
+            else:
+                requests.append((index, 'updated', r3api))
+        LOG.debug('%s resources are unchanged', len(results))
+        return self._send(specs, requests, results)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of resource caches.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.resource import K2hr3Resource
+    from k2hr3client.resourcecache import K2hr3ResourceCache
+
+    myhttp = K2hr3Http("http://127.0.0.1:18080")
+    cache = K2hr3ResourceCache(myhttp, ttl=30.0, stale_ttl=300.0)
+
+    # GETs the resource only if it is not cached or expired.
+    myresource = K2hr3Resource(roletoken=myroletoken,
+                               resource_path="test_resource")
+    resp = cache.get(myresource.get_with_roletoken("string", None))
+    resp.body  // {"result":true...
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import threading
+import time
+from typing import Callable, Hashable, Optional, Set, Tuple
+
+from k2hr3client.api import K2hr3ApiResponse, K2hr3HTTPMethod, K2hr3Request
+from k2hr3client.cache import K2hr3LRUCache, K2hr3Singleflight
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+from k2hr3client.resource import K2hr3Resource
+
+LOG = logging.getLogger(__name__)
+
+_ResourceKey = Tuple[Hashable, ...]
+# api_id of K2hr3Resource.get and K2hr3Resource.get_with_roletoken
+_GET_API_IDS = (3, 4)
+
+
+class K2hr3CachedResource():
+    """Represent a response of a resource and its validators."""
+
+    __slots__ = ('_resp', '_etag', '_last_modified')
+
+    def __init__(self, resp: K2hr3ApiResponse, etag: Optional[str] = None,
+                 last_modified: Optional[str] = None) -> None:
+        """Init the members."""
+        self._resp = resp
+        self._etag = etag
+        self._last_modified = last_modified
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3CachedResource _etag={self._etag}, ' \
+               f'_last_modified={self._last_modified}>'
+
+    @property
+    def resp(self) -> K2hr3ApiResponse:
+        """Return the response."""
+        return self._resp
+
+    @property
+    def etag(self) -> Optional[str]:
+        """Return the ETag of the response if any."""
+        return self._etag
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        """Return the Last-Modified of the response if any."""
+        return self._last_modified
+
+
+def resource_key(r3api: K2hr3Resource) -> _ResourceKey:
+    """Return the cache key of a GET of a resource.
+
+    The key is (resource_path, token type, expand, service, data type,
+    keys). The token itself is not in the key.
+
+    :raises K2hr3Exception: if r3api is not of get or get_with_roletoken
+    """
+    if getattr(r3api, 'api_id', None) not in _GET_API_IDS:
+        raise K2hr3Exception('r3api should be of get or get_with_roletoken')
+    if r3api.r3token:
+        token_type = 'U'
+    elif r3api.roletoken:
+        token_type = 'R'
+    else:
+        token_type = None
+    keys = None
+    if r3api.keys is not None:
+        keys = json.dumps(r3api.keys, sort_keys=True)
+    return (r3api.resource_path, token_type, r3api.expand, r3api.service,
+            r3api.data_type, keys)
+
+
+class K2hr3ResourceCache():  # pylint: disable=too-many-instance-attributes
+    """K2hr3ResourceCache is a read-through cache of the resource GETs.
+
+    A response lives ``ttl`` seconds, and the least recently used one is
+    evicted if more than ``maxsize`` responses are cached. An expired
+    response is still returned for ``stale_ttl`` seconds while it is
+    revalidated in the background, so readers of a hot resource never
+    wait on the network. A revalidation sends If-None-Match or
+    If-Modified-Since if the server returned ETag or Last-Modified, and
+    a 304 response extends the life of the cached response.
+
+    The responses are shared by the callers of the same token type, so
+    use a cache per tenant if the tokens of the tenants are used.
+    """
+
+    __slots__ = ('_http', '_ttl', '_stale_ttl', '_clock', '_entries',
+                 '_flight', '_executor', '_lock', '_revalidating')
+
+    def __init__(self, http: K2hr3Http,  # pylint: disable=too-many-arguments
+                 *, ttl: float = 30.0, stale_ttl: float = 300.0,
+                 maxsize: int = 1024, max_workers: int = 2,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """Init the members.
+
+        :param http: client to get the resources
+        :param ttl: seconds a response is fresh
+        :param stale_ttl: seconds an expired response is returned while it
+                          is revalidated
+        :param maxsize: max number of the responses
+        :param max_workers: number of threads to revalidate the responses
+        :raises K2hr3Exception: if stale_ttl or ttl is negative or maxsize
+                                is not int > 0
+        """
+        if stale_ttl < 0:
+            raise K2hr3Exception(
+                f'stale_ttl should be positive, not {stale_ttl}')
+        self._http = http
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries = K2hr3LRUCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._flight = K2hr3Singleflight()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='k2hr3resource')
+        self._lock = threading.Lock()
+        self._revalidating: Set[_ResourceKey] = set()
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3ResourceCache _ttl={self._ttl}, ' \
+               f'_stale_ttl={self._stale_ttl}, ' \
+               f'_maxsize={self._entries.maxsize}, ' \
+               f'entries={len(self._entries)}>'
+
+    def __len__(self) -> int:
+        """Return the number of the cached responses."""
+        return len(self._entries)
+
+    def __enter__(self) -> 'K2hr3ResourceCache':
+        """Return the cache."""
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Stop the revalidation threads."""
+        self.close()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the revalidation threads."""
+        self._executor.shutdown(wait=wait)
+
+    def peek(self, r3api: K2hr3Resource) -> Optional[K2hr3CachedResource]:
+        """Return the cached response if any even if it expired."""
+        entry = self._entries.entry(resource_key(r3api))
+        return None if entry is None else entry[0]
+
+    def get(self, r3api: K2hr3Resource) -> K2hr3ApiResponse:
+        """Return the response of a GET of the resource.
+
+        :param r3api: K2hr3Resource of get() or get_with_roletoken()
+        :raises K2hr3Exception: if the resource could not be fetched
+        """
+        key = resource_key(r3api)
+        entry = self._entries.entry(key)
+        cached = None
+        if entry is not None:
+            cached, expires_at = entry
+            now = self._clock()
+            if now < expires_at:
+                return cached.resp
+            if now < expires_at + self._stale_ttl:
+                self._revalidate_later(key, r3api, cached)
+                return cached.resp
+        request = r3api.request(K2hr3HTTPMethod.GET)
+        return self._flight.do(key, self._revalidate, key, request,
+                               cached).resp
+
+    def invalidate(self, resource_path: Optional[str] = None) -> None:
+        """Drop the responses of the resource path, or all responses."""
+        if resource_path is None:
+            self._entries.clear()
+            return
+        for key in self._entries.keys():
+            if key[0] == resource_path:
+                self._entries.pop(key)
+
+    def _revalidate(self, key: _ResourceKey, request: K2hr3Request,
+                    cached: Optional[K2hr3CachedResource]
+                    ) -> K2hr3CachedResource:
+        """Get the resource and cache it unless it is not modified."""
+        headers = request.headers
+        if cached is not None and cached.etag:
+            headers += (('If-None-Match', cached.etag),)
+        elif cached is not None and cached.last_modified:
+            headers += (('If-Modified-Since', cached.last_modified),)
+        resp = self._http.send(request._replace(headers=headers))
+        if resp is None:
+            raise K2hr3Exception(f'could not get the resource, {key[0]}')
+        if resp.code == 304 and cached is not None:
+            # the cached response is still valid.
+            cached = K2hr3CachedResource(
+                cached.resp, resp.hdrs.get('ETag') or cached.etag,
+                resp.hdrs.get('Last-Modified') or cached.last_modified)
+        elif resp.code >= 300 or resp.result is False:
+            LOG.warning('not caching the resource %s, code %s', key[0],
+                        resp.code)
+            return K2hr3CachedResource(resp)
+        else:
+            cached = K2hr3CachedResource(resp, resp.hdrs.get('ETag'),
+                                         resp.hdrs.get('Last-Modified'))
+        self._entries.set(key, cached)
+        return cached
+
+    def _revalidate_later(self, key: _ResourceKey, r3api: K2hr3Resource,
+                          cached: K2hr3CachedResource) -> None:
+        """Submit a revalidation of the response unless one is queued."""
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        try:
+            self._executor.submit(self._revalidate_quietly, key,
+                                  r3api.request(K2hr3HTTPMethod.GET), cached)
+        except BaseException:
+            with self._lock:
+                self._revalidating.discard(key)
+            raise
+
+    def _revalidate_quietly(self, key: _ResourceKey, request: K2hr3Request,
+                            cached: K2hr3CachedResource) -> None:
+        """Revalidate a response in the background."""
+        try:
+            self._flight.do(key, self._revalidate, key, request, cached)
+        except Exception as error:  # pylint: disable=broad-except
+            # the stale response is used until stale_ttl passes.
+            LOG.warning('could not revalidate the resource %s, %s', key[0],
+                        error)
+        finally:
+            with self._lock:
+                self._revalidating.discard(key)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
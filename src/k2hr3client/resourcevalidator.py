@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of resource validations in bulk.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.resource import K2hr3Resource
+    from k2hr3client.resourcevalidator import K2hr3ResourceValidator
+
+    myhttp = K2hr3Http("http://127.0.0.1:18080")
+    validator = K2hr3ResourceValidator(myhttp, positive_ttl=60.0,
+                                       negative_ttl=5.0)
+    # sends the HEAD requests concurrently and returns the results by the
+    # labels.
+    results = validator.check_all({
+        key: K2hr3Resource(roletoken=myroletoken,
+                           resource_path="test_resource").validate(
+                               "string", {key: None})
+        for key in ["key1", "key2", "key3"]
+    })
+    results  // {"key1": True, "key2": False, "key3": True}
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import time
+from typing import Callable, Dict, Hashable, Mapping, Optional
+
+from k2hr3client.api import K2hr3HTTPMethod, K2hr3Request
+from k2hr3client.cache import K2hr3LRUCache, K2hr3Singleflight
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+from k2hr3client.resource import K2hr3Resource
+
+LOG = logging.getLogger(__name__)
+
+# api_id of K2hr3Resource.validate and K2hr3Resource.validate_with_notoken
+_VALIDATE_API_IDS = (5, 6)
+# status codes which mean the resource is invalid. The others like 503 or
+# 429 are not about the resource.
+_INVALID_CODES = (401, 403, 404)
+
+
+def validation_request(r3api: K2hr3Resource) -> K2hr3Request:
+    """Return the HEAD request of a validation.
+
+    :raises K2hr3Exception: if r3api is not of validate or
+                            validate_with_notoken
+    """
+    if getattr(r3api, 'api_id', None) not in _VALIDATE_API_IDS:
+        raise K2hr3Exception(
+            'r3api should be of validate or validate_with_notoken')
+    return r3api.request(K2hr3HTTPMethod.HEAD)
+
+
+class K2hr3ResourceValidator():  # pylint: disable=too-many-instance-attributes
+    """K2hr3ResourceValidator validates many resources concurrently.
+
+    A check is identified by its request including the token, so the
+    identical checks of a call are sent once and the identical checks
+    of concurrent calls share the request in flight. The checks are sent
+    concurrently over the pooled connections of the client. A positive
+    result is reused for ``positive_ttl`` seconds and a negative one, a
+    401, 403 or 404, for ``negative_ttl`` seconds. A check that could not
+    be sent or got another error status like 503 is not cached.
+    """
+
+    __slots__ = ('_http', '_positive_ttl', '_negative_ttl', '_max_workers',
+                 '_results', '_flight', '_executor')
+
+    def __init__(self, http: K2hr3Http,  # pylint: disable=too-many-arguments
+                 *, positive_ttl: float = 60.0, negative_ttl: float = 5.0,
+                 maxsize: int = 4096, max_workers: int = 16,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """Init the members.
+
+        :param http: client to send the requests
+        :param positive_ttl: seconds a valid result is reused
+        :param negative_ttl: seconds an invalid result is reused
+        :param maxsize: max number of the results
+        :param max_workers: number of requests in flight
+        :raises K2hr3Exception: if positive_ttl or negative_ttl is
+                                negative or max_workers is not int > 0
+        """
+        if positive_ttl < 0 or negative_ttl < 0:
+            raise K2hr3Exception('positive_ttl and negative_ttl should be '
+                                 'positive')
+        if isinstance(max_workers, int) is False or max_workers < 1:
+            raise K2hr3Exception(
+                f'max_workers should be int > 0, not {max_workers}')
+        self._http = http
+        self._positive_ttl = positive_ttl
+        self._negative_ttl = negative_ttl
+        self._max_workers = max_workers
+        self._results = K2hr3LRUCache(maxsize=maxsize, ttl=positive_ttl,
+                                      clock=clock)
+        self._flight = K2hr3Singleflight()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='k2hr3validator')
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3ResourceValidator _positive_ttl={self._positive_ttl}' \
+               f', _negative_ttl={self._negative_ttl}, ' \
+               f'_max_workers={self._max_workers}, ' \
+               f'results={len(self._results)}>'
+
+    def __enter__(self) -> 'K2hr3ResourceValidator':
+        """Return the validator."""
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Stop the threads."""
+        self.close()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the threads."""
+        self._executor.shutdown(wait=wait)
+
+    def invalidate(self) -> None:
+        """Drop all results."""
+        self._results.clear()
+
+    def _validate(self, request: K2hr3Request) -> Optional[bool]:
+        """Send a check and cache the result.
+
+        :returns: None if the status like 503 or 429 tells nothing about
+                  the resource. It is not cached.
+        """
+        resp = self._http.send(request, errors=True)
+        if resp is None:
+            raise K2hr3Exception(f'could not validate {request.path}')
+        if 200 <= resp.code < 300:
+            valid = True
+        elif resp.code in _INVALID_CODES:
+            valid = False
+        else:
+            LOG.error('could not validate %s, status %s', request.path,
+                      resp.code)
+            return None
+        self._results.set(request, valid, self._positive_ttl if valid
+                          else self._negative_ttl)
+        return valid
+
+    def _check(self, request: K2hr3Request) -> Optional[bool]:
+        """Return the result of a check or None if it could not be sent."""
+        try:
+            return self._flight.do(request, self._validate, request)
+        except Exception as error:  # pylint: disable=broad-except
+            LOG.error('could not validate %s, %s', request.path, error)
+            return None
+
+    def check(self, r3api: K2hr3Resource) -> Optional[bool]:
+        """Return True if the resource is valid.
+
+        :param r3api: K2hr3Resource of validate or validate_with_notoken
+        :returns: None if the check could not be sent
+        """
+        request = validation_request(r3api)
+        valid = self._results.get(request)
+        if valid is not None:
+            return valid
+        return self._check(request)
+
+    def check_all(self, checks: Mapping[Hashable, K2hr3Resource]
+                  ) -> Dict[Hashable, Optional[bool]]:
+        """Return the results of the checks by the labels.
+
+        :param checks: K2hr3Resource of validate or validate_with_notoken by
+                       the labels
+        :returns: True if valid, False if not, and None if the check could
+                  not be sent
+        """
+        requests = {label: validation_request(r3api)
+                    for label, r3api in checks.items()}
+        results: Dict[K2hr3Request, Optional[bool]] = {}
+        futures: Dict[K2hr3Request, Future] = {}
+        for request in requests.values():
+            if request in results or request in futures:
+                continue
+            valid = self._results.get(request)
+            if valid is not None:
+                results[request] = valid
+            else:
+                futures[request] = self._executor.submit(self._check,
+                                                         request)
+        for request, future in futures.items():
+            results[request] = future.result()
+        return {label: results[request]
+                for label, request in requests.items()}
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
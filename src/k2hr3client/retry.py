@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of retry policies.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.retry import K2hr3RetryPolicy
+
+    # retries 5 times in 10 seconds at most.
+    policy = K2hr3RetryPolicy(retries=5, backoff=0.2, deadline=10)
+    myhttp = K2hr3Http("http://127.0.0.1:18080", retry_policy=policy)
+"""
+
+import logging
+import random
+import time
+from typing import FrozenSet, Iterable, Optional
+
+from k2hr3client.exception import K2hr3Exception
+
+LOG = logging.getLogger(__name__)
+
+_IDEMPOTENT_METHODS = frozenset(
+    ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'))
+
+
+class K2hr3RetryPolicy():  # pylint: disable=too-many-instance-attributes
+    """K2hr3RetryPolicy decides whether and when to retry a request.
+
+    The delay grows exponentially from ``backoff`` up to ``max_backoff``
+    with full jitter. A request is retried ``retries`` times at most and
+    never after ``deadline`` seconds from its first attempt. A request
+    that may have reached the server is retried only if its method is
+    idempotent, unless ``retry_non_idempotent`` is True.
+
+    The policy has no mutable state, so it can be shared by clients and
+    threads. The budget of each request is kept by K2hr3RetryState.
+    """
+
+    __slots__ = ('_retries', '_backoff', '_max_backoff', '_jitter',
+                 '_deadline', '_retry_statuses', '_retry_non_idempotent')
+
+    def __init__(self, retries: int = 3,  # pylint: disable=too-many-arguments
+                 *, backoff: float = 1.0, max_backoff: float = 60.0,
+                 jitter: bool = True, deadline: Optional[float] = None,
+                 retry_statuses: Iterable[int] = (502, 503, 504),
+                 retry_non_idempotent: bool = False) -> None:
+        """Init the members.
+
+        :param retries: max number of retries of a request
+        :param backoff: base delay seconds of the first retry
+        :param max_backoff: max delay seconds of a retry
+        :param jitter: randomize the delay between 0 and the backoff
+        :param deadline: max seconds of a request including retries
+        :param retry_statuses: http status codes to retry
+        :param retry_non_idempotent: retry POST that may have been sent
+        :raises K2hr3Exception: if retries is not int >= 0, backoff or
+                                max_backoff is negative or deadline is not
+                                positive
+        """
+        if isinstance(retries, int) is False or retries < 0:
+            raise K2hr3Exception(f'retries should be int >= 0, not {retries}')
+        if backoff < 0 or max_backoff < 0:
+            raise K2hr3Exception('backoff should not be negative')
+        if deadline is not None and deadline <= 0:
+            raise K2hr3Exception(
+                f'deadline should be positive, not {deadline}')
+        self._retries = retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._jitter = jitter
+        self._deadline = deadline
+        self._retry_statuses = frozenset(retry_statuses)
+        self._retry_non_idempotent = retry_non_idempotent
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        attrs = []
+        values = ""
+        for attr in ['_retries', '_backoff', '_max_backoff', '_jitter',
+                     '_deadline', '_retry_non_idempotent']:
+            val = getattr(self, attr, None)
+            attrs.append((attr, repr(val)))
+            values = ', '.join(['%s=%s' % i for i in attrs]) # pylint: disable=consider-using-f-string # noqa
+        return '<K2hr3RetryPolicy ' + values + '>'
+
+    @property
+    def retries(self) -> int:
+        """Return the max number of retries."""
+        return self._retries
+
+    @property
+    def max_backoff(self) -> float:
+        """Return the max delay seconds of a retry."""
+        return self._max_backoff
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """Return the max seconds of a request including retries."""
+        return self._deadline
+
+    @property
+    def retry_statuses(self) -> FrozenSet[int]:
+        """Return the http status codes to retry."""
+        return self._retry_statuses
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay seconds before the retry of the attempt."""
+        delay = min(self._max_backoff, self._backoff * (2 ** attempt))
+        if self._jitter:
+            return random.uniform(0, delay)  # nosec
+        return delay
+
+    def is_retryable(self, method: str, status: Optional[int] = None,
+                     sent: bool = True) -> bool:
+        """Return True if the failure of the request can be retried.
+
+        :param method: http method of the request
+        :param status: http status code if the server responded
+        :param sent: False if the request surely did not reach the server
+        """
+        if status is not None and status not in self._retry_statuses:
+            return False
+        if not sent:
+            return True
+        return method.upper() in _IDEMPOTENT_METHODS or \
+            self._retry_non_idempotent
+
+    def start(self) -> 'K2hr3RetryState':
+        """Return a new retry budget of a request."""
+        return K2hr3RetryState(self)
+
+
+class K2hr3RetryState():
+    """K2hr3RetryState keeps the retry budget of a request."""
+
+    __slots__ = ('_policy', '_attempt', '_deadline_at')
+
+    def __init__(self, policy: K2hr3RetryPolicy) -> None:
+        """Init the members."""
+        self._policy = policy
+        self._attempt = 0
+        self._deadline_at = None  # type: Optional[float]
+        if policy.deadline is not None:
+            self._deadline_at = time.monotonic() + policy.deadline
+
+    @property
+    def attempt(self) -> int:
+        """Return the number of retries done."""
+        return self._attempt
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of retries left."""
+        return self._policy.retries - self._attempt
+
+    def time_left(self) -> Optional[float]:
+        """Return the seconds left until the deadline if any."""
+        if self._deadline_at is None:
+            return None
+        return max(0.0, self._deadline_at - time.monotonic())
+
+    def next_delay(self, method: str, status: Optional[int] = None,
+                   sent: bool = True,
+                   retry_after: Optional[str] = None) -> Optional[float]:
+        """Consume a retry and return the delay seconds before it.
+
+        :param retry_after: value of the Retry-After response header. It
+                            is capped by max_backoff.
+        :returns: None if the request should not be retried
+        """
+        if not self._policy.is_retryable(method, status, sent):
+            return None
+        if self.remaining <= 0:
+            LOG.error('reached the max retry count.')
+            return None
+        delay = self._policy.backoff(self._attempt)
+        if retry_after and retry_after.strip().isdigit():
+            delay = max(delay, min(float(retry_after),
+                                   self._policy.max_backoff))
+        time_left = self.time_left()
+        if time_left is not None and delay >= time_left:
+            LOG.error('reached the deadline of the request.')
+            return None
+        self._attempt += 1
+        return delay
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -53,10 +53,12 @@
 from enum import Enum
 import json
 import logging
-from typing import List, Optional
+from typing import Any, List, Optional
 
 
-from k2hr3client.api import K2hr3Api, K2hr3HTTPMethod
+from k2hr3client.api import K2hr3Api, K2hr3Endpoint, K2hr3HTTPMethod, \
+    register_endpoints
+from k2hr3client.builder import K2hr3BodyBuilder
 
 LOG = logging.getLogger(__name__)
 
@@ -70,6 +72,9 @@ _ROLE_API_CREATE_ROLE = """
     }
 }
 """
+_ROLE_API_CREATE_ROLE_BODY = K2hr3BodyBuilder(
+    _ROLE_API_CREATE_ROLE, name=('role', 'name'),
+    policies=('role', 'policies'), alias=('role', 'alias'))
 _ROLE_API_ADD_MEMBER = """
 {
     "host":    {
@@ -112,6 +117,16 @@ _ROLE_API_ADD_MEMBER_USING_ROLETOKEN = """
     }
 }
 """
+_ROLE_HOST_FIELDS = ('port', 'cuk', 'extra', 'tag', 'inboundip', 'outboundip')
+_ROLE_API_ADD_MEMBER_BODY = K2hr3BodyBuilder(
+    _ROLE_API_ADD_MEMBER, host=('host', 'host'),
+    **{field: ('host', field) for field in _ROLE_HOST_FIELDS})
+_ROLE_API_ADD_MEMBERS_BODY = K2hr3BodyBuilder(
+    _ROLE_API_ADD_MEMBERS, host=('host',),
+    clear_hostname=('clear_hostname',), clear_ips=('clear_ips',))
+_ROLE_API_ADD_MEMBER_USING_ROLETOKEN_BODY = K2hr3BodyBuilder(
+    _ROLE_API_ADD_MEMBER_USING_ROLETOKEN,
+    **{field: ('host', field) for field in _ROLE_HOST_FIELDS})
 
 
 class K2hr3RoleHost:  # pylint disable=too-few-public-methods
@@ -121,8 +136,9 @@ class K2hr3RoleHost:  # pylint disable=too-few-public-methods
     NOTE(hiwakaba): This class exists only for backward compatibility.
     """
 
-    def __init__(self, host: str, port: str, cuk: str, extra: str, tag: str,
-                 inboundip: str, outboundip: str):
+    def __init__(self, host: str, port: str, cuk: str, extra: Optional[str],
+                 tag: Optional[str], inboundip: Optional[str],
+                 outboundip: Optional[str]):
         """Init the members."""
         self.host = host
         self.port = port
@@ -158,6 +174,18 @@ class K2hr3TokenType(Enum):  # pylint disable=too-few-public-methods
     NO_TOKEN = 3
 
 
+def _host_values(host: Any) -> dict:
+    """Return the host fields of a K2hr3RoleHost or a K2hr3Role."""
+    return {field: getattr(host, field) for field in _ROLE_HOST_FIELDS}
+
+
+def _host_list(hosts: Any) -> List[dict]:
+    """Return the host objects of a K2hr3RoleHostList or K2hr3RoleHosts."""
+    if isinstance(hosts, K2hr3RoleHostList):
+        hosts = hosts.hostlist
+    return [{'host': host.host, **_host_values(host)} for host in hosts]
+
+
 class K2hr3Role(K2hr3Api):  # pylint: disable=too-many-instance-attributes
     """Relationship with K2HR3 ROLE API.
 
@@ -228,9 +256,16 @@ class K2hr3Role(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         self.clear_ips = clear_ips  # type: ignore
         return self
 
-    def add_members(self, role_name: str, hosts: str,
+    # POST(Add HOSTs to ROLE)
+    # http(s)://API SERVER:PORT/v1/role/role path
+    # PUT(Add HOSTs to ROLE)
+    # http(s)://API SERVER:PORT/v1/role/role path?urlarg
+    def add_members(self, role_name: str, hosts: Any,
                     clear_hostname: bool, clear_ips: str):
-        """Add members to the role."""
+        """Add members to the role.
+
+        :param hosts: K2hr3RoleHostList or iterable of K2hr3RoleHost
+        """
         self.api_id = 4
         self.role_name = role_name  # type: ignore
         self.hosts = hosts  # type: ignore
@@ -349,143 +384,72 @@ class K2hr3Role(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         if getattr(self, '_r3token', None) is None:
             self._r3token = val
 
-    #
-    # abstract methos that must be implemented in subclasses
-    #
-    def _api_path(self, method: K2hr3HTTPMethod) -> Optional[str]: # pylint: disable=too-many-branches, disable=too-many-return-statements, too-many-statements, line-too-long # noqa
-        """Get the request url path."""
-        if method == K2hr3HTTPMethod.POST:
-            if self.api_id == 1:
-                python_data = json.loads(_ROLE_API_CREATE_ROLE)
-                python_data['role']['name'] = self.role_name
-                python_data['role']['policies'] = self.policies
-                python_data['role']['alias'] = self.alias
-                self.body = json.dumps(python_data)
-                # POST http(s)://API SERVER:PORT/v1/role
-                return f'{self.version}/{self.basepath}'
-            if self.api_id == 3:
-                python_data = json.loads(_ROLE_API_ADD_MEMBER)
-                python_data['host']['host'] = self.host.host  # type: ignore[attr-defined]  # noqa
-                python_data['host']['port'] = self.host.port  # type: ignore[attr-defined]  # noqa
-                python_data['host']['cuk'] = self.host.cuk  # type: ignore[attr-defined]  # noqa
-                python_data['host']['extra'] = self.host.extra  # type: ignore[attr-defined]  # noqa
-                python_data['host']['tag'] = self.host.tag  # type: ignore[attr-defined]  # noqa
-                python_data['host']['inboundip'] = self.host.inboundip  # type: ignore[attr-defined]  # noqa # pylint: disable=line-too-long
-                python_data['host']['outboundip'] = self.host.outboundip  # type: ignore[attr-defined]  # noqa # pylint: disable=line-too-long
-                self.body = json.dumps(python_data)
-                # http(s)://API SERVER:PORT/v1/role/role path
-                return f'{self.version}/{self.basepath}/{self.role_name}'
-            # elif (self.api_id == 4):
-            #     python_data = json.loads(_ROLE_API_ADD_MEMBERS)
-            #     # TODO(hiwakaba) Not implemented
-            #     self.body = json.dumps(python_data)
-            #     # http(s)://API SERVER:PORT/v1/role/role path
-            #     return f'{self.basepath}/{self.role_name}'
-            if self.api_id == 5:
-                python_data = json.loads(_ROLE_API_ADD_MEMBER_USING_ROLETOKEN)
-                python_data['host']['port'] = self.host.port  # type: ignore[attr-defined]  # noqa
-                python_data['host']['cuk'] = self.host.cuk  # type: ignore[attr-defined]  # noqa
-                python_data['host']['extra'] = self.host.extra  # type: ignore[attr-defined]  # noqa
-                python_data['host']['tag'] = self.host.tag  # type: ignore[attr-defined]  # noqa
-                python_data['host']['inboundip'] = self.host.inboundip  # type: ignore[attr-defined]  # noqa # pylint: disable=line-too-long
-                python_data['host']['outboundip'] = self.host.outboundip  # type: ignore[attr-defined]  # noqa # pylint: disable=line-too-long
-                self.body = json.dumps(python_data)
-                # http(s)://API SERVER:PORT/v1/role/role path
-                return f'{self.version}/{self.basepath}/{self.role_name}'
-        if method == K2hr3HTTPMethod.PUT:
-            if self.api_id == 1:
-                self.urlparams = json.dumps({
-                    'name': self.role_name,
-                    'policies': self.policies,
-                    'alias': self.alias
-                })
-                # POST http(s)://API SERVER:PORT/v1/role
-                return f'{self.version}/{self.basepath}'
-            if self.api_id == 3:
-                self.urlparams = json.dumps({
-                    'host': self.host.host,  # type: ignore[attr-defined]
-                    'port': self.host.port,  # type: ignore[attr-defined]
-                    'cuk': self.host.cuk,  # type: ignore[attr-defined]
-                    'extra': self.host.extra,  # type: ignore[attr-defined]
-                    'tag': self.host.tag,  # type: ignore[attr-defined]
-                    'inboundip': self.host.inboundip,  # type: ignore[attr-defined]  # noqa
-                    'outboundip': self.host.outboundip  # type: ignore[attr-defined]  # noqa
-                })
-                # http(s)://API SERVER:PORT/v1/role/role path
-                return f'{self.version}/{self.basepath}/{self.role_name}'
-            if self.api_id == 4:
-                # TODO(hiwakaba) Not implemented
-                self.urlparams = json.dumps({
-                })
-                # http(s)://API SERVER:PORT/v1/role/role path
-                return f'{self.version}/{self.basepath}/{self.role_name}'
-            if self.api_id == 5:
-                self.urlparams = json.dumps({
-                    'port': self.port,
-                    'cuk': self.cuk,
-                    'extra': self.extra,
-                    'tag': self.tag,
-                    'inboundip': self.inboundip,
-                    'outboundip': self.outboundip
-                })
-                # http(s)://API SERVER:PORT/v1/role/role path
-                return f'{self.version}/{self.basepath}/{self.role_name}'
-        if method == K2hr3HTTPMethod.GET:
-            if self.api_id == 6:
-                self.urlparams = json.dumps({
-                    'expand': self.expand
-                })
-                # GET(Show ROLE details)
-                # http(s)://API SERVER:PORT/v1/role/role path or yrn full role path?urlarg # noqa
-                return f'{self.version}/{self.basepath}/{self.role_name}'
-            if self.api_id == 7:
-                self.urlparams = json.dumps({
-                    'expand': self.expand
-                })
-                # http(s)://APISERVER:PORT/v1/role/token/list/role path or yrn full role path # noqa
-                return f'{self.version}/{self.basepath}/token/list/' \
-                       f'{self.role_name}'
-
-        if method == K2hr3HTTPMethod.HEAD:
-            if self.api_id == 8:
-                # HEAD(Validate ROLE)
-                # http(s)://API SERVER:PORT/v1/role/role path or yrn full role path # noqa
-                return f'{self.version}/{self.basepath}/{self.role_name}'
-
-        if method == K2hr3HTTPMethod.DELETE:
-            if self.api_id == 9:
-                # DELETE(Delete ROLE)
-                # http(s)://API SERVER:PORT/v1/role/role path or yrn full role path?urlarg # noqa
-                return f'{self.version}/{self.basepath}/{self.role_name}'
-            if self.api_id == 10:
-                # DELETE(Hostname/IP address deletion-role specification)
-                # http(s)://API SERVER:PORT/v1/role/role path or yrn full role path # noqa
-                self.urlparams = json.dumps({
-                    'host': self.host,
-                    'port': self.port,
-                    'cuk': self.cuk
-                })
-                return f'{self.version}/{self.basepath}/{self.role_name}'
-            if self.api_id == 11:
-                # DELETE(Hostname/IP address deletion-role specification)
-                # http(s)://API SERVER:PORT/v1/role/role path or yrn full role path # noqa
-                self.urlparams = json.dumps({
-                    'cuk': self.cuk
-                })
-                return f'{self.version}/{self.basepath}'
-            if self.api_id == 12:
-                # DELETE (RoleToken deletion - Role specified)
-                # http(s)://API SERVER:PORT/v1/role/role path or yrn full role path # noqa
-                self.urlparams = json.dumps({
-                    'port': self.port,
-                    'cuk': self.cuk
-                })
-                return f'{self.version}/{self.basepath}/{self.role_name}'
-            if self.api_id == 13:
-                # DELETE(Delete RoleToken - Role not specified)
-                # http(s)://API SERVER:PORT/v1/role/token/role token string
-                return f'{self.version}/{self.basepath}/token/{self.role_token_string}' # noqa
-        return None
+
+_ROLE_PATH = '{version}/{basepath}/{role_name}'
+register_endpoints(K2hr3Role, (
+    # POST http(s)://API SERVER:PORT/v1/role
+    K2hr3Endpoint(1, K2hr3HTTPMethod.POST, '{version}/{basepath}',
+                  body=lambda r3api: _ROLE_API_CREATE_ROLE_BODY.build(
+                      name=r3api.role_name, policies=r3api.policies,
+                      alias=r3api.alias)),
+    # PUT http(s)://API SERVER:PORT/v1/role?urlarg
+    K2hr3Endpoint(1, K2hr3HTTPMethod.PUT, '{version}/{basepath}',
+                  query=(('name', 'role_name'), 'policies', 'alias')),
+    # POST(Add HOST to ROLE)
+    # http(s)://API SERVER:PORT/v1/role/role path
+    K2hr3Endpoint(3, K2hr3HTTPMethod.POST, _ROLE_PATH,
+                  body=lambda r3api: _ROLE_API_ADD_MEMBER_BODY.build(
+                      host=r3api.host.host, **_host_values(r3api.host))),
+    # PUT(Add HOST to ROLE)
+    # http(s)://API SERVER:PORT/v1/role/role path?urlarg
+    K2hr3Endpoint(3, K2hr3HTTPMethod.PUT, _ROLE_PATH,
+                  query=(('host', 'host.host'),) + tuple(
+                      (field, f'host.{field}')
+                      for field in _ROLE_HOST_FIELDS)),
+    # POST(Add HOSTs to ROLE)
+    K2hr3Endpoint(4, K2hr3HTTPMethod.POST, _ROLE_PATH,
+                  body=lambda r3api: _ROLE_API_ADD_MEMBERS_BODY.build(
+                      host=_host_list(r3api.hosts),
+                      clear_hostname=r3api.clear_hostname,
+                      clear_ips=r3api.clear_ips)),
+    # PUT(Add HOSTs to ROLE) with the json array of the hosts
+    K2hr3Endpoint(4, K2hr3HTTPMethod.PUT, _ROLE_PATH,
+                  query=(('host',
+                          lambda r3api: json.dumps(_host_list(r3api.hosts))),
+                         'clear_hostname', 'clear_ips')),
+    K2hr3Endpoint(5, K2hr3HTTPMethod.POST, _ROLE_PATH,
+                  body=lambda r3api:
+                  _ROLE_API_ADD_MEMBER_USING_ROLETOKEN_BODY.build(
+                      **_host_values(r3api))),
+    K2hr3Endpoint(5, K2hr3HTTPMethod.PUT, _ROLE_PATH,
+                  query=_ROLE_HOST_FIELDS),
+    # GET(Show ROLE details)
+    # http(s)://API SERVER:PORT/v1/role/role path or yrn full role path?urlarg # noqa
+    K2hr3Endpoint(6, K2hr3HTTPMethod.GET, _ROLE_PATH, query=('expand',)),
+    # GET (Role Token List)
+    # http(s)://APISERVER:PORT/v1/role/token/list/role path or yrn full role path # noqa
+    K2hr3Endpoint(7, K2hr3HTTPMethod.GET,
+                  '{version}/{basepath}/token/list/{role_name}',
+                  query=('expand',)),
+    # HEAD(Validate ROLE)
+    K2hr3Endpoint(8, K2hr3HTTPMethod.HEAD, _ROLE_PATH),
+    # DELETE(Delete ROLE)
+    K2hr3Endpoint(9, K2hr3HTTPMethod.DELETE, _ROLE_PATH),
+    # DELETE(Hostname/IP address deletion-role specification)
+    K2hr3Endpoint(10, K2hr3HTTPMethod.DELETE, _ROLE_PATH,
+                  query=('host', 'port', 'cuk')),
+    # DELETE(Hostname/IP address deletion - Role not specified)
+    K2hr3Endpoint(11, K2hr3HTTPMethod.DELETE, '{version}/{basepath}',
+                  query=('cuk',)),
+    # DELETE (RoleToken deletion - Role specified)
+    K2hr3Endpoint(12, K2hr3HTTPMethod.DELETE, _ROLE_PATH,
+                  query=('port', 'cuk')),
+    # DELETE(Delete RoleToken - Role not specified)
+    # http(s)://API SERVER:PORT/v1/role/token/role token string
+    K2hr3Endpoint(13, K2hr3HTTPMethod.DELETE,
+                  '{version}/{basepath}/token/{role_token_string}'),
+))
+
 #
 # Local variables:
 # tab-width: 4
@@ -48,12 +48,13 @@
 
 """
 
-import json
 import logging
-from typing import Optional
+from typing import List, Optional, Union
 
 
-from k2hr3client.api import K2hr3Api, K2hr3HTTPMethod
+from k2hr3client.api import K2hr3Api, K2hr3Endpoint, K2hr3HTTPMethod, \
+    register_endpoints
+from k2hr3client.builder import K2hr3BodyBuilder
 
 LOG = logging.getLogger(__name__)
 
@@ -75,6 +76,13 @@ _SERVICE_API_MODIFY_VERIFY = """
     "verify":  "<verify url>"
 }
 """
+_SERVICE_API_CREATE_SERVICE_BODY = K2hr3BodyBuilder(
+    _SERVICE_API_CREATE_SERVICE, name=('name',), verify=('verify',))
+_SERVICE_API_ADD_MEMBER_BODY = K2hr3BodyBuilder(
+    _SERVICE_API_ADD_MEMBER, tenant=('tenant',),
+    clear_tenant=('clear_tenant',))
+_SERVICE_API_MODIFY_VERIFY_BODY = K2hr3BodyBuilder(
+    _SERVICE_API_MODIFY_VERIFY, verify=('verify',))
 
 
 class K2hr3Service(K2hr3Api):  # pylint: disable=too-many-instance-attributes
@@ -110,8 +118,11 @@ class K2hr3Service(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         self.verify_url = verify_url  # type: ignore
         return self
 
-    def add_member(self, tenant: str, clear_tenant: bool):
-        """Add members to services."""
+    def add_member(self, tenant: Union[str, List[str]], clear_tenant: bool):
+        """Add members to services.
+
+        :param tenant: tenant name or list of tenant names
+        """
         self.api_id = 2
         self.tenant = tenant  # type: ignore
         self.clear_tenant = clear_tenant  # type: ignore
@@ -178,85 +189,43 @@ class K2hr3Service(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         if getattr(self, '_r3token', None) is None:
             self._r3token = val
 
-    #
-    # abstract methos that must be implemented in subclasses
-    #
-    def _api_path(self, method: K2hr3HTTPMethod) -> Optional[str]: # pylint: disable=too-many-branches, disable=too-many-return-statements, line-too-long # noqa
-        """Get the request url path."""
-        if method == K2hr3HTTPMethod.POST:
-            if self.api_id == 1:
-                python_data = json.loads(_SERVICE_API_CREATE_SERVICE)
-                # {
-                # "name":    <service name>
-                # "verify":  <verify url>
-                # }
-                python_data['name'] = self.name
-                python_data['verify'] = self.verify_url
-                self.body = json.dumps(python_data)
-            elif self.api_id == 2:
-                python_data = json.loads(_SERVICE_API_ADD_MEMBER)
-                # {
-                # "tenant":  <tenant name> or [<tenant name>, ...]
-                # "clear_tenant": true/false or undefined
-                # "verify":  <verify url>
-                # }
-                python_data['tenant'] = self.tenant
-                python_data['clear_tenant'] = self.clear_tenant
-                self.body = json.dumps(python_data)
-            elif self.api_id == 3:
-                python_data = json.loads(_SERVICE_API_MODIFY_VERIFY)
-                # {
-                # "tenant":  <tenant name> or [<tenant name>, ...]
-                # "clear_tenant": true/false or undefined
-                # "verify":  <verify url>
-                # }
-                python_data['verify'] = self.verify_url
-                self.body = json.dumps(python_data)
-            return f'{self.version}/{self.basepath}'
-        if method == K2hr3HTTPMethod.PUT:
-            if self.api_id == 1:
-                # {
-                # "tenant":  <tenant name> or [<tenant name>, ...]
-                # "clear_tenant": true/false or undefined
-                # "verify":  <verify url>
-                # }
-                self.urlparams = json.dumps({
-                    'name': self.name,
-                    'verify': self.verify_url
-                })
-            elif self.api_id == 2:
-                # {
-                # "name":    <service name>
-                # "verify":  <verify url>
-                # }
-                self.urlparams = json.dumps({
-                    'tenant': self.tenant,
-                    'clear_tenant': self.clear_tenant
-                })
-            elif self.api_id == 3:
-                # {
-                # "name":    <service name>
-                # "verify":  <verify url>
-                # }
-                self.urlparams = json.dumps({
-                    'verify': self.verify_url
-                })
-            return f'{self.version}/{self.basepath}'
-        if method == K2hr3HTTPMethod.GET:
-            if self.api_id == 4:
-                return f'{self.version}/{self.basepath}/{self.name}'
-        if method == K2hr3HTTPMethod.HEAD:
-            if self.api_id == 5:
-                return f'{self.version}/{self.basepath}/{self.name}'
-        if method == K2hr3HTTPMethod.DELETE:
-            if self.api_id == 6:
-                return f'{self.version}/{self.basepath}/{self.name}'
-            if self.api_id == 7:
-                self.urlparams = json.dumps({
-                    'tenant': self.tenant
-                })
-                return f'{self.version}/{self.basepath}/{self.name}'
-        return None
+
+_SERVICE_PATH = '{version}/{basepath}/{name}'
+register_endpoints(K2hr3Service, (
+    # {
+    # "name":    <service name>
+    # "verify":  <verify url>
+    # }
+    K2hr3Endpoint(1, K2hr3HTTPMethod.POST, '{version}/{basepath}',
+                  body=lambda r3api: _SERVICE_API_CREATE_SERVICE_BODY.build(
+                      name=r3api.name, verify=r3api.verify_url)),
+    K2hr3Endpoint(1, K2hr3HTTPMethod.PUT, '{version}/{basepath}',
+                  query=('name', ('verify', 'verify_url'))),
+    # {
+    # "tenant":  <tenant name> or [<tenant name>, ...]
+    # "clear_tenant": true/false or undefined
+    # "verify":  <verify url>
+    # }
+    K2hr3Endpoint(2, K2hr3HTTPMethod.POST, '{version}/{basepath}',
+                  body=lambda r3api: _SERVICE_API_ADD_MEMBER_BODY.build(
+                      tenant=r3api.tenant, clear_tenant=r3api.clear_tenant)),
+    K2hr3Endpoint(2, K2hr3HTTPMethod.PUT, '{version}/{basepath}',
+                  query=('tenant', 'clear_tenant')),
+    # {
+    # "verify":  <verify url>
+    # }
+    K2hr3Endpoint(3, K2hr3HTTPMethod.POST, '{version}/{basepath}',
+                  body=lambda r3api: _SERVICE_API_MODIFY_VERIFY_BODY.build(
+                      verify=r3api.verify_url)),
+    K2hr3Endpoint(3, K2hr3HTTPMethod.PUT, '{version}/{basepath}',
+                  query=(('verify', 'verify_url'),)),
+    K2hr3Endpoint(4, K2hr3HTTPMethod.GET, _SERVICE_PATH),
+    K2hr3Endpoint(5, K2hr3HTTPMethod.HEAD, _SERVICE_PATH),
+    K2hr3Endpoint(6, K2hr3HTTPMethod.DELETE, _SERVICE_PATH),
+    K2hr3Endpoint(7, K2hr3HTTPMethod.DELETE, _SERVICE_PATH,
+                  query=('tenant',)),
+))
+
 #
 # Local variables:
 # tab-width: 4
@@ -26,7 +26,7 @@
     # Import modules from k2hr3client package.
     from k2hr3client.token import K2hr3Token
     from k2hr3client.http import K2hr3Http
-    from k2hr3client.tenant import K2hr3Tenant
+    from k2hr3client.tenant import K2hr3Tenant, stream_tenant_list
 
     iaas_project = "demo"
     iaas_token = "gAAAAA..."
@@ -49,14 +49,22 @@
     )
     mytenant.resp.body // {"result":true...
 
+    # GET the expanded tenant list a tenant at a time.
+    for tenant in stream_tenant_list(myhttp, mytoken.token):
+        print(tenant.name, tenant.users)
+
 """
 
-import json
 import logging
-from typing import List, Optional
+from typing import IO, Any, Iterable, Iterator, List, Optional, Union
 
 
-from k2hr3client.api import K2hr3Api, K2hr3HTTPMethod
+from k2hr3client.api import K2hr3Api, K2hr3Endpoint, K2hr3HTTPMethod, \
+    register_endpoints
+from k2hr3client.builder import K2hr3BodyBuilder
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+from k2hr3client.jsonutil import iter_members
 
 LOG = logging.getLogger(__name__)
 
@@ -81,6 +89,14 @@ _TENANT_API_UPDATE_TENANT = """
     }
 }
 """
+_TENANT_API_CREATE_TENANT_BODY = K2hr3BodyBuilder(
+    _TENANT_API_CREATE_TENANT, name=('tenant', 'name'),
+    desc=('tenant', 'desc'), display=('tenant', 'display'),
+    users=('tenant', 'users'))
+_TENANT_API_UPDATE_TENANT_BODY = K2hr3BodyBuilder(
+    _TENANT_API_UPDATE_TENANT, id=('tenant', 'id'),
+    desc=('tenant', 'desc'), display=('tenant', 'display'),
+    users=('tenant', 'users'))
 
 
 class K2hr3Tenant(K2hr3Api):  # pylint: disable=too-many-instance-attributes
@@ -212,75 +228,125 @@ class K2hr3Tenant(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         if getattr(self, '_r3token', None) is None:
             self._r3token = val
 
-    #
-    # abstract methos that must be implemented in subclasses
-    #
-    def _api_path(self, method: K2hr3HTTPMethod) -> Optional[str]: # pylint: disable=too-many-branches, disable=too-many-return-statements, line-too-long # noqa
-        """Get the request url path."""
-        if method == K2hr3HTTPMethod.POST:
-            if self.api_id == 1:
-                python_data = json.loads(_TENANT_API_CREATE_TENANT)
-                python_data['tenant']['name'] = self.tenant_name
-                python_data['tenant']['users'] = self.users
-                python_data['tenant']['desc'] = self.desc
-                python_data['tenant']['display'] = self.display
-                self.body = json.dumps(python_data)
-                return f'{self.version}/{self.basepath}'
-            if self.api_id == 3:
-                python_data = json.loads(_TENANT_API_UPDATE_TENANT)
-                python_data['tenant']['id'] = self.tenant_id
-                python_data['tenant']['users'] = self.users
-                python_data['tenant']['desc'] = self.desc
-                python_data['tenant']['display'] = self.display
-                self.body = json.dumps(python_data)
-                return f'{self.version}/{self.basepath}/{self.tenant_name}'
-
-        if method == K2hr3HTTPMethod.PUT:
-            if self.api_id == 1:
-                python_data = json.loads(_TENANT_API_CREATE_TENANT)
-                self.urlparams = json.dumps({
-                    'name': self.tenant_name,
-                    'users': self.users,
-                    'desc': self.desc,
-                    'display': self.display
-                })
-                return f'{self.version}/{self.basepath}'
-            if self.api_id == 3:
-                python_data = json.loads(_TENANT_API_UPDATE_TENANT)
-                self.urlparams = json.dumps({
-                    'id': self.tenant_id,
-                    'users': self.users,
-                    'desc': self.desc,
-                    'display': self.display
-                })
-                return f'{self.version}/{self.basepath}/{self.tenant_name}'
-
-        if method == K2hr3HTTPMethod.GET:
-            if self.api_id == 5:
-                self.urlparams = json.dumps({
-                    'expand': self.expand
-                })
-                return f'{self.version}/{self.basepath}'
-            if self.api_id == 6:
-                return f'{self.version}/{self.basepath}/{self.tenant_name}'
-
-        if method == K2hr3HTTPMethod.HEAD:
-            if self.api_id == 7:
-                return f'{self.version}/{self.basepath}/{self.tenant_name}'
-
-        if method == K2hr3HTTPMethod.DELETE:
-            if self.api_id == 8:
-                self.urlparams = json.dumps({
-                    'tenant': self.tenant_name,
-                    'id': self.tenant_id
-                })
-                return f'{self.version}/{self.basepath}'
-            if self.api_id == 9:
-                self.urlparams = json.dumps({
-                    'id': self.tenant_id
-                })
-                return f'{self.version}/{self.basepath}/{self.tenant_name}'
-        return None
+
+class K2hr3TenantInfo():
+    """Represent a tenant of the tenant list."""
+
+    __slots__ = ('_name', '_id', '_desc', '_display', '_users')
+
+    def __init__(self, name: str,  # pylint: disable=too-many-arguments
+                 id: Optional[str] = None,  # pylint: disable=redefined-builtin # noqa
+                 desc: Optional[str] = None, display: Optional[str] = None,
+                 users: Optional[List[str]] = None) -> None:
+        """Init the members."""
+        self._name = name
+        self._id = id
+        self._desc = desc
+        self._display = display
+        self._users = users
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3TenantInfo _name={self._name!r}, _id={self._id!r}>'
+
+    @classmethod
+    def from_item(cls, item: Any) -> 'K2hr3TenantInfo':
+        """Return the tenant of an item of the tenants in the response.
+
+        :raises K2hr3Exception: if the item has no name
+        """
+        name = item.get('name') if isinstance(item, dict) else item
+        if isinstance(name, str) is False or not name:
+            raise K2hr3Exception(f'tenant should have a name, not {item}')
+        if isinstance(item, dict):
+            return cls(name, item.get('id'), item.get('desc'),
+                       item.get('display'), item.get('users'))
+        return cls(name)
+
+    @property
+    def name(self) -> str:
+        """Return the tenant name."""
+        return self._name
+
+    @property
+    def id(self) -> Optional[str]:  # pylint: disable=invalid-name
+        """Return the tenant id if the list was expanded."""
+        return self._id
+
+    @property
+    def desc(self) -> Optional[str]:
+        """Return the description if the list was expanded."""
+        return self._desc
+
+    @property
+    def display(self) -> Optional[str]:
+        """Return the display name if the list was expanded."""
+        return self._display
+
+    @property
+    def users(self) -> Optional[List[str]]:
+        """Return the users if the list was expanded."""
+        return self._users
+
+
+def iter_tenants(chunks: Union[IO, Iterable[Union[str, bytes]]],
+                 chunk_size: int = 65536) -> Iterator[K2hr3TenantInfo]:
+    """Yield the tenants of a tenant list response read in chunks.
+
+    Only a tenant is decoded at a time, so the memory is bounded by the
+    largest tenant, not by the number of the tenants. A tenant without a
+    name is skipped.
+
+    :param chunks: file object or iterable of str or bytes chunks
+    :raises K2hr3Exception: if the response is not valid json
+    """
+    for item, _ in iter_members(chunks, 'tenants', chunk_size):
+        try:
+            tenant = K2hr3TenantInfo.from_item(item)
+        except K2hr3Exception as error:
+            LOG.warning('skipped a tenant. %s', error)
+            continue
+        yield tenant
+
+
+def stream_tenant_list(http: K2hr3Http, r3token: str, expand: bool = True,
+                       chunk_size: int = 65536
+                       ) -> Iterator[K2hr3TenantInfo]:
+    """GET the tenant list and yield the tenants as the socket is read.
+
+    :raises K2hr3Exception: if the request failed
+    """
+    request = K2hr3Tenant(r3token).get_tenant_list(expand).request(
+        K2hr3HTTPMethod.GET)
+    with http.stream(request) as res:
+        yield from iter_tenants(res, chunk_size)
+
+
+_TENANT_PATH = '{version}/{basepath}/{tenant_name}'
+register_endpoints(K2hr3Tenant, (
+    K2hr3Endpoint(1, K2hr3HTTPMethod.POST, '{version}/{basepath}',
+                  body=lambda r3api: _TENANT_API_CREATE_TENANT_BODY.build(
+                      name=r3api.tenant_name, users=r3api.users,
+                      desc=r3api.desc, display=r3api.display)),
+    K2hr3Endpoint(1, K2hr3HTTPMethod.PUT, '{version}/{basepath}',
+                  query=(('name', 'tenant_name'), 'users', 'desc',
+                         'display')),
+    K2hr3Endpoint(3, K2hr3HTTPMethod.POST, _TENANT_PATH,
+                  body=lambda r3api: _TENANT_API_UPDATE_TENANT_BODY.build(
+                      id=r3api.tenant_id, users=r3api.users,
+                      desc=r3api.desc, display=r3api.display)),
+    K2hr3Endpoint(3, K2hr3HTTPMethod.PUT, _TENANT_PATH,
+                  query=(('id', 'tenant_id'), 'users', 'desc', 'display')),
+    K2hr3Endpoint(5, K2hr3HTTPMethod.GET, '{version}/{basepath}',
+                  query=('expand',)),
+    K2hr3Endpoint(6, K2hr3HTTPMethod.GET, _TENANT_PATH),
+    K2hr3Endpoint(7, K2hr3HTTPMethod.HEAD, _TENANT_PATH),
+    K2hr3Endpoint(8, K2hr3HTTPMethod.DELETE, '{version}/{basepath}',
+                  query=(('tenant', 'tenant_name'), ('id', 'tenant_id'))),
+    K2hr3Endpoint(9, K2hr3HTTPMethod.DELETE, _TENANT_PATH,
+                  query=(('id', 'tenant_id'),)),
+))
+
 #
 # Local variables:
 # tab-width: 4
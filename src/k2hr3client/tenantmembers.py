@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of service members in bulk.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.tenantmembers import K2hr3TenantMembers
+
+    myhttp = K2hr3Http("http://127.0.0.1:18080")
+    tenants = [f"tenant{i}" for i in range(5000)]
+    members = K2hr3TenantMembers(myhttp, mytoken.token, chunk_size=100)
+    report = members.add_to_service(
+        "test_service", tenants,
+        progress=lambda done, total: print(f"{done}/{total}"))
+    report.failed  // [<K2hr3TenantResult tenant='tenant42', ...
+
+    # sends the failed tenants only.
+    report = members.add_to_service("test_service", tenants, report=report)
+    report.ok  // True
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from k2hr3client.acr import K2hr3Acr
+from k2hr3client.api import K2hr3Api, K2hr3HTTPMethod
+from k2hr3client.batch import K2hr3BatchExecutor, outcome
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+from k2hr3client.service import K2hr3Service
+
+LOG = logging.getLogger(__name__)
+
+_Chunk = List[Tuple[int, str]]
+# function to make a request of a chunk of tenants
+_Request = Callable[[List[str]], K2hr3Api]
+# function called with the numbers of the done and all tenants
+_Progress = Callable[[int, int], None]
+
+
+class K2hr3TenantResult():
+    """Represent the result of a tenant sent by K2hr3TenantMembers."""
+
+    __slots__ = ('_tenant', '_ok', '_code', '_error')
+
+    def __init__(self, tenant: str, ok: bool,  # pylint: disable=invalid-name # noqa
+                 code: Optional[int] = None,
+                 error: Optional[str] = None) -> None:
+        """Init the members."""
+        self._tenant = tenant
+        self._ok = ok
+        self._code = code
+        self._error = error
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3TenantResult tenant={self._tenant!r}, ' \
+               f'_ok={self._ok}, _code={self._code}>'
+
+    @property
+    def tenant(self) -> str:
+        """Return the tenant name."""
+        return self._tenant
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """Return True if the tenant was added."""
+        return self._ok
+
+    @property
+    def code(self) -> Optional[int]:
+        """Return the status code of the response if any."""
+        return self._code
+
+    @property
+    def error(self) -> Optional[str]:
+        """Return the reason of the failure if any."""
+        return self._error
+
+
+class K2hr3TenantReport():
+    """Represent the results of the tenants in input order."""
+
+    __slots__ = ('_results', '_skipped')
+
+    def __init__(self, results: List[K2hr3TenantResult],
+                 skipped: int = 0) -> None:
+        """Init the members."""
+        self._results = results
+        self._skipped = skipped
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3TenantReport results={len(self._results)}, ' \
+               f'failed={len(self.failed)}, _skipped={self._skipped}>'
+
+    def __len__(self) -> int:
+        """Return the number of the tenants."""
+        return len(self._results)
+
+    @property
+    def results(self) -> List[K2hr3TenantResult]:
+        """Return the results of the tenants."""
+        return self._results
+
+    @property
+    def succeeded(self) -> List[str]:
+        """Return the names of the added tenants."""
+        return [result.tenant for result in self._results if result.ok]
+
+    @property
+    def failed(self) -> List[K2hr3TenantResult]:
+        """Return the results of the failed tenants."""
+        return [result for result in self._results if not result.ok]
+
+    @property
+    def skipped(self) -> int:
+        """Return the number of the tenants added by a previous report."""
+        return self._skipped
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """Return True if all of the tenants were added."""
+        return all(result.ok for result in self._results)
+
+
+class K2hr3TenantMembers():
+    """K2hr3TenantMembers adds many tenants to a service.
+
+    The service API accepts a list of tenants, so the tenants are split
+    into chunks of at most ``chunk_size`` tenants and the chunks are sent
+    concurrently. If a chunk fails, its tenants are sent one by one to
+    find the failed tenants unless ``isolate`` is False. The ACR API
+    accepts a tenant per request, so the tenants are sent concurrently
+    one by one. The tenants are added without clear_tenant, because the
+    chunks would clear each other.
+
+    The tenants that succeeded in the report of a previous call are not
+    sent again.
+    """
+
+    __slots__ = ('_http', '_r3token', '_chunk_size', '_max_workers',
+                 '_isolate')
+
+    def __init__(self, http: K2hr3Http,  # pylint: disable=too-many-arguments # noqa
+                 r3token: str, chunk_size: int = 100, max_workers: int = 8,
+                 isolate: bool = True) -> None:
+        """Init the members.
+
+        :param http: client to send the requests
+        :param r3token: token of the service owner
+        :param chunk_size: max number of tenants in a request
+        :param max_workers: number of requests in flight
+        :param isolate: sends the tenants of a failed chunk one by one if
+                        True
+        :raises K2hr3Exception: if chunk_size is not int > 0
+        """
+        if isinstance(chunk_size, int) is False or chunk_size < 1:
+            raise K2hr3Exception(
+                f'chunk_size should be int > 0, not {chunk_size}')
+        self._http = http
+        self._r3token = r3token
+        self._chunk_size = chunk_size
+        self._max_workers = max_workers
+        self._isolate = isolate
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        # NOTE: the token is a secret.
+        return f'<K2hr3TenantMembers _chunk_size={self._chunk_size}, ' \
+               f'_max_workers={self._max_workers}>'
+
+    @property
+    def chunk_size(self) -> int:
+        """Return the max number of tenants in a request."""
+        return self._chunk_size
+
+    def add_to_service(self, service_name: str,  # pylint: disable=too-many-arguments # noqa
+                       tenants: Iterable[str],
+                       progress: Optional[_Progress] = None,
+                       report: Optional[K2hr3TenantReport] = None,
+                       method: K2hr3HTTPMethod = K2hr3HTTPMethod.POST
+                       ) -> K2hr3TenantReport:
+        """Add the tenants to the service by K2hr3Service.add_member.
+
+        :param tenants: tenant names
+        :param progress: function called with the numbers of the done and
+                         all tenants whenever a request completes
+        :param report: report of a previous call
+        :param method: K2hr3HTTPMethod.POST or K2hr3HTTPMethod.PUT
+        :returns: the results of the tenants in input order
+        """
+        def request(chunk: List[str]) -> K2hr3Api:
+            return K2hr3Service(self._r3token, service_name).add_member(
+                chunk, False)
+        return self._add(request, self._chunk_size, tenants,
+                         progress=progress, report=report, method=method)
+
+    def add_to_acr(self, service_name: str,  # pylint: disable=too-many-arguments # noqa
+                   tenants: Iterable[str],
+                   progress: Optional[_Progress] = None,
+                   report: Optional[K2hr3TenantReport] = None,
+                   method: K2hr3HTTPMethod = K2hr3HTTPMethod.POST
+                   ) -> K2hr3TenantReport:
+        """Add the tenants to the service by K2hr3Acr.add_member.
+
+        :param tenants: tenant names
+        :param progress: function called with the numbers of the done and
+                         all tenants whenever a request completes
+        :param report: report of a previous call
+        :param method: K2hr3HTTPMethod.POST or K2hr3HTTPMethod.PUT
+        :returns: the results of the tenants in input order
+        """
+        def request(chunk: List[str]) -> K2hr3Api:
+            return K2hr3Acr(self._r3token, service_name).add_member(chunk[0])
+        return self._add(request, 1, tenants, progress=progress,
+                         report=report, method=method)
+
+    @staticmethod
+    def _unique(tenants: Iterable[str]) -> _Chunk:
+        """Return the (position, tenant) of the unique tenants.
+
+        :raises K2hr3Exception: if a tenant is not a tenant name
+        """
+        items: _Chunk = []
+        seen = set()
+        for tenant in tenants:
+            if isinstance(tenant, str) is False or not tenant:
+                raise K2hr3Exception(
+                    f'tenant should be a tenant name, not {tenant!r}')
+            if tenant not in seen:
+                seen.add(tenant)
+                items.append((len(items), tenant))
+        return items
+
+    def _add(self, request: _Request,  # pylint: disable=too-many-arguments,too-many-locals # noqa
+             chunk_size: int, tenants: Iterable[str], *,
+             progress: Optional[_Progress],
+             report: Optional[K2hr3TenantReport],
+             method: K2hr3HTTPMethod) -> K2hr3TenantReport:
+        """Add the tenants by the requests of the chunks."""
+        added: Dict[str, K2hr3TenantResult] = {}
+        if report is not None:
+            added = {result.tenant: result for result in report.results
+                     if result.ok}
+        results: Dict[int, K2hr3TenantResult] = {}
+        pending: _Chunk = []
+        for index, tenant in self._unique(tenants):
+            if tenant in added:
+                results[index] = added[tenant]
+            else:
+                pending.append((index, tenant))
+        skipped = len(results)
+        total = skipped + len(pending)
+        chunks = [pending[i:i + chunk_size]
+                  for i in range(0, len(pending), chunk_size)]
+
+        def done(chunk: _Chunk, ok: bool,  # pylint: disable=invalid-name
+                 code: Optional[int], error: Optional[str]) -> None:
+            for index, tenant in chunk:
+                results[index] = K2hr3TenantResult(tenant, ok, code, error)
+            if progress is not None:
+                progress(len(results), total)
+
+        retries: List[_Chunk] = []
+        with K2hr3BatchExecutor(self._http,
+                                max_workers=self._max_workers) as executor:
+            for result in executor.as_completed(
+                    [(method, request([tenant for _, tenant in chunk]))
+                     for chunk in chunks]):
+                chunk = chunks[result.index]
+                ok, code, error = outcome(result)
+                if not ok and self._isolate and len(chunk) > 1:
+                    LOG.warning('%s tenants failed. sending them one by one.'
+                                ' %s', len(chunk), error)
+                    retries.extend([[item] for item in chunk])
+                    continue
+                done(chunk, ok, code, error)
+            for result in executor.as_completed(
+                    [(method, request([chunk[0][1]])) for chunk in retries]):
+                done(retries[result.index], *outcome(result))
+        return K2hr3TenantReport([results[index] for index in sorted(results)],
+                                 skipped)
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
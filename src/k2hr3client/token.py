@@ -37,16 +37,20 @@
     mytoken.token  // gAAAAA...
 """
 
+import bisect
+import datetime
 from enum import Enum
 import json
 import logging
-from typing import Optional
-import urllib.parse
-import urllib.request
+import time
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, \
+    Tuple, Union
 
 
 from k2hr3client.api import K2hr3Api, K2hr3HTTPMethod
+from k2hr3client.builder import K2hr3BodyBuilder
 from k2hr3client.exception import K2hr3Exception
+from k2hr3client.jsonutil import iter_members
 
 LOG = logging.getLogger(__name__)
 
@@ -68,6 +72,12 @@ _TOKEN_API_CREATE_TOKEN_TYPE2 = """
     }
 }
 """
+# NOTE: "user" and "password" are added to "auth" as ever.
+_TOKEN_API_CREATE_TOKEN_TYPE1_BODY = K2hr3BodyBuilder(
+    _TOKEN_API_CREATE_TOKEN_TYPE1, tenant_name=('auth', 'tenantName'),
+    user=('auth', 'user'), password=('auth', 'password'))
+_TOKEN_API_CREATE_TOKEN_TYPE2_BODY = K2hr3BodyBuilder(
+    _TOKEN_API_CREATE_TOKEN_TYPE2, tenant_name=('auth', 'tenantName'))
 IDENTITY_V3_PASSWORD_AUTH_JSON_DATA = """
 {
     "auth": {
@@ -109,6 +119,43 @@ IDENTITY_V3_TOKEN_AUTH_JSON_DATA = """
     }
 }
 """
+IDENTITY_V3_PASSWORD_AUTH_BODY = K2hr3BodyBuilder(
+    IDENTITY_V3_PASSWORD_AUTH_JSON_DATA,
+    name=('auth', 'identity', 'password', 'user', 'name'),
+    domain=('auth', 'identity', 'password', 'user', 'domain', 'name'),
+    password=('auth', 'identity', 'password', 'user', 'password'))
+IDENTITY_V3_TOKEN_AUTH_BODY = K2hr3BodyBuilder(
+    IDENTITY_V3_TOKEN_AUTH_JSON_DATA,
+    token=('auth', 'identity', 'token', 'id'),
+    domain=('auth', 'scope', 'project', 'domain', 'id'),
+    project=('auth', 'scope', 'project', 'name'))
+
+
+def parse_expiry(value: Any) -> Optional[float]:
+    """Return the epoch seconds of an expiry value of a response.
+
+    Epoch seconds and ISO 8601 strings like "2024-01-01T00:00:00.000000Z"
+    are accepted. A string without a timezone is in UTC.
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        expiry = datetime.datetime.fromisoformat(
+            value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        LOG.warning('unknown expiry format, %s', value)
+        return None
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=datetime.timezone.utc)
+    return expiry.timestamp()
 
 
 class K2hr3AuthType(Enum):
@@ -218,7 +265,7 @@ class K2hr3Token(K2hr3Api):  # pylint: disable=too-many-instance-attributes
     @property
     def token(self):
         """Return k2hr3 token."""
-        python_data = json.loads(self.resp.body)
+        python_data = self.resp.json()
         return python_data.get('token')
 
     #
@@ -229,14 +276,12 @@ class K2hr3Token(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         if method == K2hr3HTTPMethod.POST:
             if self.api_id == 1:
                 if self.user and self.password:
-                    python_data = json.loads(_TOKEN_API_CREATE_TOKEN_TYPE1)
-                    python_data['auth']['user'] = self.user
-                    python_data['auth']['password'] = self.password
-                    python_data['auth']['tenantName'] = self.iaas_project
+                    self.body = _TOKEN_API_CREATE_TOKEN_TYPE1_BODY.build(
+                        tenant_name=self.iaas_project, user=self.user,
+                        password=self.password)
                 else:
-                    python_data = json.loads(_TOKEN_API_CREATE_TOKEN_TYPE2)
-                    python_data['auth']['tenantName'] = self.iaas_project
-                self.body = json.dumps(python_data)
+                    self.body = _TOKEN_API_CREATE_TOKEN_TYPE2_BODY.build(
+                        tenant_name=self.iaas_project)
                 return f'{self.version}/{self.basepath}'
         if method == K2hr3HTTPMethod.PUT:
             if self.api_id == 1:
@@ -264,40 +309,21 @@ class K2hr3Token(K2hr3Api):  # pylint: disable=too-many-instance-attributes
     #
     @staticmethod
     def get_openstack_token(identity_url, user, password, project):
-        """Get the openstack token."""
-        # unscoped token-id
-        # https://docs.openstack.org/api-ref/identity/v3/index.html#password-authentication-with-unscoped-authorization
-        python_data = json.loads(IDENTITY_V3_PASSWORD_AUTH_JSON_DATA)
-        python_data['auth']['identity']['password']['user']['name'] = user
-        python_data['auth']['identity']['password']['user']['password'] = password  # noqa
-        headers = {
-            'User-Agent': 'k2hr3client-python',
-            'Content-Type': 'application/json'
-        }
-        req = urllib.request.Request(identity_url,
-                                     json.dumps(python_data).encode('ascii'),
-                                     headers, method="POST")
-        unscoped_token_id = ""
-        with urllib.request.urlopen(req) as res:
-            unscoped_token_id = dict(res.info()).get('X-Subject-Token')
-        if not unscoped_token_id:
-            return None
-
-        # scoped token-id
-        # https://docs.openstack.org/api-ref/identity/v3/index.html?expanded=#token-authentication-with-scoped-authorization
-        python_data = json.loads(IDENTITY_V3_TOKEN_AUTH_JSON_DATA)
-        python_data['auth']['identity']['token']['id'] = unscoped_token_id
-        python_data['auth']['scope']['project']['name'] = project
-        headers = {
-            'User-Agent': 'k2hr3client-python',
-            'Content-Type': 'application/json'
-        }
-        req = urllib.request.Request(identity_url,
-                                     json.dumps(python_data).encode('ascii'),
-                                     headers, method="POST")
-        with urllib.request.urlopen(req) as res:
-            scoped_token_id = dict(res.info()).get('X-Subject-Token')
-            return scoped_token_id
+        """Get the openstack token.
+
+        The unscoped and scoped tokens are cached per user until they
+        expire. See K2hr3IdentityTokenProvider for details.
+        """
+        # NOTE: k2hr3client.identity imports this module.
+        from k2hr3client.identity import (  # pylint: disable=import-outside-toplevel # noqa
+            clear_identity_providers, get_identity_provider)
+        try:
+            return get_identity_provider(
+                identity_url, user, password).scoped_token(project)
+        except K2hr3Exception as error:
+            LOG.error('could not get the openstack token. %s', error)
+        # NOTE: do not keep the password that could not be authenticated.
+        clear_identity_providers(identity_url, user)
         return None
 
 
@@ -374,7 +400,7 @@ class K2hr3RoleToken(K2hr3Api):  # pylint: disable=too-many-instance-attributes
     @property
     def token(self):
         """Return k2hr3 token."""
-        python_data = json.loads(self.resp.body)
+        python_data = self.resp.json()
         return python_data.get('token')
 
     #
@@ -387,17 +413,105 @@ class K2hr3RoleToken(K2hr3Api):  # pylint: disable=too-many-instance-attributes
         return None
 
 
+class K2hr3RoleTokenIndex():
+    """K2hr3RoleTokenIndex indexes the role tokens of a role token list.
+
+    The details of the tokens are kept in a dict and the expiries in a
+    sorted list, so a lookup by token is O(1) and the tokens that expire
+    in a period are found in O(log n).
+    """
+
+    __slots__ = ('_tokens', '_expiries')
+
+    def __init__(self, tokens: Iterable[Tuple[str, Optional[dict]]]
+                 ) -> None:
+        """Init the members.
+
+        :param tokens: (token, detail) pairs. The detail is None if the
+                       list was not expanded.
+        """
+        self._tokens: Dict[str, dict] = {}
+        expiries: List[Tuple[float, str]] = []
+        for token, detail in tokens:
+            detail = detail if isinstance(detail, dict) else {}
+            self._tokens[token] = detail
+            expiry = parse_expiry(detail.get('expire'))
+            if expiry is not None:
+                expiries.append((expiry, token))
+        expiries.sort()
+        self._expiries = expiries
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3RoleTokenIndex tokens={len(self._tokens)}>'
+
+    def __len__(self) -> int:
+        """Return the number of the tokens."""
+        return len(self._tokens)
+
+    def __contains__(self, roletoken: object) -> bool:
+        """Return True if the role token is in the list."""
+        return roletoken in self._tokens
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate the role tokens."""
+        return iter(self._tokens)
+
+    @classmethod
+    def from_stream(cls, chunks: Union[IO, Iterable[Union[str, bytes]]]
+                    ) -> 'K2hr3RoleTokenIndex':
+        """Index a role token list response read in chunks.
+
+        Only a token is decoded at a time, so a huge response is never
+        held as a whole in memory.
+        """
+        return cls(iter_members(chunks, 'tokens'))
+
+    def detail(self, roletoken: str) -> dict:
+        """Return the detail of the role token.
+
+        :raises KeyError: if the role token is not in the list
+        """
+        return self._tokens[roletoken]
+
+    def registerpath(self, roletoken: str) -> Optional[str]:
+        """Return the registerpath of the role token.
+
+        :raises KeyError: if the role token is not in the list
+        """
+        return self._tokens[roletoken].get('registerpath')
+
+    def expiry(self, roletoken: str) -> Optional[float]:
+        """Return the epoch seconds the role token expires at.
+
+        :raises KeyError: if the role token is not in the list
+        """
+        return parse_expiry(self._tokens[roletoken].get('expire'))
+
+    def expiring(self, within: float, now: Optional[float] = None
+                 ) -> List[str]:
+        """Return the role tokens that expire in the seconds, soonest first.
+
+        The tokens that have already expired are included.
+        """
+        deadline = (time.time() if now is None else now) + within
+        end = bisect.bisect_right(self._expiries, (deadline, '\uffff'))
+        return [token for _, token in self._expiries[:end]]
+
+
 class K2hr3RoleTokenList(K2hr3Api):  # pylint: disable=too-many-instance-attributes # noqa
     """Represent K2hr3 ROLE TOKEN LIST API.
 
     See https://k2hr3.antpick.ax/api_role.html for details.
     """
 
-    __slots__ = ('_r3token', '_role', '_expand')
+    __slots__ = ('_r3token', '_role', '_expand', '_index')
 
     def __init__(self, r3token, role, expand):
         """Init the members."""
         super().__init__("role/token/list")
+        # (response, index) of the response the index was built from
+        self._index: Optional[Tuple[Any, K2hr3RoleTokenIndex]] = None
         self.r3token = r3token
         self.role = role
         self.expand = expand
@@ -458,10 +572,35 @@ class K2hr3RoleTokenList(K2hr3Api):  # pylint: disable=too-many-instance-attribu
         if getattr(self, '_r3token', None) is None:
             self._r3token = val
 
+    @property
+    def index(self) -> K2hr3RoleTokenIndex:
+        """Return the index of the tokens in the response.
+
+        The response body is parsed once when this is first called.
+        """
+        index = self._index
+        if index is None or index[0] is not self.resp:
+            tokens = self.resp.json().get('tokens') or {}
+            if isinstance(tokens, list):
+                tokens = dict.fromkeys(tokens)
+            index = (self.resp, K2hr3RoleTokenIndex(tokens.items()))
+            self._index = index
+        return index[1]
+
     def registerpath(self, roletoken):
-        """Set the registerpath."""
-        python_data = json.loads(self.resp.body)
-        return python_data['tokens'][roletoken]['registerpath']
+        """Return the registerpath of the role token.
+
+        :raises KeyError: if the role token or its registerpath is missing
+        """
+        return self.index.detail(roletoken)['registerpath']
+
+    def expiry(self, roletoken: str) -> Optional[float]:
+        """Return the epoch seconds the role token expires at."""
+        return self.index.expiry(roletoken)
+
+    def expiring(self, within: float) -> List[str]:
+        """Return the role tokens that expire in the seconds."""
+        return self.index.expiring(within)
 
     #
     # abstract methos that must be implemented in subclasses
@@ -0,0 +1,524 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of token caches.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.tokencache import K2hr3RoleTokenPool, K2hr3TokenCache
+
+    myhttp = K2hr3Http("http://127.0.0.1:18080")
+    cache = K2hr3TokenCache(myhttp, path="/var/cache/k2hr3/tokens.json")
+
+    # POSTs a request only if no valid token of the project is cached.
+    r3token = cache.get("demo", iaas_token="gAAAAA...")
+
+    # hands out a pre-issued role token and its registerpath.
+    with K2hr3RoleTokenPool(myhttp, r3token, size=64) as roletokens:
+        roletoken = roletokens.get("k2hdkccluster")
+        roletoken.registerpath  // "/v1/role/..."
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Optional, Set, \
+    Tuple, Union
+
+from k2hr3client.api import K2hr3HTTPMethod
+from k2hr3client.cache import K2hr3Singleflight
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+from k2hr3client.token import K2hr3AuthType, K2hr3RoleToken, \
+    K2hr3RoleTokenList, K2hr3Token, parse_expiry
+
+LOG = logging.getLogger(__name__)
+
+_TokenKey = Tuple[str, str]
+# keys of the expiry in the token responses
+_EXPIRY_KEYS = ('expires_at', 'expire_at', 'expire')
+
+
+def fingerprint(*credentials: Optional[str]) -> str:
+    """Return the digest of the credentials to key a cache."""
+    digest = hashlib.sha256()
+    for credential in credentials:
+        digest.update((credential or '').encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class K2hr3CachedToken():
+    """Represent a K2HR3 token in K2hr3TokenCache."""
+
+    __slots__ = ('_token', '_expires_at')
+
+    def __init__(self, token: str, expires_at: float) -> None:
+        """Init the members.
+
+        :param expires_at: epoch seconds the token expires at
+        """
+        self._token = token
+        self._expires_at = expires_at
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        # NOTE: the token is a secret.
+        return f'<K2hr3CachedToken _expires_at={self._expires_at}>'
+
+    @property
+    def token(self) -> str:
+        """Return the k2hr3 token."""
+        return self._token
+
+    @property
+    def expires_at(self) -> float:
+        """Return the epoch seconds the token expires at."""
+        return self._expires_at
+
+    def expires_in(self, now: Optional[float] = None) -> float:
+        """Return the seconds until the token expires."""
+        return self._expires_at - (time.time() if now is None else now)
+
+
+class K2hr3CachedRoleToken(K2hr3CachedToken):
+    """Represent a role token in K2hr3RoleTokenPool."""
+
+    __slots__ = ('_role', '_registerpath')
+
+    def __init__(self, token: str, expires_at: float, role: str,
+                 registerpath: Optional[str]) -> None:
+        """Init the members."""
+        super().__init__(token, expires_at)
+        self._role = role
+        self._registerpath = registerpath
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3CachedRoleToken _role={self._role!r}, ' \
+               f'_expires_at={self._expires_at}>'
+
+    @property
+    def role(self) -> str:
+        """Return the role."""
+        return self._role
+
+    @property
+    def registerpath(self) -> Optional[str]:
+        """Return the registerpath of the role token."""
+        return self._registerpath
+
+
+class K2hr3TokenCache():  # pylint: disable=too-many-instance-attributes
+    """K2hr3TokenCache keeps the scoped K2HR3 tokens of projects.
+
+    The tokens are keyed by (iaas_project, fingerprint of the credentials).
+    A token is refreshed in the background when it is used in the last
+    ``refresh_margin`` seconds of its life, and concurrent callers of the
+    same key share one token creation. The expiry is read from the
+    response if it has one, otherwise a token lives ``lifetime`` seconds.
+
+    If ``path`` is given, the tokens are also stored in the file readable
+    only by the owner, so that a restarted process reuses them. The
+    credentials are never stored.
+    """
+
+    __slots__ = ('_http', '_refresh_margin', '_lifetime', '_path', '_lock',
+                 '_tokens', '_credentials', '_flight', '_executor')
+
+    def __init__(self, http: K2hr3Http,  # pylint: disable=too-many-arguments
+                 refresh_margin: float = 300.0, lifetime: float = 3600.0,
+                 path: Optional[str] = None, max_workers: int = 2) -> None:
+        """Init the members.
+
+        :param http: client to create the tokens
+        :param refresh_margin: seconds before the expiry to refresh a token
+        :param lifetime: seconds a token lives if the response has no expiry
+        :param path: file path to store the tokens
+        :param max_workers: number of threads to refresh the tokens
+        :raises K2hr3Exception: if refresh_margin is negative or lifetime is
+                                not positive
+        """
+        if refresh_margin < 0 or lifetime <= 0:
+            raise K2hr3Exception('refresh_margin and lifetime should be '
+                                 'positive')
+        self._http = http
+        self._refresh_margin = refresh_margin
+        self._lifetime = lifetime
+        self._path = path
+        self._lock = threading.Lock()
+        self._tokens: Dict[_TokenKey, K2hr3CachedToken] = {}
+        self._credentials: Dict[_TokenKey, Tuple[Optional[str], ...]] = {}
+        self._flight = K2hr3Singleflight()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='k2hr3token')
+        if path:
+            self._load()
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3TokenCache _refresh_margin={self._refresh_margin}, ' \
+               f'_lifetime={self._lifetime}, _path={self._path}, ' \
+               f'tokens={len(self._tokens)}>'
+
+    def __enter__(self) -> 'K2hr3TokenCache':
+        """Return the cache."""
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Stop the refresh threads."""
+        self.close()
+
+    @property
+    def path(self) -> Optional[str]:
+        """Return the file path to store the tokens."""
+        return self._path
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the refresh threads."""
+        self._executor.shutdown(wait=wait)
+
+    @staticmethod
+    def _key(iaas_project: str, iaas_token: Optional[str],
+             user: Optional[str], password: Optional[str]) -> _TokenKey:
+        return (iaas_project, fingerprint(iaas_token, user, password))
+
+    def peek(self, iaas_project: str, iaas_token: Optional[str] = None,
+             user: Optional[str] = None, password: Optional[str] = None
+             ) -> Optional[K2hr3CachedToken]:
+        """Return the cached token if any without creating one."""
+        key = self._key(iaas_project, iaas_token, user, password)
+        with self._lock:
+            return self._tokens.get(key)
+
+    def get(self, iaas_project: str, iaas_token: Optional[str] = None,
+            user: Optional[str] = None, password: Optional[str] = None
+            ) -> str:
+        """Return a valid k2hr3 token of the project.
+
+        :param iaas_token: openstack token to create a token
+        :param user: user name to create a token with the credential
+        :param password: password to create a token with the credential
+        :raises K2hr3Exception: if a token could not be created
+        """
+        key = self._key(iaas_project, iaas_token, user, password)
+        with self._lock:
+            self._credentials[key] = (iaas_token, user, password)
+            cached = self._tokens.get(key)
+        if cached is not None:
+            expires_in = cached.expires_in()
+            if expires_in > 0:
+                if expires_in <= self._refresh_margin and \
+                        not self._flight.in_flight(key):
+                    self._executor.submit(self._refresh_quietly, key)
+                return cached.token
+        return self._flight.do(key, self._refresh, key).token
+
+    def invalidate(self, iaas_project: Optional[str] = None) -> None:
+        """Drop the tokens of the project, or all tokens."""
+        with self._lock:
+            for key in list(self._tokens):
+                if iaas_project is None or key[0] == iaas_project:
+                    del self._tokens[key]
+        if self._path:
+            self._save()
+
+    def _create(self, key: _TokenKey) -> K2hr3CachedToken:
+        """Create a token of the key."""
+        with self._lock:
+            iaas_token, user, password = self._credentials[key]
+        if user and password:
+            r3token = K2hr3Token(key[0], iaas_token,
+                                 auth_type=K2hr3AuthType.CREDENTIAL)
+        else:
+            r3token = K2hr3Token(key[0], iaas_token)
+        # request() shares nothing between the threads unlike POST().
+        if not self._http.request(K2hr3HTTPMethod.POST,
+                                  r3token.create(user, password)):
+            raise K2hr3Exception(
+                f'could not create a token of the project, {key[0]}')
+        python_data = r3token.resp.json()
+        expires_at = None
+        for name in _EXPIRY_KEYS:
+            expires_at = parse_expiry(python_data.get(name))
+            if expires_at is not None:
+                break
+        if expires_at is None:
+            expires_at = time.time() + self._lifetime
+        return K2hr3CachedToken(python_data['token'], expires_at)
+
+    def _refresh(self, key: _TokenKey) -> K2hr3CachedToken:
+        """Create a token of the key and cache it."""
+        cached = self._create(key)
+        with self._lock:
+            self._tokens[key] = cached
+        if self._path:
+            self._save()
+        return cached
+
+    def _refresh_quietly(self, key: _TokenKey) -> None:
+        """Refresh a token in the background."""
+        try:
+            self._flight.do(key, self._refresh, key)
+        except Exception as error:  # pylint: disable=broad-except
+            # the cached token is used until it expires.
+            LOG.warning('could not refresh the token of %s, %s',
+                        key[0], error)
+
+    def _load(self) -> None:
+        """Load the unexpired tokens from the file."""
+        try:
+            with open(self._path, encoding='utf-8') as fp:  # type: ignore
+                python_data = json.load(fp)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            LOG.warning('could not load the tokens from %s, %s',
+                        self._path, error)
+            return
+        now = time.time()
+        with self._lock:
+            for item in python_data.get('tokens', []):
+                try:
+                    cached = K2hr3CachedToken(item['token'],
+                                              float(item['expires_at']))
+                    key = (item['project'], item['fingerprint'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if cached.expires_in(now) > 0:
+                    self._tokens[key] = cached
+
+    def _save(self) -> None:
+        """Store the tokens to the file readable only by the owner."""
+        with self._lock:
+            python_data = {'tokens': [
+                {'project': key[0], 'fingerprint': key[1],
+                 'token': cached.token, 'expires_at': cached.expires_at}
+                for key, cached in self._tokens.items()]}
+        tmppath = f'{self._path}.{os.getpid()}.{threading.get_ident()}'
+        try:
+            fd = os.open(tmppath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                         0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+                json.dump(python_data, fp)
+            os.replace(tmppath, self._path)  # type: ignore
+        except OSError as error:
+            LOG.warning('could not store the tokens to %s, %s',
+                        self._path, error)
+            try:
+                os.unlink(tmppath)
+            except OSError:
+                pass
+
+
+class K2hr3RoleTokenPool():  # pylint: disable=too-many-instance-attributes
+    """K2hr3RoleTokenPool hands out pre-issued role tokens of roles.
+
+    Up to ``size`` role tokens and their registerpaths are issued per role
+    and each token is handed out once in O(1). When less than
+    ``low_water`` tokens are left, the role is refilled on a background
+    thread. A token is dropped ``refresh_margin`` seconds before it
+    expires. ``r3token`` is a K2HR3 token or a callable that returns one,
+    like ``functools.partial(K2hr3TokenCache.get, cache, "demo", token)``.
+    """
+
+    __slots__ = ('_http', '_r3token', '_size', '_low_water', '_expire',
+                 '_lifetime', '_refresh_margin', '_lock', '_tokens',
+                 '_issuing', '_refilling', '_executor')
+
+    def __init__(self, http: K2hr3Http,  # pylint: disable=too-many-arguments
+                 r3token: Union[str, Callable[[], str]], *, size: int = 32,
+                 low_water: int = 8, expire: int = 0,
+                 lifetime: float = 86400.0, refresh_margin: float = 60.0,
+                 max_workers: int = 2) -> None:
+        """Init the members.
+
+        :param http: client to issue the role tokens
+        :param r3token: k2hr3 token or a callable that returns it
+        :param size: max number of role tokens kept per role
+        :param low_water: number of role tokens to start a refill
+        :param expire: expire seconds of a role token. 0 is the default.
+        :param lifetime: seconds a token lives if its expiry is unknown
+        :param refresh_margin: seconds before the expiry to drop a token
+        :param max_workers: number of threads to refill the roles
+        :raises K2hr3Exception: if size is not int > 0 or low_water is not
+                                int in [0, size]
+        """
+        if isinstance(size, int) is False or size < 1:
+            raise K2hr3Exception(f'size should be int > 0, not {size}')
+        if isinstance(low_water, int) is False or \
+                not 0 <= low_water <= size:
+            raise K2hr3Exception(
+                f'low_water should be int in [0, size], not {low_water}')
+        self._http = http
+        self._r3token = r3token
+        self._size = size
+        self._low_water = low_water
+        self._expire = expire
+        self._lifetime = lifetime
+        self._refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, Deque[K2hr3CachedRoleToken]] = {}
+        # number of role tokens being issued by fill() per role
+        self._issuing: Dict[str, int] = {}
+        self._refilling: Set[str] = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='k2hr3roletoken')
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3RoleTokenPool _size={self._size}, ' \
+               f'_low_water={self._low_water}, ' \
+               f'roles={sorted(self._tokens)}>'
+
+    def __enter__(self) -> 'K2hr3RoleTokenPool':
+        """Return the pool."""
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Stop the refill threads."""
+        self.close()
+
+    @property
+    def size(self) -> int:
+        """Return the max number of role tokens kept per role."""
+        return self._size
+
+    @property
+    def low_water(self) -> int:
+        """Return the number of role tokens to start a refill."""
+        return self._low_water
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the refill threads."""
+        self._executor.shutdown(wait=wait)
+
+    def available(self, role: str) -> int:
+        """Return the number of role tokens kept for the role."""
+        with self._lock:
+            return len(self._tokens.get(role, ()))
+
+    def _issue(self, role: str, count: int) -> List[K2hr3CachedRoleToken]:
+        """Issue role tokens and find their registerpaths."""
+        r3token = self._r3token() if callable(self._r3token) \
+            else self._r3token
+        issued: List[Tuple[str, Optional[str], Optional[float]]] = []
+        for _ in range(count):
+            roletoken = K2hr3RoleToken(r3token, role, self._expire)
+            if not self._http.request(K2hr3HTTPMethod.GET, roletoken):
+                raise K2hr3Exception(
+                    f'could not issue a role token of {role}')
+            python_data = roletoken.resp.json()
+            issued.append((python_data['token'],
+                           python_data.get('registerpath'),
+                           parse_expiry(python_data.get('expire'))))
+        if any(registerpath is None for _, registerpath, _ in issued):
+            # one list request finds the registerpaths of all tokens.
+            tokenlist = K2hr3RoleTokenList(r3token, role, True)
+            if not self._http.request(K2hr3HTTPMethod.GET, tokenlist):
+                raise K2hr3Exception(
+                    f'could not get the role token list of {role}')
+            tokens = tokenlist.index
+            for index, (token, registerpath, expires_at) in \
+                    enumerate(issued):
+                if token in tokens:
+                    issued[index] = (
+                        token, registerpath or tokens.registerpath(token),
+                        expires_at or tokens.expiry(token))
+        default_expires_at = time.time() + (self._expire or self._lifetime)
+        return [K2hr3CachedRoleToken(token, expires_at or default_expires_at,
+                                     role, registerpath)
+                for token, registerpath, expires_at in issued]
+
+    def fill(self, role: str) -> int:
+        """Issue role tokens of the role up to size.
+
+        :returns: the number of role tokens issued
+        :raises K2hr3Exception: if a role token could not be issued
+        """
+        with self._lock:
+            issuing = self._issuing.get(role, 0)
+            count = self._size - len(self._tokens.get(role, ())) - issuing
+            if count <= 0:
+                return 0
+            # reserves the slots for the concurrent calls.
+            self._issuing[role] = issuing + count
+        try:
+            issued = self._issue(role, count)
+            with self._lock:
+                self._tokens.setdefault(role, deque()).extend(issued)
+            return len(issued)
+        finally:
+            with self._lock:
+                self._issuing[role] -= count
+
+    def _refill(self, role: str) -> None:
+        """Fill the role in the background."""
+        try:
+            self.fill(role)
+        except Exception as error:  # pylint: disable=broad-except
+            LOG.warning('could not refill the role tokens of %s, %s',
+                        role, error)
+        finally:
+            with self._lock:
+                self._refilling.discard(role)
+
+    def get(self, role: str) -> K2hr3CachedRoleToken:
+        """Hand out a role token of the role.
+
+        A role token is issued in place if none is kept.
+
+        :raises K2hr3Exception: if a role token could not be issued
+        """
+        cached = None
+        refill = False
+        with self._lock:
+            tokens = self._tokens.setdefault(role, deque())
+            while tokens:
+                cached = tokens.popleft()
+                if cached.expires_in() > self._refresh_margin:
+                    break
+                cached = None
+            if len(tokens) < self._low_water and \
+                    role not in self._refilling:
+                self._refilling.add(role)
+                refill = True
+        if refill:
+            self._executor.submit(self._refill, role)
+        if cached is not None:
+            return cached
+        return self._issue(role, 1)[0]
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
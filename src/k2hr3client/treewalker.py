@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+#
+"""K2HR3 Python Client of YRN hierarchy walks.
+
+.. code-block:: python
+
+    # Import modules from k2hr3client package.
+    import json
+    from k2hr3client.http import K2hr3Http
+    from k2hr3client.treewalker import K2hr3TreeWalker
+
+    myhttp = K2hr3Http("http://127.0.0.1:18080")
+    walker = K2hr3TreeWalker(myhttp, mytoken.token, max_in_flight=8)
+    try:
+        for node in walker.walk():
+            print(node.target, node.path, node.children)
+    except KeyboardInterrupt:
+        # saves the position to resume the walk later.
+        with open("walk.json", "w") as f:
+            json.dump(walker.checkpoint(), f)
+
+    with open("walk.json") as f:
+        walker = K2hr3TreeWalker(myhttp, mytoken.token,
+                                 checkpoint=json.load(f))
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+import logging
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, \
+    Set, Tuple
+
+from k2hr3client.api import K2hr3HTTPMethod
+from k2hr3client.batch import K2hr3BatchExecutor, K2hr3BatchResult
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.http import K2hr3Http
+from k2hr3client.list import LIST_TARGETS, K2hr3List
+
+LOG = logging.getLogger(__name__)
+
+# (target, path) of an object to list
+_Position = Tuple[str, str]
+# fields of a yrn, "yrn:yahoo:<service>::<tenant>:<target>:<path>"
+_YRN_FIELDS = 7
+
+
+class K2hr3TreeNode():
+    """Represent an object and its children listed by K2hr3TreeWalker."""
+
+    __slots__ = ('_target', '_path', '_children', '_error')
+
+    def __init__(self, target: str, path: str, children: List[str],
+                 error: Optional[str] = None) -> None:
+        """Init the members."""
+        self._target = target
+        self._path = path
+        self._children = children
+        self._error = error
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        return f'<K2hr3TreeNode _target={self._target}, ' \
+               f'_path={self._path!r}, children={len(self._children)}>'
+
+    @property
+    def target(self) -> str:
+        """Return "resource", "policy" or "role"."""
+        return self._target
+
+    @property
+    def path(self) -> str:
+        """Return the path of the object. The root is empty."""
+        return self._path
+
+    @property
+    def children(self) -> List[str]:
+        """Return the paths of the children."""
+        return self._children
+
+    @property
+    def error(self) -> Optional[str]:
+        """Return the reason if the children could not be listed."""
+        return self._error
+
+
+def _child_path(parent: str, name: Any) -> str:
+    """Return the path of a child of the list response."""
+    if isinstance(name, dict):
+        name = name.get('name') or ''
+    name = str(name)
+    if name.startswith('yrn:'):
+        fields = name.split(':', _YRN_FIELDS - 1)
+        return fields[-1].strip('/') if len(fields) == _YRN_FIELDS else name
+    name = name.strip('/')
+    if not parent or name.startswith(parent + '/'):
+        return name
+    return f'{parent}/{name}'
+
+
+class K2hr3TreeWalker():
+    """K2hr3TreeWalker walks the YRN hierarchy of a service or a tenant.
+
+    Every object is listed by the List API without expansion, and each
+    listed object is yielded as a K2hr3TreeNode. The subtrees are listed
+    concurrently with at most ``max_in_flight`` requests in flight. The
+    walk goes deep first, so only the nodes waiting to be listed and the
+    positions already queued are kept in memory. A position is listed
+    once, so an alias or a link back to an ancestor does not loop.
+    checkpoint() returns the positions not yielded yet, and a walker
+    created with it resumes the walk.
+    """
+
+    __slots__ = ('_http', '_r3token', '_service', '_max_in_flight',
+                 '_pending', '_in_flight', '_visited')
+
+    def __init__(self, http: K2hr3Http,  # pylint: disable=too-many-arguments
+                 r3token: str, *, service: str = '',
+                 targets: Sequence[str] = LIST_TARGETS,
+                 max_in_flight: int = 8,
+                 checkpoint: Optional[Dict[str, Any]] = None) -> None:
+        """Init the members.
+
+        :param http: client to send the requests
+        :param r3token: scoped token of the tenant
+        :param service: service name. The objects of the tenant if empty.
+                        The service of the checkpoint if it is given.
+        :param targets: "resource", "policy" and "role" to walk
+        :param max_in_flight: max number of requests in flight
+        :param checkpoint: position returned by checkpoint() to resume
+        :raises K2hr3Exception: if max_in_flight is not int > 0, a target
+                                is unknown or the checkpoint is invalid
+        """
+        if isinstance(max_in_flight, int) is False or max_in_flight < 1:
+            raise K2hr3Exception(
+                f'max_in_flight should be int > 0, not {max_in_flight}')
+        for target in targets:
+            if target not in LIST_TARGETS:
+                raise K2hr3Exception(
+                    f'target should be one of {LIST_TARGETS}, not {target}')
+        self._http = http
+        self._r3token = r3token
+        self._service = service
+        self._max_in_flight = max_in_flight
+        self._pending: Deque[_Position] = deque()
+        self._in_flight: Set[_Position] = set()
+        if checkpoint is None:
+            self._pending.extend((target, '') for target in targets)
+        else:
+            try:
+                self._service = str(checkpoint['service'])
+                self._pending.extend(
+                    (str(target), str(path))
+                    for target, path in checkpoint['pending'])
+            except (KeyError, TypeError, ValueError) as error:
+                raise K2hr3Exception(
+                    f'invalid checkpoint, {checkpoint}') from error
+            if service and service != self._service:
+                raise K2hr3Exception(
+                    f'service should be {self._service} of the checkpoint, '
+                    f'not {service}')
+        self._visited: Set[_Position] = set(self._pending)
+
+    def __repr__(self) -> str:
+        """Represent the members."""
+        # NOTE: the token is a secret.
+        return f'<K2hr3TreeWalker _service={self._service!r}, ' \
+               f'_max_in_flight={self._max_in_flight}, ' \
+               f'pending={len(self._pending) + len(self._in_flight)}>'
+
+    @property
+    def done(self) -> bool:
+        """Return True if nothing is left to walk."""
+        return not self._pending and not self._in_flight
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """Return the positions not yielded yet as a json object."""
+        positions = sorted(self._in_flight) + list(self._pending)
+        return {'service': self._service,
+                'pending': [list(position) for position in positions]}
+
+    def _list(self, position: _Position) -> K2hr3List:
+        """Return the request to list the children of a position."""
+        return K2hr3List(self._r3token, self._service).get(
+            expand=False, target=position[0], root_path=position[1] or None)
+
+    def _node(self, position: _Position,
+              result: K2hr3BatchResult) -> K2hr3TreeNode:
+        """Return the node of a listed position."""
+        target, path = position
+        resp = result.r3api.resp if result.ok else None
+        if resp is None or resp.result is False:
+            error = resp.message if resp is not None else None
+            LOG.error('could not list %s %s, %s', target, path,
+                      error or result.error)
+            return K2hr3TreeNode(target, path, [],
+                                 str(error or result.error or
+                                     'request failed'))
+        return K2hr3TreeNode(target, path, [
+            _child_path(path, child)
+            for child in (resp.json() or {}).get('children') or []])
+
+    def walk(self) -> Iterator[K2hr3TreeNode]:
+        """Yield the nodes as they are listed."""
+        futures: Dict[Future, _Position] = {}
+        with K2hr3BatchExecutor(self._http,
+                                max_workers=self._max_in_flight) as executor:
+            try:
+                while self._pending or futures:
+                    while self._pending and \
+                            len(futures) < self._max_in_flight:
+                        # the last pushed one first to go deep.
+                        position = self._pending.pop()
+                        self._in_flight.add(position)
+                        futures[executor.submit(
+                            K2hr3HTTPMethod.GET,
+                            self._list(position))] = position
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        position = futures.pop(future)
+                        node = self._node(position, future.result())
+                        for child in node.children:
+                            # a cycle of the links would never end the walk.
+                            if (position[0], child) not in self._visited:
+                                self._visited.add((position[0], child))
+                                self._pending.append((position[0], child))
+                        self._in_flight.discard(position)
+                        yield node
+            finally:
+                # the positions in flight are listed again on resume.
+                for future in futures:
+                    future.cancel()
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
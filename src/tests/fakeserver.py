@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""A local fake K2HR3 API server for tests and benchmarks.
+
+.. code-block:: python
+
+    from tests.fakeserver import K2hr3FakeServer
+
+    with K2hr3FakeServer() as server:
+        httpreq = K2hr3Http(server.baseurl)
+        ...
+        server.connections  // number of accepted tcp connections
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import ssl
+import threading
+import time
+from typing import Callable, Optional
+import urllib.parse
+
+
+class K2hr3FakeRequest():  # pylint: disable=too-few-public-methods
+    """Represent a request received by the fake server."""
+
+    def __init__(self, method, path, query, headers, body):
+        """Init the members."""
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        """Return the decoded request body."""
+        return json.loads(self.body) if self.body else None
+
+
+def default_app(_req):
+    """Return a minimal successful K2HR3 response."""
+    return 200, {}, {'result': True, 'message': None}
+
+
+class _K2hr3FakeHandler(BaseHTTPRequestHandler):
+    """Dispatch every request to the app of the server."""
+
+    protocol_version = 'HTTP/1.1'
+    # sends the headers and the body in one segment on a keep-alive socket.
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def setup(self):
+        """Count the accepted connections."""
+        super().setup()
+        with self.server.lock:  # type: ignore[attr-defined]
+            self.server.connections += 1  # type: ignore[attr-defined]
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin # noqa
+        """Keep the test output quiet."""
+
+    def _dispatch(self):
+        if hasattr(self.connection, 'session_reused'):
+            with self.server.lock:  # type: ignore[attr-defined]
+                self.server.tls_resumed.append(  # type: ignore[attr-defined]
+                    self.connection.session_reused)
+        parsed = urllib.parse.urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else None
+        req = K2hr3FakeRequest(self.command, parsed.path,
+                               urllib.parse.parse_qs(parsed.query),
+                               self.headers, body)
+        server = self.server
+        with server.lock:  # type: ignore[attr-defined]
+            server.requests.append(req)  # type: ignore[attr-defined]
+        if server.delay:  # type: ignore[attr-defined]
+            time.sleep(server.delay)  # type: ignore[attr-defined]
+        result = server.app(req)  # type: ignore[attr-defined]
+        if result is None:
+            # drops the connection without any response.
+            self.close_connection = True
+            return
+        status, headers, payload = result
+        if isinstance(payload, (dict, list)):
+            payload = json.dumps(payload)
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        payload = payload or b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_HEAD = do_DELETE = _dispatch
+
+
+class _K2hr3FakeHTTPServer(ThreadingHTTPServer):
+    """Accept many concurrent connections."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class K2hr3FakeServer():
+    """K2hr3FakeServer serves a K2HR3 like API on a local ephemeral port."""
+
+    def __init__(self, app: Optional[Callable] = None,
+                 delay: float = 0.0, certfile: Optional[str] = None,
+                 keyfile: Optional[str] = None) -> None:
+        """Init the members.
+
+        :param certfile: serves https with the certificate if not None
+        """
+        self._httpd = _K2hr3FakeHTTPServer(('127.0.0.1', 0),
+                                           _K2hr3FakeHandler)
+        self._scheme = 'http'
+        if certfile:
+            ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            ctx.load_cert_chain(certfile, keyfile)
+            self._httpd.socket = ctx.wrap_socket(self._httpd.socket,
+                                                 server_side=True)
+            self._scheme = 'https'
+        self._httpd.app = app or default_app  # type: ignore[attr-defined]
+        self._httpd.delay = delay  # type: ignore[attr-defined]
+        self._httpd.lock = threading.Lock()  # type: ignore[attr-defined]
+        self._httpd.requests = []  # type: ignore[attr-defined]
+        self._httpd.connections = 0  # type: ignore[attr-defined]
+        self._httpd.tls_resumed = []  # type: ignore[attr-defined]
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        kwargs={'poll_interval': 0.05},
+                                        daemon=True)
+
+    def __enter__(self):
+        """Start the server."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        """Stop the server."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    @property
+    def port(self) -> int:
+        """Return the listening port."""
+        return self._httpd.server_address[1]
+
+    @property
+    def baseurl(self) -> str:
+        """Return the base url of the server."""
+        return f'{self._scheme}://127.0.0.1:{self.port}'
+
+    @property
+    def requests(self) -> list:
+        """Return the received requests."""
+        return self._httpd.requests  # type: ignore[attr-defined]
+
+    @property
+    def connections(self) -> int:
+        """Return the number of accepted connections."""
+        return self._httpd.connections  # type: ignore[attr-defined]
+
+    @property
+    def tls_resumed(self) -> list:
+        """Return whether each https request used a resumed TLS session."""
+        return self._httpd.tls_resumed  # type: ignore[attr-defined]
+
+    @property
+    def app(self) -> Callable:
+        """Return the request handler."""
+        return self._httpd.app  # type: ignore[attr-defined]
+
+    @app.setter
+    def app(self, val: Callable) -> None:
+        """Set the request handler."""
+        self._httpd.app = val  # type: ignore[attr-defined]
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
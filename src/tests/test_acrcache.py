@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import logging
+import threading
+import unittest
+
+from k2hr3client import acrcache as kacrcache
+from k2hr3client import http as khttp
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+_CROLE = 'yrn:yahoo:::demo:role:client'
+_SROLE = 'yrn:yahoo:::demo:role:service'
+
+
+class TestK2hr3AcrCache(unittest.TestCase):
+    """Tests the K2hr3AcrCache class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_acrcache.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.server.app = self._app
+        self.httpreq = khttp.K2hr3Http(self.server.baseurl)
+        self.now = 0.0
+        self.acrcache = kacrcache.K2hr3AcrCache(
+            self.httpreq, 'token', 'myservice', ttl=10.0, maxsize=2,
+            clock=lambda: self.now)
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    @staticmethod
+    def _app(req):
+        if req.query.get('crole') == ['broken']:
+            return 403, {}, {'result': False, 'message': 'no role'}
+        return 200, {}, {'result': True, 'message': None, 'response': [
+            {'name': 'myresource', 'expire': None, 'type': 'string',
+             'data': req.query['crole'][0], 'keys': {}}]}
+
+    def test_acrcache_construct(self):
+        """Creates a K2hr3AcrCache instance."""
+        self.assertRegex(repr(self.acrcache), '<K2hr3AcrCache .*>')
+        self.assertEqual(self.acrcache.service, 'myservice')
+        with self.assertRaises(K2hr3Exception):
+            kacrcache.K2hr3AcrCache(self.httpreq, 'token', None)
+
+    def test_acr_key(self):
+        """Normalizes the equivalent arguments to a key."""
+        self.assertEqual(
+            kacrcache.acr_key(' 10.0.0.1 ', cport=8080, crole=_CROLE + '/',
+                              ccuk='', sport='', srole=_SROLE),
+            kacrcache.acr_key('10.0.0.1', cport='8080', crole=_CROLE,
+                              ccuk=None, sport=None, srole=_SROLE,
+                              scuk=None))
+        self.assertNotEqual(kacrcache.acr_key(crole=_CROLE),
+                            kacrcache.acr_key(srole=_CROLE))
+
+    def test_acrcache_get(self):
+        """Sends a request per key until the response expires."""
+        resp = self.acrcache.get('10.0.0.1', cport=8080, crole=_CROLE,
+                                 srole=_SROLE)
+        self.assertEqual(resp.json()['response'][0]['data'], _CROLE)
+        for _ in range(3):
+            self.assertIs(self.acrcache.get('10.0.0.1', cport='8080',
+                                            crole=_CROLE + '/',
+                                            srole=_SROLE), resp)
+        self.assertEqual(len(self.server.requests), 1)
+        req = self.server.requests[0]
+        self.assertEqual(req.path, '/v1/acr/myservice')
+        self.assertEqual(req.query['cport'], ['8080'])
+        self.assertEqual(req.query['srole'], [_SROLE])
+        self.assertEqual(req.headers['x-auth-token'], 'U=token')
+        self.now += 10
+        self.assertIsNot(self.acrcache.get('10.0.0.1', cport=8080,
+                                           crole=_CROLE, srole=_SROLE), resp)
+        self.assertEqual(len(self.server.requests), 2)
+        stats = self.acrcache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (3, 2, 1))
+        self.assertEqual(stats.hit_ratio, 0.6)
+
+    def test_acrcache_does_not_cache_errors(self):
+        """Returns an error response without caching it."""
+        for _ in range(2):
+            self.assertEqual(self.acrcache.get(crole='broken').code, 403)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(len(self.acrcache), 0)
+
+    def test_acrcache_singleflight(self):
+        """Sends one request for the concurrent misses of a key."""
+        self.server.delay = 0.05
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            self.acrcache.get(crole=_CROLE))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 8)
+        self.assertEqual(len({id(resp) for resp in results}), 1)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_acrcache_invalidate(self):
+        """Drops the responses of the roles."""
+        self.acrcache.get(crole=_CROLE, srole=_SROLE)
+        self.acrcache.get(crole=_SROLE, srole=_SROLE)
+        self.acrcache.invalidate(crole=_CROLE + '/')
+        self.assertEqual(len(self.acrcache), 1)
+        self.acrcache.invalidate(srole=_SROLE)
+        self.assertEqual(len(self.acrcache), 0)
+        self.acrcache.get(crole=_CROLE)
+        self.acrcache.invalidate()
+        self.assertEqual(len(self.acrcache), 0)
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -20,11 +20,16 @@
 #
 """Test Package for K2hr3 Python Client."""
 
+import json
 import logging
 import unittest
+from unittest.mock import patch
 from http.client import HTTPMessage
 
-from k2hr3client.api import K2hr3ApiResponse
+from k2hr3client import jsonutil as kjsonutil
+from k2hr3client.api import K2hr3Api, K2hr3ApiResponse, K2hr3Endpoint, \
+    K2hr3HTTPMethod, K2hr3Request, get_endpoint, register_endpoints
+from k2hr3client.exception import K2hr3Exception
 
 LOG = logging.getLogger(__name__)
 
@@ -59,6 +64,195 @@ class TestK2hr3ApiResponse(unittest.TestCase):
         # Note: The order of _error and _code is unknown!
         self.assertRegex(repr(response), '<K2hr3ApiResponse .*>')
 
+    def _response(self, body):
+        hdrs = HTTPMessage()
+        hdrs['mime-version'] = '1.0'
+        return K2hr3ApiResponse(code=200, url="http://localhost:18080",
+                                hdrs=hdrs, body=body)
+
+    def test_k2hr3apiresponse_json(self):
+        """Decodes the body once."""
+        response = self._response('{"result": true, "token": "r3token"}')
+        with patch('k2hr3client.api.loads', wraps=json.loads) as mock:
+            self.assertEqual(response.json()['token'], 'r3token')
+            self.assertIs(response.json(), response.json())
+        self.assertEqual(mock.call_count, 1)
+        self.assertIsNone(self._response(None).json())
+        self.assertFalse(hasattr(response, '__dict__'))
+
+    def test_k2hr3apiresponse_result_message(self):
+        """Reads the result and the message without decoding the body."""
+        response = self._response(
+            '{"result":false,"message":"no \\"role\\"","roles":[]}')
+        with patch('k2hr3client.api.loads') as mock:
+            self.assertFalse(response.result)
+            self.assertEqual(response.message, 'no "role"')
+        mock.assert_not_called()
+        response = self._response('{"roles": [], "result": true}')
+        self.assertTrue(response.result)
+        self.assertIsNone(response.message)
+
+    def test_set_decoder(self):
+        """Decodes the body by the decoder set by set_decoder."""
+        self.assertIn('json', kjsonutil.available_decoders())
+        decoder = kjsonutil.get_decoder()
+        try:
+            kjsonutil.set_decoder(lambda text: {'decoded': text})
+            self.assertEqual(self._response('{}').json(), {'decoded': '{}'})
+            kjsonutil.set_decoder('auto')
+            self.assertEqual(kjsonutil.get_decoder(),
+                             kjsonutil.available_decoders()[0])
+            with self.assertRaises(K2hr3Exception):
+                kjsonutil.set_decoder('nosuchjson')
+        finally:
+            kjsonutil.set_decoder(decoder)
+
+
+class _K2hr3Thing(K2hr3Api):
+    """API class of the endpoint tests."""
+
+    def __init__(self):
+        """Init the members."""
+        super().__init__('thing')
+        self.name = None
+        self.expand = None
+
+    def get(self, name, expand):
+        """Show a thing."""
+        self.api_id = 1
+        self.name = name
+        self.expand = expand
+        return self
+
+
+class _K2hr3SubThing(_K2hr3Thing):
+    """Sub class of the endpoint tests."""
+
+
+register_endpoints(_K2hr3Thing, (
+    K2hr3Endpoint(1, K2hr3HTTPMethod.GET, '{version}/{basepath}/{name}',
+                  query=(('expanded', 'expand'), 'name')),
+    K2hr3Endpoint(1, K2hr3HTTPMethod.POST, lambda r3api: 'v1/things',
+                  body=lambda r3api: json.dumps({'name': r3api.name})),
+))
+
+
+class TestK2hr3Endpoint(unittest.TestCase):
+    """Tests the K2hr3Endpoint class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_api.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def test_endpoint_construct(self):
+        """Creates a K2hr3Endpoint instance."""
+        endpoint = get_endpoint(_K2hr3Thing, K2hr3HTTPMethod.GET, 1)
+        self.assertIsInstance(endpoint, K2hr3Endpoint)
+        self.assertEqual(endpoint.operation, 1)
+        self.assertEqual(endpoint.method, K2hr3HTTPMethod.GET)
+        self.assertRegex(repr(endpoint), '<K2hr3Endpoint .*>')
+
+    def test_endpoint_api_path(self):
+        """Sets the urlparams and returns the path of the template."""
+        thing = _K2hr3Thing().get('box', True)
+        self.assertEqual(thing._api_path(K2hr3HTTPMethod.GET),  # pylint: disable=protected-access # noqa
+                         'v1/thing/box')
+        self.assertEqual(json.loads(thing.urlparams),
+                         {'expanded': True, 'name': 'box'})
+        self.assertIsNone(thing.body)
+
+    def test_endpoint_body(self):
+        """Sets the body and returns the path of the callable."""
+        thing = _K2hr3Thing().get('box', True)
+        self.assertEqual(thing._api_path(K2hr3HTTPMethod.POST),  # pylint: disable=protected-access # noqa
+                         'v1/things')
+        self.assertEqual(thing.body, '{"name": "box"}')
+        self.assertIsNone(thing.urlparams)
+
+    def test_endpoint_not_registered(self):
+        """Returns None if no endpoint is registered."""
+        thing = _K2hr3Thing().get('box', True)
+        self.assertIsNone(thing._api_path(K2hr3HTTPMethod.DELETE))  # pylint: disable=protected-access # noqa
+        self.assertIsNone(get_endpoint(_K2hr3Thing, K2hr3HTTPMethod.GET, 2))
+
+    def test_endpoint_inherited(self):
+        """Looks up the endpoints of the base classes."""
+        self.assertIs(get_endpoint(_K2hr3SubThing, K2hr3HTTPMethod.GET, 1),
+                      get_endpoint(_K2hr3Thing, K2hr3HTTPMethod.GET, 1))
+
+    def test_endpoint_registered_twice(self):
+        """Raises K2hr3Exception if an operation is registered twice."""
+        with self.assertRaises(K2hr3Exception):
+            register_endpoints(_K2hr3Thing, (
+                K2hr3Endpoint(1, K2hr3HTTPMethod.GET, '{version}'),))
+
+
+class TestK2hr3Request(unittest.TestCase):
+    """Tests the K2hr3Request class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_api.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.thing = _K2hr3Thing()
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def test_request_hashable(self):
+        """Builds equal and hashable requests of the same operation."""
+        first = self.thing.get('box', True).request(K2hr3HTTPMethod.GET)
+        second = _K2hr3Thing().get('box', True).request(K2hr3HTTPMethod.GET)
+        self.assertIsInstance(first, K2hr3Request)
+        self.assertEqual(first, second)
+        self.assertEqual(len({first, second}), 1)
+        with self.assertRaises(AttributeError):
+            first.path = 'v1'  # type: ignore
+
+    def test_request_does_not_change_api(self):
+        """Builds requests of other operations from the same instance."""
+        first = self.thing.get('box', True).request(K2hr3HTTPMethod.GET)
+        second = self.thing.get('bag', False).request(K2hr3HTTPMethod.GET)
+        self.assertEqual(
+            first.url('http://localhost'),
+            'http://localhost/v1/thing/box?expanded=True&name=box')
+        self.assertEqual(
+            second.url('http://localhost'),
+            'http://localhost/v1/thing/bag?expanded=False&name=bag')
+        self.assertIsNone(self.thing.urlparams)
+        self.assertIsNone(self.thing.body)
+        self.assertIsNone(self.thing.resp)
+
+    def test_request_build(self):
+        """Encodes the url parameters and the body by the method."""
+        headers = {'Content-Type': 'application/json'}
+        post = K2hr3Request.build(K2hr3HTTPMethod.POST, 'v1/thing',
+                                  {'a': 1}, headers, '{"b": 2}')
+        self.assertEqual(post.body, b'{"b": 2}')
+        self.assertEqual(post.url('http://localhost'),
+                         'http://localhost/v1/thing')
+        form = K2hr3Request.build(K2hr3HTTPMethod.POST, 'v1/thing',
+                                  '{"a": 1}', None, None)
+        self.assertEqual(form.body, b'a=1')
+        put = K2hr3Request.build(K2hr3HTTPMethod.PUT, 'v1/thing', None,
+                                 headers, None)
+        self.assertEqual(put.url('http://localhost'),
+                         'http://localhost/v1/thing?')
+        self.assertEqual(put.headers,
+                         (('Content-Type', 'application/json'),))
+
 
 #
 # Local variables:
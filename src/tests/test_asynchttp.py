@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import asyncio
+import http.client
+import json
+import logging
+import unittest
+
+from k2hr3client import api as kapi
+from k2hr3client import asynchttp as kasynchttp
+from k2hr3client import role as krole
+from k2hr3client import token as ktoken
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+class TestAsyncK2hr3Http(unittest.IsolatedAsyncioTestCase):
+    """Tests the AsyncK2hr3Http class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_asynchttp.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.token = "testtoken"
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def test_asynchttp_construct(self):
+        """Creates a AsyncK2hr3Http instance."""
+        client = kasynchttp.AsyncK2hr3Http(self.server.baseurl)
+        self.assertIsInstance(client, kasynchttp.AsyncK2hr3Http)
+        self.assertRegex(repr(client), '<AsyncK2hr3Http .*>')
+
+    async def test_asynchttp_post(self):
+        """Sends a POST request of K2hr3Token."""
+        self.server.app = lambda req: (
+            201, {}, {'result': True, 'token': 'r3token'})
+        async with kasynchttp.AsyncK2hr3Http(self.server.baseurl) as client:
+            mytoken = ktoken.K2hr3Token("demo", "openstacktoken")
+            self.assertTrue(await client.post(mytoken.create()))
+        self.assertEqual(mytoken.token, 'r3token')
+        req = self.server.requests[0]
+        self.assertEqual(req.method, 'POST')
+        self.assertEqual(req.path, '/v1/user/tokens')
+        self.assertEqual(req.json(), json.loads(mytoken.body))
+        self.assertEqual(req.headers['x-auth-token'], 'U=openstacktoken')
+
+    async def test_asynchttp_get_with_urlparams(self):
+        """Sends a GET request with the url params."""
+        async with kasynchttp.AsyncK2hr3Http(self.server.baseurl) as client:
+            myrole = krole.K2hr3Role(self.token)
+            self.assertTrue(await client.get(myrole.get("testrole", True)))
+        self.assertEqual(myrole.resp.code, 200)
+        req = self.server.requests[0]
+        self.assertEqual(req.path, '/v1/role/testrole')
+        self.assertEqual(req.query, {'expand': ['True']})
+
+    async def test_asynchttp_error_status(self):
+        """Returns False if the server returns an error status."""
+        self.server.app = lambda req: (404, {}, {'result': False})
+        async with kasynchttp.AsyncK2hr3Http(self.server.baseurl) as client:
+            myrole = krole.K2hr3Role(self.token)
+            self.assertFalse(await client.head(myrole.validate_role("x")))
+        self.assertIsNone(myrole.resp)
+
+    async def test_asynchttp_send_request(self):
+        """Sends an immutable request concurrently and returns responses."""
+        self.server.app = lambda req: (
+            201, {}, {'result': True, 'body': req.json()})
+        myrole = krole.K2hr3Role(self.token)
+        request = myrole.create('myrole', [], []).request(
+            kapi.K2hr3HTTPMethod.POST)
+        async with kasynchttp.AsyncK2hr3Http(self.server.baseurl) as client:
+            responses = await asyncio.gather(
+                *[client.send(request) for _ in range(8)])
+        for response in responses:
+            self.assertEqual(response.code, 201)
+            self.assertEqual(response.json()['body'],
+                             json.loads(request.body))
+        self.assertIsNone(myrole.resp)
+        self.assertIsNone(myrole.body)
+
+    async def test_asynchttp_concurrency(self):
+        """Runs requests concurrently up to max_concurrency."""
+        self.server.__exit__(None, None, None)
+        self.server = K2hr3FakeServer(delay=0.01).__enter__()
+        async with kasynchttp.AsyncK2hr3Http(
+                self.server.baseurl, max_concurrency=8) as client:
+            roles = [krole.K2hr3Role(self.token).get(f"role{i}")
+                     for i in range(64)]
+            results = await asyncio.gather(*[client.get(r) for r in roles])
+        self.assertTrue(all(results))
+        self.assertLessEqual(self.server.connections, 8)
+        self.assertEqual(len(self.server.requests), 64)
+
+    async def test_read_chunked_response(self):
+        """Reads a chunked response."""
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'HTTP/1.1 200 OK\r\n'
+                         b'Transfer-Encoding: chunked\r\n\r\n'
+                         b'5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n')
+        code, headers, body, will_close = \
+            await kasynchttp._read_response(reader, 'GET')
+        self.assertEqual(code, 200)
+        self.assertEqual(headers['Transfer-Encoding'], 'chunked')
+        self.assertEqual(body, b'hello world')
+        self.assertFalse(will_close)
+
+    async def test_read_truncated_response(self):
+        """Raises HTTPException if the body is truncated."""
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n'
+                         b'hello')
+        reader.feed_eof()
+        with self.assertRaises(http.client.IncompleteRead):
+            await kasynchttp._read_response(reader, 'GET')
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'HTTP/1.1 200 OK\r\nContent-Length: x\r\n\r\n')
+        with self.assertRaises(http.client.HTTPException):
+            await kasynchttp._read_response(reader, 'GET')
+
+    async def test_asynchttp_invalid_chunk_size(self):
+        """Returns False if the server sends an invalid chunk size."""
+        self.server.app = lambda req: (
+            200, {'Transfer-Encoding': 'chunked'}, b'zz\r\nhello\r\n')
+        async with kasynchttp.AsyncK2hr3Http(self.server.baseurl) as client:
+            myrole = krole.K2hr3Role(self.token)
+            self.assertFalse(await client.get(myrole.get("testrole")))
+        self.assertIsNone(myrole.resp)
+        self.assertEqual(len(self.server.requests), 1)
+
+
+class TestAsyncK2hr3HttpLoops(unittest.TestCase):
+    """Tests an AsyncK2hr3Http used in many event loops.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_asynchttp.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer(delay=0.02).__enter__()
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def test_asynchttp_in_many_loops(self):
+        """Sends the requests of a client in the next asyncio.run."""
+        client = kasynchttp.AsyncK2hr3Http(self.server.baseurl,
+                                           max_concurrency=2)
+
+        async def get_roles():
+            return await asyncio.gather(*[
+                client.get(krole.K2hr3Role("testtoken").get(f"role{i}"))
+                for i in range(4)])
+
+        self.assertEqual(asyncio.run(get_roles()), [True] * 4)
+        self.assertEqual(client.pool.idle_count(), 2)
+        self.assertEqual(asyncio.run(get_roles()), [True] * 4)
+        self.assertEqual(len(self.server.requests), 8)
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
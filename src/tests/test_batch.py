@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import logging
+import threading
+import time
+import unittest
+
+from k2hr3client import batch as kbatch
+from k2hr3client import http as khttp
+from k2hr3client import role as krole
+from k2hr3client.api import K2hr3HTTPMethod
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+class TestK2hr3BatchExecutor(unittest.TestCase):
+    """Tests the K2hr3BatchExecutor class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_batch.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.pool = khttp.K2hr3ConnectionPool(maxsize=16)
+        self.httpreq = khttp.K2hr3Http(self.server.baseurl, pool=self.pool)
+        self.token = "testtoken"
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.pool.clear()
+        self.server.__exit__(None, None, None)
+
+    def _requests(self, count):
+        return [(K2hr3HTTPMethod.GET, krole.K2hr3Role(self.token).get(
+            f"role{i}")) for i in range(count)]
+
+    def test_batch_construct(self):
+        """Creates a K2hr3BatchExecutor instance."""
+        with kbatch.K2hr3BatchExecutor(self.httpreq) as executor:
+            self.assertIsInstance(executor, kbatch.K2hr3BatchExecutor)
+            self.assertRegex(repr(executor), '<K2hr3BatchExecutor .*>')
+            self.assertEqual(executor.max_per_host, executor.max_workers)
+
+    def test_batch_run_in_input_order(self):
+        """Returns the results in input order."""
+        self.server.app = lambda req: (
+            200, {}, {'result': True, 'role': req.path})
+        requests = self._requests(32)
+        with kbatch.K2hr3BatchExecutor(self.httpreq, 8) as executor:
+            results = executor.run(requests)
+        self.assertEqual([r.index for r in results], list(range(32)))
+        for i, result in enumerate(results):
+            self.assertTrue(result.ok)
+            self.assertIs(result.r3api, requests[i][1])
+            self.assertIn(f'/v1/role/role{i}"', result.r3api.resp.body)
+
+    def test_batch_as_completed(self):
+        """Yields every result once as each completes."""
+        with kbatch.K2hr3BatchExecutor(self.httpreq, 4) as executor:
+            indexes = [r.index for r in
+                       executor.as_completed(self._requests(16))]
+        self.assertEqual(sorted(indexes), list(range(16)))
+
+    def test_batch_max_per_host(self):
+        """Bounds the requests in flight to a host."""
+        lock = threading.Lock()
+        state = {'inflight': 0, 'peak': 0}
+
+        def app(_req):
+            with lock:
+                state['inflight'] += 1
+                state['peak'] = max(state['peak'], state['inflight'])
+            time.sleep(0.01)
+            with lock:
+                state['inflight'] -= 1
+            return 200, {}, {'result': True}
+
+        self.server.app = app
+        with kbatch.K2hr3BatchExecutor(self.httpreq, max_workers=16,
+                                       max_per_host=3) as executor:
+            results = executor.run(self._requests(24))
+        self.assertTrue(all(r.ok for r in results))
+        self.assertLessEqual(state['peak'], 3)
+
+    def test_batch_reports_failure(self):
+        """Reports a failed request in its result."""
+        self.server.app = lambda req: (
+            (500, {}, {}) if req.path.endswith('role1') else
+            (200, {}, {'result': True}))
+        with kbatch.K2hr3BatchExecutor(self.httpreq) as executor:
+            results = executor.run([('get', r) for _, r in
+                                    self._requests(3)])
+        self.assertEqual([r.ok for r in results], [True, False, True])
+        self.assertEqual(results[1].response.code, 500)
+        self.assertEqual(kbatch.outcome(results[1]),
+                         (False, 500, 'request failed'))
+        self.assertEqual(kbatch.outcome(results[0]), (True, 200, None))
+
+    def test_http_request_keeps_no_state(self):
+        """Sends a request without updating the members."""
+        myrole = krole.K2hr3Role(self.token).get("role0")
+        self.assertTrue(self.httpreq.request(K2hr3HTTPMethod.GET, myrole))
+        self.assertIsNone(self.httpreq.url)
+        self.assertIsNone(self.httpreq.urlparams)
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import json
+import logging
+from typing import Any, Tuple
+import unittest
+
+from k2hr3client import acr, builder, policy, resource, role, \
+    service, tenant, token
+from k2hr3client.exception import K2hr3Exception
+
+LOG = logging.getLogger(__name__)
+
+_VALUES: Tuple[Any, ...] = ('value', 'ユーザー', 'quote"back\\slash', 8080,
+                            1.5, True, None, [], ['a', 'b'], {},
+                            {'key': ['v', 1]})
+
+
+def _legacy(template, fields, values):
+    """Return the body built by json.loads and json.dumps."""
+    python_data = json.loads(template)
+    for name, path in fields.items():
+        node = python_data
+        for key in path[:-1]:
+            node = node[key]
+        node[path[-1]] = values[name]
+    return json.dumps(python_data)
+
+
+class TestK2hr3BodyBuilder(unittest.TestCase):
+    """Tests the K2hr3BodyBuilder class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_builder.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.cases = [
+            (acr._ACR_API_ADD_MEMBER,  # pylint: disable=protected-access
+             {'tenant': ('tenant',)}),
+            (policy._POLICY_API_CREATE_POLICY,  # pylint: disable=protected-access # noqa
+             {'name': ('policy', 'name'), 'effect': ('policy', 'effect'),
+              'action': ('policy', 'action'),
+              'resource': ('policy', 'resource'),
+              'alias': ('policy', 'alias')}),
+            (resource._RESOURCE_API_CREATE_RESOURCE,  # pylint: disable=protected-access # noqa
+             {'name': ('resource', 'name'), 'type': ('resource', 'type'),
+              'data': ('resource', 'data'), 'keys': ('resource', 'keys'),
+              'alias': ('resource', 'alias')}),
+            (role._ROLE_API_CREATE_ROLE,  # pylint: disable=protected-access
+             {'name': ('role', 'name'), 'policies': ('role', 'policies'),
+              'alias': ('role', 'alias')}),
+            (role._ROLE_API_ADD_MEMBER,  # pylint: disable=protected-access
+             {field: ('host', field) for field in
+              ('host', 'port', 'cuk', 'extra', 'tag', 'inboundip',
+               'outboundip')}),
+            (service._SERVICE_API_ADD_MEMBER,  # pylint: disable=protected-access # noqa
+             {'tenant': ('tenant',), 'clear_tenant': ('clear_tenant',)}),
+            (tenant._TENANT_API_UPDATE_TENANT,  # pylint: disable=protected-access # noqa
+             {'id': ('tenant', 'id'), 'desc': ('tenant', 'desc'),
+              'display': ('tenant', 'display'),
+              'users': ('tenant', 'users')}),
+            (token._TOKEN_API_CREATE_TOKEN_TYPE1,  # pylint: disable=protected-access # noqa
+             {'tenant_name': ('auth', 'tenantName'),
+              'user': ('auth', 'user'), 'password': ('auth', 'password')}),
+            (token.IDENTITY_V3_PASSWORD_AUTH_JSON_DATA,
+             {'name': ('auth', 'identity', 'password', 'user', 'name'),
+              'domain': ('auth', 'identity', 'password', 'user', 'domain',
+                         'name'),
+              'password': ('auth', 'identity', 'password', 'user',
+                           'password')}),
+            (token.IDENTITY_V3_TOKEN_AUTH_JSON_DATA,
+             {'token': ('auth', 'identity', 'token', 'id'),
+              'domain': ('auth', 'scope', 'project', 'domain', 'id'),
+              'project': ('auth', 'scope', 'project', 'name')}),
+        ]
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def test_builder_construct(self):
+        """Creates a K2hr3BodyBuilder instance."""
+        body = builder.K2hr3BodyBuilder('{"a": {"b": 1}}', b=('a', 'b'))
+        self.assertEqual(body.fields, ['b'])
+        self.assertRegex(repr(body), '<K2hr3BodyBuilder .*>')
+
+    def test_builder_byte_identical(self):
+        """Builds the same bodies as json.loads and json.dumps."""
+        for template, fields in self.cases:
+            body = builder.K2hr3BodyBuilder(template, **fields)
+            for index, _ in enumerate(_VALUES):
+                values = {name: _VALUES[(index + offset) % len(_VALUES)]
+                          for offset, name in enumerate(fields)}
+                self.assertEqual(body.build(**values),
+                                 _legacy(template, fields, values))
+
+    def test_builder_default(self):
+        """Keeps the template value of an omitted field."""
+        body = builder.K2hr3BodyBuilder(
+            service._SERVICE_API_ADD_MEMBER,  # pylint: disable=protected-access # noqa
+            tenant=('tenant',), verify=('verify',))
+        self.assertEqual(
+            body.build(tenant='t'),
+            json.dumps({'tenant': 't', 'clear_tenant': 'true/false',
+                        'verify': '<verify url>'}))
+
+    def test_builder_added_field_required(self):
+        """Raises K2hr3Exception if a field not in the template is omitted."""
+        body = builder.K2hr3BodyBuilder('{"a": {}}', b=('a', 'b'))
+        self.assertEqual(body.build(b=1), '{"a": {"b": 1}}')
+        with self.assertRaises(K2hr3Exception):
+            body.build()
+
+    def test_builder_invalid_path(self):
+        """Raises K2hr3Exception if a field path is not in the template."""
+        with self.assertRaises(K2hr3Exception):
+            builder.K2hr3BodyBuilder('{"a": 1}', b=('x', 'y', 'b'))
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
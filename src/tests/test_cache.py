@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+import unittest
+
+from k2hr3client import cache as kcache
+from k2hr3client.exception import K2hr3Exception
+
+LOG = logging.getLogger(__name__)
+
+
+class TestK2hr3Singleflight(unittest.TestCase):
+    """Tests the K2hr3Singleflight class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_cache.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.flight = kcache.K2hr3Singleflight()
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def test_singleflight_construct(self):
+        """Creates a K2hr3Singleflight instance."""
+        self.assertIsInstance(self.flight, kcache.K2hr3Singleflight)
+        self.assertRegex(repr(self.flight), '<K2hr3Singleflight .*>')
+
+    def test_singleflight_shares_call(self):
+        """Runs one call for concurrent callers of a key."""
+        calls = []
+        lock = threading.Lock()
+
+        def func():
+            with lock:
+                calls.append(1)
+            time.sleep(0.05)
+            return len(calls)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda _: self.flight.do('key', func), range(8)))
+        self.assertEqual(results, [1] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(self.flight.in_flight('key'))
+
+    def test_singleflight_shares_exception(self):
+        """Raises the exception of the call and forgets the key."""
+        def func():
+            raise ValueError('error')
+        with self.assertRaises(ValueError):
+            self.flight.do('key', func)
+        self.assertEqual(self.flight.do('key', lambda: 1), 1)
+
+
+class TestK2hr3LRUCache(unittest.TestCase):
+    """Tests the K2hr3LRUCache class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_cache.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.now = 1000.0
+        self.cache = kcache.K2hr3LRUCache(maxsize=2, ttl=10.0,
+                                          clock=lambda: self.now)
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def test_lrucache_construct(self):
+        """Creates a K2hr3LRUCache instance."""
+        self.assertEqual((self.cache.maxsize, self.cache.ttl), (2, 10.0))
+        self.assertRegex(repr(self.cache), '<K2hr3LRUCache .*>')
+        with self.assertRaises(K2hr3Exception):
+            kcache.K2hr3LRUCache(maxsize=0)
+        with self.assertRaises(K2hr3Exception):
+            kcache.K2hr3LRUCache(ttl=-1)
+
+    def test_lrucache_expires(self):
+        """Returns the expired entries only by entry."""
+        self.cache.set('key', 'value')
+        self.cache.set('short', 'value', ttl=1.0)
+        self.now += 5
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertIsNone(self.cache.get('short'))
+        self.assertEqual(self.cache.entry('short'), ('value', 1001.0))
+        self.now += 5
+        self.assertEqual(self.cache.get('key', 'default'), 'default')
+        self.assertEqual(self.cache.pop('key'), 'value')
+        self.assertEqual(len(self.cache), 1)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lrucache_evicts_least_recently_used(self):
+        """Evicts the least recently used entry."""
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.cache.set('c', 3)
+        self.assertEqual(self.cache.keys(), ['a', 'c'])
+        self.assertIsNone(self.cache.get('b'))
+
+    def test_lrucache_stats(self):
+        """Counts the hits and the misses of get."""
+        self.assertEqual(self.cache.stats().hit_ratio, 0.0)
+        self.cache.set('a', 1)
+        self.cache.get('a')
+        self.cache.get('a')
+        self.cache.get('b')
+        self.now += 10
+        self.cache.get('a')
+        self.cache.entry('a')
+        stats = self.cache.stats()
+        self.assertEqual(stats, kcache.K2hr3CacheStats(2, 2, 1, 2))
+        self.assertEqual(stats.hit_ratio, 0.5)
+        self.cache.reset_stats()
+        self.assertEqual(self.cache.stats().hits, 0)
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
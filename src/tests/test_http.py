@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import logging
+import os
+import ssl
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+
+from k2hr3client import api as kapi
+from k2hr3client import http as khttp
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client import role as krole
+from k2hr3client import version as kversion
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+class TestK2hr3ConnectionPool(unittest.TestCase):
+    """Tests the K2hr3ConnectionPool class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_http.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.pool = khttp.K2hr3ConnectionPool(maxsize=2, idle_timeout=60)
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.pool.clear()
+        self.server.__exit__(None, None, None)
+
+    def test_pool_construct(self):
+        """Creates a K2hr3ConnectionPool instance."""
+        self.assertIsInstance(self.pool, khttp.K2hr3ConnectionPool)
+        self.assertRegex(repr(self.pool), '<K2hr3ConnectionPool .*>')
+
+    def test_pool_reuses_connection(self):
+        """Sends many requests over one connection."""
+        for _ in range(5):
+            code, _, body = self.pool.request(
+                'GET', f'{self.server.baseurl}/v1')
+            self.assertEqual(code, 200)
+            self.assertIn(b'"result": true', body)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.pool.idle_count(), 1)
+
+    def test_pool_evicts_idle_connection(self):
+        """Evicts a connection idle longer than idle_timeout."""
+        pool = khttp.K2hr3ConnectionPool(idle_timeout=0.05)
+        pool.request('GET', f'{self.server.baseurl}/v1')
+        time.sleep(0.1)
+        pool.request('GET', f'{self.server.baseurl}/v1')
+        self.assertEqual(self.server.connections, 2)
+        pool.clear()
+
+    def test_pool_detects_closed_connection(self):
+        """Reconnects if the server closed an idle connection."""
+        self.pool.request('GET', f'{self.server.baseurl}/v1')
+        self.server.app = lambda req: (200, {'Connection': 'close'}, {})
+        self.pool.request('GET', f'{self.server.baseurl}/v1')
+        self.assertEqual(self.pool.idle_count(), 0)
+        self.server.app = lambda req: (200, {}, {})
+        code, _, _ = self.pool.request('GET', f'{self.server.baseurl}/v1')
+        self.assertEqual(code, 200)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_pool_bounds_idle_connections(self):
+        """Keeps at most maxsize idle connections per host."""
+        key = ('http', '127.0.0.1', self.server.port, None)
+        conns = [self.pool._acquire(key, 30)[0] for _ in range(3)]
+        for conn in conns:
+            conn.connect()
+            self.pool._release(key, conn)
+        self.assertEqual(self.pool.idle_count(), 2)
+
+    def test_http_get_uses_pool(self):
+        """Sends K2hr3Http requests over the pool."""
+        httpreq = khttp.K2hr3Http(self.server.baseurl, pool=self.pool)
+        for _ in range(3):
+            myversion = kversion.K2hr3Version("v1")
+            myversion.get()
+            self.assertTrue(httpreq.GET(myversion))
+            self.assertEqual(myversion.resp.code, 200)
+            self.assertEqual(myversion.resp.url, f'{self.server.baseurl}/v1')
+        self.assertEqual(self.server.connections, 1)
+
+    def test_http_get_error_status(self):
+        """Returns False if the server returns an error status."""
+        self.server.app = lambda req: (403, {}, {'result': False})
+        httpreq = khttp.K2hr3Http(self.server.baseurl, pool=self.pool)
+        myversion = kversion.K2hr3Version("v1")
+        myversion.get()
+        self.assertFalse(httpreq.GET(myversion))
+        self.assertIsNone(myversion.resp)
+
+    def test_http_send_request(self):
+        """Sends an immutable request many times and returns responses."""
+        httpreq = khttp.K2hr3Http(self.server.baseurl, pool=self.pool)
+        myrole = krole.K2hr3Role('token')
+        request = myrole.get('myrole').request(kapi.K2hr3HTTPMethod.GET)
+        responses = [httpreq.send(request) for _ in range(3)]
+        for response in responses:
+            self.assertIsInstance(response, kapi.K2hr3ApiResponse)
+            self.assertEqual(response.code, 200)
+            self.assertEqual(
+                response.url,
+                f'{self.server.baseurl}/v1/role/myrole?expand=True')
+        self.assertIsNone(myrole.resp)
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.requests[0].headers['x-auth-token'],
+                         'U=token')
+        self.assertEqual(self.server.connections, 1)
+
+    def test_http_send_error_status(self):
+        """Returns None or the response of an error status."""
+        self.server.app = lambda req: (404, {}, {'result': False})
+        httpreq = khttp.K2hr3Http(self.server.baseurl, pool=self.pool)
+        request = krole.K2hr3Role('token').validate_role('x').request(
+            kapi.K2hr3HTTPMethod.HEAD)
+        self.assertIsNone(httpreq.send(request))
+        resp = httpreq.send(request, errors=True)
+        self.assertEqual(resp.code, 404)
+        self.assertEqual(resp.body, '')
+
+    def test_pool_stream(self):
+        """Reuses the connection only if the body was read to the end."""
+        self.server.app = lambda req: (200, {}, 'x' * 100000)
+        url = f'{self.server.baseurl}/v1'
+        with self.pool.stream('GET', url) as res:
+            self.assertEqual(res.status, 200)
+            self.assertEqual(len(res.read(1000)), 1000)
+        self.assertEqual(self.pool.idle_count(), 0)
+        with self.pool.stream('GET', url) as res:
+            while res.read(8192):
+                pass
+        self.assertEqual(self.pool.idle_count(), 1)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_http_stream(self):
+        """Yields the unread response or raises on an error status."""
+        httpreq = khttp.K2hr3Http(self.server.baseurl, pool=self.pool)
+        request = krole.K2hr3Role('token').get('myrole').request(
+            kapi.K2hr3HTTPMethod.GET)
+        with httpreq.stream(request) as res:
+            self.assertEqual(res.read(), b'{"result": true, "message": null}')
+        self.assertEqual(self.server.requests[0].path, '/v1/role/myrole')
+        self.server.app = lambda req: (403, {}, {'result': False})
+        with self.assertRaises(K2hr3Exception):
+            with httpreq.stream(request):
+                pass
+
+
+class TestK2hr3SSLContext(unittest.TestCase):
+    """Tests the shared SSLContext of K2hr3Http.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_http.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def test_ssl_context_is_shared(self):
+        """Returns the same SSLContext for the same settings."""
+        ctx1 = khttp.get_ssl_context(True)
+        ctx2 = khttp.get_ssl_context(True)
+        self.assertIs(ctx1, ctx2)
+        self.assertIsNot(ctx1, khttp.get_ssl_context(False))
+
+    def test_ssl_context_verification(self):
+        """Builds the SSLContext from the verification settings."""
+        ctx = khttp.get_ssl_context(True)
+        self.assertFalse(ctx.check_hostname)
+        self.assertEqual(ctx.verify_mode, ssl.CERT_NONE)
+        ctx = khttp.get_ssl_context(False)
+        self.assertTrue(ctx.check_hostname)
+        self.assertEqual(ctx.verify_mode, ssl.CERT_REQUIRED)
+
+    def test_http_ssl_context(self):
+        """Shares the SSLContext between K2hr3Http instances."""
+        httpreq1 = khttp.K2hr3Http("https://127.0.0.1:18443")
+        httpreq2 = khttp.K2hr3Http("https://127.0.0.1:18443")
+        self.assertIs(httpreq1.ssl_context, httpreq2.ssl_context)
+
+    @unittest.skipIf(shutil.which('openssl') is None, 'openssl not found')
+    def test_tls_session_resumption(self):
+        """Resumes the TLS session on a new connection."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            certfile = os.path.join(tmpdir, 'cert.pem')
+            keyfile = os.path.join(tmpdir, 'key.pem')
+            subprocess.run(
+                ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+                 '-days', '1', '-subj', '/CN=127.0.0.1',
+                 '-keyout', keyfile, '-out', certfile],
+                check=True, capture_output=True)
+            with K2hr3FakeServer(certfile=certfile,
+                                 keyfile=keyfile) as server:
+                pool = khttp.K2hr3ConnectionPool()
+                httpreq = khttp.K2hr3Http(server.baseurl, pool=pool)
+                for _ in range(2):
+                    myversion = kversion.K2hr3Version("v1")
+                    myversion.get()
+                    self.assertTrue(httpreq.GET(myversion))
+                    # closes the connection to make a new handshake.
+                    pool.clear()
+                self.assertEqual(server.tls_resumed, [False, True])
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import http.client
+import itertools
+import logging
+import time
+import unittest
+from unittest.mock import patch
+
+from k2hr3client import http as khttp
+from k2hr3client import identity as kidentity
+from k2hr3client import token as ktoken
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+def _keystone_app(lifetime=3600):
+    """Return an app that acts as the Identity v3 auth/tokens API."""
+    counter = itertools.count(1)
+
+    def app(req):
+        auth = req.json()['auth']
+        if 'password' in auth['identity']:
+            user = auth['identity']['password']['user']
+            if user['password'] != 'password':
+                return (401, {}, {'error': {'code': 401}})
+            token_id = f'unscoped{next(counter)}'
+        else:
+            project = auth['scope']['project']['name']
+            token_id = f'{project}-{auth["identity"]["token"]["id"]}'
+        expires_at = datetime.datetime.fromtimestamp(
+            time.time() + lifetime, datetime.timezone.utc)
+        return (201, {'X-Subject-Token': token_id}, {'token': {
+            'expires_at': expires_at.strftime('%Y-%m-%dT%H:%M:%S.%fZ')}})
+    return app
+
+
+class TestK2hr3IdentityTokenProvider(unittest.TestCase):
+    """Tests the K2hr3IdentityTokenProvider class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_identity.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer(app=_keystone_app()).__enter__()
+        self.url = f'{self.server.baseurl}/identity/v3/auth/tokens'
+        self.pool = khttp.K2hr3ConnectionPool()
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.pool.clear()
+        self.server.__exit__(None, None, None)
+
+    def _provider(self, **kwargs):
+        return kidentity.K2hr3IdentityTokenProvider(
+            self.url, 'demo', 'password', pool=self.pool, **kwargs)
+
+    def test_provider_construct(self):
+        """Creates a K2hr3IdentityTokenProvider instance."""
+        provider = self._provider()
+        self.assertIsInstance(provider, kidentity.K2hr3IdentityTokenProvider)
+        self.assertRegex(repr(provider), '<K2hr3IdentityTokenProvider .*>')
+        self.assertNotIn('password', repr(provider))
+
+    def test_provider_reuses_unscoped_token(self):
+        """Authenticates once for the scoped tokens of many projects."""
+        provider = self._provider()
+        self.assertEqual(provider.scoped_token('demo'), 'demo-unscoped1')
+        self.assertEqual(provider.scoped_token('admin'), 'admin-unscoped1')
+        self.assertEqual(provider.scoped_token('demo'), 'demo-unscoped1')
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.connections, 1)
+        req = self.server.requests[1]
+        self.assertEqual(req.path, '/identity/v3/auth/tokens')
+        self.assertEqual(req.json()['auth']['identity']['token']['id'],
+                         'unscoped1')
+
+    def test_provider_drops_expiring_token(self):
+        """Gets new tokens when the cached ones are about to expire."""
+        self.server.app = _keystone_app(lifetime=30)
+        provider = self._provider(refresh_margin=60)
+        self.assertEqual(provider.scoped_token('demo'), 'demo-unscoped1')
+        self.assertEqual(provider.scoped_token('demo'), 'demo-unscoped2')
+
+    def test_provider_singleflight(self):
+        """Shares one request between concurrent callers."""
+        self.server.__exit__(None, None, None)
+        self.server = K2hr3FakeServer(app=_keystone_app(),
+                                      delay=0.05).__enter__()
+        self.url = f'{self.server.baseurl}/identity/v3/auth/tokens'
+        provider = self._provider()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tokens = set(executor.map(
+                lambda _: provider.scoped_token('demo'), range(8)))
+        self.assertEqual(tokens, {'demo-unscoped1'})
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_provider_error(self):
+        """Raises K2hr3Exception if the authentication failed."""
+        provider = kidentity.K2hr3IdentityTokenProvider(
+            self.url, 'demo', 'wrong', pool=self.pool)
+        with self.assertRaises(K2hr3Exception):
+            provider.scoped_token('demo')
+
+    def test_provider_timeout(self):
+        """Raises K2hr3Exception if the server does not respond in time."""
+        self.server.__exit__(None, None, None)
+        self.server = K2hr3FakeServer(app=_keystone_app(),
+                                      delay=0.5).__enter__()
+        self.url = f'{self.server.baseurl}/identity/v3/auth/tokens'
+        provider = self._provider(timeout=0.1)
+        with self.assertRaises(K2hr3Exception):
+            provider.unscoped_token()
+
+    def test_provider_broken_response(self):
+        """Raises K2hr3Exception if the response is broken."""
+        provider = self._provider()
+        with patch.object(khttp.K2hr3ConnectionPool, 'request',
+                          side_effect=http.client.BadStatusLine('x')):
+            with self.assertRaises(K2hr3Exception):
+                provider.unscoped_token()
+
+    def test_get_openstack_token(self):
+        """Caches the tokens of K2hr3Token.get_openstack_token."""
+        for _ in range(2):
+            self.assertEqual(ktoken.K2hr3Token.get_openstack_token(
+                self.url, 'demo', 'password', 'demo'), 'demo-unscoped1')
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertIsNone(ktoken.K2hr3Token.get_openstack_token(
+            self.url, 'demo', 'wrong', 'demo'))
+
+    def test_clear_identity_providers(self):
+        """Does not keep the passwords of the dropped providers."""
+        provider = kidentity.get_identity_provider(self.url, 'demo',
+                                                   'password')
+        self.assertIs(kidentity.get_identity_provider(
+            self.url, 'demo', 'password'), provider)
+        kidentity.clear_identity_providers(self.url, 'other')
+        self.assertIs(kidentity.get_identity_provider(
+            self.url, 'demo', 'password'), provider)
+        kidentity.clear_identity_providers(self.url, 'demo')
+        self.assertIsNot(kidentity.get_identity_provider(
+            self.url, 'demo', 'password'), provider)
+        kidentity.clear_identity_providers()
+        self.assertIsNone(ktoken.K2hr3Token.get_openstack_token(
+            self.url, 'demo', 'wrong', 'demo'))
+        self.assertEqual(kidentity._PROVIDERS, {})  # pylint: disable=protected-access # noqa
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import io
+import json
+import logging
+import unittest
+
+from k2hr3client import jsonutil as kjsonutil
+from k2hr3client.exception import K2hr3Exception
+
+LOG = logging.getLogger(__name__)
+
+
+class TestK2hr3JsonUtil(unittest.TestCase):
+    """Tests the json utilities.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_jsonutil.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.doc = {
+            'result': True, 'message': None, 'count': 12345,
+            'tokens': {f'token{i}': {'registerpath': f'/v1/{i}',
+                                     'expire': 1.5e9 + i}
+                       for i in range(100)},
+            'after': ['ÄÖÜ', 1.5]}
+        self.body = json.dumps(self.doc, ensure_ascii=False).encode('utf-8')
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def test_iter_members_in_chunks(self):
+        """Yields the same members whatever the chunk size is."""
+        for chunk_size in (1, 3, 64, 65536):
+            members = dict(kjsonutil.iter_members(
+                io.BytesIO(self.body), 'tokens', chunk_size=chunk_size))
+            self.assertEqual(members, self.doc['tokens'])
+
+    def test_iter_members_of_top_level(self):
+        """Yields the members of the top-level object or array."""
+        chunks = [self.body[i:i + 5] for i in range(0, len(self.body), 5)]
+        self.assertEqual(dict(kjsonutil.iter_members(chunks)), self.doc)
+        self.assertEqual(list(kjsonutil.iter_members(['["a", "b"]'])),
+                         [('a', None), ('b', None)])
+
+    def test_iter_members_of_array(self):
+        """Yields (item, None) of an array member."""
+        self.assertEqual(
+            list(kjsonutil.iter_members(['{"tokens": [', '"a",', '"b"]}'],
+                                        'tokens')),
+            [('a', None), ('b', None)])
+
+    def test_iter_members_missing(self):
+        """Yields nothing if the member is missing or empty."""
+        self.assertEqual(list(kjsonutil.iter_members(['{}'], 'tokens')), [])
+        self.assertEqual(
+            list(kjsonutil.iter_members(['{"tokens": {}}'], 'tokens')), [])
+
+    def test_iter_members_invalid(self):
+        """Raises K2hr3Exception if the text is broken."""
+        with self.assertRaises(K2hr3Exception):
+            list(kjsonutil.iter_members(['{"tokens": {"a": 1'], 'tokens'))
+        with self.assertRaises(K2hr3Exception):
+            list(kjsonutil.iter_members(['[1 2]']))
+
+    def test_iter_members_escaped_in_chunks(self):
+        """Yields the escapes and literals split across the chunks."""
+        body = json.dumps(self.doc['after'] + [-1e-5, None, False])
+        self.assertEqual(
+            [item for item, _ in kjsonutil.iter_members(body)],
+            self.doc['after'] + [-1e-5, None, False])
+
+    def test_iter_members_invalid_fails_fast(self):
+        """Raises K2hr3Exception without reading the rest of the text."""
+        read = []
+
+        def chunks():
+            for chunk in ['{"tokens": {"a": x', '1}', '}']:
+                read.append(chunk)
+                yield chunk
+
+        with self.assertRaises(K2hr3Exception):
+            list(kjsonutil.iter_members(chunks(), 'tokens'))
+        self.assertEqual(len(read), 1)
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -26,6 +26,8 @@ from unittest.mock import patch
 
 from k2hr3client import http as khttp
 from k2hr3client import list as klist
+from k2hr3client.api import K2hr3HTTPMethod
+from k2hr3client.exception import K2hr3Exception
 
 LOG = logging.getLogger(__name__)
 
@@ -87,6 +89,37 @@ class TestK2hr3List(unittest.TestCase):
         # 4. assert Request body
         self.assertEqual(mylist.body, None)
 
+    @patch('k2hr3client.http.K2hr3Http._HTTP_REQUEST_METHOD')
+    def test_k2hr3list_target_get_ok(self, mock_HTTP_REQUEST_METHOD):
+        """Get the objects under a root path."""
+        mylist = klist.K2hr3List("token", self.service)
+        mylist.get(expand=True, target='resource', root_path='/a/b/')
+        httpreq = khttp.K2hr3Http(self.base_url)
+        self.assertTrue(httpreq.GET(mylist))
+
+        # 1. assert URL
+        self.assertEqual(
+            httpreq.url,
+            f"{self.base_url}/v1/list/{self.service}/resource/a/b")
+        # 2. assert URL params
+        self.assertEqual(mylist.urlparams, '{"expand": true}')
+        self.assertEqual(httpreq.urlparams, 'expand=True')
+
+    def test_k2hr3list_target_path(self):
+        """Builds the paths of the tenant and of the service."""
+        mylist = klist.K2hr3List("token").get(target='role')
+        request = mylist.request(K2hr3HTTPMethod.GET)
+        self.assertEqual(request.path, 'v1/list/role')
+        self.assertEqual(request.query, 'expand=False')
+        mylist = klist.K2hr3List("token", self.service).validate(
+            target='policy', root_path='p')
+        request = mylist.request(K2hr3HTTPMethod.HEAD)
+        self.assertEqual(request.path, f'v1/list/{self.service}/policy/p')
+        with self.assertRaises(K2hr3Exception):
+            klist.K2hr3List("token").get(target='service')
+        with self.assertRaises(K2hr3Exception):
+            klist.K2hr3List("token").get(root_path='p')
+
 
 #
 # Local variables:
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import json
+import logging
+import unittest
+
+from k2hr3client import api as kapi
+from k2hr3client import http as khttp
+from k2hr3client import membership as kmembership
+from k2hr3client import role as krole
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+class TestK2hr3RoleMembers(unittest.TestCase):
+    """Tests the K2hr3RoleMembers class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_membership.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.httpreq = khttp.K2hr3Http(self.server.baseurl)
+        self.hosts = [
+            krole.K2hr3RoleHost(f'host{i}', 8000 + i, f'cuk{i}', None, None,
+                                None, None)
+            for i in range(25)
+        ]
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def test_role_members_construct(self):
+        """Creates a K2hr3RoleMembers instance."""
+        members = kmembership.K2hr3RoleMembers(self.httpreq, 'token')
+        self.assertEqual(members.chunk_size, 100)
+        self.assertRegex(repr(members), '<K2hr3RoleMembers .*>')
+        self.assertNotIn('token', repr(members))
+        with self.assertRaises(K2hr3Exception):
+            kmembership.K2hr3RoleMembers(self.httpreq, 'token', chunk_size=0)
+
+    def test_role_members_chunks(self):
+        """Splits the hosts by the number and the size."""
+        members = kmembership.K2hr3RoleMembers(self.httpreq, 'token',
+                                               chunk_size=10)
+        chunks = members.chunks(self.hosts)
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual([index for chunk in chunks for index, _ in chunk],
+                         list(range(25)))
+        members = kmembership.K2hr3RoleMembers(self.httpreq, 'token',
+                                               max_body_size=300)
+        for chunk in members.chunks(self.hosts):
+            self.assertLessEqual(
+                len(json.dumps([vars(host) for _, host in chunk])), 300)
+
+    def test_role_members_add(self):
+        """Sends the chunks and reports every host."""
+        members = kmembership.K2hr3RoleMembers(self.httpreq, 'token',
+                                               chunk_size=10)
+        results = members.add('myrole', self.hosts)
+        self.assertEqual([result.host for result in results], self.hosts)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(len(self.server.requests), 3)
+        sent = [host['host'] for req in self.server.requests
+                for host in req.json()['host']]
+        self.assertEqual(sorted(sent), sorted(h.host for h in self.hosts))
+        self.assertEqual(self.server.requests[0].path, '/v1/role/myrole')
+
+    def test_role_members_add_using_put(self):
+        """Sends the hosts as the url parameter of PUT."""
+        members = kmembership.K2hr3RoleMembers(self.httpreq, 'token')
+        results = members.add('myrole', self.hosts[:3],
+                              method=kapi.K2hr3HTTPMethod.PUT)
+        self.assertTrue(all(result.ok for result in results))
+        req = self.server.requests[0]
+        self.assertEqual(req.method, 'PUT')
+        self.assertEqual(len(json.loads(req.query['host'][0])), 3)
+
+    def test_role_members_partial_failure(self):
+        """Reports the failed hosts of a failed chunk."""
+        def app(req):
+            if 'host13' in [host['host'] for host in req.json()['host']]:
+                return 400, {}, {'result': False, 'message': 'bad host'}
+            return 200, {}, {'result': True, 'message': None}
+        self.server.app = app
+        members = kmembership.K2hr3RoleMembers(self.httpreq, 'token',
+                                               chunk_size=10)
+        results = members.add('myrole', self.hosts)
+        failed = [result.host.host for result in results if not result.ok]
+        self.assertEqual(failed, ['host13'])
+        # 3 chunks and 10 hosts of the failed chunk.
+        self.assertEqual(len(self.server.requests), 13)
+        self.assertRegex(repr(results[13]), '<K2hr3MemberResult .*>')
+
+    def test_role_members_rejected_code(self):
+        """Reports the status code and the message of a rejected host."""
+        def app(req):
+            if 'host13' in [host['host'] for host in req.json()['host']]:
+                return 403, {}, {'result': False, 'message': 'forbidden'}
+            return 200, {}, {'result': True, 'message': None}
+        self.server.app = app
+        members = kmembership.K2hr3RoleMembers(self.httpreq, 'token',
+                                               chunk_size=10)
+        results = members.add('myrole', self.hosts)
+        self.assertFalse(results[13].ok)
+        self.assertEqual(results[13].code, 403)
+        self.assertEqual(results[13].error, 'forbidden')
+        self.assertEqual(results[12].code, 200)
+
+    def test_role_members_failure_without_isolate(self):
+        """Reports the hosts of a failed chunk as failed."""
+        self.server.app = lambda req: (
+            200, {}, {'result': False, 'message': 'no role'})
+        members = kmembership.K2hr3RoleMembers(
+            self.httpreq, 'token', chunk_size=10, isolate=False)
+        results = members.add('myrole', self.hosts)
+        self.assertFalse(any(result.ok for result in results))
+        self.assertEqual(results[0].error, 'no role')
+        self.assertEqual(results[0].code, 200)
+        self.assertEqual(len(self.server.requests), 3)
+
+
+class TestK2hr3RoleMembershipSync(unittest.TestCase):
+    """Tests the K2hr3RoleMembershipSync class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_membership.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.server.app = self._app
+        self.httpreq = khttp.K2hr3Http(self.server.baseurl)
+        self.members = {
+            'hostnames': ['host1 8080 cuk1 extra1', 'host2 * cuk2'],
+            'ips': ['10.0.0.1 0']
+        }
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def _app(self, req):
+        if req.method == 'GET':
+            return 200, {}, {'result': True, 'message': None,
+                             'role': {'policies': [], 'aliases': [],
+                                      'hosts': self.members}}
+        return 200, {}, {'result': True, 'message': None}
+
+    def test_member_key(self):
+        """Normalizes the keys of the members."""
+        host = krole.K2hr3RoleHost('host1', 8080, None, 'extra', None, None,
+                                   None)
+        self.assertEqual(kmembership.member_key(host), ('host1', '8080', ''))
+        self.assertEqual(kmembership.member_key('host2 * cuk2 extra'),
+                         ('host2', '0', 'cuk2'))
+        self.assertEqual(kmembership.member_key(('host3',)),
+                         ('host3', '0', ''))
+        self.assertEqual(
+            kmembership.member_key({'host': 'host4', 'port': '0',
+                                    'cuk': 'cuk4'}),
+            ('host4', '0', 'cuk4'))
+        with self.assertRaises(K2hr3Exception):
+            kmembership.member_key(('', 8080))
+
+    def test_membership_sync_diff(self):
+        """Computes the hosts to add and the members to delete."""
+        members = {
+            ('host1', '8080', ''): krole.K2hr3RoleHost(
+                'host1', '8080', '', None, None, None, None),
+            ('host2', '0', ''): krole.K2hr3RoleHost(
+                'host2', '0', '', None, None, None, None),
+        }
+        adds, deletes = kmembership.K2hr3RoleMembershipSync.diff(
+            [('host1', 8080, None), ('host3', 8080, None),
+             ('host3', '8080', '')], members)
+        self.assertEqual([host.host for host in adds], ['host3'])
+        self.assertEqual([host.host for host in deletes], ['host2'])
+
+    def test_membership_sync_unchanged(self):
+        """Sends nothing but the role details if nothing changed."""
+        sync = kmembership.K2hr3RoleMembershipSync(self.httpreq, 'token')
+        result = sync.sync('myrole', [('10.0.0.1', None, None),
+                                      ('host2', '*', 'cuk2'),
+                                      ('host1', 8080, 'cuk1')])
+        self.assertTrue(result.ok)
+        self.assertEqual(result.unchanged, 3)
+        self.assertEqual((result.added, result.deleted), ([], []))
+        self.assertEqual(len(self.server.requests), 1)
+        req = self.server.requests[0]
+        self.assertEqual((req.method, req.path), ('GET', '/v1/role/myrole'))
+        self.assertEqual(req.query['expand'], ['False'])
+
+    def test_membership_sync(self):
+        """Adds the missing hosts and deletes the other members."""
+        sync = kmembership.K2hr3RoleMembershipSync(self.httpreq, 'token')
+        host3 = krole.K2hr3RoleHost('host3', '8080', None, 'extra3', None,
+                                    None, None)
+        result = sync.sync('myrole', [('host1', 8080, 'cuk1'), host3])
+        self.assertTrue(result.ok)
+        self.assertRegex(repr(result), '<K2hr3SyncResult .*>')
+        self.assertEqual(result.unchanged, 1)
+        self.assertEqual([r.host for r in result.added], [host3])
+        self.assertEqual(sorted(r.host.host for r in result.deleted),
+                         ['10.0.0.1', 'host2'])
+        methods = sorted(req.method for req in self.server.requests)
+        self.assertEqual(methods, ['DELETE', 'DELETE', 'GET', 'POST'])
+        post = [req for req in self.server.requests if req.method == 'POST']
+        self.assertEqual(post[0].json()['host'][0]['extra'], 'extra3')
+        deletes = sorted((req.query['host'][0], req.query['port'][0],
+                          req.query.get('cuk', [''])[0])
+                         for req in self.server.requests
+                         if req.method == 'DELETE')
+        self.assertEqual(deletes, [('10.0.0.1', '0', ''),
+                                   ('host2', '0', 'cuk2')])
+
+    def test_membership_sync_failure(self):
+        """Reports the failed deletes and fails if the role is not found."""
+        sync = kmembership.K2hr3RoleMembershipSync(self.httpreq, 'token')
+        self.server.app = lambda req: (
+            (404, {}, {'result': False, 'message': 'no role'})
+            if req.method == 'DELETE' else self._app(req))
+        result = sync.sync('myrole', [('host1', 8080, 'cuk1')])
+        self.assertFalse(result.ok)
+        self.assertEqual(len(result.deleted), 2)
+        self.assertFalse(any(r.ok for r in result.deleted))
+        self.server.app = lambda req: (
+            404, {}, {'result': False, 'message': 'no role'})
+        with self.assertRaises(K2hr3Exception):
+            sync.sync('myrole', [])
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import logging
+import random
+import re
+import threading
+import time
+import unittest
+import urllib.parse
+
+from k2hr3client import http as khttp
+from k2hr3client import policyengine as kpolicyengine
+from k2hr3client.api import K2hr3HTTPMethod
+from k2hr3client.exception import K2hr3Exception
+from k2hr3client.policy import K2hr3Policy
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+_POLICY = 'yrn:yahoo:::demo:policy:'
+_RESOURCE = 'yrn:yahoo:::demo:resource:'
+_READ = 'yrn:yahoo::::action:read'
+_WRITE = 'yrn:yahoo::::action:write'
+
+
+def _matches(pattern, yrn):
+    """Return True if a pattern matches a yrn by a linear comparison."""
+    patterns = re.split('[:/]', pattern)
+    segments = re.split('[:/]', yrn)
+    return len(patterns) == len(segments) and all(
+        p in ('*', s) for p, s in zip(patterns, segments))
+
+
+class K2hr3PolicyServer():
+    """Stub server of the policy API evaluating the policies by a scan."""
+
+    def __init__(self, policies):
+        """Init the members."""
+        self.policies = policies
+
+    def _allowed(self, name, resource, action):
+        effects = set()
+        names, seen = [name], {name}
+        while names:
+            policy = self.policies[names.pop()]
+            if action in policy['action'] and any(
+                    _matches(pattern, resource)
+                    for pattern in policy['resource']):
+                effects.add(policy['effect'])
+            for alias in policy['alias']:
+                if alias not in seen:
+                    seen.add(alias)
+                    names.append(alias)
+        return 'allow' in effects and 'deny' not in effects
+
+    def __call__(self, req):
+        """Return the response of a request."""
+        name = urllib.parse.unquote(req.path.split('/', 3)[3])
+        if name not in self.policies:
+            return 404, {}, {'result': False, 'message': 'no policy'}
+        if req.method == 'HEAD':
+            resource = kpolicyengine.full_yrn(
+                req.query['resource'][0], 'resource',
+                req.query['tenant'][0])
+            if self._allowed(name, resource, req.query['action'][0]):
+                return 204, {}, None
+            return 403, {}, None
+        return 200, {}, {'result': True, 'message': None, 'policy': dict(
+            self.policies[name], name=name, condition=None, reference=0)}
+
+
+class TestK2hr3YrnTrie(unittest.TestCase):
+    """Tests the K2hr3YrnTrie class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_policyengine.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def test_full_yrn(self):
+        """Returns the yrn full path of a name."""
+        self.assertEqual(kpolicyengine.full_yrn('a/b', 'resource', 'demo'),
+                         f'{_RESOURCE}a/b')
+        self.assertEqual(kpolicyengine.full_yrn('p', 'policy', 'demo', 's'),
+                         'yrn:yahoo:s::demo:policy:p')
+        self.assertEqual(kpolicyengine.full_yrn(f'{_RESOURCE}a', 'resource',
+                                                'other'), f'{_RESOURCE}a')
+
+    def test_trie_match(self):
+        """Matches the patterns by the segments."""
+        trie = kpolicyengine.K2hr3YrnTrie()
+        trie.add(f'{_RESOURCE}a', 1)
+        trie.add(f'{_RESOURCE}a/*', 2)
+        trie.add(f'{_RESOURCE}*/b', 3)
+        trie.add(f'{_RESOURCE}a', 4)
+        self.assertEqual(len(trie), 3)
+        self.assertRegex(repr(trie), '<K2hr3YrnTrie .*>')
+        self.assertEqual(trie.match(f'{_RESOURCE}a'), {1, 4})
+        self.assertEqual(trie.match(f'{_RESOURCE}a/b'), {2, 3})
+        self.assertEqual(trie.match(f'{_RESOURCE}c/b'), {3})
+        self.assertEqual(trie.match(f'{_RESOURCE}a/b/c'), set())
+        self.assertEqual(trie.match('yrn:yahoo:::other:resource:a'), set())
+
+    def test_matcher_deny_wins(self):
+        """Denies if a denying rule matches."""
+        matcher = kpolicyengine.K2hr3PolicyMatcher(f'{_POLICY}p', [
+            {'name': f'{_POLICY}p', 'effect': 'allow', 'action': [_READ],
+             'resource': [f'{_RESOURCE}*']},
+            {'name': f'{_POLICY}q', 'effect': 'deny', 'action': [_READ],
+             'resource': [f'{_RESOURCE}secret']},
+        ])
+        self.assertEqual(matcher.policies, (f'{_POLICY}p', f'{_POLICY}q'))
+        self.assertTrue(matcher.allowed(f'{_RESOURCE}a', _READ))
+        self.assertFalse(matcher.allowed(f'{_RESOURCE}secret', _READ))
+        self.assertFalse(matcher.allowed(f'{_RESOURCE}a', _WRITE))
+        with self.assertRaises(K2hr3Exception):
+            kpolicyengine.K2hr3PolicyMatcher('p', [{'effect': 'maybe'}])
+
+
+class TestK2hr3PolicyEngine(unittest.TestCase):
+    """Tests the K2hr3PolicyEngine class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_policyengine.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.policies = {
+            f'{_POLICY}p': {'effect': 'allow', 'action': [_READ],
+                            'resource': [f'{_RESOURCE}a'],
+                            'alias': []},
+        }
+        self.stub = K2hr3PolicyServer(self.policies)
+        self.server = K2hr3FakeServer(self.stub).__enter__()
+        self.httpreq = khttp.K2hr3Http(self.server.baseurl)
+        self.now = 0.0
+        self.engine = kpolicyengine.K2hr3PolicyEngine(
+            self.httpreq, 'token', ttl=10.0, clock=lambda: self.now)
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.engine.close()
+        self.server.__exit__(None, None, None)
+
+    def _gets(self):
+        return [req for req in self.server.requests if req.method == 'GET']
+
+    def _wait_gets(self, count):
+        for _ in range(100):
+            if len(self._gets()) >= count:
+                return
+            time.sleep(0.01)
+
+    def _head(self, name, tenant, resource, action):
+        request = K2hr3Policy('token').validate(
+            kpolicyengine.full_yrn(name, 'policy', tenant), tenant,
+            resource, action).request(K2hr3HTTPMethod.HEAD)
+        return self.httpreq.send(request, errors=True).code == 204
+
+    def test_engine_repr(self):
+        """Represents a K2hr3PolicyEngine instance."""
+        self.assertRegex(repr(self.engine), '<K2hr3PolicyEngine .*>')
+        with self.assertRaises(K2hr3Exception):
+            kpolicyengine.K2hr3PolicyEngine(self.httpreq, 'token', ttl=-1)
+
+    def test_engine_validates_in_memory(self):
+        """Fetches a policy once and answers in memory."""
+        for _ in range(100):
+            self.assertTrue(self.engine.validate('p', 'demo', 'a', _READ))
+            self.assertFalse(self.engine.validate('p', 'demo', 'b', _READ))
+            self.assertFalse(self.engine.validate('p', 'demo', 'a', _WRITE))
+        gets = self._gets()
+        self.assertEqual(len(gets), 1)
+        self.assertEqual(gets[0].path, f'/v1/policy/{_POLICY}p')
+        self.assertEqual(gets[0].headers['x-auth-token'], 'U=token')
+
+    def test_engine_resolves_aliases(self):
+        """Evaluates the aliases of a policy once even if they loop."""
+        self.policies[f'{_POLICY}p']['alias'] = [f'{_POLICY}q']
+        self.policies[f'{_POLICY}q'] = {
+            'effect': 'deny', 'action': [_READ],
+            'resource': [f'{_RESOURCE}a'], 'alias': [f'{_POLICY}p']}
+        self.assertFalse(self.engine.validate('p', 'demo', 'a', _READ))
+        self.assertEqual(len(self._gets()), 2)
+        engine = kpolicyengine.K2hr3PolicyEngine(self.httpreq, 'token',
+                                                 max_aliases=0)
+        with self.assertRaises(K2hr3Exception):
+            engine.validate('p', 'demo', 'a', _READ)
+        engine.close()
+
+    def test_engine_max_aliases(self):
+        """Allows max_aliases aliases of a policy and no more."""
+        self.policies[f'{_POLICY}p']['alias'] = [f'{_POLICY}q']
+        for name in ('q', 'r'):
+            self.policies[f'{_POLICY}{name}'] = {
+                'effect': 'allow', 'action': [_READ],
+                'resource': [f'{_RESOURCE}a'], 'alias': []}
+        engine = kpolicyengine.K2hr3PolicyEngine(self.httpreq, 'token',
+                                                 max_aliases=1)
+        self.assertTrue(engine.validate('p', 'demo', 'a', _READ))
+        self.policies[f'{_POLICY}p']['alias'].append(f'{_POLICY}r')
+        engine.invalidate()
+        with self.assertRaises(K2hr3Exception):
+            engine.validate('p', 'demo', 'a', _READ)
+        engine.close()
+
+    def test_engine_refreshes_in_background(self):
+        """Answers by the old policy while it is refreshed."""
+        self.assertTrue(self.engine.validate('p', 'demo', 'a', _READ))
+        self.policies[f'{_POLICY}p']['effect'] = 'deny'
+        self.now = 11.0
+        self.assertTrue(self.engine.validate('p', 'demo', 'a', _READ))
+        self._wait_gets(2)
+        self.engine.close()
+        self.assertFalse(self.engine.validate('p', 'demo', 'a', _READ))
+        self.assertEqual(len(self._gets()), 2)
+
+    def test_engine_invalidate(self):
+        """Fetches the policy again after it is invalidated."""
+        self.policies[f'{_POLICY}p']['alias'] = [f'{_POLICY}q']
+        self.policies[f'{_POLICY}q'] = {
+            'effect': 'allow', 'action': [_READ],
+            'resource': [f'{_RESOURCE}b'], 'alias': []}
+        self.assertTrue(self.engine.validate('p', 'demo', 'b', _READ))
+        self.policies[f'{_POLICY}q']['effect'] = 'deny'
+        self.engine.invalidate('q', 'demo')
+        self.assertFalse(self.engine.validate('p', 'demo', 'b', _READ))
+        self.engine.invalidate()
+        self.engine.validate('p', 'demo', 'b', _READ)
+        self.assertEqual(len(self._gets()), 6)
+
+    def test_engine_no_policy(self):
+        """Raises K2hr3Exception if the policy could not be fetched."""
+        with self.assertRaises(K2hr3Exception):
+            self.engine.validate('nothing', 'demo', 'a', _READ)
+
+    def test_engine_concurrent_first_use(self):
+        """Fetches a policy once for the concurrent callers."""
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            self.engine.validate('p', 'demo', 'a', _READ)))
+            for _ in range(8)]
+        self.server.delay = 0.05
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [True] * 8)
+        self.assertEqual(len(self._gets()), 1)
+
+    def test_engine_differential(self):
+        """Answers the same as the server implementing the same rules."""
+        rand = random.Random(23)
+        names = ['a', 'b', 'a/b', 'a/c', 'b/c', 'a/b/c']
+        patterns = names + ['*', 'a/*', '*/c', '*/*/c']
+        self.policies.clear()
+        for i in range(6):
+            self.policies[f'{_POLICY}p{i}'] = {
+                'effect': rand.choice(['allow', 'allow', 'deny']),
+                'action': rand.sample([_READ, _WRITE], rand.randint(1, 2)),
+                'resource': [f'{_RESOURCE}{pattern}' for pattern in
+                             rand.sample(patterns, rand.randint(1, 4))],
+                'alias': [f'{_POLICY}p{j}' for j in range(6)
+                          if j != i and rand.random() < 0.2],
+            }
+        answers = set()
+        for _ in range(200):
+            args = (f'p{rand.randrange(6)}', 'demo', rand.choice(names),
+                    rand.choice([_READ, _WRITE]))
+            answer = self.engine.validate(*args)
+            self.assertEqual(answer, self._head(*args), args)
+            answers.add(answer)
+        self.assertEqual(answers, {True, False})
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
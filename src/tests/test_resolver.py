@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import logging
+import socket
+import time
+import unittest
+from unittest.mock import patch
+
+from k2hr3client import asynchttp as kasynchttp
+from k2hr3client import http as khttp
+from k2hr3client import resolver as kresolver
+from k2hr3client import version as kversion
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+def _addrinfo(port, *hosts):
+    """Return the getaddrinfo result of the addresses."""
+    return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '',
+             (host, port)) for host in hosts]
+
+
+def _closed_port():
+    """Return a local port that refuses connections."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestK2hr3Resolver(unittest.TestCase):
+    """Tests the K2hr3Resolver class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_resolver.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.resolver = kresolver.K2hr3Resolver(ttl=60)
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def test_resolver_construct(self):
+        """Creates a K2hr3Resolver instance."""
+        self.assertIsInstance(self.resolver, kresolver.K2hr3Resolver)
+        self.assertRegex(repr(self.resolver), '<K2hr3Resolver .*>')
+        self.assertIsInstance(kresolver.get_resolver(),
+                              kresolver.K2hr3Resolver)
+
+    def test_resolver_caches_addresses(self):
+        """Resolves a host once in the ttl."""
+        with patch('socket.getaddrinfo',
+                   return_value=_addrinfo(80, '192.0.2.1')) as mock:
+            for _ in range(3):
+                addrinfos = self.resolver.resolve('k2hr3.test', 80)
+        self.assertEqual(addrinfos[0][4], ('192.0.2.1', 80))
+        self.assertEqual(mock.call_count, 1)
+
+    def test_resolver_expires_addresses(self):
+        """Resolves a host again after the ttl."""
+        resolver = kresolver.K2hr3Resolver(ttl=0.01)
+        with patch('socket.getaddrinfo',
+                   return_value=_addrinfo(80, '192.0.2.1')) as mock:
+            resolver.resolve('k2hr3.test', 80)
+            time.sleep(0.02)
+            self.assertIsNone(resolver.cached('k2hr3.test', 80))
+            resolver.resolve('k2hr3.test', 80)
+        self.assertEqual(mock.call_count, 2)
+
+    def test_resolver_caches_failure(self):
+        """Keeps a failed lookup for negative_ttl."""
+        with patch('socket.getaddrinfo',
+                   side_effect=socket.gaierror('not found')) as mock:
+            for _ in range(2):
+                with self.assertRaises(OSError):
+                    self.resolver.resolve('k2hr3.test', 80)
+        self.assertEqual(mock.call_count, 1)
+
+    def test_resolver_round_robin(self):
+        """Rotates the addresses of a host."""
+        with patch('socket.getaddrinfo',
+                   return_value=_addrinfo(80, '192.0.2.1', '192.0.2.2')):
+            firsts = [self.resolver.resolve('k2hr3.test', 80)[0][4][0]
+                      for _ in range(4)]
+        self.assertEqual(firsts, ['192.0.2.1', '192.0.2.2'] * 2)
+
+    def test_resolver_falls_back(self):
+        """Connects to the next address and tries the failed one last."""
+        with K2hr3FakeServer() as server:
+            addrinfos = _addrinfo(server.port, '127.0.0.1') + \
+                _addrinfo(_closed_port(), '127.0.0.1')
+            addrinfos.reverse()
+            with patch('socket.getaddrinfo', return_value=addrinfos):
+                sock = self.resolver.create_connection('k2hr3.test', 80, 5)
+                sock.close()
+                for _ in range(2):
+                    addrinfo = self.resolver.resolve('k2hr3.test', 80)[0]
+                    self.assertEqual(addrinfo[4][1], server.port)
+
+    def test_invalidate(self):
+        """Drops the cached addresses."""
+        with patch('socket.getaddrinfo',
+                   return_value=_addrinfo(80, '192.0.2.1')):
+            self.resolver.resolve('k2hr3.test', 80)
+        self.resolver.invalidate('k2hr3.test')
+        self.assertIsNone(self.resolver.cached('k2hr3.test', 80))
+
+
+class TestK2hr3LazyResolution(unittest.TestCase):
+    """Tests the lazy resolution of K2hr3Http.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_resolver.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.resolver = kresolver.K2hr3Resolver()
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def test_construct_does_not_resolve(self):
+        """Does not resolve the host when a client is created."""
+        with patch('socket.getaddrinfo') as getaddrinfo, \
+                patch('socket.gethostbyname') as gethostbyname:
+            khttp.K2hr3Http('http://k2hr3.test:18080')
+        getaddrinfo.assert_not_called()
+        gethostbyname.assert_not_called()
+
+    def test_pool_connects_to_cached_address(self):
+        """Connects to the address cached by the resolver."""
+        pool = khttp.K2hr3ConnectionPool(idle_timeout=0,
+                                         resolver=self.resolver)
+        httpreq = khttp.K2hr3Http(f'http://k2hr3.test:{self.server.port}',
+                                  pool=pool)
+        with patch('socket.getaddrinfo',
+                   return_value=_addrinfo(self.server.port,
+                                          '127.0.0.1')) as mock:
+            for _ in range(2):
+                myversion = kversion.K2hr3Version("v1")
+                myversion.get()
+                self.assertTrue(httpreq.GET(myversion))
+        self.assertEqual(mock.call_count, 1)
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(self.server.requests[0].headers['Host'],
+                         f'k2hr3.test:{self.server.port}')
+        pool.clear()
+
+
+class TestAsyncK2hr3LazyResolution(unittest.IsolatedAsyncioTestCase):
+    """Tests the resolution of AsyncK2hr3Http.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_resolver.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    async def test_async_pool_falls_back(self):
+        """Connects to the next address if an address fails."""
+        resolver = kresolver.K2hr3Resolver()
+        addrinfos = _addrinfo(_closed_port(), '127.0.0.1') + \
+            _addrinfo(self.server.port, '127.0.0.1')
+        pool = kasynchttp.AsyncK2hr3ConnectionPool(resolver=resolver)
+        with patch('socket.getaddrinfo', return_value=addrinfos):
+            async with kasynchttp.AsyncK2hr3Http(
+                    f'http://k2hr3.test:{self.server.port}',
+                    pool=pool) as client:
+                myversion = kversion.K2hr3Version("v1")
+                myversion.get()
+                self.assertTrue(await client.get(myversion))
+        self.assertEqual(len(self.server.requests), 1)
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -21,12 +21,16 @@
 """Test Package for K2hr3 Python Client."""
 import json
 import logging
+import os
+from pathlib import Path
+import tempfile
 import unittest
 from unittest.mock import patch
 import urllib.parse
 
 from k2hr3client import http as khttp
 from k2hr3client import resource as kresource
+from k2hr3client.exception import K2hr3Exception
 
 LOG = logging.getLogger(__name__)
 
@@ -73,6 +77,54 @@ class TestK2hr3Resource(unittest.TestCase):
         resource = kresource.K2hr3Resource("token")
         self.assertIsInstance(resource, kresource.K2hr3Resource)
 
+    def test_resource_create_resource_from_template(self):
+        """Renders a template file as the data."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'resource.txt'
+            path.write_text('cluster: __TROVE_K2HDKC_CLUSTER_NAME__\n'
+                            'tenant: __TROVE_K2HDKC_TENANT_NAME__\n'
+                            'path: __TROVE_K2HDKC_CLUSTER_NAME__\\d\n')
+            myresource = kresource.K2hr3Resource("token")
+            myresource.create_conf_resource(
+                self.name, self.data_type, path, self.tenant,
+                'my\\1cluster', self.keys)
+            self.assertEqual(myresource.data,
+                             'cluster: my\\1cluster\n'
+                             'tenant: mytenant\n'
+                             'path: my\\1cluster\\d\n')
+
+            # the data is cached until the file is modified.
+            data = kresource.render_template(path, 'a', 'b')
+            self.assertIs(kresource.render_template(path, 'a', 'b'), data)
+            path.write_text('__TROVE_K2HDKC_TENANT_NAME__')
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertEqual(kresource.render_template(path, 'a', 'b'), 'a')
+
+    def test_resource_create_resource_from_template_error(self):
+        """Raises if the template is not a file or the data is too big."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(K2hr3Exception):
+                kresource.render_template(Path(tmpdir), 'a', 'b')
+            path = Path(tmpdir) / 'resource.txt'
+            with self.assertRaises(K2hr3Exception):
+                kresource.render_template(path, 'a', 'b')
+            # 8191 characters become 8193 with a tenant name of 30.
+            path.write_text('x' * (8191 - 28) +
+                            '__TROVE_K2HDKC_TENANT_NAME__')
+            self.assertEqual(
+                len(kresource.render_template(path, 'a' * 28, 'b')), 8191)
+            with self.assertRaises(K2hr3Exception):
+                kresource.render_template(path, 'a' * 30, 'b')
+            # a file bigger than max_length is read up to max_length.
+            path.write_text('__TROVE_K2HDKC_TENANT_NAME__\n' * 10)
+            self.assertEqual(
+                kresource.render_template(path, 'a', 'b', max_length=100),
+                'a\n' * 10)
+            with self.assertRaises(K2hr3Exception):
+                kresource.render_template(path, 'a' * 10, 'b',
+                                          max_length=100)
+
     def test_k2hr3resource_repr(self):
         """Represent a K2hr3Resource instance."""
         resource = kresource.K2hr3Resource("token")
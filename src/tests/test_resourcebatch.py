@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import logging
+from pathlib import Path
+import tempfile
+import unittest
+
+from k2hr3client import http as khttp
+from k2hr3client import resourcebatch as kresourcebatch
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+class TestK2hr3ResourceBatch(unittest.TestCase):
+    """Tests the K2hr3ResourceBatch class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_resourcebatch.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.server.app = self._app
+        self.resources = {
+            'res1': {'string': 'data1', 'object': None,
+                     'keys': {'k': 'v'}, 'aliases': []},
+            'res2': {'string': None, 'object': {'port': 8020},
+                     'keys': {}, 'aliases': ['yrn:yahoo:::demo:resource:a']},
+        }
+        self.httpreq = khttp.K2hr3Http(self.server.baseurl)
+        self.batch = kresourcebatch.K2hr3ResourceBatch(
+            self.httpreq, 'token', max_workers=4, tenant='mytenant',
+            cluster_name='mycluster')
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def _app(self, req):
+        if req.method == 'GET':
+            name = req.path[len('/v1/resource/'):]
+            if name not in self.resources:
+                return 404, {}, {'result': False, 'message': 'no resource'}
+            return 200, {}, {'result': True, 'message': None,
+                             'resource': self.resources[name]}
+        resource = req.json()['resource']
+        if resource['name'] == 'bad':
+            return 200, {}, {'result': False, 'message': 'bad resource'}
+        if resource['name'] == 'denied':
+            return 403, {}, {'result': False, 'message': 'forbidden'}
+        return 201, {}, {'result': True, 'message': None}
+
+    def _posted(self):
+        return sorted(req.json()['resource']['name']
+                      for req in self.server.requests if req.method == 'POST')
+
+    def test_resource_spec(self):
+        """Validates the specs locally."""
+        spec = kresourcebatch.K2hr3ResourceSpec('/res1/', data='data')
+        self.assertEqual((spec.name, spec.data_type, spec.data),
+                         ('res1', 'string', 'data'))
+        self.assertRegex(repr(spec), '<K2hr3ResourceSpec .*>')
+        for args in [{'name': ''}, {'name': 1},
+                     {'name': 'res', 'data_type': 'int'},
+                     {'name': 'res', 'keys': []},
+                     {'name': 'res', 'alias': 'yrn'},
+                     {'name': 'res', 'alias': [1]}]:
+            with self.assertRaises(K2hr3Exception):
+                kresourcebatch.K2hr3ResourceSpec(**args)
+        with self.assertRaises(K2hr3Exception):
+            self.batch.create([spec, kresourcebatch.K2hr3ResourceSpec('res1')])
+        with self.assertRaises(K2hr3Exception):
+            self.batch.create(['res1'])
+        with self.assertRaises(K2hr3Exception):
+            kresourcebatch.K2hr3ResourceBatch(self.httpreq, 'token',
+                                              max_workers=0)
+        self.assertEqual(self.server.requests, [])
+
+    def test_resource_batch_create(self):
+        """Creates the resources concurrently and reports every spec."""
+        specs = [kresourcebatch.K2hr3ResourceSpec(f'res{i}', data=f'{i}')
+                 for i in range(10)]
+        specs.insert(3, kresourcebatch.K2hr3ResourceSpec('bad'))
+        specs.insert(5, kresourcebatch.K2hr3ResourceSpec('denied'))
+        results = self.batch.create(specs)
+        self.assertEqual([result.spec for result in results], specs)
+        self.assertEqual([result.ok for result in results],
+                         [True] * 3 + [False, True, False] + [True] * 6)
+        self.assertEqual(results[3].error, 'bad resource')
+        self.assertEqual(results[3].code, 200)
+        self.assertEqual(results[5].error, 'forbidden')
+        self.assertEqual(results[5].code, 403)
+        self.assertEqual(results[0].code, 201)
+        self.assertEqual(results[0].action, 'created')
+        self.assertRegex(repr(results[0]), '<K2hr3ResourceResult .*>')
+        self.assertEqual(len(self._posted()), 12)
+        self.assertTrue(all(req.path == '/v1/resource'
+                            for req in self.server.requests))
+
+    def test_resource_batch_create_or_update(self):
+        """Skips the unchanged resources."""
+        specs = [
+            kresourcebatch.K2hr3ResourceSpec('res1', data='data1',
+                                             keys={'k': 'v'}),
+            kresourcebatch.K2hr3ResourceSpec(
+                'res2', 'object', {'port': 8020},
+                alias=['yrn:yahoo:::demo:resource:a']),
+            kresourcebatch.K2hr3ResourceSpec('res3', data='data3'),
+        ]
+        results = self.batch.create_or_update(specs)
+        self.assertEqual([result.action for result in results],
+                         ['skipped', 'skipped', 'created'])
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(self._posted(), ['res3'])
+
+        # a modified resource is updated.
+        specs[0] = kresourcebatch.K2hr3ResourceSpec('res1', data='data1')
+        self.server.requests.clear()
+        results = self.batch.create_or_update(specs, listing={
+            'res1': self.resources['res1'], 'res2': self.resources['res2'],
+            'res3': {'string': 'data3'}})
+        self.assertEqual([result.action for result in results],
+                         ['updated', 'skipped', 'skipped'])
+        self.assertEqual(self._posted(), ['res1'])
+        self.assertEqual([req.method for req in self.server.requests],
+                         ['POST'])
+
+    def test_resource_batch_template(self):
+        """Compares the rendered template data."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'resource.txt'
+            path.write_text('__TROVE_K2HDKC_CLUSTER_NAME__')
+            spec = kresourcebatch.K2hr3ResourceSpec('res3', data=path)
+            self.resources['res3'] = {'string': 'mycluster'}
+            results = self.batch.create_or_update([spec])
+            self.assertEqual(results[0].action, 'skipped')
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import logging
+import threading
+import time
+import unittest
+
+from k2hr3client import http as khttp
+from k2hr3client import resource as kresource
+from k2hr3client import resourcecache as kresourcecache
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+class TestK2hr3ResourceCache(unittest.TestCase):
+    """Tests the K2hr3ResourceCache class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_resourcecache.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.server.app = self._app
+        self.etag = 'W/"1"'
+        self.data = 'data1'
+        self.httpreq = khttp.K2hr3Http(self.server.baseurl)
+        self.now = 1000.0
+        self.cache = kresourcecache.K2hr3ResourceCache(
+            self.httpreq, ttl=10.0, stale_ttl=60.0, maxsize=2,
+            clock=lambda: self.now)
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.cache.close()
+        self.server.__exit__(None, None, None)
+
+    def _app(self, req):
+        if self.etag and req.headers.get('If-None-Match') == self.etag:
+            return 304, {'ETag': self.etag}, b''
+        headers = {'ETag': self.etag} if self.etag else {
+            'Last-Modified': 'Mon, 14 Sep 2020 00:00:00 GMT'}
+        return 200, headers, {'result': True, 'message': None,
+                              'resource': self.data}
+
+    @staticmethod
+    def _resource(path='test_resource', expand=False):
+        return kresource.K2hr3Resource('token', resource_path=path).get(
+            expand=expand)
+
+    def _wait_for_requests(self, count):
+        for _ in range(100):
+            if len(self.server.requests) >= count and \
+                    not self.cache._flight.in_flight(  # pylint: disable=protected-access # noqa
+                        kresourcecache.resource_key(self._resource())):
+                return
+            time.sleep(0.01)
+
+    def test_resourcecache_construct(self):
+        """Creates a K2hr3ResourceCache instance."""
+        self.assertRegex(repr(self.cache), '<K2hr3ResourceCache .*>')
+        with self.assertRaises(K2hr3Exception):
+            kresourcecache.K2hr3ResourceCache(self.httpreq, stale_ttl=-1)
+
+    def test_resource_key(self):
+        """Keys the resources by the token type and the url parameters."""
+        by_token = kresourcecache.resource_key(self._resource())
+        by_roletoken = kresourcecache.resource_key(
+            kresource.K2hr3Resource(roletoken='token',
+                                    resource_path='test_resource').get())
+        self.assertNotEqual(by_token, by_roletoken)
+        self.assertNotEqual(by_token, kresourcecache.resource_key(
+            self._resource(expand=True)))
+        keys = [kresourcecache.resource_key(
+            kresource.K2hr3Resource(roletoken='token').get_with_roletoken(
+                'string', keys)) for keys in ({'a': 1, 'b': 2},
+                                              {'b': 2, 'a': 1})]
+        self.assertEqual(keys[0], keys[1])
+        with self.assertRaises(K2hr3Exception):
+            kresourcecache.resource_key(
+                kresource.K2hr3Resource('token').validate('string', None))
+
+    def test_resourcecache_hit(self):
+        """Returns a fresh response without any request."""
+        resp = self.cache.get(self._resource())
+        self.assertEqual(resp.json()['resource'], 'data1')
+        self.now += 5
+        self.assertIs(self.cache.get(self._resource()), resp)
+        self.assertEqual(len(self.server.requests), 1)
+        self.cache.get(self._resource(expand=True))
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[0].query['expand'], ['False'])
+
+    def test_resourcecache_stale_while_revalidate(self):
+        """Returns the stale response and revalidates it by the ETag."""
+        resp = self.cache.get(self._resource())
+        self.now += 20
+        self.assertIs(self.cache.get(self._resource()), resp)
+        self._wait_for_requests(2)
+        self.assertEqual(self.server.requests[1].headers['If-None-Match'],
+                         'W/"1"')
+        # 304 extends the life of the response.
+        self.assertEqual(self.cache.peek(self._resource()).etag, 'W/"1"')
+        self.assertIs(self.cache.get(self._resource()), resp)
+        self.assertEqual(len(self.server.requests), 2)
+
+        # a modified resource is replaced in the background.
+        self.etag, self.data = 'W/"2"', 'data2'
+        self.now += 20
+        self.assertIs(self.cache.get(self._resource()), resp)
+        self._wait_for_requests(3)
+        self.assertEqual(
+            self.cache.get(self._resource()).json()['resource'], 'data2')
+
+    def test_resourcecache_queues_one_revalidation(self):
+        """Queues one revalidation of a stale response."""
+        self.cache.close()
+        self.cache = kresourcecache.K2hr3ResourceCache(
+            self.httpreq, ttl=10.0, stale_ttl=60.0, max_workers=1,
+            clock=lambda: self.now)
+        resp = self.cache.get(self._resource())
+        self.now += 20
+        gate = threading.Event()
+        self.cache._executor.submit(gate.wait)  # pylint: disable=protected-access # noqa
+        for _ in range(3):
+            self.assertIs(self.cache.get(self._resource()), resp)
+        gate.set()
+        self.cache.close()
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_resourcecache_last_modified(self):
+        """Revalidates the response by the Last-Modified."""
+        self.etag = None
+        self.cache.get(self._resource())
+        self.now += 100
+        resp = self.cache.get(self._resource())
+        self.assertEqual(resp.json()['resource'], 'data1')
+        self.assertEqual(
+            self.server.requests[1].headers['If-Modified-Since'],
+            'Mon, 14 Sep 2020 00:00:00 GMT')
+
+    def test_resourcecache_evicts_and_invalidates(self):
+        """Evicts the least recently used responses."""
+        for path in ('path1', 'path2', 'path3'):
+            self.cache.get(self._resource(path))
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.peek(self._resource('path1')))
+        self.cache.invalidate('path2')
+        self.assertEqual(len(self.cache), 1)
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_resourcecache_shares_fetch(self):
+        """Concurrent misses of the same resource send one request."""
+        self.server.delay = 0.1
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(self.cache.get(self._resource())))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 8)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_resourcecache_error(self):
+        """Does not cache the errors."""
+        self.server.app = lambda req: (
+            200, {}, {'result': False, 'message': 'no resource'})
+        resp = self.cache.get(self._resource())
+        self.assertFalse(resp.result)
+        self.assertEqual(len(self.cache), 0)
+        self.server.app = lambda req: (404, {}, {'result': False})
+        with self.assertRaises(K2hr3Exception):
+            self.cache.get(self._resource())
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import logging
+import time
+import unittest
+
+from k2hr3client import http as khttp
+from k2hr3client import resource as kresource
+from k2hr3client import resourcevalidator as kresourcevalidator
+from k2hr3client import retry as kretry
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+class TestK2hr3ResourceValidator(unittest.TestCase):
+    """Tests the K2hr3ResourceValidator class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_resourcevalidator.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.server.app = self._app
+        self.httpreq = khttp.K2hr3Http(
+            self.server.baseurl,
+            retry_policy=kretry.K2hr3RetryPolicy(retries=0))
+        self.now = 1000.0
+        self.validator = kresourcevalidator.K2hr3ResourceValidator(
+            self.httpreq, positive_ttl=60.0, negative_ttl=5.0,
+            max_workers=8, clock=lambda: self.now)
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.validator.close()
+        self.server.__exit__(None, None, None)
+
+    @staticmethod
+    def _app(req):
+        if req.path.endswith('/invalid'):
+            return 403, {}, b''
+        return 204, {}, b''
+
+    @staticmethod
+    def _check(name, roletoken='token'):
+        return kresource.K2hr3Resource(
+            roletoken=roletoken, resource_path=name).validate('string', None)
+
+    def test_validator_construct(self):
+        """Creates a K2hr3ResourceValidator instance."""
+        self.assertRegex(repr(self.validator), '<K2hr3ResourceValidator .*>')
+        with self.assertRaises(K2hr3Exception):
+            kresourcevalidator.K2hr3ResourceValidator(self.httpreq,
+                                                      negative_ttl=-1)
+        with self.assertRaises(K2hr3Exception):
+            self.validator.check(kresource.K2hr3Resource('token').get())
+
+    def test_validator_check_all(self):
+        """Sends the unique checks concurrently."""
+        self.server.delay = 0.2
+        checks = {f'label{i}': self._check(f'res{i % 6}') for i in range(12)}
+        checks['invalid'] = self._check('invalid')
+        start = time.monotonic()
+        results = self.validator.check_all(checks)
+        self.assertLess(time.monotonic() - start, 0.6)
+        self.assertEqual(len(self.server.requests), 7)
+        self.assertEqual(set(results), set(checks))
+        self.assertFalse(results.pop('invalid'))
+        self.assertTrue(all(results.values()))
+        self.assertEqual(self.server.requests[0].method, 'HEAD')
+
+        # the other token is another check.
+        self.assertTrue(self.validator.check(self._check('res0', 'other')))
+        self.assertEqual(len(self.server.requests), 8)
+
+    def test_validator_ttl(self):
+        """Reuses the positive and negative results for their ttl."""
+        self.assertTrue(self.validator.check(self._check('res')))
+        self.assertFalse(self.validator.check(self._check('invalid')))
+        self.now += 10
+        self.assertEqual(
+            self.validator.check_all({'a': self._check('res'),
+                                      'b': self._check('invalid')}),
+            {'a': True, 'b': False})
+        # only the negative result expired.
+        self.assertEqual(len(self.server.requests), 3)
+        self.validator.invalidate()
+        self.assertTrue(self.validator.check(self._check('res')))
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_validator_error(self):
+        """Returns None and does not cache the check not sent."""
+        self.server.app = lambda req: None
+        self.assertEqual(self.validator.check_all({'a': self._check('res')}),
+                         {'a': None})
+        self.server.app = self._app
+        self.assertTrue(self.validator.check(self._check('res')))
+
+    def test_validator_unavailable(self):
+        """Returns None and does not cache a 503 or a 429."""
+        for code in (503, 429):
+            self.server.app = lambda req, code=code: (code, {}, b'')
+            self.assertIsNone(self.validator.check(self._check('res')))
+        self.server.app = self._app
+        self.assertTrue(self.validator.check(self._check('res')))
+        self.assertEqual(len(self.server.requests), 3)
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
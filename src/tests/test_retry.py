@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import logging
+import socket
+import unittest
+from unittest.mock import patch
+
+from k2hr3client import asynchttp as kasynchttp
+from k2hr3client import http as khttp
+from k2hr3client import retry as kretry
+from k2hr3client import token as ktoken
+from k2hr3client import version as kversion
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+def _faults(*statuses):
+    """Return an app that fails with the statuses and then succeeds.
+
+    None in the statuses drops the connection without a response.
+    """
+    faults = list(statuses)
+
+    def app(req):  # pylint: disable=unused-argument
+        if faults:
+            status = faults.pop(0)
+            if status is None:
+                return None
+            return (status, {}, {'result': False})
+        return (201, {}, {'result': True, 'token': 'r3token'})
+    return app
+
+
+def _closed_port():
+    """Return a local port that refuses connections."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestK2hr3RetryPolicy(unittest.TestCase):
+    """Tests the K2hr3RetryPolicy class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_retry.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def test_retry_policy_construct(self):
+        """Creates a K2hr3RetryPolicy instance."""
+        policy = kretry.K2hr3RetryPolicy()
+        self.assertIsInstance(policy, kretry.K2hr3RetryPolicy)
+        self.assertRegex(repr(policy), '<K2hr3RetryPolicy .*>')
+        with self.assertRaises(K2hr3Exception):
+            kretry.K2hr3RetryPolicy(retries=-1)
+        with self.assertRaises(K2hr3Exception):
+            kretry.K2hr3RetryPolicy(deadline=0)
+
+    def test_retry_policy_backoff(self):
+        """Doubles the delay up to max_backoff."""
+        policy = kretry.K2hr3RetryPolicy(backoff=1, max_backoff=5,
+                                         jitter=False)
+        self.assertEqual([policy.backoff(i) for i in range(4)], [1, 2, 4, 5])
+        policy = kretry.K2hr3RetryPolicy(backoff=1, max_backoff=5)
+        for i in range(4):
+            self.assertTrue(0 <= policy.backoff(i) <= min(5, 2 ** i))
+
+    def test_retry_policy_is_retryable(self):
+        """Retries POST only if the request surely was not sent."""
+        policy = kretry.K2hr3RetryPolicy()
+        self.assertTrue(policy.is_retryable('GET'))
+        self.assertTrue(policy.is_retryable('PUT', 503))
+        self.assertFalse(policy.is_retryable('GET', 404))
+        self.assertFalse(policy.is_retryable('POST'))
+        self.assertFalse(policy.is_retryable('POST', 503))
+        self.assertTrue(policy.is_retryable('POST', sent=False))
+        policy = kretry.K2hr3RetryPolicy(retry_non_idempotent=True)
+        self.assertTrue(policy.is_retryable('POST', 503))
+
+    def test_retry_state_budget(self):
+        """Stops retrying when the budget is exhausted."""
+        policy = kretry.K2hr3RetryPolicy(retries=2, backoff=0.1,
+                                         jitter=False)
+        retry = policy.start()
+        self.assertEqual(retry.next_delay('GET'), 0.1)
+        self.assertEqual(retry.next_delay('GET', retry_after='2'), 2)
+        self.assertIsNone(retry.next_delay('GET'))
+        self.assertEqual(retry.attempt, 2)
+
+    def test_retry_state_caps_retry_after(self):
+        """Caps the delay of Retry-After by max_backoff."""
+        policy = kretry.K2hr3RetryPolicy(retries=2, backoff=0.1,
+                                         max_backoff=5.0, jitter=False)
+        self.assertEqual(policy.max_backoff, 5.0)
+        retry = policy.start()
+        self.assertEqual(retry.next_delay('GET', retry_after='86400'), 5.0)
+        self.assertEqual(retry.next_delay('GET', retry_after='3'), 3.0)
+
+    def test_retry_state_deadline(self):
+        """Stops retrying if the delay exceeds the deadline."""
+        policy = kretry.K2hr3RetryPolicy(retries=10, backoff=1,
+                                         jitter=False, deadline=0.5)
+        self.assertIsNone(policy.start().next_delay('GET'))
+
+
+class TestK2hr3HttpRetry(unittest.TestCase):
+    """Tests the retries of K2hr3Http with a fault injecting server.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_retry.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.pool = khttp.K2hr3ConnectionPool()
+        self.policy = kretry.K2hr3RetryPolicy(retries=3, backoff=0.001,
+                                              jitter=False)
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.pool.clear()
+        self.server.__exit__(None, None, None)
+
+    def _http(self, baseurl=None):
+        return khttp.K2hr3Http(baseurl or self.server.baseurl,
+                               pool=self.pool, retry_policy=self.policy)
+
+    def test_retry_unavailable(self):
+        """Retries GET on 503 with the original method."""
+        self.server.app = _faults(503, 503)
+        myversion = kversion.K2hr3Version("v1")
+        myversion.get()
+        self.assertTrue(self._http().GET(myversion))
+        self.assertEqual(myversion.resp.code, 201)
+        self.assertEqual([r.method for r in self.server.requests],
+                         ['GET'] * 3)
+
+    def test_retry_put_resends_put(self):
+        """Retries PUT as PUT, not as GET."""
+        self.server.app = _faults(None, 502)
+        myversion = kversion.K2hr3Version("v1")
+        myversion.get()
+        self.assertTrue(self._http().PUT(myversion))
+        self.assertEqual([r.method for r in self.server.requests],
+                         ['PUT'] * 3)
+
+    def test_retry_exhausted(self):
+        """Returns False when the retries are exhausted."""
+        self.server.app = _faults(503, 503, 503, 503)
+        myversion = kversion.K2hr3Version("v1")
+        myversion.get()
+        self.assertFalse(self._http().GET(myversion))
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_no_retry_post_after_send(self):
+        """Does not replay POST that may have reached the server."""
+        self.server.app = _faults(None)
+        mytoken = ktoken.K2hr3Token("demo", "openstacktoken")
+        mytoken.create()
+        self.assertFalse(self._http().POST(mytoken))
+        self.assertEqual(len(self.server.requests), 1)
+        self.server.app = _faults(503)
+        self.assertFalse(self._http().POST(mytoken))
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_retry_post_not_sent(self):
+        """Retries POST if the connection was refused."""
+        mytoken = ktoken.K2hr3Token("demo", "openstacktoken")
+        mytoken.create()
+        httpreq = self._http(f'http://127.0.0.1:{_closed_port()}')
+        retry = self.policy.start()
+        with patch.object(
+                kretry.K2hr3RetryPolicy, 'start', return_value=retry):
+            self.assertFalse(httpreq.POST(mytoken))
+        self.assertEqual(retry.attempt, 3)
+
+    def test_retry_deadline(self):
+        """Gives up when the deadline comes."""
+        self.policy = kretry.K2hr3RetryPolicy(retries=100, backoff=0.05,
+                                              jitter=False, deadline=0.3)
+        self.server.app = _faults(*([503] * 100))
+        myversion = kversion.K2hr3Version("v1")
+        myversion.get()
+        self.assertFalse(self._http().GET(myversion))
+        self.assertLess(len(self.server.requests), 5)
+
+    def test_retry_deadline_reached(self):
+        """Does not send a request after the deadline."""
+        myversion = kversion.K2hr3Version("v1")
+        myversion.get()
+        with patch.object(
+                kretry.K2hr3RetryState, 'time_left', return_value=0.0), \
+                patch.object(khttp.K2hr3ConnectionPool, 'request') as sent:
+            self.assertFalse(self._http().GET(myversion))
+        sent.assert_not_called()
+
+
+class TestAsyncK2hr3HttpRetry(unittest.IsolatedAsyncioTestCase):
+    """Tests the retries of AsyncK2hr3Http with a fault injecting server.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_retry.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.policy = kretry.K2hr3RetryPolicy(retries=3, backoff=0.001,
+                                              jitter=False)
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    async def test_async_retry_unavailable(self):
+        """Retries GET on 503 and a dropped connection."""
+        self.server.app = _faults(503, None)
+        async with kasynchttp.AsyncK2hr3Http(
+                self.server.baseurl, retry_policy=self.policy) as client:
+            myversion = kversion.K2hr3Version("v1")
+            myversion.get()
+            self.assertTrue(await client.get(myversion))
+        self.assertEqual([r.method for r in self.server.requests],
+                         ['GET'] * 3)
+
+    async def test_async_no_retry_post_after_send(self):
+        """Does not replay POST that may have reached the server."""
+        self.server.app = _faults(503)
+        async with kasynchttp.AsyncK2hr3Http(
+                self.server.baseurl, retry_policy=self.policy) as client:
+            mytoken = ktoken.K2hr3Token("demo", "openstacktoken")
+            self.assertFalse(await client.post(mytoken.create()))
+        self.assertEqual(len(self.server.requests), 1)
+
+    async def test_async_retry_deadline_reached(self):
+        """Does not send a request after the deadline."""
+        with patch.object(
+                kretry.K2hr3RetryState, 'time_left', return_value=0.0), \
+                patch.object(kasynchttp.AsyncK2hr3Http, '_exchange') as sent:
+            async with kasynchttp.AsyncK2hr3Http(
+                    self.server.baseurl, retry_policy=self.policy) as client:
+                myversion = kversion.K2hr3Version("v1")
+                myversion.get()
+                self.assertFalse(await client.get(myversion))
+        sent.assert_not_called()
+
+    async def test_async_retry_post_not_sent(self):
+        """Retries POST if the connection was refused."""
+        retry = self.policy.start()
+        async with kasynchttp.AsyncK2hr3Http(
+                f'http://127.0.0.1:{_closed_port()}',
+                retry_policy=self.policy) as client:
+            mytoken = ktoken.K2hr3Token("demo", "openstacktoken")
+            with patch.object(
+                    kretry.K2hr3RetryPolicy, 'start', return_value=retry):
+                self.assertFalse(await client.post(mytoken.create()))
+        self.assertEqual(retry.attempt, 3)
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -179,6 +179,55 @@ class TestK2hr3Role(unittest.TestCase):
         body = json.dumps(python_data)
         self.assertEqual(myrole.body, body)
 
+    @patch('k2hr3client.http.K2hr3Http._HTTP_REQUEST_METHOD')
+    def test_role_add_members_using_post(self, mock_HTTP_REQUEST_METHOD):
+        """Add members using POST."""
+        myrole = krole.K2hr3Role(self.token)
+        hosts = krole.K2hr3RoleHostList()
+        hosts.add_host(self.host)
+        hosts.add_host(krole.K2hr3RoleHost(
+            'otherhost', '1025', 'othercuk', None, None, None, None))
+        myrole.add_members(self.role_name, hosts, self.clear_hostname,
+                           self.clear_ips)
+
+        httpreq = khttp.K2hr3Http(self.base_url)
+        self.assertTrue(httpreq.POST(myrole))
+
+        # 1. assert URL
+        self.assertEqual(httpreq.url, f"{self.base_url}/v1/role/{self.role_name}")
+        # 2. assert URL params
+        self.assertEqual(myrole.urlparams, None)
+        # 3. assert Request body
+        python_data = json.loads(krole._ROLE_API_ADD_MEMBERS)  # pylint: disable=protected-access # noqa
+        python_data['host'] = [vars(host) for host in hosts.hostlist]
+        python_data['clear_hostname'] = self.clear_hostname
+        python_data['clear_ips'] = self.clear_ips
+        self.assertEqual(myrole.body, json.dumps(python_data))
+
+    @patch('k2hr3client.http.K2hr3Http._HTTP_REQUEST_METHOD')
+    def test_role_add_members_using_put(self, mock_HTTP_REQUEST_METHOD):
+        """Add members using PUT."""
+        myrole = krole.K2hr3Role(self.token)
+        myrole.add_members(self.role_name, [self.host], self.clear_hostname,
+                           self.clear_ips)
+
+        httpreq = khttp.K2hr3Http(self.base_url)
+        self.assertTrue(httpreq.PUT(myrole))
+
+        # 1. assert URL
+        self.assertEqual(httpreq.url, f"{self.base_url}/v1/role/{self.role_name}")
+        # 2. assert URL params
+        s_s_urlparams = {
+            'host': json.dumps([vars(self.host)]),
+            'clear_hostname': self.clear_hostname,
+            'clear_ips': self.clear_ips
+        }
+        self.assertEqual(myrole.urlparams, json.dumps(s_s_urlparams))
+        s_urlparams = urllib.parse.urlencode(s_s_urlparams)
+        self.assertEqual(httpreq.urlparams, f"{s_urlparams}")
+        # 3. assert Request body
+        self.assertEqual(myrole.body, None)
+
     @patch('k2hr3client.http.K2hr3Http._HTTP_REQUEST_METHOD')
     def test_role_add_member_using_put(self, mock_HTTP_REQUEST_METHOD):
         myrole = krole.K2hr3Role(self.token)
@@ -252,6 +301,27 @@ class TestK2hr3Role(unittest.TestCase):
         # 4. assert Request body
         self.assertEqual(myrole.body, None)
 
+    @patch('k2hr3client.http.K2hr3Http._HTTP_REQUEST_METHOD')
+    def test_role_add_member_with_roletoken_using_post(
+            self, mock_HTTP_REQUEST_METHOD):
+        """Add a member with a roletoken using POST."""
+        myrole = krole.K2hr3Role(self.token, krole.K2hr3TokenType.ROLE_TOKEN)
+        myrole.add_member_with_roletoken(
+            self.role_name, self.host.port, self.host.cuk, self.host.extra,
+            self.host.tag, self.host.inboundip, self.host.outboundip)
+
+        httpreq = khttp.K2hr3Http(self.base_url)
+        self.assertTrue(httpreq.POST(myrole))
+
+        # 1. assert URL
+        self.assertEqual(httpreq.url, f"{self.base_url}/v1/role/{self.role_name}")
+        # 2. assert Request body
+        python_data = json.loads(krole._ROLE_API_ADD_MEMBER_USING_ROLETOKEN)  # pylint: disable=protected-access # noqa
+        for field in ('port', 'cuk', 'extra', 'tag', 'inboundip',
+                      'outboundip'):
+            python_data['host'][field] = getattr(self.host, field)
+        self.assertEqual(myrole.body, json.dumps(python_data))
+
     @patch('k2hr3client.http.K2hr3Http._HTTP_REQUEST_METHOD')
     def test_role_get(self, mock_HTTP_REQUEST_METHOD):
         myrole = krole.K2hr3Role(self.token)
@@ -21,12 +21,15 @@
 """Test Package for K2hr3 Python Client."""
 import json
 import logging
+import tracemalloc
 import unittest
 from unittest.mock import patch
 import urllib.parse
 
 from k2hr3client import http as khttp
 from k2hr3client import tenant as ktenant
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
 
 LOG = logging.getLogger(__name__)
 
@@ -370,6 +373,80 @@ class TestK2hr3Tenant(unittest.TestCase):
         # 4. assert Request body
         self.assertEqual(mytenant.body, None)
 
+
+class TestK2hr3TenantList(unittest.TestCase):
+    """Tests the streaming tenant list.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_tenant.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.tenants = [
+            {'name': f'tenant{i}', 'id': f'{i:032x}', 'desc': 'x' * 100,
+             'display': f'Tenant {i}', 'users': ['demo']}
+            for i in range(20000)
+        ]
+        # encodes the body in advance not to trace the server allocations.
+        body = json.dumps({'result': True, 'message': None,
+                           'tenants': self.tenants}).encode('utf-8')
+        self.server.app = lambda req: (200, {}, body)
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def test_iter_tenants(self):
+        """Parses the tenants of chunks."""
+        text = json.dumps({'result': True, 'tenants': self.tenants[:3]})
+        tenants = list(ktenant.iter_tenants(
+            [text[i:i + 7] for i in range(0, len(text), 7)]))
+        self.assertEqual([tenant.name for tenant in tenants],
+                         ['tenant0', 'tenant1', 'tenant2'])
+        self.assertEqual(tenants[1].id, f'{1:032x}')
+        self.assertEqual(tenants[1].users, ['demo'])
+        self.assertEqual(tenants[1].display, 'Tenant 1')
+        self.assertEqual(tenants[1].desc, 'x' * 100)
+        self.assertRegex(repr(tenants[0]), '<K2hr3TenantInfo .*>')
+        # the list of the names is not expanded.
+        tenants = list(ktenant.iter_tenants(
+            ['{"result": true, "tenants": ["a", "b"]}']))
+        self.assertEqual([(t.name, t.id) for t in tenants],
+                         [('a', None), ('b', None)])
+        # a tenant without a name is skipped.
+        tenants = list(ktenant.iter_tenants(
+            ['{"result": true, "tenants": [{"id": "1"}, null, "",'
+             ' {"name": "c"}]}']))
+        self.assertEqual([t.name for t in tenants], ['c'])
+        with self.assertRaises(K2hr3Exception):
+            ktenant.K2hr3TenantInfo.from_item({'id': '1'})
+
+    def test_stream_tenant_list(self):
+        """Reads a big tenant list with bounded memory."""
+        httpreq = khttp.K2hr3Http(self.server.baseurl)
+        tracemalloc.start()
+        try:
+            count = 0
+            for tenant in ktenant.stream_tenant_list(httpreq, 'token',
+                                                     chunk_size=8192):
+                count += 1
+                self.assertEqual(tenant.users, ['demo'])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(count, 20000)
+        # the response is about 4MB.
+        self.assertLess(peak, 1024 * 1024)
+        req = self.server.requests[0]
+        self.assertEqual(req.path, '/v1/tenant')
+        self.assertEqual(req.query['expand'], ['True'])
+        self.assertEqual(req.headers['x-auth-token'], 'U=token')
+
+
 #
 # Local variables:
 # tab-width: 4
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import logging
+import unittest
+
+from k2hr3client import http as khttp
+from k2hr3client import tenantmembers as ktenantmembers
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+class TestK2hr3TenantMembers(unittest.TestCase):
+    """Tests the K2hr3TenantMembers class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_tenantmembers.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.server.app = self._app
+        self.httpreq = khttp.K2hr3Http(self.server.baseurl)
+        self.members = ktenantmembers.K2hr3TenantMembers(
+            self.httpreq, 'token', chunk_size=100, max_workers=4)
+        self.tenants = [f'tenant{i}' for i in range(250)]
+        self.bad = set()
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def _app(self, req):
+        tenants = req.json()['tenant']
+        if isinstance(tenants, str):
+            tenants = [tenants]
+        if self.bad.intersection(tenants):
+            return 400, {}, {'result': False, 'message': 'no such tenant'}
+        return 201, {}, {'result': True, 'message': None}
+
+    def _sent(self):
+        sent = []
+        for req in self.server.requests:
+            tenants = req.json()['tenant']
+            sent.extend([tenants] if isinstance(tenants, str) else tenants)
+        return sent
+
+    def test_tenantmembers_construct(self):
+        """Creates a K2hr3TenantMembers instance."""
+        self.assertEqual(self.members.chunk_size, 100)
+        self.assertNotIn('token', repr(self.members))
+        with self.assertRaises(K2hr3Exception):
+            ktenantmembers.K2hr3TenantMembers(self.httpreq, 'token',
+                                              chunk_size=0)
+
+    def test_add_to_service(self):
+        """Adds the tenants by the chunks and reports the progress."""
+        progress = []
+        report = self.members.add_to_service(
+            'myservice', self.tenants + ['tenant0'],
+            progress=lambda done, total: progress.append((done, total)))
+        self.assertTrue(report.ok)
+        self.assertEqual(report.succeeded, self.tenants)
+        self.assertEqual(len(report), 250)
+        self.assertEqual(report.skipped, 0)
+        self.assertRegex(repr(report), '<K2hr3TenantReport .*>')
+        self.assertEqual(sorted(len(req.json()['tenant'])
+                                for req in self.server.requests),
+                         [50, 100, 100])
+        req = self.server.requests[0]
+        self.assertEqual(req.method, 'POST')
+        self.assertEqual(req.headers['x-auth-token'], 'U=token')
+        self.assertFalse(req.json()['clear_tenant'])
+        self.assertEqual(len(progress), 3)
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(progress[-1], (250, 250))
+
+    def test_add_to_service_isolates_failures(self):
+        """Sends the tenants of a failed chunk one by one."""
+        self.bad = {'tenant42'}
+        report = self.members.add_to_service('myservice', self.tenants)
+        self.assertFalse(report.ok)
+        self.assertEqual([result.tenant for result in report.failed],
+                         ['tenant42'])
+        self.assertEqual(report.failed[0].code, 400)
+        self.assertEqual(report.failed[0].error, 'no such tenant')
+        self.assertEqual(report.results[0].code, 201)
+        self.assertEqual(len(report.succeeded), 249)
+        self.assertEqual(len(self.server.requests), 3 + 100)
+
+    def test_add_to_service_skips_succeeded(self):
+        """Sends only the tenants not added by the previous report."""
+        self.bad = {'tenant42', 'tenant142'}
+        members = ktenantmembers.K2hr3TenantMembers(
+            self.httpreq, 'token', chunk_size=100, isolate=False)
+        report = members.add_to_service('myservice', self.tenants)
+        self.assertEqual(len(report.failed), 200)
+        self.bad = set()
+        count = len(self.server.requests)
+        report = members.add_to_service('myservice', self.tenants,
+                                        report=report)
+        self.assertTrue(report.ok)
+        self.assertEqual(report.skipped, 50)
+        self.assertEqual(report.succeeded, self.tenants)
+        sent = [tenant for req in self.server.requests[count:]
+                for tenant in req.json()['tenant']]
+        self.assertEqual(sorted(sent), sorted(self.tenants[:200]))
+
+    def test_add_to_acr(self):
+        """Adds the tenants to the ACR one by one."""
+        self.bad = {'tenant3'}
+        report = self.members.add_to_acr('myservice', self.tenants[:10])
+        self.assertEqual([result.tenant for result in report.results],
+                         self.tenants[:10])
+        self.assertEqual([result.tenant for result in report.failed],
+                         ['tenant3'])
+        self.assertEqual(sorted(self._sent()), sorted(self.tenants[:10]))
+        self.assertEqual(self.server.requests[0].path, '/v1/acr/myservice')
+
+    def test_add_invalid_tenant(self):
+        """Raises K2hr3Exception before sending an invalid tenant."""
+        with self.assertRaises(K2hr3Exception):
+            self.members.add_to_service('myservice', ['tenant0', ''])
+        with self.assertRaises(K2hr3Exception):
+            self.members.add_to_acr('myservice', [None])
+        self.assertEqual(self.server.requests, [])
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
@@ -20,8 +20,11 @@
 #
 """Test Package for K2hr3 Python Client."""
 
+import http.client
+import io
 import json
 import logging
+import time
 import unittest
 from unittest.mock import patch
 import urllib.parse
@@ -178,6 +181,85 @@ class TestK2hr3token(unittest.TestCase):
         self.assertEqual(mytoken.body, None)
 
 
+class TestK2hr3RoleTokenList(unittest.TestCase):
+    """Tests the K2hr3RoleTokenList class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_token.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.now = time.time()
+        self.tokens = {
+            f'roletoken{i}': {
+                'registerpath': f'/v1/role/my_role/roletoken{i}',
+                'expire': self.now + i * 60}
+            for i in range(1, 101)}
+
+    def tearDown(self):
+        """Tears down a test case."""
+
+    def _tokenlist(self, tokens):
+        tokenlist = ktoken.K2hr3RoleTokenList("my_r3_token", "my_role", True)
+        hdrs = http.client.HTTPMessage()
+        hdrs['Content-Type'] = 'application/json'
+        tokenlist.set_response(200, 'http://127.0.0.1:18080', hdrs,
+                               json.dumps({'result': True, 'tokens': tokens}))
+        return tokenlist
+
+    def test_registerpath_parses_once(self):
+        """Parses the response body once for all lookups."""
+        tokenlist = self._tokenlist(self.tokens)
+        with patch('k2hr3client.api.loads', wraps=json.loads) as mock:
+            for i in range(1, 101):
+                self.assertEqual(tokenlist.registerpath(f'roletoken{i}'),
+                                 f'/v1/role/my_role/roletoken{i}')
+        self.assertEqual(mock.call_count, 1)
+        self.assertIn('roletoken1', tokenlist.index)
+        self.assertEqual(len(tokenlist.index), 100)
+
+    def test_expiry(self):
+        """Returns the expiry of a token and the tokens expiring soon."""
+        tokenlist = self._tokenlist(self.tokens)
+        self.assertEqual(tokenlist.expiry('roletoken2'), self.now + 120)
+        self.assertEqual(tokenlist.index.expiring(150, now=self.now),
+                         ['roletoken1', 'roletoken2'])
+        self.assertEqual(tokenlist.expiring(-1), [])
+
+    def test_not_expanded(self):
+        """Indexes the tokens of a not expanded list."""
+        tokenlist = self._tokenlist(['roletoken1', 'roletoken2'])
+        self.assertIn('roletoken2', tokenlist.index)
+        self.assertIsNone(tokenlist.index.registerpath('roletoken2'))
+        with self.assertRaises(KeyError):
+            tokenlist.registerpath('roletoken2')
+        with self.assertRaises(KeyError):
+            tokenlist.registerpath('roletoken3')
+        self.assertIsNone(tokenlist.expiry('roletoken2'))
+
+    def test_index_from_stream(self):
+        """Indexes a role token list read in chunks."""
+        body = json.dumps({'result': True, 'message': None,
+                           'tokens': self.tokens}).encode('utf-8')
+        index = ktoken.K2hr3RoleTokenIndex.from_stream(io.BytesIO(body))
+        self.assertEqual(len(index), 100)
+        self.assertEqual(index.registerpath('roletoken100'),
+                         '/v1/role/my_role/roletoken100')
+
+    def test_parse_expiry(self):
+        """Parses the expiry of epoch seconds and ISO 8601."""
+        self.assertEqual(ktoken.parse_expiry(10), 10.0)
+        self.assertEqual(ktoken.parse_expiry('10.5'), 10.5)
+        self.assertEqual(
+            ktoken.parse_expiry('1970-01-01T00:01:00.000000Z'), 60.0)
+        self.assertEqual(ktoken.parse_expiry('1970-01-01T00:01:00'), 60.0)
+        self.assertIsNone(ktoken.parse_expiry('tomorrow'))
+        self.assertIsNone(ktoken.parse_expiry(None))
+
+
 #
 # Local variables:
 # tab-width: 4
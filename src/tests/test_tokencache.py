@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import logging
+import os
+import stat
+import tempfile
+import time
+import unittest
+
+from k2hr3client import http as khttp
+from k2hr3client import tokencache as ktokencache
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+
+def _token_app(lifetime=3600.0):
+    """Return an app that issues a new token per request."""
+    counter = itertools.count(1)
+
+    def app(req):  # pylint: disable=unused-argument
+        return (201, {}, {'result': True, 'scoped': True,
+                          'token': f'r3token{next(counter)}',
+                          'expire': time.time() + lifetime})
+    return app
+
+
+class TestK2hr3TokenCache(unittest.TestCase):
+    """Tests the K2hr3TokenCache class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_tokencache.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer(app=_token_app()).__enter__()
+        self.http = khttp.K2hr3Http(self.server.baseurl)
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def test_tokencache_construct(self):
+        """Creates a K2hr3TokenCache instance."""
+        with ktokencache.K2hr3TokenCache(self.http) as cache:
+            self.assertIsInstance(cache, ktokencache.K2hr3TokenCache)
+            self.assertRegex(repr(cache), '<K2hr3TokenCache .*>')
+        with self.assertRaises(K2hr3Exception):
+            ktokencache.K2hr3TokenCache(self.http, lifetime=0)
+
+    def test_tokencache_reuses_token(self):
+        """Creates a token once per project and credential."""
+        with ktokencache.K2hr3TokenCache(self.http) as cache:
+            self.assertEqual(cache.get("demo", "ostoken"), 'r3token1')
+            self.assertEqual(cache.get("demo", "ostoken"), 'r3token1')
+            self.assertEqual(cache.get("demo", "other"), 'r3token2')
+            self.assertEqual(cache.get("admin", "ostoken"), 'r3token3')
+        self.assertEqual(len(self.server.requests), 3)
+        req = self.server.requests[0]
+        self.assertEqual(req.path, '/v1/user/tokens')
+        self.assertEqual(req.headers['x-auth-token'], 'U=ostoken')
+        # the shared client is not changed by the cache.
+        self.assertIsNone(self.http.url)
+
+    def test_tokencache_tracks_expiry(self):
+        """Reads the expiry from the response."""
+        with ktokencache.K2hr3TokenCache(self.http) as cache:
+            cache.get("demo", "ostoken")
+            cached = cache.peek("demo", "ostoken")
+        self.assertAlmostEqual(cached.expires_in(), 3600, delta=10)
+
+    def test_tokencache_singleflight(self):
+        """Shares one token creation between concurrent callers."""
+        self.server.__exit__(None, None, None)
+        self.server = K2hr3FakeServer(app=_token_app(),
+                                      delay=0.1).__enter__()
+        http = khttp.K2hr3Http(self.server.baseurl)
+        with ktokencache.K2hr3TokenCache(http) as cache, \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            tokens = list(executor.map(
+                lambda _: cache.get("demo", "ostoken"), range(8)))
+        self.assertEqual(set(tokens), {'r3token1'})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_tokencache_refreshes_in_background(self):
+        """Refreshes a token close to its expiry in the background."""
+        self.server.app = _token_app(lifetime=30)
+        with ktokencache.K2hr3TokenCache(self.http,
+                                         refresh_margin=60) as cache:
+            self.assertEqual(cache.get("demo", "ostoken"), 'r3token1')
+            # returns the cached token and refreshes it.
+            self.assertEqual(cache.get("demo", "ostoken"), 'r3token1')
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(cache.peek("demo", "ostoken").token, 'r3token2')
+
+    def test_tokencache_recreates_expired_token(self):
+        """Creates a new token if the cached one expired."""
+        self.server.app = _token_app(lifetime=-1)
+        with ktokencache.K2hr3TokenCache(self.http,
+                                         refresh_margin=0) as cache:
+            self.assertEqual(cache.get("demo", "ostoken"), 'r3token1')
+            self.assertEqual(cache.get("demo", "ostoken"), 'r3token2')
+
+    def test_tokencache_error(self):
+        """Raises K2hr3Exception if a token could not be created."""
+        self.server.app = lambda req: (401, {}, {'result': False})
+        with ktokencache.K2hr3TokenCache(self.http) as cache:
+            with self.assertRaises(K2hr3Exception):
+                cache.get("demo", "ostoken")
+
+    def test_tokencache_store(self):
+        """Stores the tokens in a file readable only by the owner."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'tokens.json')
+            with ktokencache.K2hr3TokenCache(self.http, path=path) as cache:
+                cache.get("demo", "ostoken")
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+            with open(path, encoding='utf-8') as fp:
+                self.assertNotIn('ostoken', fp.read())
+            with ktokencache.K2hr3TokenCache(self.http, path=path) as cache:
+                self.assertEqual(cache.get("demo", "ostoken"), 'r3token1')
+        self.assertEqual(len(self.server.requests), 1)
+
+
+def _roletoken_app(registerpath=True):
+    """Return an app that issues a new role token per request."""
+    counter = itertools.count(1)
+    issued = {}
+
+    def app(req):
+        if req.path.startswith('/v1/role/token/list/'):
+            return (200, {}, {'result': True, 'tokens': {
+                token: {'registerpath': path, 'expire': time.time() + 600}
+                for token, path in issued.items()}})
+        token = f'roletoken{next(counter)}'
+        issued[token] = f'/v1/role/{req.path.split("/")[-1]}/{token}'
+        payload = {'result': True, 'token': token}
+        if registerpath:
+            payload['registerpath'] = issued[token]
+        return (200, {}, payload)
+    return app
+
+
+class TestK2hr3RoleTokenPool(unittest.TestCase):
+    """Tests the K2hr3RoleTokenPool class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_tokencache.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer(app=_roletoken_app()).__enter__()
+        self.http = khttp.K2hr3Http(self.server.baseurl)
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def test_roletokenpool_construct(self):
+        """Creates a K2hr3RoleTokenPool instance."""
+        with ktokencache.K2hr3RoleTokenPool(self.http, "r3token") as pool:
+            self.assertIsInstance(pool, ktokencache.K2hr3RoleTokenPool)
+            self.assertRegex(repr(pool), '<K2hr3RoleTokenPool .*>')
+        with self.assertRaises(K2hr3Exception):
+            ktokencache.K2hr3RoleTokenPool(self.http, "r3token", size=2,
+                                           low_water=3)
+
+    def test_roletokenpool_fill(self):
+        """Issues role tokens up to size and hands them out once."""
+        with ktokencache.K2hr3RoleTokenPool(self.http, "r3token", size=4,
+                                            low_water=0) as pool:
+            self.assertEqual(pool.fill("testrole"), 4)
+            self.assertEqual(pool.fill("testrole"), 0)
+            roletokens = [pool.get("testrole") for _ in range(4)]
+            self.assertEqual(pool.available("testrole"), 0)
+        self.assertEqual([r.token for r in roletokens],
+                         [f'roletoken{i}' for i in range(1, 5)])
+        self.assertEqual(roletokens[0].registerpath,
+                         '/v1/role/testrole/roletoken1')
+        self.assertEqual(roletokens[0].role, 'testrole')
+        self.assertEqual(len(self.server.requests), 4)
+        req = self.server.requests[0]
+        self.assertEqual(req.path, '/v1/role/token/testrole')
+        self.assertEqual(req.headers['x-auth-token'], 'U=r3token')
+
+    def test_roletokenpool_fill_concurrently(self):
+        """Concurrent fills never issue more role tokens than size."""
+        self.server.delay = 0.05
+        with ktokencache.K2hr3RoleTokenPool(self.http, "r3token", size=4,
+                                            low_water=0) as pool, \
+                ThreadPoolExecutor(max_workers=4) as executor:
+            counts = list(executor.map(
+                lambda _: pool.fill("testrole"), range(4)))
+            self.assertEqual(pool.available("testrole"), 4)
+        self.assertEqual(sum(counts), 4)
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_roletokenpool_registerpath_from_list(self):
+        """Finds the registerpaths by one role token list request."""
+        self.server.app = _roletoken_app(registerpath=False)
+        with ktokencache.K2hr3RoleTokenPool(
+                self.http, lambda: "r3token", size=3, low_water=0) as pool:
+            pool.fill("testrole")
+            roletoken = pool.get("testrole")
+        self.assertEqual(roletoken.registerpath,
+                         '/v1/role/testrole/roletoken1')
+        self.assertAlmostEqual(roletoken.expires_in(), 600, delta=10)
+        self.assertEqual([r.path for r in self.server.requests][-1],
+                         '/v1/role/token/list/testrole')
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_roletokenpool_refills_below_low_water(self):
+        """Refills a role in the background below the low water mark."""
+        with ktokencache.K2hr3RoleTokenPool(self.http, "r3token", size=4,
+                                            low_water=2) as pool:
+            # issues one in place and refills the role concurrently.
+            self.assertRegex(pool.get("testrole").token, r'roletoken[1-5]')
+        self.assertEqual(pool.available("testrole"), 4)
+        self.assertEqual(len(self.server.requests), 5)
+
+    def test_roletokenpool_drops_expiring_token(self):
+        """Does not hand out a role token about to expire."""
+        with ktokencache.K2hr3RoleTokenPool(self.http, "r3token", size=2,
+                                            low_water=0, expire=30,
+                                            refresh_margin=60) as pool:
+            pool.fill("testrole")
+            self.assertEqual(pool.get("testrole").token, 'roletoken3')
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#
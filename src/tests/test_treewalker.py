@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+#
+# K2HDKC DBaaS based on Trove
+#
+# Copyright 2020 Yahoo Japan Corporation
+# Copyright 2024 LY Corporation
+#
+# K2HDKC DBaaS is a Database as a Service compatible with Trove which
+# is DBaaS for OpenStack.
+# Using K2HR3 as backend and incorporating it into Trove to provide
+# DBaaS functionality. K2HDKC, K2HR3, CHMPX and K2HASH are components
+# provided as AntPickax.
+#
+# For the full copyright and license information, please view
+# the license file that was distributed with this source code.
+#
+# AUTHOR:   Hirotaka Wakabayashi
+# CREATE:   Mon Sep 14 2020
+# REVISION:
+#
+"""Test Package for K2hr3 Python Client."""
+
+import itertools
+import json
+import logging
+import threading
+import time
+import unittest
+
+from k2hr3client import http as khttp
+from k2hr3client import treewalker as ktreewalker
+from k2hr3client.exception import K2hr3Exception
+from tests.fakeserver import K2hr3FakeServer
+
+LOG = logging.getLogger(__name__)
+
+_YRN = 'yrn:yahoo:::demo:'
+
+
+class TestK2hr3TreeWalker(unittest.TestCase):
+    """Tests the K2hr3TreeWalker class.
+
+    Simple usage(this class only):
+    $ python -m unittest tests/test_treewalker.py
+
+    Simple usage(all):
+    $ python -m unittest tests
+    """
+    def setUp(self):
+        """Sets up a test case."""
+        self.server = K2hr3FakeServer().__enter__()
+        self.server.app = self._app
+        self.httpreq = khttp.K2hr3Http(self.server.baseurl)
+        self.tree = {
+            'resource': {'': ['a', 'b'], 'a': ['a/x', 'a/y'], 'a/x': [],
+                         'a/y': [], 'b': []},
+            'policy': {'': ['p']},
+            'role': {'': [f'r{i}' for i in range(8)]},
+        }
+        self.lock = threading.Lock()
+        self.delay = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def tearDown(self):
+        """Tears down a test case."""
+        self.server.__exit__(None, None, None)
+
+    def _app(self, req):
+        parts = req.path.split('/', 4)[3:]
+        target, path = parts[0], parts[1] if len(parts) > 1 else ''
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        if path == 'broken':
+            return 200, {}, {'result': False, 'message': 'no such path'}
+        children = self.tree[target].get(path, [])
+        return 200, {}, {'result': True, 'message': None, 'children': [
+            {'name': f'{_YRN}{target}:{child}', 'children': []}
+            for child in children]}
+
+    def _walked(self, nodes):
+        return sorted((node.target, node.path) for node in nodes)
+
+    def _all(self):
+        return sorted({(target, path) for target, paths in self.tree.items()
+                       for path in list(paths) + [child for children in
+                                                  paths.values()
+                                                  for child in children]})
+
+    def test_child_path(self):
+        """Returns the paths of the children."""
+        self.assertEqual(ktreewalker._child_path(  # pylint: disable=protected-access # noqa
+            '', {'name': f'{_YRN}resource:a/b'}), 'a/b')
+        self.assertEqual(ktreewalker._child_path('a', 'b'), 'a/b')  # pylint: disable=protected-access # noqa
+        self.assertEqual(ktreewalker._child_path('a', 'a/b'), 'a/b')  # pylint: disable=protected-access # noqa
+
+    def test_treewalker_construct(self):
+        """Creates a K2hr3TreeWalker instance."""
+        walker = ktreewalker.K2hr3TreeWalker(self.httpreq, 'token')
+        self.assertRegex(repr(walker), '<K2hr3TreeWalker .*>')
+        self.assertNotIn('token', repr(walker))
+        with self.assertRaises(K2hr3Exception):
+            ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                        max_in_flight=0)
+        with self.assertRaises(K2hr3Exception):
+            ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                        targets=['service'])
+        with self.assertRaises(K2hr3Exception):
+            ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                        checkpoint={'positions': []})
+
+    def test_treewalker_walk(self):
+        """Walks the whole tree with a limit of the requests in flight."""
+        self.delay = 0.05
+        walker = ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                             max_in_flight=4)
+        nodes = list(walker.walk())
+        self.assertEqual(self._walked(nodes), self._all())
+        self.assertTrue(walker.done)
+        self.assertEqual(len(self.server.requests), len(nodes))
+        self.assertEqual(self.max_in_flight, 4)
+        node = [node for node in nodes if node.path == 'a'][0]
+        self.assertEqual(node.children, ['a/x', 'a/y'])
+        self.assertRegex(repr(node), '<K2hr3TreeNode .*>')
+        req = [req for req in self.server.requests
+               if req.path == '/v1/list/resource/a'][0]
+        self.assertEqual(req.query['expand'], ['False'])
+
+    def test_treewalker_service(self):
+        """Walks the objects of a service."""
+        self.server.app = lambda req: (200, {}, {'result': True,
+                                                 'children': []})
+        walker = ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                             service='myservice',
+                                             targets=['role'])
+        self.assertEqual([node.path for node in walker.walk()], [''])
+        self.assertEqual(self.server.requests[0].path,
+                         '/v1/list/myservice/role')
+
+    def test_treewalker_resume_service(self):
+        """Resumes the walk of the service of the checkpoint."""
+        self.server.app = lambda req: (200, {}, {'result': True,
+                                                 'children': []})
+        checkpoint = {'service': 'myservice', 'pending': [['role', '']]}
+        walker = ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                             checkpoint=checkpoint)
+        self.assertEqual(walker.checkpoint(), checkpoint)
+        self.assertEqual([node.path for node in walker.walk()], [''])
+        self.assertEqual(self.server.requests[0].path,
+                         '/v1/list/myservice/role')
+        with self.assertRaises(K2hr3Exception):
+            ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                        service='other',
+                                        checkpoint=checkpoint)
+
+    def test_treewalker_resume(self):
+        """Resumes an interrupted walk from the checkpoint."""
+        walker = ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                             max_in_flight=2)
+        walk = walker.walk()
+        first = [next(walk) for _ in range(3)]
+        walk.close()
+        self.assertFalse(walker.done)
+        checkpoint = json.loads(json.dumps(walker.checkpoint()))
+        walker = ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                             checkpoint=checkpoint)
+        rest = list(walker.walk())
+        self.assertEqual(sorted(set(self._walked(first + rest))),
+                         self._all())
+        self.assertEqual(len(first + rest), len(self._all()))
+
+    def test_treewalker_cycle(self):
+        """Lists each position once if the links make a cycle."""
+        self.tree = {'resource': {'': ['a'], 'a': ['a', 'b'], 'b': ['a']}}
+        walker = ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                             targets=['resource'])
+        nodes = list(itertools.islice(walker.walk(), 10))
+        self.assertEqual(sorted(node.path for node in nodes),
+                         ['', 'a', 'b'])
+        self.assertTrue(walker.done)
+
+    def test_treewalker_error(self):
+        """Yields the node that could not be listed."""
+        self.tree = {'resource': {'': ['broken', 'ok']}}
+        walker = ktreewalker.K2hr3TreeWalker(self.httpreq, 'token',
+                                             targets=['resource'])
+        nodes = {node.path: node for node in walker.walk()}
+        self.assertEqual(sorted(nodes), ['', 'broken', 'ok'])
+        self.assertEqual(nodes['broken'].error, 'no such path')
+        self.assertIsNone(nodes['ok'].error)
+
+
+#
+# Local variables:
+# tab-width: 4
+# c-basic-offset: 4
+# End:
+# vim600: expandtab sw=4 ts=4 fdm=marker
+# vim<600: expandtab sw=4 ts=4
+#